@@ -52,6 +52,89 @@ class Settings(BaseSettings):
     embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
     hf_token: str | None = None  # Hugging Face token for private models
     
+    # Retrieval Configuration (BM25 keyword ranking)
+    bm25_k1: float = 1.5  # Term frequency saturation
+    bm25_b: float = 0.75  # Chunk length normalization
+    rag_cache_size: int = 512  # Cached retrieval results (0 disables the cache)
+    rag_cache_ttl_seconds: int = 3600  # Lifetime of a cached retrieval result
+    # Helper prompt context packing (estimated tokens of retrieved chunks per provider)
+    helper_context_candidates: int = 10  # Chunks retrieved before packing
+    helper_context_max_chunks: int = 5  # Chunks kept after packing
+    helper_context_tokens_groq: int = 900
+    helper_context_tokens_gemini: int = 1200
+    helper_context_tokens_ollama: int = 500  # Small local models slow down a lot with long prompts
+    rag_watch_index: bool = False  # Poll the embeddings dir and hot-reload a rebuilt index
+    rag_watch_interval_seconds: float = 30.0  # Poll interval for rag_watch_index
+    admin_api_key: str | None = None  # Required in X-Admin-Key for /api/v1/admin (admin API disabled if unset)
+    
+    # Pooled HTTP clients for LLM providers (one keep-alive pool per base URL)
+    http_pool_maxsize: int = 20  # Max pooled connections per base URL
+    http_keepalive_expiry_seconds: float = 60.0  # Idle time before an async connection is closed
+    
+    # Multi-provider hedging / failover for helper calls (off unless hedge providers are set)
+    llm_hedge_providers: str = ""  # Comma-separated secondaries after llm_provider, e.g. "gemini,ollama"
+    llm_hedge_percentile: float = 90.0  # Hedge once the primary is slower than this percentile of its recent latencies
+    llm_hedge_initial_delay_seconds: float = 3.0  # Hedge delay until enough latencies are recorded
+    llm_hedge_min_delay_seconds: float = 0.3
+    llm_hedge_max_delay_seconds: float = 8.0
+    llm_failover_ratio: float = 2.0  # Demote the primary while its average latency is this much worse than the best
+    llm_failover_window_seconds: float = 60.0  # Latency samples older than this are ignored for ordering
+    
+    # Per-key Groq rate limiter (token buckets + priority queue, see rate_limiter.py)
+    rate_limit_enabled: bool = True
+    groq_rpm_limit: int = 30  # Requests per minute per key (0 = unlimited)
+    groq_tpm_limit: int = 12000  # Tokens per minute per key (0 = unlimited)
+    rate_limit_interactive_max_wait_seconds: float = 10.0  # Then intent/extraction/helper fall back
+    rate_limit_background_max_wait_seconds: float = 120.0  # Report generation / translation
+    rate_limit_max_retries: int = 3  # Re-queued attempts after a 429
+    rate_limit_default_retry_seconds: float = 5.0  # Block after a 429 without Retry-After
+    
+    # API key pools (spread calls over all configured Gemini / Groq keys, see key_pool.py)
+    key_pool_strategy: Literal["least_loaded", "round_robin"] = "least_loaded"
+    key_pool_cooldown_seconds: float = 60.0  # After a quota error without Retry-After (doubles per repeat)
+    key_pool_max_cooldown_seconds: float = 900.0
+    key_pool_auth_cooldown_seconds: float = 3600.0  # After 401/403 (invalid or revoked key)
+    key_pool_failure_threshold: int = 3  # Other errors in a row before a short cooldown
+    key_pool_error_cooldown_seconds: float = 15.0
+    
+    # Circuit breakers per provider endpoint (closed → open → half-open)
+    circuit_breaker_enabled: bool = True
+    circuit_window_seconds: float = 60.0  # Outcomes considered for the rates below
+    circuit_minimum_calls: int = 4  # Calls in the window before the breaker may open
+    circuit_failure_rate_threshold: float = 0.5  # Open at this share of failed calls
+    circuit_slow_call_seconds: float = 8.0  # Calls slower than this count as slow
+    circuit_slow_call_rate_threshold: float = 0.8  # Open at this share of slow calls
+    circuit_open_seconds: float = 30.0  # Fail fast this long before probing again
+    circuit_half_open_max_calls: int = 1  # Probe calls that must succeed to close
+    
+    # Wizard turn flow (LLM calls per turn)
+    # Opt-in: one JSON-mode call classifies intent and extracts the answer instead of
+    # a classification call followed by an AnswerExtractor call (see intent_classifier.py)
+    llm_joint_turn_analysis: bool = False
+    
+    # Local intent model (answer vs help request without the LLM, see intent_model.py)
+    intent_model_enabled: bool = True
+    intent_model_path: str = "app/data/models/intent_model.npz"  # Relative to backend/
+    intent_model_threshold: float = 0.9  # Below this probability either way, the LLM decides
+    
+    # Optional in-process models (loaded in the background, see model_registry.py)
+    model_preload: bool = True  # Start loading registered models right after startup
+    model_memory_budget_mb: int = 450  # Process RSS ceiling for loading models (0 = unlimited)
+    
+    # Semantic validator (synonym embeddings precomputed once per mapping)
+    validator_embeddings_enabled: bool = True  # False = lexicon + fuzzy matching only
+    validator_model_size_mb: int = 120  # RSS estimate of the sentence encoder (replaced by the measured size)
+    validator_embedding_cache_path: str = "app/data/cache/validator_embeddings.npz"  # Relative to backend/, empty = memory only
+    
+    # Request coalescing (identical in-flight LLM calls share one upstream request)
+    llm_coalescing_enabled: bool = True
+    
+    # Helper response cache (memory LRU + SQLite disk tier, shared TTL)
+    helper_cache_enabled: bool = True
+    helper_cache_size: int = 1024  # Responses kept in memory
+    helper_cache_ttl_seconds: int = 7 * 24 * 3600  # Lifetime of a cached response (both tiers)
+    helper_cache_path: str = "app/data/cache/helper_cache.sqlite3"  # Disk tier (relative to backend/, empty = memory only)
+    
     # n8n Integration
     n8n_webhook_url: str = "http://localhost:5678/webhook/soil-report"  # Default n8n webhook URL
     
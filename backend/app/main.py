@@ -2,8 +2,9 @@
 FastAPI application entry point for Argovers Soil Assistant.
 
 Initializes:
-- RAG engine (loads FAISS index)
+- RAG engine (loads FAISS index, hot-reloadable via RAGIndexManager)
 - LLM adapter (Gemini or local)
+- Optional models (background loads via the model registry)
 - FastAPI app with routes
 - CORS middleware
 
@@ -19,9 +20,19 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from .config import settings
-from .routes import sessions, reports
-from .services.rag_engine import RAGEngine
+from .routes import sessions, reports, admin
+from .services.rag_index_manager import RAGIndexManager
 from .services.llm_adapter import create_llm_adapter
+from .services.http_client import connection_stats, aclose_all
+from .services.helper_cache import get_helper_cache
+from .services.rate_limiter import get_rate_limiter
+from .services.key_pool import key_pool_stats
+from .services.single_flight import single_flight_stats
+from .services.circuit_breaker import circuit_breaker_stats
+from .services.intent_model import intent_model_stats
+from .services.model_registry import get_model_registry, model_registry_stats
+from .services.validators_enhanced import get_semantic_validator
+import asyncio
 import os
 
 # Initialize FastAPI app
@@ -73,8 +84,9 @@ app.add_middleware(
 )
 
 # Initialize RAG engine and LLM adapter
-rag_engine: RAGEngine | None = None
+rag_index = RAGIndexManager()
 llm_adapter = None
+rag_watch_task: asyncio.Task | None = None
 
 
 @app.on_event("startup")
@@ -86,21 +98,24 @@ async def startup_event():
     - RAG engine (FAISS index + embedding model)
 
     """
-    global rag_engine, llm_adapter
+    global llm_adapter, rag_watch_task
     
     print("🚀 Starting Argovers Soil Assistant...")
     print(f"📍 API Base URL: {settings.api_base_url}")
     
     # Initialize RAG engine
     try:
-        rag_engine = RAGEngine()
-        sessions.set_rag_engine(rag_engine)
+        rag_index.load()
         print("✓ RAG engine ready")
     except Exception as e:
         print(f"⚠ Warning: RAG engine initialization failed: {e}")
         print("  Helper mode will not work until index is built.")
-        # Create a dummy engine that returns empty results
-        rag_engine = None
+    sessions.set_rag_index(rag_index)
+    admin.set_rag_index(rag_index)
+    
+    # Pick up rebuilt indexes without a restart
+    if settings.rag_watch_index:
+        rag_watch_task = asyncio.create_task(rag_index.watch(settings.rag_watch_interval_seconds))
     
     # Initialize LLM adapter
     try:
@@ -111,17 +126,26 @@ async def startup_event():
         print(f"✗ Error: LLM adapter initialization failed: {e}")
         print("  Please check your API keys in .env file")
         raise
+    
+    # Heavy optional models load off the request path (lexical matching until ready)
+    if settings.model_preload:
+        get_semantic_validator()
+        get_model_registry().preload()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on application shutdown."""
     print("👋 Shutting down Argovers Soil Assistant...")
+    if rag_watch_task:
+        rag_watch_task.cancel()
+    await aclose_all()
 
 
 # Include routers
 app.include_router(sessions.router)
 app.include_router(reports.router, prefix="/api/reports", tags=["reports"])
+app.include_router(admin.router)
 
 # Mount static files for audio
 audio_dir = Path(__file__).parent / "data" / "audio"
@@ -135,7 +159,7 @@ async def root():
     return {
         "message": "Argovers Soil Assistant API",
         "status": "running",
-        "rag_ready": rag_engine.is_ready() if rag_engine else False,
+        "rag_ready": rag_index.engine.is_ready() if rag_index.engine else False,
     }
 
 
@@ -144,6 +168,17 @@ async def health():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "rag_ready": rag_engine.is_ready() if rag_engine else False,
+        "rag_ready": rag_index.engine.is_ready() if rag_index.engine else False,
+        "rag_cache": rag_index.engine.cache_stats() if rag_index.engine else None,
+        "rag_index_version": rag_index.version,
+        "http_pools": connection_stats(),
+        "helper_cache": get_helper_cache().stats() if settings.helper_cache_enabled else None,
+        "llm_router": llm_adapter.stats() if hasattr(llm_adapter, "stats") else None,
+        "rate_limits": get_rate_limiter().stats() if settings.rate_limit_enabled else None,
+        "key_pools": key_pool_stats(),
+        "coalescing": single_flight_stats(),
+        "circuit_breakers": circuit_breaker_stats(),
+        "intent_model": intent_model_stats(),
+        "models": model_registry_stats(),
     }
 
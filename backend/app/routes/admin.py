@@ -0,0 +1,66 @@
+"""
+Admin routes for operating the running server.
+
+Endpoints:
+- GET /api/v1/admin/rag - Served RAG index version, active/draining versions
+- POST /api/v1/admin/rag/reload - Load, validate and hot-swap a rebuilt index
+
+All endpoints require the `X-Admin-Key` header to match `admin_api_key`
+(the admin API is disabled while it is unset).
+"""
+
+import asyncio
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException
+from typing import Any, Dict, Optional
+from ..config import settings
+from ..services.rag_index_manager import RAGIndexManager
+
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
+
+# Set by main.py
+_rag_index: RAGIndexManager | None = None
+
+
+def set_rag_index(manager: RAGIndexManager) -> None:
+    """Set RAG index manager (called from main.py)."""
+    global _rag_index
+    _rag_index = manager
+
+
+def require_admin(x_admin_key: Optional[str] = Header(None)) -> None:
+    """Dependency that checks the admin key."""
+    if not settings.admin_api_key:
+        raise HTTPException(status_code=403, detail="Admin API disabled (ADMIN_API_KEY not set)")
+    if not x_admin_key or not secrets.compare_digest(x_admin_key, settings.admin_api_key):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
+
+
+def get_rag_index_dep() -> RAGIndexManager:
+    """Dependency function that returns the RAG index manager."""
+    if _rag_index is None:
+        raise HTTPException(status_code=500, detail="RAG engine not initialized")
+    return _rag_index
+
+
+@router.get("/rag", dependencies=[Depends(require_admin)])
+async def rag_status(manager: RAGIndexManager = Depends(get_rag_index_dep)) -> Dict[str, Any]:
+    """Served index version, leases per version and last reload result."""
+    return manager.status()
+
+
+@router.post("/rag/reload", dependencies=[Depends(require_admin)])
+async def reload_rag_index(
+    force: bool = False,
+    manager: RAGIndexManager = Depends(get_rag_index_dep),
+) -> Dict[str, Any]:
+    """
+    Hot-reload the RAG index from disk.
+    
+    The new version is loaded and validated in a worker thread while current
+    requests keep being served; it is swapped in only if validation passes.
+    """
+    result = await asyncio.to_thread(manager.reload, force)
+    if result["status"] == "failed":
+        raise HTTPException(status_code=422, detail=result)
+    return result
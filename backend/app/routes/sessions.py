@@ -4,11 +4,15 @@ API routes for session management and soil test wizard.
 Endpoints:
 - POST /api/v1/session/start - Start new session
 - POST /api/v1/session/next - Submit answer and get next step
+- POST /api/v1/session/next/stream - Same as /next, helper text streamed over SSE
 - GET /api/v1/session/state/{session_id} - Get current session state
 """
 
 from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+import asyncio
+import json
 from ..models import (
     StartSessionRequest,
     StartSessionResponse,
@@ -24,8 +28,9 @@ from ..services.orchestrator import (
     PARAMETER_ORDER,
     handle_user_message,
 )
-from ..services.orchestrator_enhanced import handle_user_message_enhanced
+from ..services.orchestrator_enhanced import handle_user_message_enhanced_async
 from ..services.rag_engine import RAGEngine
+from ..services.rag_index_manager import RAGIndexManager
 from ..services.llm_adapter import LLMAdapter
 # n8n removed - using direct LLM report generation
 from ..services.stt_service import create_stt_service
@@ -50,14 +55,14 @@ def get_llm() -> LLMAdapter:
 
 
 # Store instances (set by main.py)
-_rag_engine: RAGEngine | None = None
+_rag_index: RAGIndexManager | None = None
 _llm_adapter: LLMAdapter | None = None
 
 
-def set_rag_engine(engine: RAGEngine) -> None:
-    """Set RAG engine instance (called from main.py)."""
-    global _rag_engine
-    _rag_engine = engine
+def set_rag_index(manager: RAGIndexManager) -> None:
+    """Set RAG index manager (called from main.py)."""
+    global _rag_index
+    _rag_index = manager
 
 
 def set_llm_adapter(adapter: LLMAdapter) -> None:
@@ -66,11 +71,19 @@ def set_llm_adapter(adapter: LLMAdapter) -> None:
     _llm_adapter = adapter
 
 
-def get_rag_engine_dep() -> RAGEngine:
-    """Dependency function that returns RAG engine."""
-    if _rag_engine is None:
+def get_rag_engine_dep() -> Iterator[RAGEngine]:
+    """
+    Dependency function that returns RAG engine.
+    
+    Leases the current index version for the whole request, so a hot reload
+    mid-request does not change it; the lease is returned after the response.
+    """
+    if _rag_index is None:
         raise HTTPException(status_code=500, detail="RAG engine not initialized")
-    return _rag_engine
+    with _rag_index.lease() as engine:
+        if engine is None:
+            raise HTTPException(status_code=500, detail="RAG engine not initialized")
+        yield engine
 
 
 def get_llm_dep() -> LLMAdapter:
@@ -94,7 +107,7 @@ async def start_session(request: StartSessionRequest) -> StartSessionResponse:
     tts_service = create_tts_service()
     audio_url = ""
     try:
-        audio_path = tts_service.synthesize(question, request.language)
+        audio_path = await tts_service.synthesize_async(question, request.language)
         audio_url = tts_service.get_audio_url(audio_path, base_url=settings.api_base_url)
         print(f"✓ TTS generated for first question: {audio_url}")
     except Exception as e:
@@ -141,8 +154,8 @@ async def next_message(
     stt_service = create_stt_service() if audio_bytes else None
     tts_service = create_tts_service()
     
-    # Process through enhanced orchestrator
-    response, audit = handle_user_message_enhanced(
+    # Process through enhanced orchestrator (awaits I/O, never blocks the loop)
+    response, audit = await handle_user_message_enhanced_async(
         session=session,
         user_message=user_text,
         audio_bytes=audio_bytes,
@@ -152,18 +165,90 @@ async def next_message(
         tts_service=tts_service,
     )
     
-    # Update session state
+    _save_turn(session, response, audit)
+    
+    # n8n removed - report generation happens via /api/reports/generate endpoint
+    
+    return response
+
+
+@router.post("/next/stream")
+async def next_message_stream(
+    session_id: str = Form(...),
+    user_text: Optional[str] = Form(None),
+    audio_file: Optional[UploadFile] = File(None),
+    rag_engine: RAGEngine = Depends(get_rag_engine_dep),
+    llm: LLMAdapter = Depends(get_llm_dep),
+) -> StreamingResponse:
+    """
+    Same as /next, streamed as Server-Sent Events.
+    
+    Events:
+    - token: {"text": ...} helper text pieces as the LLM produces them (helper mode only)
+    - done: the NextMessageResponse payload (same as /next)
+    - error: {"detail": ...} if the turn failed
+    """
+    session = session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    audio_bytes = None
+    if audio_file:
+        audio_bytes = await audio_file.read()
+    
+    stt_service = create_stt_service() if audio_bytes else None
+    tts_service = create_tts_service()
+    events: asyncio.Queue[Tuple[str, Dict[str, Any]]] = asyncio.Queue()
+    
+    async def on_helper_text(text: str) -> None:
+        await events.put(("token", {"text": text}))
+    
+    async def run_turn() -> None:
+        try:
+            response, audit = await handle_user_message_enhanced_async(
+                session=session,
+                user_message=user_text,
+                audio_bytes=audio_bytes,
+                rag_engine=rag_engine,
+                llm=llm,
+                stt_service=stt_service,
+                tts_service=tts_service,
+                on_helper_text=on_helper_text,
+            )
+            _save_turn(session, response, audit)
+            await events.put(("done", response.model_dump(mode="json")))
+        except Exception as e:
+            print(f"✗ Streaming turn error: {e}")
+            await events.put(("error", {"detail": str(e)}))
+    
+    async def event_stream() -> AsyncIterator[str]:
+        turn = asyncio.create_task(run_turn())
+        try:
+            while True:
+                event, data = await events.get()
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+                if event in ("done", "error"):
+                    break
+        finally:
+            # Client went away mid-turn
+            if not turn.done():
+                turn.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _save_turn(session: SessionState, response: NextMessageResponse, audit: Dict[str, Any]) -> None:
+    """Persist session state after a turn and log its audit data."""
     session.current_parameter = response.parameter
     session.helper_mode = response.helper_mode
     session.answers = response.answers
     session_manager.update_session(session)
     
-    # Log audit data
     print(f"📊 Audit: {audit}")
-    
-    # n8n removed - report generation happens via /api/reports/generate endpoint
-    
-    return response
 
 
 @router.get("/state/{session_id}", response_model=SessionStateResponse)
@@ -10,9 +10,14 @@ Examples:
 - "It looks dark, almost black" → extracts "black"
 """
 
-from typing import Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 from ..models import Language
 from ..config import settings
+from .rate_limiter import limited_http_post, async_limited_http_post
+from .helper_cache import normalize_message
+from .single_flight import get_single_flight, make_key
+from .circuit_breaker import get_breaker
+import asyncio
 import re
 
 
@@ -58,21 +63,82 @@ class AnswerExtractor:
             - extracted_value: One of expected_values or None
             - confidence: 0.0-1.0 confidence score
         """
+        # Identical messages extracted concurrently share one LLM call
+        return get_single_flight("extraction").do_sync(
+            self._flight_key(user_message, parameter, language, expected_values),
+            lambda: self._extract_with_llm(user_message, parameter, language, expected_values),
+        )
+    
+    async def extract_answer_async(
+        self,
+        user_message: str,
+        parameter: str,
+        language: Language,
+        expected_values: list[str]
+    ) -> Tuple[Optional[str], float]:
+        """Async variant of extract_answer() (awaits the LLM call instead of blocking)."""
+        return await get_single_flight("extraction").do(
+            self._flight_key(user_message, parameter, language, expected_values),
+            lambda: self._extract_with_llm_async(user_message, parameter, language, expected_values),
+        )
+    
+    def _flight_key(
+        self,
+        user_message: str,
+        parameter: str,
+        language: Language,
+        expected_values: list[str]
+    ) -> str:
+        return make_key(
+            self.llm_provider, getattr(self, "model_name", None), parameter, language,
+            normalize_message(user_message), "|".join(expected_values),
+        )
+    
+    def _extract_with_llm(
+        self,
+        user_message: str,
+        parameter: str,
+        language: Language,
+        expected_values: list[str]
+    ) -> Tuple[Optional[str], float]:
         # Build extraction prompt
         prompt = self._build_extraction_prompt(
             user_message, parameter, language, expected_values
         )
         
         # Call LLM
-        if self.llm_provider == "groq":
-            return self._extract_with_groq(prompt, expected_values)
-        elif self.llm_provider == "ollama":
-            return self._extract_with_ollama(prompt, expected_values)
+        if self.llm_provider in ("groq", "ollama"):
+            return self._extract_with_http(prompt, expected_values)
         elif self.llm_provider == "gemini":
             return self._extract_with_gemini(prompt, expected_values)
         else:
             return None, 0.0
     
+    async def _extract_with_llm_async(
+        self,
+        user_message: str,
+        parameter: str,
+        language: Language,
+        expected_values: list[str]
+    ) -> Tuple[Optional[str], float]:
+        prompt = self._build_extraction_prompt(
+            user_message, parameter, language, expected_values
+        )
+        
+        if self.llm_provider in ("groq", "ollama"):
+            url, request = self._llm_request(prompt)
+            try:
+                response = await async_limited_http_post(url, self._groq_key(), **request)
+                return self._parse_llm_response(response, expected_values)
+            except Exception as e:
+                print(f"✗ {self.llm_provider.capitalize()} extraction error: {e}")
+                return None, 0.0
+        elif self.llm_provider == "gemini":
+            # Gemini SDK is blocking - keep it off the event loop
+            return await asyncio.to_thread(self._extract_with_gemini, prompt, expected_values)
+        else:
+            return None, 0.0
+    
     def _build_extraction_prompt(
         self,
         user_message: str,
@@ -108,22 +174,19 @@ Answer:"""
         
         return prompt
     
-    def _extract_with_groq(
-        self,
-        prompt: str,
-        expected_values: list[str]
-    ) -> Tuple[Optional[str], float]:
-        """Extract answer using Groq."""
-        import requests
-        
-        try:
-            response = requests.post(
-                self.base_url,
-                headers={
+    def _groq_key(self) -> Optional[str]:
+        """API key whose rate limiter schedules the call (None for Ollama)."""
+        return self.api_key if self.llm_provider == "groq" else None
+
+    def _llm_request(self, prompt: str) -> Tuple[str, Dict[str, Any]]:
+        """URL and request arguments of the extraction call (Groq or Ollama)."""
+        if self.llm_provider == "groq":
+            return self.base_url, {
+                "headers": {
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json"
                 },
-                json={
+                "json": {
                     "model": self.model_name,
                     "messages": [
                         {"role": "user", "content": prompt}
@@ -131,59 +194,52 @@ Answer:"""
                     "temperature": 0.1,
                     "max_tokens": 10,
                 },
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                extracted_text = result["choices"][0]["message"]["content"].strip().lower()
-                
-                # Parse response
-                return self._parse_extraction(extracted_text, expected_values)
-            else:
-                print(f"✗ Groq extraction error: {response.status_code}")
-                return None, 0.0
-        
-        except Exception as e:
-            print(f"✗ Groq extraction error: {e}")
+                "timeout": 10,
+            }
+        return f"{self.base_url}/api/generate", {
+            "json": {
+                "model": self.model_name,
+                "prompt": prompt,
+                "stream": False,
+                "options": {
+                    "temperature": 0.1,  # Very low for extraction
+                    "num_predict": 10,  # Short response
+                    "top_p": 0.9,
+                }
+            },
+            "timeout": 10,
+        }
+    
+    def _parse_llm_response(
+        self,
+        response: Any,
+        expected_values: list[str]
+    ) -> Tuple[Optional[str], float]:
+        """Parse a Groq/Ollama response (requests or httpx)."""
+        if response.status_code != 200:
+            print(f"✗ {self.llm_provider.capitalize()} extraction error: {response.status_code}")
             return None, 0.0
+        
+        result = response.json()
+        if self.llm_provider == "groq":
+            extracted_text = result["choices"][0]["message"]["content"].strip().lower()
+        else:
+            extracted_text = result.get('response', '').strip().lower()
+        
+        return self._parse_extraction(extracted_text, expected_values)
     
-    def _extract_with_ollama(
+    def _extract_with_http(
         self,
         prompt: str,
         expected_values: list[str]
     ) -> Tuple[Optional[str], float]:
-        """Extract answer using Ollama."""
-        import requests
-        
+        """Extract answer using Groq or Ollama."""
+        url, request = self._llm_request(prompt)
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model_name,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.1,  # Very low for extraction
-                        "num_predict": 10,  # Short response
-                        "top_p": 0.9,
-                    }
-                },
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                extracted_text = result.get('response', '').strip().lower()
-                
-                # Parse response
-                return self._parse_extraction(extracted_text, expected_values)
-            else:
-                print(f"✗ Ollama extraction error: {response.status_code}")
-                return None, 0.0
-        
+            response = limited_http_post(url, self._groq_key(), **request)
+            return self._parse_llm_response(response, expected_values)
         except Exception as e:
-            print(f"✗ Ollama extraction error: {e}")
+            print(f"✗ {self.llm_provider.capitalize()} extraction error: {e}")
             return None, 0.0
     
     def _extract_with_gemini(
@@ -212,11 +268,12 @@ Answer:"""
                     max_output_tokens=20,
                 )
                 
-                response = client.models.generate_content(
-                    model=self.model_name,
-                    contents=contents,
-                    config=config,
-                )
+                with get_breaker("gemini", "generate_content").guard():
+                    response = client.models.generate_content(
+                        model=self.model_name,
+                        contents=contents,
+                        config=config,
+                    )
                 
                 # Extract text
                 if hasattr(response, 'text'):
@@ -241,7 +298,8 @@ Answer:"""
                 genai.configure(api_key=self.api_key)
                 model = genai.GenerativeModel(self.model_name)
                 
-                response = model.generate_content(prompt)
+                with get_breaker("gemini", "generate_content").guard():
+                    response = model.generate_content(prompt)
                 extracted_text = response.text.strip().lower()
                 
                 return self._parse_extraction(extracted_text, expected_values)
@@ -0,0 +1,149 @@
+"""
+BM25 ranking over knowledge base chunks.
+
+The term-frequency matrix is stored term-major (one posting row per term,
+CSR layout) so that scoring a query is a single gather over the query's
+posting rows plus one np.bincount - a sparse matrix-vector product done
+in plain NumPy, without pulling SciPy onto the server.
+
+Artifact (written by preprocess_kb_improved.py next to kb_index.faiss):
+    kb_bm25.npz with vocab, indptr, doc_ids, tf, doc_len, idf
+
+To modify:
+- Change tokenization: Update `tokenize()` (rebuild the artifact afterwards)
+- Tune ranking: Set `bm25_k1` / `bm25_b` in config.py
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Union
+import numpy as np
+
+
+BM25_FILENAME = "kb_bm25.npz"
+
+# Punctuation stripped from both chunk and query tokens
+_TOKEN_STRIP = ".,:;!?()[]{}\"'`*#|-–—।"
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase text, split on whitespace and strip surrounding punctuation."""
+    tokens = []
+    for raw in text.lower().split():
+        token = raw.strip(_TOKEN_STRIP)
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def build_term_matrix(texts: Iterable[str]) -> Dict[str, np.ndarray]:
+    """
+    Build the term-major sparse term-frequency matrix and IDF vector.
+
+    Args:
+        texts: Chunk texts in index order (row i == FAISS id i)
+
+    Returns:
+        Dict of arrays as saved in kb_bm25.npz
+    """
+    doc_term_counts: List[Counter] = [Counter(tokenize(text)) for text in texts]
+    n_docs = len(doc_term_counts)
+
+    postings: Dict[str, List[tuple]] = {}
+    for doc_id, counts in enumerate(doc_term_counts):
+        for term, count in counts.items():
+            postings.setdefault(term, []).append((doc_id, count))
+
+    vocab = sorted(postings)
+    indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    doc_ids: List[int] = []
+    tf: List[int] = []
+    for term_id, term in enumerate(vocab):
+        for doc_id, count in postings[term]:
+            doc_ids.append(doc_id)
+            tf.append(count)
+        indptr[term_id + 1] = len(doc_ids)
+
+    df = np.diff(indptr).astype(np.float32)
+    idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+    return {
+        "vocab": np.array(vocab, dtype=str),
+        "indptr": indptr,
+        "doc_ids": np.array(doc_ids, dtype=np.int32),
+        "tf": np.array(tf, dtype=np.float32),
+        "doc_len": np.array([sum(c.values()) for c in doc_term_counts], dtype=np.float32),
+        "idf": idf,
+    }
+
+
+def save_term_matrix(path: Union[str, Path], matrix: Dict[str, np.ndarray]) -> None:
+    """Save term matrix arrays to a compressed .npz file."""
+    np.savez_compressed(str(path), **matrix)
+
+
+class BM25Index:
+    """
+    Okapi BM25 scorer backed by a term-major sparse term-frequency matrix.
+
+    Per-posting BM25 weights are precomputed at load time, so scoring a
+    query only gathers the posting rows of its terms and sums them per chunk.
+    """
+
+    def __init__(self, matrix: Dict[str, np.ndarray], k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize scorer from term matrix arrays.
+
+        Args:
+            matrix: Arrays produced by build_term_matrix() / kb_bm25.npz
+            k1: Term frequency saturation
+            b: Document length normalization
+        """
+        self.indptr = matrix["indptr"]
+        self.doc_ids = matrix["doc_ids"]
+        self.idf = matrix["idf"]
+        doc_len = matrix["doc_len"]
+        self.n_docs = len(doc_len)
+        self.term_ids: Dict[str, int] = {
+            str(term): i for i, term in enumerate(matrix["vocab"])
+        }
+
+        # Precompute BM25 weight for every (term, chunk) posting
+        tf = matrix["tf"]
+        avg_len = float(doc_len.mean()) if self.n_docs else 1.0
+        norm = k1 * (1.0 - b + b * doc_len[self.doc_ids] / max(avg_len, 1e-6))
+        row_idf = np.repeat(self.idf, np.diff(self.indptr))
+        self.weights = (row_idf * tf * (k1 + 1.0) / (tf + norm)).astype(np.float32)
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Build index in memory (used when no prebuilt artifact exists)."""
+        return cls(build_term_matrix(texts), k1=k1, b=b)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Load index from a kb_bm25.npz artifact."""
+        with np.load(str(path), allow_pickle=False) as data:
+            matrix = {key: data[key] for key in data.files}
+        return cls(matrix, k1=k1, b=b)
+
+    def score(self, query: str) -> np.ndarray:
+        """
+        Score every chunk against a query.
+
+        Returns:
+            float32 array of BM25 scores, one per chunk (0 for no overlap)
+        """
+        query_ids = [
+            self.term_ids[term] for term in set(tokenize(query)) if term in self.term_ids
+        ]
+        if not query_ids:
+            return np.zeros(self.n_docs, dtype=np.float32)
+
+        rows = [np.arange(self.indptr[t], self.indptr[t + 1]) for t in query_ids]
+        selected = np.concatenate(rows)
+        return np.bincount(
+            self.doc_ids[selected],
+            weights=self.weights[selected],
+            minlength=self.n_docs,
+        ).astype(np.float32)
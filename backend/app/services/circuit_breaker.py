@@ -0,0 +1,273 @@
+"""
+Circuit breakers around external providers (LLMs, STT, TTS).
+
+When Groq is down, every turn used to wait for intent classification,
+answer extraction and the helper call to time out one after another.
+Each provider endpoint now has a breaker:
+
+- closed:    calls go through; outcomes are kept for `circuit_window_seconds`
+- open:      too many failures (`circuit_failure_rate_threshold`) or slow
+             calls (`circuit_slow_call_rate_threshold` of calls slower than
+             `circuit_slow_call_seconds`) → calls fail immediately with
+             CircuitOpenError for `circuit_open_seconds`
+- half-open: after that, `circuit_half_open_max_calls` probe calls go
+             through; success closes the breaker, a failure reopens it
+
+Callers already catch provider errors, so an open breaker lands on the
+existing fallbacks in milliseconds (`_fallback_classification`,
+`_fallback_response`, the validator-only path, empty STT/TTS results).
+
+HTTP calls through http_client.py are guarded automatically (breaker per
+provider + endpoint, see `breaker_for_url()`); SDK calls (Groq Whisper SDK,
+Gemini, gTTS, reports) use `get_breaker(provider, endpoint).guard()`.
+5xx responses and exceptions count as failures, 429 is neutral (the rate
+limiter handles it), anything else is a success.
+
+`circuit_breaker_stats()` is shown under `circuit_breakers` in /health.
+
+To modify:
+- Thresholds / timings: Update `circuit_*` settings in config.py
+- Provider names of hosts: Update `PROVIDER_HOSTS`
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+from ..config import settings
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Breaker names use the provider instead of the host where it is known
+PROVIDER_HOSTS = {
+    "api.groq.com": "groq",
+    "generativelanguage.googleapis.com": "gemini",
+    "localhost:11434": "ollama",
+    "127.0.0.1:11434": "ollama",
+}
+
+# Outcomes kept per breaker (on top of the time window)
+MAX_OUTCOMES = 200
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit '{name}' is open (retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class _Attempt:
+    """One guarded call; observe() reports the provider's response."""
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.elapsed: Optional[float] = None
+        self.outcome: Optional[bool] = True  # True = success, False = failure, None = neutral
+
+    def observe(self, response: Any) -> None:
+        """Classify an HTTP response (latency is measured up to this point)."""
+        self.elapsed = time.monotonic() - self.start
+        status = getattr(response, "status_code", None)
+        if isinstance(status, int):
+            if status >= 500:
+                self.outcome = False
+            elif status == 429:
+                self.outcome = None
+
+    def fail(self) -> None:
+        """Count the call as failed although it did not raise."""
+        self.outcome = False
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker of one provider endpoint."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.times_opened = 0
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque(maxlen=MAX_OUTCOMES)  # (time, ok, slow)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+    def _retry_in(self, now: float) -> float:
+        return max(0.0, self._opened_at + settings.circuit_open_seconds - now)
+
+    def check(self) -> None:
+        """
+        Admit one call (reserving a probe slot when half-open).
+
+        Raises:
+            CircuitOpenError: Breaker is open (or half-open with all probes out)
+        """
+        if not settings.circuit_breaker_enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self.state == OPEN and self._retry_in(now) <= 0:
+                self.state = HALF_OPEN
+                self._probes = self._probe_successes = 0
+                print(f"⏳ Circuit {self.name} half-open, probing")
+            if self.state == HALF_OPEN:
+                if self._probes < settings.circuit_half_open_max_calls:
+                    self._probes += 1
+                    return
+            elif self.state == CLOSED:
+                return
+            self.rejected += 1
+            retry_in = self._retry_in(now)
+        raise CircuitOpenError(self.name, retry_in)
+
+    def reject_if_open(self) -> None:
+        """
+        Fail fast before queueing for a call (no probe slot is reserved).
+
+        Raises:
+            CircuitOpenError: Breaker is open and not due for a probe yet
+        """
+        if not settings.circuit_breaker_enabled or self.state != OPEN:
+            return
+        with self._lock:
+            retry_in = self._retry_in(time.monotonic())
+            if self.state != OPEN or retry_in <= 0:
+                return
+            self.rejected += 1
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record(self, seconds: float, success: Optional[bool]) -> None:
+        """Record a finished call (success None = neutral, e.g. 429 or cancelled)."""
+        if not settings.circuit_breaker_enabled:
+            return
+        now = time.monotonic()
+        slow = seconds >= settings.circuit_slow_call_seconds
+        with self._lock:
+            if success is None:
+                if self.state == HALF_OPEN:
+                    self._probes = max(0, self._probes - 1)
+                return
+            self.calls += 1
+            self.failures += not success
+            self.slow_calls += slow
+            ok = success and not slow
+
+            if self.state == HALF_OPEN:
+                if not ok:
+                    self._open(now, "probe failed" if not success else f"probe slow ({seconds:.1f}s)")
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= settings.circuit_half_open_max_calls:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    print(f"✓ Circuit {self.name} closed")
+                return
+            if self.state == OPEN:
+                return  # Late result of a call admitted before the breaker opened
+
+            self._outcomes.append((now, success, slow))
+            while self._outcomes and self._outcomes[0][0] < now - settings.circuit_window_seconds:
+                self._outcomes.popleft()
+            total = len(self._outcomes)
+            if total < settings.circuit_minimum_calls:
+                return
+            failure_rate = sum(1 for _, good, _ in self._outcomes if not good) / total
+            slow_rate = sum(1 for _, _, was_slow in self._outcomes if was_slow) / total
+            if failure_rate >= settings.circuit_failure_rate_threshold:
+                self._open(now, f"{failure_rate:.0%} of {total} calls failed")
+            elif slow_rate >= settings.circuit_slow_call_rate_threshold:
+                self._open(now, f"{slow_rate:.0%} of {total} calls slower than {settings.circuit_slow_call_seconds:.0f}s")
+
+    def _open(self, now: float, reason: str) -> None:
+        self.state = OPEN
+        self.times_opened += 1
+        self._opened_at = now
+        self._outcomes.clear()
+        print(f"⚠️  Circuit {self.name} open: {reason}, failing fast for {settings.circuit_open_seconds:.0f}s")
+
+    @contextmanager
+    def guard(self) -> Iterator[_Attempt]:
+        """
+        Guard one provider call (sync or async code).
+
+        Usage:
+            with get_breaker("gemini", "generate_content").guard() as attempt:
+                response = call()
+                attempt.observe(response)   # optional, for HTTP responses
+
+        Raises:
+            CircuitOpenError: Breaker is open (the call is not made)
+        """
+        self.check()
+        attempt = _Attempt()
+        try:
+            yield attempt
+        except (asyncio.CancelledError, GeneratorExit):
+            # Cancelled (e.g. a losing hedge) or abandoned: says nothing about the provider
+            self.record(time.monotonic() - attempt.start, None)
+            raise
+        except Exception as e:
+            # SDK rate-limit errors (429) are neutral like 429 responses
+            rate_limited = 429 in (getattr(e, "status_code", None), getattr(e, "code", None))
+            self.record(time.monotonic() - attempt.start, None if rate_limited else False)
+            raise
+        else:
+            elapsed = attempt.elapsed if attempt.elapsed is not None else time.monotonic() - attempt.start
+            self.record(elapsed, attempt.outcome)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            window = len(self._outcomes)
+            failed = sum(1 for _, good, _ in self._outcomes if not good)
+            return {
+                "state": self.state,
+                "calls": self.calls,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+                "window_failure_rate": round(failed / window, 4) if window else 0.0,
+                "retry_in_s": round(self._retry_in(now), 1) if self.state == OPEN else 0.0,
+            }
+
+
+# Global breakers per "provider:endpoint"
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider: str, endpoint: str) -> CircuitBreaker:
+    """Get or create the breaker of a provider endpoint."""
+    name = f"{provider}:{endpoint}"
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(name))
+    return breaker
+
+
+def breaker_for_url(url: str) -> CircuitBreaker:
+    """Breaker of an HTTP endpoint: provider (or host) + last two path segments."""
+    parts = urlsplit(url)
+    provider = PROVIDER_HOSTS.get(parts.netloc, parts.netloc)
+    endpoint = "/".join(parts.path.strip("/").split("/")[-2:]) or "/"
+    return get_breaker(provider, endpoint)
+
+
+def circuit_breaker_stats() -> Dict[str, Any]:
+    """State and counters of every breaker created so far."""
+    return {name: breaker.stats() for name, breaker in list(_breakers.items())}
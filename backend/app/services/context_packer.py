@@ -0,0 +1,127 @@
+"""
+Token-budget-aware packing of retrieved chunks into a helper prompt.
+
+Retrieval returns more candidates than fit in a prompt. The packer walks
+them in score order and keeps a chunk only if it:
+- fits in the remaining token budget (the top chunk is truncated instead)
+- is not a near-duplicate of a chunk already kept (how_to_test chunks
+  contain the text of their how_to_test_step children)
+
+If a later candidate contains chunks already kept (a how_to_test parent
+after one of its steps), it replaces them when it fits in the budget.
+
+To modify:
+- Change budgets: Update `helper_context_tokens_*` in config.py
+- Change duplicate detection: Update `NEAR_DUPLICATE_JACCARD` / `_Candidate.contains()`
+"""
+
+from typing import List, Tuple
+from .bm25 import tokenize
+
+
+# Token-set Jaccard similarity above which two chunks count as the same text
+NEAR_DUPLICATE_JACCARD = 0.9
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough LLM token count without a tokenizer.
+
+    ~4 characters per token for Latin script; Devanagari splits into far
+    more tokens per character, so non-ASCII characters count ~1 token per 2.
+    """
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii) // 4 + non_ascii // 2 + 1
+
+
+def _truncate(text: str, token_budget: int) -> str:
+    """Cut text to roughly `token_budget` tokens, preferring a line break."""
+    if estimate_tokens(text) <= token_budget:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= token_budget:
+            low = mid
+        else:
+            high = mid - 1
+    cut = text[:low]
+    line_end = cut.rfind("\n")
+    return (cut[:line_end] if line_end > len(cut) // 2 else cut).rstrip()
+
+
+class _Candidate:
+    """A chunk with its normalized text, token set and estimated cost."""
+
+    def __init__(self, rank: int, text: str):
+        self.rank = rank
+        self.text = text
+        tokens = tokenize(text)
+        self.normalized = " ".join(tokens)
+        self.tokens = frozenset(tokens)
+        self.cost = estimate_tokens(text)
+
+    def contains(self, other: "_Candidate") -> bool:
+        """True if `other` is this chunk's text (or a part of it, e.g. one step)."""
+        if other.normalized in self.normalized:
+            return True
+        union = len(self.tokens | other.tokens)
+        return union > 0 and len(self.tokens & other.tokens) / union >= NEAR_DUPLICATE_JACCARD
+
+
+def pack_chunks(
+    chunks: List[str],
+    token_budget: int,
+    max_chunks: int = 5,
+) -> List[str]:
+    """
+    Pack score-ordered chunks into a token budget.
+
+    Args:
+        chunks: Candidate chunk texts, best first
+        token_budget: Maximum estimated tokens of all kept chunks together
+        max_chunks: Maximum number of chunks kept
+
+    Returns:
+        Kept chunk texts in score order
+    """
+    return [text for _, text in pack_chunk_positions(chunks, token_budget, max_chunks)]
+
+
+def pack_chunk_positions(
+    chunks: List[str],
+    token_budget: int,
+    max_chunks: int = 5,
+) -> List[Tuple[int, str]]:
+    """
+    Same as pack_chunks(), but returns (position in `chunks`, kept text) pairs.
+
+    The kept text differs from the input only when the top chunk was truncated.
+    """
+    kept: List[_Candidate] = []
+    # Position in `chunks` of each kept candidate (its rank can be inherited)
+    positions = {}
+
+    for rank, text in enumerate(chunks):
+        candidate = _Candidate(rank, text)
+        if any(other.contains(candidate) for other in kept):
+            continue
+
+        # Chunks this one contains (e.g. its own steps) are replaced by it
+        covered = [other for other in kept if candidate.contains(other)]
+        remaining = [other for other in kept if other not in covered]
+        used = sum(other.cost for other in remaining)
+
+        if not kept and candidate.cost > token_budget:
+            # Always send something: trim the best chunk to the budget
+            candidate = _Candidate(rank, _truncate(text, token_budget))
+        if used + candidate.cost > token_budget or len(remaining) >= max_chunks:
+            continue
+
+        # A replacing parent takes the best rank of the chunks it covers
+        candidate.rank = min([rank] + [other.rank for other in covered])
+        positions[id(candidate)] = rank
+        kept = remaining + [candidate]
+
+    kept.sort(key=lambda candidate: candidate.rank)
+    return [(positions[id(candidate)], candidate.text) for candidate in kept]
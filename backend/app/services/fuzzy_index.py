@@ -0,0 +1,267 @@
+"""
+Typo-tolerant lookup over the answer lexicon (SymSpell-style deletion index).
+
+The lexicon (lexicon.py) only matches terms exactly, and the old fallback in
+SemanticValidator scored every synonym with a character-set overlap that
+was slow and often wrong. Misspelled and loosely transliterated answers
+("blak", "chiknee", "sukhee", "nahin") are now looked up in a deletion
+index: every term is stored under all strings reachable by deleting up to
+`max_edits()` characters, a word is looked up by its own deletions, and
+candidates are verified with a banded Damerau (optimal string alignment)
+Levenshtein distance. A lookup costs a few dozen dict probes however many
+synonyms the lexicon holds.
+
+Keys are lexicon.normalize()d text plus a romanized Hindi folding table
+(`_TRANSLIT_FOLD`: aspirates kh/gh/bh/dh/th → k/g/b/d/t, sh → s, w → v,
+ph → f, ...), so common spelling variants cost no edits at all.
+
+Allowed edits grow with word length (`max_edits()`): none up to 3
+characters ("no" must not match "na"), 1 up to 7, 2 beyond. Single words
+are matched per token; multi-word terms ("very dry") against the whole
+utterance.
+
+Main entry points:
+- `match(parameter, text, language)`: values (English + language), validators
+- `match(parameter, text)`: values of every language, intent fast path
+- `FuzzyIndex`: index over any {label: [terms]} mapping (SemanticValidator)
+
+To modify:
+- Spelling variants: Update `_TRANSLIT_FOLD`
+- Edit budget: Update `max_edits()`
+"""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ..models import Language
+from . import lexicon
+
+
+# Romanized Hindi spelling variants folded to one key (applied in order, after lexicon.normalize)
+_TRANSLIT_FOLD = (
+    ("chh", "c"), ("ch", "c"), ("kh", "k"), ("gh", "g"), ("jh", "j"),
+    ("th", "t"), ("dh", "d"), ("bh", "b"), ("sh", "s"), ("ph", "f"),
+    ("ck", "k"), ("q", "k"), ("w", "v"), ("z", "j"), ("ey", "e"),
+)
+
+# Longest utterance (in words) compared against multi-word terms as a whole
+MAX_PHRASE_WORDS = 3
+
+
+def fold(text: str) -> str:
+    """Fuzzy key: lexicon normalization + transliteration folding."""
+    text = lexicon.normalize(text)
+    for old, new in _TRANSLIT_FOLD:
+        text = text.replace(old, new)
+    return text
+
+
+def max_edits(length: int) -> int:
+    """Edits allowed for a word of `length` characters."""
+    if length <= 3:
+        return 0
+    return 1 if length <= 7 else 2
+
+
+def bounded_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (Levenshtein + adjacent transpositions).
+
+    Only the diagonal band of width 2 * max_distance + 1 is computed and the
+    scan stops as soon as a row exceeds the bound.
+
+    Returns:
+        The distance, or max_distance + 1 if it is larger than max_distance
+    """
+    if a == b:
+        return 0
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > max_distance:
+        return max_distance + 1
+
+    # Common prefix / suffix cost nothing
+    start = 0
+    while start < len(a) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    n, m = len(a), len(b)
+    over = max_distance + 1
+    if n == 0:
+        return m if m <= max_distance else over
+
+    before = None
+    previous = list(range(m + 1))
+    for i in range(1, n + 1):
+        current = [over] * (m + 1)
+        current[0] = i
+        low, high = max(1, i - max_distance), min(m, i + max_distance)
+        row_min = current[0] if low == 1 else over
+        char = a[i - 1]
+        for j in range(low, high + 1):
+            value = min(
+                previous[j - 1] + (char != b[j - 1]),  # Substitution / match
+                current[j - 1] + 1,  # Insertion
+                previous[j] + 1,  # Deletion
+            )
+            if before is not None and j > 1 and char == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, before[j - 2] + 1)  # Transposition
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return over
+        before, previous = previous, current
+    return previous[m] if previous[m] <= max_distance else over
+
+
+def similarity(a: str, b: str) -> float:
+    """Edit similarity of two texts' fuzzy keys (0.0 to 1.0, 0.0 beyond the edit budget)."""
+    a, b = fold(a), fold(b)
+    longest = max(len(a), len(b))
+    if not longest:
+        return 0.0
+    distance = bounded_distance(a, b, max_edits(min(len(a), len(b))))
+    return 1.0 - distance / longest if distance <= max_edits(min(len(a), len(b))) else 0.0
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """`word` and every string reachable by deleting up to `distance` characters."""
+    result = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        result |= frontier
+    return result
+
+
+class FuzzyMatch:
+    """Best fuzzy hit of an utterance."""
+
+    __slots__ = ("label", "term", "distance", "score")
+
+    def __init__(self, label: Tuple[str, str], term: str, distance: int, score: float):
+        self.label = label  # (group, value) as in lexicon.TermMatcher
+        self.term = term  # Matched fuzzy key
+        self.distance = distance
+        self.score = score  # 1 - distance / length of the longer key
+
+    @property
+    def value(self) -> Optional[str]:
+        return self.label[1] if self.label[0] == "value" else None
+
+    def __repr__(self) -> str:
+        return f"FuzzyMatch(label={self.label!r}, term={self.term!r}, distance={self.distance})"
+
+
+class FuzzyIndex:
+    """Deletion index over (term, label) pairs."""
+
+    def __init__(self, entries: Iterable[Tuple[str, Tuple[str, str]]]):
+        """
+        Build an index.
+
+        Args:
+            entries: (term, (group, value)) pairs; terms are folded here
+        """
+        self.labels: Dict[str, Tuple[str, str]] = {}
+        for term, label in entries:
+            key = fold(term)
+            if key:
+                self.labels.setdefault(key, label)  # First label wins, like lexicon mapping order
+        self.deletes: Dict[str, List[str]] = {}
+        self.phrase_words = 1
+        for key in self.labels:
+            self.phrase_words = max(self.phrase_words, len(key.split()))
+            for variant in _deletes(key, max_edits(len(key))):
+                self.deletes.setdefault(variant, []).append(key)
+
+    @classmethod
+    def from_mapping(cls, canonical_labels: Dict[str, List[str]]) -> "FuzzyIndex":
+        """Index over a {canonical value: [synonyms]} mapping."""
+        return cls((term, ("value", value)) for value, terms in canonical_labels.items() for term in terms)
+
+    def lookup(self, word: str) -> Optional[FuzzyMatch]:
+        """Closest term to an already-folded word or phrase (None beyond the edit budget)."""
+        label = self.labels.get(word)
+        if label is not None:
+            return FuzzyMatch(label, word, 0, 1.0)
+        budget = max_edits(len(word))
+        if not budget:
+            return None
+        best = None
+        seen: Set[str] = set()
+        for variant in _deletes(word, budget):
+            for key in self.deletes.get(variant, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                allowed = min(budget, max_edits(len(key)))
+                distance = bounded_distance(word, key, allowed)
+                if distance <= allowed and (best is None or distance < best.distance
+                                            or (distance == best.distance and len(key) > len(best.term))):
+                    best = FuzzyMatch(self.labels[key], key, distance, 1.0 - distance / max(len(word), len(key)))
+        return best
+
+    def best(self, text: str) -> Optional[FuzzyMatch]:
+        """
+        Best fuzzy hit in an utterance: the whole (short) utterance against
+        multi-word terms, then every word. Fewest edits win, then the longer term.
+        """
+        folded = fold(text)
+        words = folded.split()
+        candidates = []
+        if 1 < len(words) <= max(MAX_PHRASE_WORDS, self.phrase_words) and self.phrase_words > 1:
+            candidates.append(self.lookup(folded))
+        candidates.extend(self.lookup(word) for word in words)
+        best = None
+        for candidate in candidates:
+            if candidate is not None and (best is None or (candidate.distance, -len(candidate.term)) < (best.distance, -len(best.term))):
+                best = candidate
+        return best
+
+
+def _compile() -> Tuple[Dict[Tuple[str, str], FuzzyIndex], Dict[str, FuzzyIndex]]:
+    answer_indexes: Dict[Tuple[str, str], FuzzyIndex] = {}
+    intent_indexes: Dict[str, FuzzyIndex] = {}
+    for parameter, entry in lexicon.VOCABULARY.items():
+        values = entry.get("values", {})
+        for language in lexicon.LANGUAGES:
+            # English terms (incl. transliterations) are always accepted, like lexicon.scan()
+            languages = ["en"] if language == "en" else ["en", language]
+            answer_indexes[(parameter, language)] = FuzzyIndex(
+                (term, ("value", value)) for value, terms in values.items()
+                for code in languages for term in terms.get(code, [])
+            )
+        # Hints are generic words ("none", "good"): only exact hint matches count
+        intent_indexes[parameter] = FuzzyIndex(
+            (term, ("value", value)) for value, terms in values.items()
+            for code in lexicon.LANGUAGES for term in terms.get(code, [])
+        )
+    return answer_indexes, intent_indexes
+
+
+# Built once at import
+_ANSWER_INDEXES, _INTENT_INDEXES = _compile()
+
+
+def match(parameter: str, text: str, language: Optional[Language] = None) -> Optional[FuzzyMatch]:
+    """
+    Typo-tolerant lexicon lookup (use after an exact lexicon.scan() found nothing).
+
+    Args:
+        parameter: Wizard parameter (color, moisture, ...)
+        text: User's message
+        language: Session language → values (English + that language);
+            None → values of every language (intent fast path)
+
+    Returns:
+        Best FuzzyMatch, or None
+    """
+    if language is None:
+        index = _INTENT_INDEXES.get(parameter)
+    else:
+        index = _ANSWER_INDEXES.get((parameter, language)) or _ANSWER_INDEXES.get((parameter, "en"))
+    return index.best(text) if index is not None else None
@@ -0,0 +1,220 @@
+"""
+Two-tier response cache for helper-mode LLM calls.
+
+Most helper requests are near-identical ("how do I check pH?" in Hindi), so
+the generated explanation is cached and served without any network call:
+- Tier 1: in-memory LRU with TTL (LRUTTLCache)
+- Tier 2: SQLite file shared across restarts and workers, same TTL
+
+Key = provider, model, parameter, language, normalized user message,
+retrieved chunk ids and the RAG index fingerprint, so a rebuilt knowledge
+base (hot reload) never serves answers generated from old chunks.
+Fallback texts (provider errors) are never cached.
+
+To modify:
+- Size / TTL / location: Update `helper_cache_*` settings in config.py
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Iterable, Optional
+from ..config import settings
+from .bm25 import tokenize
+from .ttl_cache import LRUTTLCache
+
+
+# Expired disk rows are purged every this many writes
+PURGE_EVERY_WRITES = 200
+
+
+class FallbackText(str):
+    """Helper text produced by a provider's error/fallback path (never cached)."""
+
+
+def normalize_message(message: str) -> str:
+    """Case/punctuation/whitespace-insensitive form of a user message."""
+    return " ".join(tokenize(unicodedata.normalize("NFC", message)))
+
+
+def default_cache_path() -> str:
+    """SQLite path from settings, resolved relative to backend/."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    return os.path.join(backend_dir, settings.helper_cache_path)
+
+
+class HelperResponseCache:
+    """In-memory LRU in front of a SQLite table, both with the same TTL."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_size: int = 1024,
+        ttl_seconds: float = 7 * 24 * 3600,
+    ):
+        """
+        Initialize cache (creates the SQLite file if needed).
+
+        Args:
+            path: SQLite file; None keeps only the memory tier
+            memory_size: Entries held in memory
+            ttl_seconds: Lifetime of a cached response in both tiers
+        """
+        self.ttl_seconds = ttl_seconds
+        self.memory = LRUTTLCache(maxsize=memory_size, ttl_seconds=ttl_seconds)
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS helper_responses ("
+                    "key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._purge_expired()
+            except sqlite3.Error as e:
+                print(f"⚠ Helper cache disk tier disabled: {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        parameter: str,
+        language: str,
+        user_message: str,
+        chunk_ids: Iterable[int],
+        index_version: Optional[str],
+    ) -> str:
+        """Stable cache key (sha256) of everything the helper response depends on."""
+        parts = [
+            provider,
+            model,
+            parameter,
+            language,
+            normalize_message(user_message),
+            ",".join(str(chunk_id) for chunk_id in chunk_ids),
+            index_version or "",
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response from memory, then disk (promoted to memory); None on miss."""
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        if self._db is not None:
+            with self._lock:
+                try:
+                    row = self._db.execute(
+                        "SELECT response, expires_at FROM helper_responses WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    print(f"⚠ Helper cache read error: {e}")
+                    row = None
+            if row is not None and row[1] > time.time():
+                self.disk_hits += 1
+                self.memory.set(key, row[0])
+                return row[0]
+
+        self.misses += 1
+        return None
+
+    async def get_async(self, key: str) -> Optional[str]:
+        """
+        Async variant of get().
+        
+        Memory hits return immediately; the SQLite read runs in a worker
+        thread so the event loop never waits on disk.
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        if self._db is None:
+            self.misses += 1
+            return None
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key: str, response: str) -> None:
+        """Async variant of set() (the SQLite write runs in a worker thread)."""
+        if not response or isinstance(response, FallbackText):
+            return
+        if self._db is None:
+            self.memory.set(key, response)
+            return
+        await asyncio.to_thread(self.set, key, response)
+
+    def set(self, key: str, response: str) -> None:
+        """Store a generated response in both tiers (fallback texts are skipped)."""
+        if not response or isinstance(response, FallbackText):
+            return
+        self.memory.set(key, response)
+        if self._db is None:
+            return
+
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO helper_responses (key, response, expires_at) VALUES (?, ?, ?)",
+                    (key, str(response), time.time() + self.ttl_seconds),
+                )
+                self._writes += 1
+                if self._writes % PURGE_EVERY_WRITES == 0:
+                    self._purge_expired()
+            except sqlite3.Error as e:
+                print(f"⚠ Helper cache write error: {e}")
+
+    def _purge_expired(self) -> None:
+        self._db.execute("DELETE FROM helper_responses WHERE expires_at <= ?", (time.time(),))
+
+    def clear(self) -> None:
+        """Drop all cached responses (counters are kept)."""
+        self.memory.clear()
+        if self._db is not None:
+            with self._lock:
+                self._db.execute("DELETE FROM helper_responses")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit counters per tier and the overall hit rate."""
+        memory_hits = self.memory.hits
+        lookups = memory_hits + self.disk_hits + self.misses
+        disk_entries = None
+        if self._db is not None:
+            with self._lock:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM helper_responses").fetchone()[0]
+        return {
+            "memory_entries": len(self.memory),
+            "disk_entries": disk_entries,
+            "memory_hits": memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Global instance
+_helper_cache: Optional[HelperResponseCache] = None
+
+
+def get_helper_cache() -> HelperResponseCache:
+    """Get or create the global helper response cache."""
+    global _helper_cache
+    if _helper_cache is None:
+        _helper_cache = HelperResponseCache(
+            path=default_cache_path() if settings.helper_cache_path else None,
+            memory_size=settings.helper_cache_size,
+            ttl_seconds=settings.helper_cache_ttl_seconds,
+        )
+    return _helper_cache
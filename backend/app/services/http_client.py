@@ -0,0 +1,184 @@
+"""
+Process-wide pooled HTTP clients for LLM providers.
+
+Every Groq/Ollama call used to go through a bare `requests.post` (or a
+fresh `httpx.AsyncClient`), paying a new TCP + TLS handshake per call.
+This module keeps one keep-alive connection pool per provider base URL
+(scheme://host:port) and shares it across the process:
+- Sync callers: `http_post()` / `http_get()` (requests.Session per base URL)
+- Async callers: `async_http_post()` / `async_http_stream()` (httpx.AsyncClient
+  per base URL and event loop)
+
+`connection_stats()` reports requests vs. newly opened connections per
+base URL, i.e. how often a pooled connection was reused.
+
+POSTs are guarded by the endpoint's circuit breaker (circuit_breaker.py):
+while it is open they raise CircuitOpenError without touching the network.
+
+To modify:
+- Pool sizes / keep-alive: Update `http_pool_*` settings in config.py
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Tuple
+from urllib.parse import urlsplit
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from ..config import settings
+from .circuit_breaker import breaker_for_url
+
+
+_lock = threading.Lock()
+_sessions: Dict[str, requests.Session] = {}
+_async_clients: Dict[Tuple[str, int], Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+# Async request/connection counters per base URL (httpx has no pool counters)
+_async_counts: Dict[str, Dict[str, int]] = {}
+
+
+def base_url_of(url: str) -> str:
+    """Pool key of a URL: scheme://host[:port]."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def get_session(url: str) -> requests.Session:
+    """Shared keep-alive requests.Session for the URL's base URL."""
+    base_url = base_url_of(url)
+    session = _sessions.get(base_url)
+    if session is None:
+        with _lock:
+            session = _sessions.get(base_url)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,  # One host per session
+                    pool_maxsize=settings.http_pool_maxsize,
+                    max_retries=0,
+                )
+                session.mount(base_url, adapter)
+                _sessions[base_url] = session
+    return session
+
+
+def http_post(url: str, **kwargs: Any) -> requests.Response:
+    """requests.post() over the pooled session for the URL's base URL."""
+    with breaker_for_url(url).guard() as attempt:
+        response = get_session(url).post(url, **kwargs)
+        attempt.observe(response)
+        return response
+
+
+def http_get(url: str, **kwargs: Any) -> requests.Response:
+    """requests.get() over the pooled session for the URL's base URL."""
+    return get_session(url).get(url, **kwargs)
+
+
+def get_async_client(url: str) -> httpx.AsyncClient:
+    """
+    Shared httpx.AsyncClient for the URL's base URL in the running event loop.
+
+    Clients are bound to the loop that created them, so each loop gets its
+    own (clients of closed loops are dropped).
+    """
+    base_url = base_url_of(url)
+    loop = asyncio.get_running_loop()
+    key = (base_url, id(loop))
+    entry = _async_clients.get(key)
+    if entry is None or entry[0] is not loop:
+        with _lock:
+            for stale_key in [k for k, (l, _) in _async_clients.items() if l.is_closed()]:
+                del _async_clients[stale_key]
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.http_pool_maxsize,
+                    max_keepalive_connections=settings.http_pool_maxsize,
+                    keepalive_expiry=settings.http_keepalive_expiry_seconds,
+                ),
+            )
+            entry = (loop, client)
+            _async_clients[key] = entry
+    return entry[1]
+
+
+def _traced(url: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Count the request and add a trace hook counting newly opened connections."""
+    base_url = base_url_of(url)
+    counts = _async_counts.setdefault(base_url, {"requests": 0, "connections_opened": 0})
+    counts["requests"] += 1
+
+    async def trace(event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            counts["connections_opened"] += 1
+
+    return {**kwargs, "extensions": {**kwargs.get("extensions", {}), "trace": trace}}
+
+
+async def async_http_post(url: str, **kwargs: Any) -> httpx.Response:
+    """httpx POST over the pooled async client for the URL's base URL."""
+    with breaker_for_url(url).guard() as attempt:
+        response = await get_async_client(url).post(url, **_traced(url, kwargs))
+        attempt.observe(response)
+        return response
+
+
+@asynccontextmanager
+async def async_http_stream(url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+    """
+    Streaming httpx POST over the pooled async client.
+
+    Usage:
+        async with async_http_stream(url, json=...) as response:
+            async for line in response.aiter_lines(): ...
+    """
+    with breaker_for_url(url).guard() as attempt:
+        async with get_async_client(url).stream("POST", url, **_traced(url, kwargs)) as response:
+            attempt.observe(response)  # Latency = time to response headers
+            yield response
+
+
+def _reuse(requests_made: int, opened: int) -> Dict[str, Any]:
+    return {
+        "requests": requests_made,
+        "connections_opened": opened,
+        "reused": max(0, requests_made - opened),
+        "reuse_rate": round(max(0, requests_made - opened) / requests_made, 4) if requests_made else 0.0,
+    }
+
+
+def connection_stats() -> Dict[str, Any]:
+    """Requests, opened connections and reuse rate per base URL."""
+    sync_stats = {}
+    for base_url, session in list(_sessions.items()):
+        requests_made = opened = 0
+        adapter = session.get_adapter(base_url)
+        for key in list(adapter.poolmanager.pools.keys()):
+            pool = adapter.poolmanager.pools.get(key)
+            if pool is not None:
+                requests_made += pool.num_requests
+                opened += pool.num_connections
+        sync_stats[base_url] = _reuse(requests_made, opened)
+
+    async_stats = {
+        base_url: _reuse(counts["requests"], counts["connections_opened"])
+        for base_url, counts in list(_async_counts.items())
+    }
+    return {"sync": sync_stats, "async": async_stats}
+
+
+async def aclose_all() -> None:
+    """Close all pooled clients (application shutdown)."""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+        loop = asyncio.get_running_loop()
+        clients = [client for (l, client) in _async_clients.values() if l is loop]
+        for key in [k for k, (l, _) in _async_clients.items() if l is loop or l.is_closed()]:
+            del _async_clients[key]
+    for session in sessions:
+        session.close()
+    for client in clients:
+        await client.aclose()
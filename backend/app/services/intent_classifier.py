@@ -5,12 +5,38 @@ Uses local LLM to intelligently detect user intent:
 - Is the user asking for help/guidance?
 - Is the user providing an answer?
 - What's the confidence level?
+
+Joint mode (`analyze_turn_async`, setting `llm_joint_turn_analysis`) also
+extracts the answer in the same call: one JSON-mode request returns intent,
+canonical value and confidence instead of a classification call followed
+by an AnswerExtractor call.
+
+Messages the rules cannot decide go to the local intent model
+(intent_model.py) first; only turns it is unsure about reach the LLM.
 """
 
-from typing import Tuple
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel
 from ..models import Language
 from ..config import settings
-import requests
+from .rate_limiter import limited_http_post, async_limited_http_post
+from .helper_cache import normalize_message
+from .single_flight import get_single_flight, make_key
+from . import fuzzy_index, lexicon
+from .intent_model import get_intent_model
+
+
+# Intent names accepted in joint-mode JSON replies
+JOINT_INTENTS = {"answer": "answer", "help": "help_request", "help_request": "help_request"}
+
+
+class TurnAnalysis(BaseModel):
+    """Intent and extracted answer of one turn (joint mode)."""
+    intent: str  # "answer" or "help_request"
+    intent_confidence: float
+    value: Optional[str] = None  # One of the expected values, None if no answer found
+    value_confidence: float = 0.0
 
 
 class IntentClassifier:
@@ -48,6 +74,131 @@ class IntentClassifier:
             - intent: "answer" or "help_request"
             - confidence: 0.0-1.0
         """
+        local = self._classify_local(user_message, parameter)
+        if local:
+            return local
+        
+        # Identical messages classified concurrently share one LLM call
+        return get_single_flight("intent").do_sync(
+            self._flight_key(user_message, parameter, language),
+            lambda: self._classify_with_llm(user_message, parameter, language),
+        )
+    
+    async def classify_intent_async(
+        self,
+        user_message: str,
+        parameter: str,
+        language: Language
+    ) -> Tuple[str, float]:
+        """Async variant of classify_intent() (awaits the LLM call instead of blocking)."""
+        local = self._classify_local(user_message, parameter)
+        if local:
+            return local
+        
+        return await get_single_flight("intent").do(
+            self._flight_key(user_message, parameter, language),
+            lambda: self._classify_with_llm_async(user_message, parameter, language),
+        )
+    
+    def _flight_key(self, user_message: str, parameter: str, language: Language) -> str:
+        return make_key(self.provider, self.model_name, parameter, language, normalize_message(user_message))
+    
+    def _classify_with_llm(self, user_message: str, parameter: str, language: Language) -> Tuple[str, float]:
+        url, request = self._llm_request(self._build_prompt(user_message, parameter, language))
+        try:
+            response = limited_http_post(url, self.api_key, **request)
+            return self._parse_llm_response(response, user_message, language)
+        except Exception as e:
+            print(f"✗ Intent classification error: {e}")
+            return self._fallback_classification(user_message, language)
+    
+    async def _classify_with_llm_async(self, user_message: str, parameter: str, language: Language) -> Tuple[str, float]:
+        url, request = self._llm_request(self._build_prompt(user_message, parameter, language))
+        try:
+            response = await async_limited_http_post(url, self.api_key, **request)
+            return self._parse_llm_response(response, user_message, language)
+        except Exception as e:
+            print(f"✗ Intent classification error: {e}")
+            return self._fallback_classification(user_message, language)
+    
+    async def analyze_turn_async(
+        self,
+        user_message: str,
+        parameter: str,
+        language: Language,
+        expected_values: List[str],
+    ) -> TurnAnalysis:
+        """
+        Classify intent and extract the answer with one LLM call (joint mode).
+        
+        The reply is parsed strictly: anything but a JSON object with a known
+        intent, a value from `expected_values` (or null) and a numeric
+        confidence is rejected, and the keyword fallback decides the intent
+        (the caller's validators then look for the answer).
+        
+        Args:
+            user_message: What the user said
+            parameter: Current parameter (color, moisture, etc.)
+            language: Language code
+            expected_values: Canonical values the answer must be one of
+            
+        Returns:
+            TurnAnalysis (value None for help requests or when nothing matched)
+        """
+        local = self._classify_local(user_message, parameter)
+        if local and local[0] == "help_request":
+            return TurnAnalysis(intent=local[0], intent_confidence=local[1])
+        
+        analysis = await get_single_flight("turn").do(
+            make_key(self._flight_key(user_message, parameter, language), "|".join(expected_values)),
+            lambda: self._analyze_with_llm_async(user_message, parameter, language, expected_values),
+        )
+        if local:
+            # Rules / local model already recognised an answer: keep their intent, take the LLM's value
+            return TurnAnalysis(
+                intent=local[0],
+                intent_confidence=local[1],
+                value=analysis.value,
+                value_confidence=analysis.value_confidence,
+            )
+        return analysis
+    
+    async def _analyze_with_llm_async(
+        self,
+        user_message: str,
+        parameter: str,
+        language: Language,
+        expected_values: List[str],
+    ) -> TurnAnalysis:
+        prompt = self._build_joint_prompt(user_message, parameter, language, expected_values)
+        url, request = self._llm_request(prompt, joint=True)
+        try:
+            response = await async_limited_http_post(url, self.api_key, **request)
+            analysis = self._parse_joint_response(response, expected_values)
+        except Exception as e:
+            print(f"✗ Joint classification error: {e}")
+            analysis = None
+        
+        if analysis is None:
+            intent, confidence = self._fallback_classification(user_message, language)
+            return TurnAnalysis(intent=intent, intent_confidence=confidence)
+        return analysis
+    
+    def _classify_local(self, user_message: str, parameter: str) -> Optional[Tuple[str, float]]:
+        """Rules, then the local intent model; None if the message needs the LLM."""
+        quick = self._classify_quick(user_message, parameter)
+        if quick:
+            return quick
+        model = get_intent_model()
+        if model is None:
+            return None
+        decided = model.classify(user_message)
+        if decided:
+            print(f"✓ Local intent model: {decided[0]} ({decided[1]:.2f})")
+        return decided
+    
+    def _classify_quick(self, user_message: str, parameter: str) -> Optional[Tuple[str, float]]:
+        """Rule-based classification; None if the message needs the LLM."""
         # Quick check: If message is very short and looks like a valid value, it's likely an answer
         user_lower = user_message.lower().strip()
         
@@ -57,76 +208,6 @@ class IntentClassifier:
             if not any(phrase in user_lower for phrase in explicit_help):
                 return "answer", 0.99
         
-        # Comprehensive valid answers for each parameter (English + Hindi + variations)
-        valid_answers = {
-            "color": [
-                # English
-                "black", "red", "brown", "yellow", "grey", "gray", "dark", "light", "white",
-                # Hindi
-                "काली", "काला", "लाल", "भूरी", "भूरा", "पीली", "पीला", "स्लेटी", "सफेद",
-                # Variations
-                "kali", "lal", "bhura", "peela", "surahi"
-            ],
-            "moisture": [
-                # English
-                "dry", "wet", "moist", "damp", "very dry", "very wet", "slightly moist",
-                # Hindi
-                "सूखी", "सूखा", "गीली", "गीला", "नम", "थोड़ी नम", "बहुत सूखी", "बहुत गीली",
-                # Variations
-                "sukhi", "geeli", "nam"
-            ],
-            "smell": [
-                # English
-                "sweet", "earthy", "sour", "rotten", "no smell", "none", "good", "bad", "fresh",
-                # Hindi
-                "मीठी", "मीठा", "मिट्टी", "मिट्टी जैसी", "खट्टी", "खट्टा", "सड़ी", "सड़ा", "कोई गंध नहीं",
-                # Variations
-                "meethi", "mitti", "khatti", "sadhi"
-            ],
-            "ph": [
-                # English
-                "acidic", "neutral", "alkaline", "basic", "sour", "bitter", "balanced",
-                # Hindi
-                "अम्लीय", "तटस्थ", "क्षारीय", "खट्टा", "संतुलित",
-                # Variations
-                "amliya", "tatasth", "kshariya",
-                # Numeric pH values
-                "1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11", "12", "13", "14",
-                "6.5", "7.0", "7.5", "ph"
-            ],
-            "soil_type": [
-                # English
-                "clay", "sandy", "loamy", "silt", "silty", "loam", "sand",
-                # Hindi
-                "चिकनी", "रेतिली", "दोमट", "गादयुक्त", "मिट्टी",
-                # Variations
-                "chikni", "retili", "domat"
-            ],
-            "earthworms": [
-                # English
-                "yes", "no", "many", "few", "none", "some", "lots", "present", "absent",
-                # Hindi
-                "हाँ", "नहीं", "बहुत", "थोड़े", "कम", "हैं", "नहीं हैं",
-                # Variations
-                "haan", "nahi", "bahut", "kam", "thode"
-            ],
-            "location": [
-                # Any location-related words - be very permissive for location
-                "village", "district", "state", "city", "town", "गाँव", "गाउं", "जिला", "राज्य",
-                "में", "है", "से", "का", "की", "in", "at", "from", "near",
-                # Common location indicators
-                "नई", "पुरानी", "बड़ा", "छोटा", "नगर", "पुर", "आबाद", "गढ़"
-            ],
-            "fertilizer_used": [
-                # English
-                "urea", "dap", "npk", "organic", "compost", "manure", "none", "no", "yes",
-                # Hindi
-                "यूरिया", "डीएपी", "एनपीके", "जैविक", "खाद", "कुछ नहीं", "नहीं", "हाँ",
-                # Variations
-                "vermicompost", "cow dung", "gobar"
-            ],
-        }
-        
         # Special handling for location - be VERY permissive
         if parameter == "location":
             # For location, unless it's explicitly "don't know" or "help", treat as answer
@@ -153,41 +234,36 @@ class IntentClassifier:
                 if len(user_message.strip()) > 3:
                     return "answer", 0.95
         
-        # Check if message contains any valid answer for this parameter
-        if parameter in valid_answers:
-            for valid_answer in valid_answers[parameter]:
-                if valid_answer in user_lower:
-                    # It's likely an answer
-                    return "answer", 0.95
-        
-        # Check for obvious help requests (but not follow-up questions)
-        help_phrases = [
-            "don't know", "dont know", "not sure", "नहीं पता"
-        ]
+        # One lexicon scan: answer terms, "don't know" phrases, follow-up phrases
+        # (the longest term wins, so "नहीं पता" is not read as the answer "नहीं")
+        match = lexicon.scan(parameter, user_message)
+        # "How do I test the moisture?" names the parameter but asks how to check it
+        if "how_to" in match.groups:
+            return "help_request", 0.75 if "follow_up" in match.groups else 0.95
+        if match.groups & {"value", "hint"}:
+            return "answer", 0.95
         
-        # These are help requests ONLY if they're standalone, not follow-ups
-        for phrase in help_phrases:
-            if phrase in user_lower:
-                return "help_request", 0.95
+        # Help requests ONLY if they're standalone, not follow-ups
+        if "unsure" in match.groups:
+            return "help_request", 0.95
         
-        # Check for follow-up questions (should stay in helper mode but not restart)
-        follow_up_phrases = [
-            "problem", "issue", "after step", "step", "what next", "then what",
-            "समस्या", "कदम के बाद", "फिर क्या"
-        ]
+        # Follow-up questions (should stay in helper mode but not restart):
+        # help_request with lower confidence to indicate it's a follow-up
+        if "follow_up" in match.groups:
+            return "help_request", 0.75
         
-        for phrase in follow_up_phrases:
-            if phrase in user_lower:
-                # This is a follow-up question, not a new help request
-                # Return as help_request but with lower confidence to indicate it's a follow-up
-                return "help_request", 0.75
+        # Misspelled / transliterated answer terms ("blak", "chiknee")
+        if fuzzy_index.match(parameter, user_message) is not None:
+            return "answer", 0.9
         
         # If message is very short (1-2 words) and doesn't contain help phrases, likely an answer
         if len(user_message.split()) <= 2:
             return "answer", 0.85
         
-        # For longer messages, use LLM classification
-        # Build classification prompt
+        return None
+    
+    def _build_prompt(self, user_message: str, parameter: str, language: Language) -> str:
+        """Build the ANSWER/HELP classification prompt."""
         if language == "hi":
             # Special prompt for location
             if parameter == "location":
@@ -245,73 +321,138 @@ Reply with ONLY ONE WORD: "ANSWER" or "HELP"
 
 Reply:"""
         
-        try:
-            if self.provider == "groq":
-                # Use Groq API
-                response = requests.post(
-                    self.base_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model_name,
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": 0.0,  # Deterministic for faster response
-                        "max_tokens": 3,  # Just need "ANSWER" or "HELP"
-                    },
-                    timeout=3  # Shorter timeout
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    classification = result["choices"][0]["message"]["content"].strip().upper()
-                    
-                    # Parse response
-                    if "HELP" in classification:
-                        return "help_request", 0.90
-                    elif "ANSWER" in classification:
-                        return "answer", 0.90
-                    else:
-                        return self._fallback_classification(user_message, language)
-                else:
-                    return self._fallback_classification(user_message, language)
-            else:
-                # Use Ollama API
-                response = requests.post(
-                    f"{self.base_url}/api/generate",
-                    json={
-                        "model": self.model_name,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.1,
-                            "num_predict": 5,
-                            "top_p": 0.9,
-                        }
-                    },
-                    timeout=5
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    classification = result.get('response', '').strip().upper()
-                    
-                    if "HELP" in classification:
-                        return "help_request", 0.90
-                    elif "ANSWER" in classification:
-                        return "answer", 0.90
-                    else:
-                        return self._fallback_classification(user_message, language)
-                else:
-                    return self._fallback_classification(user_message, language)
+        return prompt
+    
+    def _build_joint_prompt(
+        self,
+        user_message: str,
+        parameter: str,
+        language: Language,
+        expected_values: List[str],
+    ) -> str:
+        """Build the joint intent + extraction prompt (JSON reply)."""
+        values_str = ", ".join(expected_values) if expected_values else "(free text: use null)"
+        reply_format = '{"intent": "answer" | "help", "value": <one allowed value> | null, "confidence": <0.0-1.0>}'
         
-        except Exception as e:
-            print(f"✗ Intent classification error: {e}")
+        if language == "hi":
+            return f"""किसान का संदेश: "{user_message}"
+प्रश्न: मिट्टी का {parameter} क्या है?
+मान्य उत्तर: {values_str}
+
+क्या किसान उत्तर दे रहा है या मदद मांग रहा है? अगर उत्तर दे रहा है, तो मान्य उत्तरों में से कौन सा?
+"value" में केवल ऊपर दिए गए अंग्रेज़ी मान लिखें। मदद या कोई उत्तर न मिलने पर null लिखें।
+
+केवल यह JSON लौटाएं: {reply_format}"""
+        
+        return f"""User message: "{user_message}"
+Question: What is the soil {parameter}?
+Allowed values: {values_str}
+
+Is the user answering the question or asking for help? If answering, which allowed value do they mean?
+"value" must be exactly one of the allowed values, or null for help requests or when no value fits.
+
+Reply with ONLY this JSON object: {reply_format}"""
+    
+    def _llm_request(self, prompt: str, joint: bool = False) -> Tuple[str, Dict[str, Any]]:
+        """URL and request arguments of the classification call for the provider."""
+        if self.provider == "groq":
+            payload = {
+                "model": self.model_name,
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": 0.0,  # Deterministic for faster response
+                "max_tokens": 3,  # Just need "ANSWER" or "HELP"
+            }
+            if joint:
+                payload["max_tokens"] = 48
+                payload["response_format"] = {"type": "json_object"}
+            return self.base_url, {
+                "headers": {
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                "json": payload,
+                "timeout": 5 if joint else 3,  # Shorter timeout
+            }
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": False,
+            "options": {
+                "temperature": 0.1,
+                "num_predict": 5,
+                "top_p": 0.9,
+            }
+        }
+        if joint:
+            payload["options"]["num_predict"] = 48
+            payload["format"] = "json"
+        return f"{self.base_url}/api/generate", {
+            "json": payload,
+            "timeout": 8 if joint else 5,
+        }
+    
+    def _parse_llm_response(self, response: Any, user_message: str, language: Language) -> Tuple[str, float]:
+        """Map the provider response (requests or httpx) to (intent, confidence)."""
+        if response.status_code != 200:
+            return self._fallback_classification(user_message, language)
+        
+        result = response.json()
+        if self.provider == "groq":
+            classification = result["choices"][0]["message"]["content"].strip().upper()
+        else:
+            classification = result.get('response', '').strip().upper()
+        
+        if "HELP" in classification:
+            return "help_request", 0.90
+        elif "ANSWER" in classification:
+            return "answer", 0.90
+        else:
             return self._fallback_classification(user_message, language)
     
+    def _parse_joint_response(self, response: Any, expected_values: List[str]) -> Optional[TurnAnalysis]:
+        """Strictly parse a joint-mode reply; None if it is not valid."""
+        if response.status_code != 200:
+            print(f"✗ Joint classification error: {response.status_code}")
+            return None
+        
+        result = response.json()
+        if self.provider == "groq":
+            text = result["choices"][0]["message"]["content"]
+        else:
+            text = result.get("response", "")
+        try:
+            data = json.loads(text)
+        except ValueError:
+            print(f"⚠️  Joint classification reply is not JSON: {text[:80]!r}")
+            return None
+        
+        if not isinstance(data, dict) or "value" not in data:
+            return None
+        intent = JOINT_INTENTS.get(str(data.get("intent", "")).strip().lower())
+        confidence = data.get("confidence")
+        if intent is None or isinstance(confidence, bool) or not isinstance(confidence, (int, float)):
+            return None
+        
+        value = data["value"]
+        if isinstance(value, str) and value.strip().lower() in ("", "null", "none"):
+            value = None
+        if value is not None:
+            canonical = {expected.lower(): expected for expected in expected_values}
+            value = canonical.get(str(value).strip().lower().replace(" ", "_"))
+            if value is None:
+                return None  # Not one of the allowed values
+        if intent == "help_request":
+            value = None
+        
+        return TurnAnalysis(
+            intent=intent,
+            intent_confidence=0.90,
+            value=value,
+            value_confidence=min(0.95, max(0.0, float(confidence))) if value else 0.0,
+        )
+    
     def _fallback_classification(self, user_message: str, language: Language) -> Tuple[str, float]:
         """Fallback to keyword-based classification."""
         user_lower = user_message.lower()
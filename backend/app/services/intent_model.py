@@ -0,0 +1,251 @@
+"""
+Local answer / help-request classifier (no network).
+
+IntentClassifier sends every message its rules cannot decide to the LLM.
+This model sits between the rules and the LLM: hashed character n-gram
+features + logistic regression in plain NumPy, so a decision takes a few
+microseconds. Only messages it is unsure about (probability below
+`intent_model_threshold` either way) still go to the LLM.
+
+Features (shared by training and inference):
+- Text normalized with lexicon.normalize() (Devanagari / transliteration folding)
+- Character 2-4-grams of the space-padded text, word unigrams and bigrams
+- Hashed into `dim` signed buckets (vectorized in NumPy), scaled by 1/sqrt(count)
+
+Artifact: app/data/models/intent_model.npz (weights, bias, dim, n-gram range),
+written by train_intent_model.py from the lexicon, help phrases, the farmer
+help queries and optional audit logs.
+
+`intent_model_stats()` shows decided / escalated turns under `intent_model` in /health.
+
+To modify:
+- Retrain: python train_intent_model.py (see its --help)
+- Escalation threshold: Update `intent_model_threshold` in config.py
+- Disable: Set `intent_model_enabled` to False in config.py
+"""
+
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from ..config import settings
+from . import lexicon
+
+
+INTENT_MODEL_VERSION = 1
+DEFAULT_DIM = 1 << 15
+NGRAM_RANGE = (2, 4)
+
+# Hash constants (part of the artifact format: changing them requires retraining)
+_BASE = np.uint64(1_000_003)
+_MIX = np.uint64(0xFF51AFD7ED558CCD)
+_SHIFT_1 = np.uint64(31)
+_SHIFT_2 = np.uint64(29)
+_SHIFT_SIGN = np.uint64(63)
+_SIGNS = np.array([-1.0, 1.0], dtype=np.float32)
+
+
+def default_model_path() -> str:
+    """Artifact path from settings, resolved relative to backend/."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    return os.path.join(backend_dir, settings.intent_model_path)
+
+
+def featurize(text: str, dim: int = DEFAULT_DIM, ngram_range: Tuple[int, int] = NGRAM_RANGE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hashed features of one message.
+
+    Character n-grams are hashed in NumPy (polynomial rolling hash over the
+    code points of " word1 word2 ... "), words and word bigrams with crc32;
+    all hashes are then mixed in one vectorized pass.
+
+    Returns:
+        (bucket indices int64, signed values float32); indices may repeat,
+        values are scaled by 1/sqrt(number of features)
+    """
+    normalized = lexicon.normalize(text)
+    words = normalized.split()
+    codes = np.frombuffer(f" {normalized} ".encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    low, high = ngram_range
+    parts = []
+    rolling = codes
+    for n in range(2, high + 1):
+        rolling = rolling[:-1] * _BASE + codes[n - 1:]  # rolling[i] = hash of codes[i:i + n]
+        if n >= low:
+            parts.append(rolling)
+    words += [f"{first} {second}" for first, second in zip(words, words[1:])]
+    parts.append(np.array([zlib.crc32(word.encode("utf-8")) for word in words], dtype=np.uint64))
+
+    # Avalanche mix: low bits pick the bucket, the top bit the sign
+    hashes = np.concatenate(parts)
+    hashes ^= hashes >> _SHIFT_1
+    hashes *= _MIX
+    hashes ^= hashes >> _SHIFT_2
+    indices = (hashes & np.uint64(dim - 1)).astype(np.int64)
+    values = _SIGNS[(hashes >> _SHIFT_SIGN).astype(np.int64)]
+    if len(values):
+        values = values * np.float32(1.0 / np.sqrt(len(values)))
+    return indices, values
+
+
+class IntentModel:
+    """Logistic regression over hashed n-grams; predicts P(help_request)."""
+
+    def __init__(self, weights: np.ndarray, bias: float, ngram_range: Tuple[int, int] = NGRAM_RANGE):
+        """
+        Initialize model.
+
+        Args:
+            weights: float32 weight per hash bucket (length is a power of two)
+            bias: Intercept
+            ngram_range: Character n-gram sizes used in training
+        """
+        self.weights = weights.astype(np.float32)
+        self.bias = float(bias)
+        self.dim = len(weights)
+        self.ngram_range = ngram_range
+        self.decided = 0
+        self.escalated = 0
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "IntentModel":
+        """Load a model from an intent_model.npz artifact."""
+        with np.load(str(path), allow_pickle=False) as data:
+            if int(data["version"]) != INTENT_MODEL_VERSION:
+                raise ValueError(f"Unsupported intent model version {int(data['version'])}")
+            return cls(data["weights"], float(data["bias"]), tuple(int(n) for n in data["ngram_range"]))
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the model as a compressed .npz artifact."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            str(path),
+            version=np.int32(INTENT_MODEL_VERSION),
+            weights=self.weights,
+            bias=np.float32(self.bias),
+            ngram_range=np.array(self.ngram_range, dtype=np.int32),
+        )
+
+    def predict_proba(self, text: str) -> float:
+        """Probability that the message is a help request."""
+        indices, values = featurize(text, self.dim, self.ngram_range)
+        logit = float(self.weights[indices] @ values) + self.bias
+        return float(1.0 / (1.0 + np.exp(-logit)))
+
+    def classify(self, text: str, threshold: Optional[float] = None) -> Optional[Tuple[str, float]]:
+        """
+        Decide answer vs help request.
+
+        Args:
+            text: User's message
+            threshold: Minimum probability of the predicted class (defaults to settings)
+
+        Returns:
+            (intent, confidence), or None if the model is unsure (ask the LLM)
+        """
+        threshold = settings.intent_model_threshold if threshold is None else threshold
+        help_probability = self.predict_proba(text)
+        if help_probability >= threshold:
+            self.decided += 1
+            return "help_request", help_probability
+        if 1.0 - help_probability >= threshold:
+            self.decided += 1
+            return "answer", 1.0 - help_probability
+        self.escalated += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.decided + self.escalated
+        return {
+            "decided": self.decided,
+            "escalated": self.escalated,
+            "llm_call_rate": round(self.escalated / total, 4) if total else 0.0,
+        }
+
+
+def train_intent_model(
+    texts: Sequence[str],
+    labels: Sequence[int],
+    dim: int = DEFAULT_DIM,
+    epochs: int = 300,
+    learning_rate: float = 0.5,
+    l2: float = 1e-4,
+) -> IntentModel:
+    """
+    Fit the logistic regression with full-batch Adam (classes weighted equally).
+
+    Args:
+        texts: Training messages
+        labels: 1 = help_request, 0 = answer
+        dim: Hash buckets (power of two)
+        epochs: Gradient steps
+        learning_rate: Adam step size
+        l2: L2 penalty on the weights
+
+    Returns:
+        Trained IntentModel
+    """
+    if dim & (dim - 1):
+        raise ValueError("dim must be a power of two")
+    y = np.asarray(labels, dtype=np.float32)
+    rows = [featurize(text, dim) for text in texts]
+    indptr = np.cumsum([0] + [len(indices) for indices, _ in rows])
+    indices = np.concatenate([indices for indices, _ in rows])
+    values = np.concatenate([values for _, values in rows])
+    row_of = np.repeat(np.arange(len(rows)), np.diff(indptr))
+
+    positives = max(1.0, float(y.sum()))
+    negatives = max(1.0, float(len(y) - y.sum()))
+    sample_weight = np.where(y > 0, len(y) / (2 * positives), len(y) / (2 * negatives)).astype(np.float32)
+
+    weights = np.zeros(dim, dtype=np.float32)
+    bias = 0.0
+    moments = np.zeros(dim + 1, dtype=np.float32)
+    velocities = np.zeros(dim + 1, dtype=np.float32)
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    for step in range(1, epochs + 1):
+        logits = np.bincount(row_of, weights=weights[indices] * values, minlength=len(rows)) + bias
+        residual = (1.0 / (1.0 + np.exp(-logits)) - y) * sample_weight / len(y)
+        gradient = np.empty(dim + 1, dtype=np.float32)
+        gradient[:dim] = np.bincount(indices, weights=values * residual[row_of], minlength=dim) + l2 * weights
+        gradient[dim] = residual.sum()
+
+        moments = beta1 * moments + (1 - beta1) * gradient
+        velocities = beta2 * velocities + (1 - beta2) * gradient ** 2
+        update = learning_rate * (moments / (1 - beta1 ** step)) / (np.sqrt(velocities / (1 - beta2 ** step)) + eps)
+        weights -= update[:dim]
+        bias -= float(update[dim])
+    return IntentModel(weights, bias)
+
+
+# Global model (None when disabled or the artifact is missing)
+_intent_model: Optional[IntentModel] = None
+_intent_model_loaded = False
+_intent_model_lock = threading.Lock()
+
+
+def get_intent_model() -> Optional[IntentModel]:
+    """Get the local intent model, loading the artifact on first use."""
+    global _intent_model, _intent_model_loaded
+    if not settings.intent_model_enabled:
+        return None
+    if not _intent_model_loaded:
+        with _intent_model_lock:
+            if not _intent_model_loaded:
+                path = default_model_path()
+                try:
+                    _intent_model = IntentModel.load(path)
+                    print(f"✓ Local intent model loaded ({_intent_model.dim} features)")
+                except FileNotFoundError:
+                    print(f"⚠️  No intent model at {path}, unsure turns go to the LLM (run train_intent_model.py)")
+                except Exception as e:
+                    print(f"⚠️  Could not load intent model: {e}")
+                _intent_model_loaded = True
+    return _intent_model
+
+
+def intent_model_stats() -> Optional[Dict[str, Any]]:
+    """Decided / escalated turns of the loaded model (None if not loaded)."""
+    return _intent_model.stats() if _intent_model is not None else None
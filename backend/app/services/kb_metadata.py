@@ -0,0 +1,264 @@
+"""
+Columnar, memory-mapped knowledge base chunk metadata.
+
+Replaces unpickling kb_index_meta.pkl (a dict of dicts) into per-worker
+Python objects. preprocess_kb_improved.py writes a kb_meta/ directory next
+to kb_index.faiss:
+
+    kb_meta/
+      text.bin          UTF-8 chunk texts, concatenated
+      offsets.npy       int64 byte offsets into text.bin (n_chunks + 1)
+      parameter.npy     int16 label ids   \
+      language.npy      int8 label ids     |  ids index into labels.json
+      section_type.npy  int8 label ids     |
+      module_name.npy   int16 label ids   /
+      flags.npy         uint8 retrieval flags (see FLAG_*)
+      labels.json       {column: [label, ...]}
+
+Arrays are opened with np.load(mmap_mode="r") and text.bin with np.memmap,
+so workers forked from a preloading gunicorn master share the pages and
+startup does not materialize one Python object per chunk. Row i is FAISS
+id i. ChunkMetadataWriter streams the same layout one chunk at a time.
+
+To modify:
+- Add a column: Extend LABEL_COLUMNS (and rebuild the knowledge base)
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+import numpy as np
+
+
+COLUMNAR_META_DIRNAME = "kb_meta"
+
+# Categorical columns stored as label ids
+LABEL_COLUMNS = {
+    "parameter": np.int16,
+    "language": np.int8,
+    "section_type": np.int8,
+    "module_name": np.int16,
+}
+
+# Retrieval flags precomputed per chunk
+FLAG_VALID = 1  # Long enough and not a JSON/code chunk
+FLAG_HOW_TO = 2  # "How to test" instructions
+
+
+def chunk_flags(text: str, section_type: str) -> int:
+    """Compute retrieval flags for one chunk."""
+    flags = 0
+    if len(text) >= 20 and not text.strip().startswith("{") and "```json" not in text:
+        flags |= FLAG_VALID
+    if section_type == "how_to_test" or "कैसे जांचें" in text or "how to" in text.lower():
+        flags |= FLAG_HOW_TO
+    return flags
+
+
+def _label_value(chunk: Dict[str, Any], column: str) -> str:
+    """Categorical value of a chunk (missing language defaults to English)."""
+    default = "en" if column == "language" else ""
+    return str(chunk.get(column) or default)
+
+
+class ChunkMetadata:
+    """Read-only columnar view over chunk metadata."""
+
+    def __init__(
+        self,
+        text_blob: np.ndarray,
+        offsets: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        labels: Dict[str, List[str]],
+        flags: np.ndarray,
+    ):
+        """
+        Initialize from column arrays (memory-mapped or in-memory).
+
+        Args:
+            text_blob: uint8 array of concatenated UTF-8 texts
+            offsets: Byte offsets of each text (n_chunks + 1)
+            columns: Label id arrays keyed by column name
+            labels: Label strings per column (id -> label)
+            flags: Retrieval flags per chunk
+        """
+        self.text_blob = text_blob
+        self.offsets = offsets
+        self.columns = columns
+        self.labels = labels
+        self.flags = flags
+        self._label_ids = {
+            column: {label: i for i, label in enumerate(values)}
+            for column, values in labels.items()
+        }
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Dict[str, Any]]) -> "ChunkMetadata":
+        """Build in memory from chunk dicts (e.g. a legacy kb_index_meta.pkl)."""
+        labels: Dict[str, List[str]] = {column: [] for column in LABEL_COLUMNS}
+        label_ids: Dict[str, Dict[str, int]] = {column: {} for column in LABEL_COLUMNS}
+        ids: Dict[str, List[int]] = {column: [] for column in LABEL_COLUMNS}
+        encoded: List[bytes] = []
+        flags: List[int] = []
+
+        for chunk in chunks:
+            text = chunk.get("text", "") or ""
+            encoded.append(text.encode("utf-8"))
+            flags.append(chunk_flags(text, chunk.get("section_type", "") or ""))
+            for column in LABEL_COLUMNS:
+                value = _label_value(chunk, column)
+                if value not in label_ids[column]:
+                    label_ids[column][value] = len(labels[column])
+                    labels[column].append(value)
+                ids[column].append(label_ids[column][value])
+
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+        return cls(
+            text_blob=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            offsets=offsets,
+            columns={c: np.array(ids[c], dtype=dtype) for c, dtype in LABEL_COLUMNS.items()},
+            labels=labels,
+            flags=np.array(flags, dtype=np.uint8),
+        )
+
+    @classmethod
+    def open(cls, directory: Union[str, Path]) -> "ChunkMetadata":
+        """Memory-map a kb_meta/ directory."""
+        directory = str(directory)
+        with open(os.path.join(directory, "labels.json"), "r", encoding="utf-8") as f:
+            labels = json.load(f)
+
+        text_path = os.path.join(directory, "text.bin")
+        if os.path.getsize(text_path) > 0:
+            text_blob = np.memmap(text_path, dtype=np.uint8, mode="r")
+        else:
+            text_blob = np.zeros(0, dtype=np.uint8)
+
+        return cls(
+            text_blob=text_blob,
+            offsets=np.load(os.path.join(directory, "offsets.npy"), mmap_mode="r"),
+            columns={
+                column: np.load(os.path.join(directory, f"{column}.npy"), mmap_mode="r")
+                for column in LABEL_COLUMNS
+            },
+            labels=labels,
+            flags=np.load(os.path.join(directory, "flags.npy"), mmap_mode="r"),
+        )
+
+    def write(self, directory: Union[str, Path]) -> None:
+        """Write the columnar layout to a kb_meta/ directory."""
+        directory = str(directory)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "text.bin"), "wb") as f:
+            f.write(np.asarray(self.text_blob).tobytes())
+        np.save(os.path.join(directory, "offsets.npy"), np.asarray(self.offsets))
+        for column in LABEL_COLUMNS:
+            np.save(os.path.join(directory, f"{column}.npy"), np.asarray(self.columns[column]))
+        np.save(os.path.join(directory, "flags.npy"), np.asarray(self.flags))
+        with open(os.path.join(directory, "labels.json"), "w", encoding="utf-8") as f:
+            json.dump(self.labels, f, ensure_ascii=False)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def text(self, row: int) -> str:
+        """Decode one chunk's text."""
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        return bytes(self.text_blob[start:end]).decode("utf-8")
+
+    def texts(self) -> Iterable[str]:
+        """Iterate over all chunk texts in row order."""
+        for row in range(len(self)):
+            yield self.text(row)
+
+    def head(self, row: int, chars: int = 200) -> str:
+        """Decode roughly the first `chars` characters of a chunk."""
+        start, end = int(self.offsets[row]), int(self.offsets[row + 1])
+        # Devanagari is 3 bytes per character in UTF-8
+        raw = bytes(self.text_blob[start:min(end, start + chars * 3)])
+        return raw.decode("utf-8", errors="ignore")[:chars]
+
+    def value(self, column: str, row: int) -> str:
+        """Label of a categorical column for one chunk."""
+        return self.labels[column][int(self.columns[column][row])]
+
+    def label_id(self, column: str, label: str) -> int:
+        """Id of a label in a column (-1 if no chunk has it)."""
+        return self._label_ids[column].get(label, -1)
+
+    def get(self, row: int) -> Dict[str, Any]:
+        """Reconstruct one chunk record as a dict."""
+        record: Dict[str, Any] = {column: self.value(column, row) for column in LABEL_COLUMNS}
+        record["text"] = self.text(row)
+        return record
+
+
+class ChunkMetadataWriter:
+    """
+    Streams chunk records into a kb_meta/ directory.
+
+    Texts go straight to text.bin; only offsets, label ids and flags (a few
+    bytes per chunk) are kept in memory until close().
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = str(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._text_file = open(os.path.join(self.directory, "text.bin"), "wb")
+        self._offsets: List[int] = [0]
+        self._labels: Dict[str, List[str]] = {column: [] for column in LABEL_COLUMNS}
+        self._label_ids: Dict[str, Dict[str, int]] = {column: {} for column in LABEL_COLUMNS}
+        self._ids: Dict[str, List[int]] = {column: [] for column in LABEL_COLUMNS}
+        self._flags: List[int] = []
+
+    def add(self, chunk: Dict[str, Any]) -> None:
+        """Append one chunk record (row order == FAISS id order)."""
+        text = chunk.get("text", "") or ""
+        encoded = text.encode("utf-8")
+        self._text_file.write(encoded)
+        self._offsets.append(self._offsets[-1] + len(encoded))
+        self._flags.append(chunk_flags(text, chunk.get("section_type", "") or ""))
+        for column in LABEL_COLUMNS:
+            value = _label_value(chunk, column)
+            if value not in self._label_ids[column]:
+                self._label_ids[column][value] = len(self._labels[column])
+                self._labels[column].append(value)
+            self._ids[column].append(self._label_ids[column][value])
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def close(self) -> None:
+        """Flush text.bin and write the column arrays + labels.json."""
+        self._text_file.close()
+        np.save(os.path.join(self.directory, "offsets.npy"), np.array(self._offsets, dtype=np.int64))
+        for column, dtype in LABEL_COLUMNS.items():
+            np.save(os.path.join(self.directory, f"{column}.npy"), np.array(self._ids[column], dtype=dtype))
+        np.save(os.path.join(self.directory, "flags.npy"), np.array(self._flags, dtype=np.uint8))
+        with open(os.path.join(self.directory, "labels.json"), "w", encoding="utf-8") as f:
+            json.dump(self._labels, f, ensure_ascii=False)
+
+
+def load_chunk_metadata(embeddings_dir: Union[str, Path]) -> Optional[ChunkMetadata]:
+    """
+    Load chunk metadata from an embeddings directory.
+
+    Prefers the memory-mapped kb_meta/ layout and falls back to the legacy
+    kb_index_meta.pkl. Returns None if neither exists.
+    """
+    embeddings_dir = str(embeddings_dir)
+    columnar_dir = os.path.join(embeddings_dir, COLUMNAR_META_DIRNAME)
+    if os.path.exists(os.path.join(columnar_dir, "labels.json")):
+        return ChunkMetadata.open(columnar_dir)
+
+    pickle_path = os.path.join(embeddings_dir, "kb_index_meta.pkl")
+    if os.path.exists(pickle_path):
+        import pickle
+
+        with open(pickle_path, "rb") as f:
+            legacy = pickle.load(f)
+        return ChunkMetadata.from_chunks(legacy.values())
+
+    return None
@@ -0,0 +1,320 @@
+"""
+API key pools: spread provider calls across every configured key.
+
+Settings define several keys per provider (`gemini_api_key`,
+`gemini_api_key_1`, `gemini_api_key_2`; `groq_llm_api_key`,
+`groq_report_api_key`). Instead of each call site hardwiring one of them,
+callers lease a key from the provider's pool for the duration of a call:
+
+    with get_key_pool("groq").lease() as lease:
+        response = call_with(lease.key)
+        lease.observe(response)   # or lease.fail(error)
+
+Calls whose only retry is a 429 go through `pool.call()` / `pool.call_async()`
+instead: the call gets the leased key and its same-key 429 retry budget
+(0 while another key is healthy, so the first 429 cools the key down and
+the call is re-leased on the next key; the rate limiter's default retries
+only for single-key pools or when every other key is cooling down).
+
+Selection:
+- least_loaded (default): fewest in-flight calls, then fewest calls so far
+- round_robin: rotate through the healthy keys
+
+Health:
+- Quota errors (429 / RESOURCE_EXHAUSTED) cool the key down for its
+  Retry-After, else `key_pool_cooldown_seconds` doubling per repeat
+- Invalid/forbidden keys (401/403) cool down for `key_pool_auth_cooldown_seconds`
+- `key_pool_failure_threshold` other errors in a row cool down briefly
+- If every key is cooling down, the one available soonest is used anyway
+- Calls failed fast by an open circuit breaker do not count against the key
+
+`key_pool_stats()` is shown under `key_pools` in /health (keys labelled by
+their settings name, never by value).
+
+To modify:
+- Strategy / cooldowns: Update `key_pool_*` settings in config.py
+- Keys per provider: Update `PROVIDER_KEY_SETTINGS`
+"""
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+from ..config import settings
+from .rate_limiter import key_label, parse_retry_after
+from .circuit_breaker import CircuitOpenError
+
+
+T = TypeVar("T")
+
+# Settings fields whose keys form each provider's pool (first = preferred)
+PROVIDER_KEY_SETTINGS = {
+    "gemini": ("gemini_api_key", "gemini_api_key_1", "gemini_api_key_2"),
+    "groq": ("groq_llm_api_key", "groq_report_api_key"),
+}
+
+
+def status_of(result: Any) -> Optional[int]:
+    """HTTP status of a response or SDK error (httpx/requests/groq/google-genai)."""
+    for attribute in ("status_code", "code"):
+        value = getattr(result, attribute, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_quota_error(result: Any) -> bool:
+    """True for rate-limit / quota exhaustion responses and errors."""
+    if status_of(result) == 429:
+        return True
+    if isinstance(result, Exception):
+        message = str(result).lower()
+        return "429" in message or "resource_exhausted" in message or "quota" in message
+    return False
+
+
+class _KeyState:
+    """Load and health of one key."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.label = key_label(key)
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.quota_errors = 0
+        self.consecutive_failures = 0
+        self.quota_strikes = 0
+        self.cooldown_until = 0.0
+
+
+class KeyLease:
+    """One call's use of a pooled key; report the outcome with observe()/fail()."""
+
+    def __init__(self, pool: "KeyPool", state: _KeyState):
+        self._pool = pool
+        self._state = state
+        self.failed = False
+
+    @property
+    def key(self) -> str:
+        return self._state.key
+
+    def observe(self, response: Any) -> None:
+        """Mark the lease failed if the response is a quota/auth/server error."""
+        status = status_of(response)
+        if status is not None and (status in (401, 403, 429) or status >= 500):
+            self.fail(response)
+
+    def fail(self, error: Any = None) -> None:
+        """Record a failed call (cools the key down for quota/auth errors)."""
+        if isinstance(error, CircuitOpenError):
+            return  # The provider is down, not this key
+        if not self.failed:
+            self.failed = True
+            self._pool._record_failure(self._state, error)
+
+
+class KeyPool:
+    """Round-robin / least-loaded selection over one provider's keys."""
+
+    def __init__(self, provider: str, keys: List[str], strategy: Optional[str] = None):
+        """
+        Initialize pool.
+
+        Args:
+            provider: Provider name (for logs / metrics)
+            keys: API keys (duplicates and empty values are dropped)
+            strategy: "least_loaded" or "round_robin" (default from settings)
+        """
+        unique = list(dict.fromkeys(key for key in keys if key))
+        if not unique:
+            raise ValueError(f"No API keys configured for {provider}")
+        self.provider = provider
+        self.strategy = strategy or settings.key_pool_strategy
+        self._states = [_KeyState(key) for key in unique]
+        self._rotation = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def keys(self) -> List[str]:
+        return [state.key for state in self._states]
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def _pick(self) -> _KeyState:
+        now = time.monotonic()
+        healthy = [state for state in self._states if state.cooldown_until <= now]
+        if not healthy:
+            # Every key is cooling down: use the one that recovers first
+            return min(self._states, key=lambda state: state.cooldown_until)
+        if self.strategy == "round_robin":
+            return healthy[next(self._rotation) % len(healthy)]
+        return min(healthy, key=lambda state: (state.in_flight, state.calls))
+
+    @contextmanager
+    def lease(self) -> Iterator[KeyLease]:
+        """
+        Lease a key for one call.
+
+        The call counts as failed if it raised or lease.fail()/observe()
+        reported an error; otherwise the key's failure streak is reset.
+        """
+        with self._lock:
+            state = self._pick()
+            state.in_flight += 1
+            state.calls += 1
+        lease = KeyLease(self, state)
+        try:
+            yield lease
+        except BaseException as e:
+            if isinstance(e, Exception):
+                lease.fail(e)
+            raise
+        finally:
+            with self._lock:
+                state.in_flight -= 1
+                if not lease.failed:
+                    state.consecutive_failures = 0
+                    state.quota_strikes = 0
+
+    def can_rotate(self, lease: KeyLease) -> bool:
+        """True if a key other than the leased one is healthy right now."""
+        now = time.monotonic()
+        return any(state is not lease._state and state.cooldown_until <= now for state in self._states)
+
+    def call(self, call: Callable[[str, Optional[int]], T]) -> T:
+        """
+        Run `call(key, max_retries)` on a leased key, rotating keys on 429s.
+
+        `max_retries` is the same-key 429 retry budget for the rate limiter:
+        0 while another key is healthy (a 429 is returned to the pool, the
+        key cools down and the call is re-leased), None (the limiter's
+        default) otherwise. Each key is tried at most once; the last
+        response / error is returned / raised.
+        """
+        for attempt in range(len(self._states)):
+            with self.lease() as lease:
+                rotate = attempt < len(self._states) - 1 and self.can_rotate(lease)
+                try:
+                    result = call(lease.key, 0 if rotate else None)
+                except Exception as e:
+                    if self._rotated(lease, e, rotate):
+                        continue
+                    raise
+                if not self._rotated(lease, result, rotate):
+                    return result
+        raise AssertionError("unreachable: the last attempt never rotates")
+
+    async def call_async(self, call: Callable[[str, Optional[int]], Awaitable[T]]) -> T:
+        """Async variant of call()."""
+        for attempt in range(len(self._states)):
+            with self.lease() as lease:
+                rotate = attempt < len(self._states) - 1 and self.can_rotate(lease)
+                try:
+                    result = await call(lease.key, 0 if rotate else None)
+                except Exception as e:
+                    if self._rotated(lease, e, rotate):
+                        continue
+                    raise
+                if not self._rotated(lease, result, rotate):
+                    return result
+        raise AssertionError("unreachable: the last attempt never rotates")
+
+    def _rotated(self, lease: KeyLease, outcome: Any, rotate: bool) -> bool:
+        """Report the outcome to the lease; True if the call should move to another key."""
+        if isinstance(outcome, Exception):
+            lease.fail(outcome)
+        else:
+            lease.observe(outcome)
+        if rotate and is_quota_error(outcome):
+            print(f"⏳ {self.provider} key {lease._state.label} rate limited, rotating to another key")
+            return True
+        return False
+
+    def _record_failure(self, state: _KeyState, error: Any) -> None:
+        now = time.monotonic()
+        status = status_of(error)
+        with self._lock:
+            state.failures += 1
+            state.consecutive_failures += 1
+            if is_quota_error(error):
+                state.quota_errors += 1
+                state.quota_strikes += 1
+                headers = getattr(error, "headers", None) or getattr(getattr(error, "response", None), "headers", None)
+                cooldown = parse_retry_after(headers)
+                if cooldown is None:
+                    cooldown = min(
+                        settings.key_pool_cooldown_seconds * 2 ** (state.quota_strikes - 1),
+                        settings.key_pool_max_cooldown_seconds,
+                    )
+                reason = "quota exhausted"
+            elif status in (401, 403):
+                cooldown = settings.key_pool_auth_cooldown_seconds
+                reason = f"rejected ({status})"
+            elif state.consecutive_failures >= settings.key_pool_failure_threshold:
+                cooldown = settings.key_pool_error_cooldown_seconds
+                reason = f"{state.consecutive_failures} failures in a row"
+            else:
+                return
+            state.cooldown_until = max(state.cooldown_until, now + cooldown)
+        print(f"⚠️  {self.provider} key {state.label} {reason}, cooling down for {cooldown:.0f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Load and health per key."""
+        now = time.monotonic()
+        with self._lock:
+            keys = {
+                state.label: {
+                    "in_flight": state.in_flight,
+                    "calls": state.calls,
+                    "failures": state.failures,
+                    "quota_errors": state.quota_errors,
+                    "healthy": state.cooldown_until <= now,
+                    "cooldown_remaining_s": round(max(0.0, state.cooldown_until - now), 1),
+                }
+                for state in self._states
+            }
+        return {
+            "strategy": self.strategy,
+            "healthy_keys": sum(1 for key in keys.values() if key["healthy"]),
+            "keys": keys,
+        }
+
+
+# Global pools per provider
+_pools: Dict[str, KeyPool] = {}
+_pools_lock = threading.Lock()
+
+
+def configured_keys(provider: str) -> List[str]:
+    """Non-empty keys of the provider's settings fields, preferred first."""
+    return [
+        getattr(settings, name) for name in PROVIDER_KEY_SETTINGS.get(provider, ())
+        if getattr(settings, name, None)
+    ]
+
+
+def get_key_pool(provider: str) -> KeyPool:
+    """
+    Get or create the global key pool of a provider.
+
+    Raises:
+        ValueError: No key configured for the provider
+    """
+    pool = _pools.get(provider)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(provider)
+            if pool is None:
+                pool = KeyPool(provider, configured_keys(provider))
+                _pools[provider] = pool
+                print(f"✓ {provider} key pool: {len(pool)} key(s), {pool.strategy}")
+    return pool
+
+
+def key_pool_stats() -> Dict[str, Any]:
+    """Stats of every pool created so far."""
+    return {provider: pool.stats() for provider, pool in list(_pools.items())}
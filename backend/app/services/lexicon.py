@@ -0,0 +1,443 @@
+"""
+Multilingual answer lexicon shared by validators, intent classifier and RAG.
+
+One vocabulary per wizard parameter (English, Hindi and transliterated
+Hindi) replaces the copies that lived in validators.py (`*_MAPPINGS`,
+`HELP_INDICATORS`), validators_enhanced.py (`canonical_labels`),
+IntentClassifier (`valid_answers`), orchestrator_enhanced
+(`_get_expected_values`) and rag_engine (`PARAM_KEYWORDS`).
+
+Terms are compiled once at import into trie-shaped regular expressions
+(one per parameter and language), so matching an utterance is a single
+left-to-right pass in the regex engine instead of one `in` check per term.
+At each position the longest term wins; terms made of letters only match
+at the start of a word ("no" does not match inside "know").
+
+Text and terms go through the same normalization:
+- NFC, casefold, apostrophes dropped, "_" → space, collapsed whitespace
+- Devanagari: nukta dropped (ड़ = ड़), chandrabindu → anusvara (हाँ = हां),
+  long ī/ū folded to short (रेतीली = रेतिली), danda → space
+- Transliteration: doubled vowels folded (aa → a, ee/ii → i, oo/uu → u),
+  so "geeli" = "gili", "bhoora" = "bhura", "laal" = "lal"
+
+Main entry points:
+- `scan(parameter, text, language)`: value + help indicator (validators)
+- `scan(parameter, text)`: answer / unsure / how-to / follow-up terms (intent fast path)
+- `canonical_values()`, `synonyms()`, `mappings()`, `mentions_topic()`
+
+To modify:
+- Add synonyms or values: Update `VOCABULARY` (no code changes needed)
+- Help / uncertainty phrases: Update `PHRASES`
+- Folding rules: Update `_ASCII_FOLD` / `_DEVANAGARI_FOLD` / `_VOWEL_FOLD`
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ..models import Language
+
+
+# Per parameter:
+# - values: canonical value -> {"en": [...], "hi": [...]} ("en" also holds transliterations)
+# - fallback: value -> terms that name it only when no `values` term matched (validators)
+# - hints: words that signal an answer without naming a value (intent fast path only)
+# - related: near-synonyms only used for semantic matching (validators_enhanced)
+# - topic: words that tie a knowledge-base chunk to the parameter (RAG boosts)
+# - free_text: answers are free text (no fixed values for extraction)
+VOCABULARY: Dict[str, Dict] = {
+    "color": {
+        "values": {
+            "black": {"en": ["black", "kali", "kala", "dark"], "hi": ["काली", "काला", "गहरा"]},
+            "red": {"en": ["red", "lal", "laal", "reddish"], "hi": ["लाल"]},
+            "brown": {"en": ["brown", "bhura", "bhoora"], "hi": ["भूरा", "भूरी"]},
+            "yellow": {"en": ["yellow", "peela", "peeli"], "hi": ["पीला", "पीली"]},
+            "grey": {"en": ["grey", "gray", "surahi"], "hi": ["सुराही", "ग्रे", "स्लेटी"]},
+        },
+        "hints": {"en": ["light", "white"], "hi": ["सफेद"]},
+        "topic": ["color", "रंग", "colour"],
+    },
+    "moisture": {
+        "values": {
+            "dry": {"en": ["dry", "sukhi", "sukha"], "hi": ["सूखी", "सूखा"]},
+            "wet": {"en": ["wet", "geeli", "geela", "very wet"], "hi": ["गीली", "गीला", "बहुत गीली"]},
+            "moist": {"en": ["moist", "nam", "slightly moist"], "hi": ["नम", "थोड़ी नम"]},
+            "very_dry": {"en": ["very_dry", "very dry", "bahut_sukhi"], "hi": ["बहुत सूखी"]},
+        },
+        "related": {"dry": ["arid"], "moist": ["humid", "damp"]},
+        "topic": ["moisture", "नमी", "wet", "dry", "गीली", "सूखी"],
+    },
+    "smell": {
+        "values": {
+            "sweet": {"en": ["sweet", "meethi"], "hi": ["मीठी", "मीठा"]},
+            "earthy": {"en": ["earthy", "mitti"], "hi": ["मिट्टी", "मिट्टी जैसी"]},
+            "sour": {"en": ["sour", "khatti", "khatta"], "hi": ["खट्टी", "खट्टा"]},
+            "rotten": {"en": ["rotten", "sadhi"], "hi": ["सड़ी", "सड़ा"]},
+            "no_smell": {"en": ["no_smell", "koi_gandh_nahi"], "hi": ["कोई गंध नहीं"]},
+        },
+        "hints": {"en": ["none", "good", "bad", "fresh"], "hi": []},
+        "related": {
+            "sweet": ["good"], "earthy": ["soil-like"], "sour": ["acidic"],
+            "rotten": ["bad", "foul"], "no_smell": ["odorless"],
+        },
+        "topic": ["smell", "गंध", "odor", "scent"],
+    },
+    "ph": {
+        "values": {
+            "acidic": {"en": ["acidic", "acid", "amliya"], "hi": ["अम्लीय"]},
+            "neutral": {"en": ["neutral", "balanced", "tatasth"], "hi": ["तटस्थ", "संतुलित"]},
+            "alkaline": {"en": ["alkaline", "basic", "kshariya"], "hi": ["क्षारीय"]},
+            "very_acidic": {"en": ["very acidic"], "hi": ["बहुत अम्लीय"]},
+            "very_alkaline": {"en": ["very alkaline"], "hi": ["बहुत क्षारीय"]},
+        },
+        "hints": {
+            "en": ["sour", "bitter", "ph", "6.5", "7.0", "7.5"] + [str(number) for number in range(1, 15)],
+            "hi": ["खट्टा"],
+        },
+        "related": {"acidic": ["khatta"]},
+        "topic": ["ph", "acid", "alkaline", "अम्ल", "क्षार"],
+    },
+    "soil_type": {
+        "values": {
+            "clay": {"en": ["clay", "chikni", "sticky"], "hi": ["चिकनी"]},
+            "sandy": {"en": ["sandy", "sand", "retili"], "hi": ["रेतिली"]},
+            "loamy": {"en": ["loamy", "loam", "dumat", "domat"], "hi": ["दोमट"]},
+            "silt": {"en": ["silt", "silty"], "hi": ["गादयुक्त"]},
+        },
+        # A bare "मिट्टी" (soil) is taken as loamy, but "चिकनी मिट्टी" stays clay
+        "fallback": {"loamy": {"hi": ["मिट्टी"]}},
+        "hints": {"en": [], "hi": ["मिट्टी"]},
+        "related": {"loamy": ["मिट्टी", "balanced"]},
+        "topic": ["soil type", "मिट्टी", "clay", "sandy", "loamy", "चिकनी", "रेतीली"],
+    },
+    "earthworms": {
+        "values": {
+            "yes": {"en": ["yes", "haan", "present", "hain"], "hi": ["हाँ", "हैं"]},
+            "no": {"en": ["no", "nahi", "absent", "none"], "hi": ["नहीं", "नहीं हैं"]},
+            "many": {"en": ["many", "bahut", "lots"], "hi": ["बहुत"]},
+            "few": {"en": ["few", "kam", "some", "thode"], "hi": ["कम", "थोड़े"]},
+        },
+        "topic": ["earthworm", "केंचुए", "worm"],
+    },
+    "location": {
+        "free_text": True,
+        "hints": {
+            "en": ["village", "district", "state", "city", "town", "in", "at", "from", "near"],
+            "hi": ["गाँव", "गाउं", "जिला", "राज्य", "में", "है", "से", "का", "की",
+                   "नई", "पुरानी", "बड़ा", "छोटा", "नगर", "पुर", "आबाद", "गढ़"],
+        },
+        "topic": ["location", "स्थान", "place"],
+    },
+    "fertilizer_used": {
+        "free_text": True,  # Yes/no or a fertilizer name
+        "values": {
+            "yes": {"en": ["yes", "haan"], "hi": ["हाँ", "हैं"]},
+            "no": {"en": ["no", "nahi", "none"], "hi": ["नहीं"]},
+        },
+        "related": {"yes": ["used"]},
+        "hints": {
+            "en": ["urea", "dap", "npk", "organic", "compost", "manure", "vermicompost", "cow dung", "gobar"],
+            "hi": ["यूरिया", "डीएपी", "एनपीके", "जैविक", "खाद", "कुछ नहीं"],
+        },
+        "topic": ["fertilizer", "खाद", "manure"],
+    },
+}
+
+# Phrase groups shared by all parameters
+PHRASES: Dict[str, Dict[str, List[str]]] = {
+    # Help/uncertainty indicators (validators: no value is accepted)
+    "help": {
+        "en": ["help", "don't know", "dont know", "dunno", "unsure", "not sure", "?", "idk",
+               "i don't know", "i dont know", "no idea", "need help"],
+        "hi": ["मदद", "पता नहीं", "समझ नहीं आया", "?", "नहीं पता", "मुझे नहीं पता", "मुझे पता नहीं",
+               "मालूम नहीं", "मदद चाहिए"],
+    },
+    # Clear "I don't know" (intent fast path: help request)
+    "unsure": {
+        "en": ["don't know", "dont know", "not sure"],
+        "hi": ["नहीं पता"],
+    },
+    # "How do I test it?" questions (intent fast path: help request, even if a value word appears)
+    "how_to": {
+        "en": ["how", "kaise", "kese"],
+        "hi": ["कैसे", "किस तरह"],
+    },
+    # Questions about a step already shown (intent fast path: follow-up)
+    "follow_up": {
+        "en": ["problem", "issue", "after step", "step", "what next", "then what"],
+        "hi": ["समस्या", "कदम के बाद", "फिर क्या"],
+    },
+}
+
+LANGUAGES: Tuple[Language, ...] = ("en", "hi")
+
+# Normalization shared by terms and utterances
+_ASCII_FOLD = (("'", ""), ("_", " "))
+_DEVANAGARI_FOLD = (
+    ("\u093c", ""),  # Nukta (ड़ → ड)
+    ("\u0901", "\u0902"),  # Chandrabindu → anusvara (हाँ → हां)
+    ("\u0940", "\u093f"),  # ी → ि
+    ("\u0942", "\u0941"),  # ू → ु
+    ("\u0908", "\u0907"),  # ई → इ
+    ("\u090a", "\u0909"),  # ऊ → उ
+    ("\u0964", " "),  # Danda
+    ("\u0965", " "),  # Double danda
+    ("\u200c", ""),  # Zero-width non-joiner
+    ("\u200d", ""),  # Zero-width joiner
+    ("\u2019", ""),  # Curly apostrophe
+)
+_VOWEL_FOLD = (("aa", "a"), ("ee", "i"), ("ii", "i"), ("oo", "u"), ("uu", "u"))
+
+# A term starting with a letter must start a word (Devanagari signs count as letters)
+_WORD_CHAR = re.compile(r"[\wऀ-ॿ]")
+_WORD_START = rf"(?<!{_WORD_CHAR.pattern})"
+
+
+def normalize(text: str) -> str:
+    """Normalization applied to both lexicon terms and utterances."""
+    if not unicodedata.is_normalized("NFC", text):
+        text = unicodedata.normalize("NFC", text)
+    text = text.casefold()
+    # Chained str.replace: much cheaper than str.translate for short messages
+    for old, new in _ASCII_FOLD if text.isascii() else _ASCII_FOLD + _DEVANAGARI_FOLD:
+        text = text.replace(old, new)
+    for double, single in _VOWEL_FOLD:
+        text = text.replace(double, single)
+    return " ".join(text.split())
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Regex of a trie over `terms`; at each position the longest term matches."""
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End of a term
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional: longer terms are tried first, the shorter one is the fallback
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class TermMatcher:
+    """Compiled matcher over (term, label) pairs; one regex pass per utterance."""
+
+    def __init__(self, entries: Iterable[Tuple[str, Tuple[str, str]]], word_start: bool = True):
+        """
+        Compile a matcher.
+
+        Args:
+            entries: (term, (group, value)) pairs; terms are normalized here
+            word_start: Letter-initial terms must start a word (False = substring match)
+        """
+        self.labels: Dict[str, List[Tuple[str, str]]] = {}
+        for term, label in entries:
+            key = normalize(term)
+            if key and label not in self.labels.setdefault(key, []):
+                self.labels[key].append(label)
+        # Longest term first per label: prefix lookups return the shortest completion's label
+        self.prefixes: Dict[str, Tuple[str, str]] = {}
+        for key in sorted(self.labels, key=len, reverse=True):
+            for end in range(2, len(key) + 1):
+                self.prefixes[key[:end]] = self.labels[key][0]
+        if word_start:
+            words = [key for key in self.labels if _WORD_CHAR.match(key)]
+            others = [key for key in self.labels if not _WORD_CHAR.match(key)]
+        else:
+            words, others = [], list(self.labels)
+        branches = [f"{_WORD_START}(?:{_trie_pattern(words)})"] if words else []
+        branches += [_trie_pattern(others)] if others else []
+        self.regex = re.compile("|".join(branches) or "(?!)")
+
+    def find(self, normalized: str) -> List[Tuple[str, Tuple[str, str]]]:
+        """(term, label) of every match in already-normalized text, left to right."""
+        matches = []
+        for match in self.regex.finditer(normalized):
+            term = match.group()
+            if term:
+                matches.extend((term, label) for label in self.labels[term])
+        return matches
+
+    def search(self, normalized: str) -> bool:
+        """True if any term occurs in already-normalized text."""
+        return self.regex.search(normalized) is not None
+
+
+class LexiconMatch:
+    """Result of scanning one utterance."""
+
+    __slots__ = ("value", "groups", "terms")
+
+    def __init__(self, value: Optional[str], groups: Set[str], terms: List[str]):
+        self.value = value  # Best canonical value (longest term, then leftmost), None if none
+        self.groups = groups  # Groups seen: "value", "fallback", "hint", "help", "unsure", "how_to", "follow_up"
+        self.terms = terms  # Matched (normalized) terms, for logging
+
+    @property
+    def is_help(self) -> bool:
+        return "help" in self.groups
+
+    def __repr__(self) -> str:
+        return f"LexiconMatch(value={self.value!r}, groups={sorted(self.groups)})"
+
+
+def _value_entries(parameter: str, languages: Iterable[str]) -> List[Tuple[str, Tuple[str, str]]]:
+    values = VOCABULARY.get(parameter, {}).get("values", {})
+    return [
+        (term, ("value", value))
+        for value, terms in values.items()
+        for language in languages
+        for term in terms.get(language, [])
+    ]
+
+
+def _fallback_entries(parameter: str, languages: Iterable[str]) -> List[Tuple[str, Tuple[str, str]]]:
+    fallback = VOCABULARY.get(parameter, {}).get("fallback", {})
+    return [
+        (term, ("fallback", value))
+        for value, terms in fallback.items()
+        for language in languages
+        for term in terms.get(language, [])
+    ]
+
+
+def _phrase_entries(group: str, languages: Iterable[str]) -> List[Tuple[str, Tuple[str, str]]]:
+    return [(term, (group, "")) for language in languages for term in PHRASES[group].get(language, [])]
+
+
+def _compile() -> Tuple[Dict, Dict, Dict, Dict]:
+    answer_matchers: Dict[Tuple[str, str], TermMatcher] = {}
+    intent_matchers: Dict[str, TermMatcher] = {}
+    topic_matchers: Dict[str, TermMatcher] = {}
+    help_matchers = {language: TermMatcher(_phrase_entries("help", [language])) for language in LANGUAGES}
+
+    for parameter, entry in VOCABULARY.items():
+        for language in LANGUAGES:
+            # English terms (incl. transliterations) are always accepted, like the old combined mappings
+            languages = ["en"] if language == "en" else ["en", language]
+            answer_matchers[(parameter, language)] = TermMatcher(
+                _value_entries(parameter, languages)
+                + _fallback_entries(parameter, languages)
+                + _phrase_entries("help", [language])
+            )
+        hints = entry.get("hints", {})
+        intent_matchers[parameter] = TermMatcher(
+            _value_entries(parameter, LANGUAGES)
+            + [(term, ("hint", "")) for language in LANGUAGES for term in hints.get(language, [])]
+            + _phrase_entries("unsure", LANGUAGES)
+            + _phrase_entries("how_to", LANGUAGES)
+            + _phrase_entries("follow_up", LANGUAGES)
+        )
+        topic_matchers[parameter] = TermMatcher(
+            [(term, ("topic", parameter)) for term in entry.get("topic", [parameter])], word_start=False
+        )
+    return answer_matchers, intent_matchers, topic_matchers, help_matchers
+
+
+# Compiled once at import
+_ANSWER_MATCHERS, _INTENT_MATCHERS, _TOPIC_MATCHERS, _HELP_MATCHERS = _compile()
+_FALLBACK_INTENT_MATCHER = TermMatcher(
+    _phrase_entries("unsure", LANGUAGES) + _phrase_entries("how_to", LANGUAGES) + _phrase_entries("follow_up", LANGUAGES)
+)
+
+
+def _best_value(matches: List[Tuple[str, Tuple[str, str]]]) -> Optional[str]:
+    best, best_length, fallback = None, 0, None
+    for term, (group, value) in matches:
+        if group == "value" and len(term) > best_length:
+            best, best_length = value, len(term)
+        elif group == "fallback" and fallback is None:
+            fallback = value
+    return best or fallback
+
+
+def scan(parameter: str, text: str, language: Optional[Language] = None) -> LexiconMatch:
+    """
+    Match an utterance against a parameter's lexicon in one pass.
+
+    Args:
+        parameter: Wizard parameter (color, moisture, ...)
+        text: User's message
+        language: Session language → values (English + that language) and
+            help indicators (validators). None → values and hints of every
+            language plus "unsure"/"how_to"/"follow_up" phrases (intent fast path)
+
+    Returns:
+        LexiconMatch with the best value and the groups seen
+    """
+    normalized = normalize(text)
+    if language is None:
+        matcher = _INTENT_MATCHERS.get(parameter, _FALLBACK_INTENT_MATCHER)
+    else:
+        matcher = _ANSWER_MATCHERS.get((parameter, language)) or _HELP_MATCHERS.get(language, _HELP_MATCHERS["en"])
+    matches = matcher.find(normalized)
+    value = _best_value(matches)
+
+    if value is None and language is not None and not matches and len(normalized) >= 2:
+        # Whole utterance is the start of a term ("bhu" → brown)
+        label = matcher.prefixes.get(normalized)
+        if label is not None and label[0] == "value":
+            value = label[1]
+            matches = [(normalized, label)]
+
+    return LexiconMatch(value, {group for _, (group, _) in matches}, [term for term, _ in matches])
+
+
+def match_value(parameter: str, text: str, language: Language) -> Optional[str]:
+    """Canonical value named in the text (None for help requests or no match)."""
+    match = scan(parameter, text, language)
+    return None if match.is_help else match.value
+
+
+def is_help_request(text: str, language: Language) -> bool:
+    """True if the text contains a help/uncertainty indicator of the language."""
+    return _HELP_MATCHERS.get(language, _HELP_MATCHERS["en"]).search(normalize(text))
+
+
+def mentions_topic(parameter: str, text: str) -> bool:
+    """True if the text mentions one of the parameter's topic keywords (substring match)."""
+    matcher = _TOPIC_MATCHERS.get(parameter)
+    if matcher is None:
+        return normalize(parameter) in normalize(text)
+    return matcher.search(normalize(text))
+
+
+def canonical_values(parameter: str) -> List[str]:
+    """Values an answer can be normalized to ([] for free-text parameters)."""
+    entry = VOCABULARY.get(parameter, {})
+    if entry.get("free_text"):
+        return []
+    return list(entry.get("values", {}))
+
+
+def synonyms(parameter: str, related: bool = False) -> Dict[str, List[str]]:
+    """{canonical value: [terms of every language]} (+ `related` near-synonyms)."""
+    entry = VOCABULARY.get(parameter, {})
+    extra = entry.get("related", {}) if related else {}
+    return {
+        value: [term for language in LANGUAGES for term in terms.get(language, [])] + extra.get(value, [])
+        for value, terms in entry.get("values", {}).items()
+    }
+
+
+def mappings(parameter: str) -> Dict[str, Dict[str, str]]:
+    """{language: {term: canonical value}} view of a parameter's values (fallback terms last)."""
+    entry = VOCABULARY.get(parameter, {})
+    groups = [entry.get("values", {}), entry.get("fallback", {})]
+    return {
+        language: {
+            term: value for group in groups for value, terms in group.items() for term in terms.get(language, [])
+        }
+        for language in LANGUAGES
+    }
+
+
+def topic_keywords(parameter: str) -> List[str]:
+    """Keywords tying knowledge-base chunks to a parameter."""
+    return list(VOCABULARY.get(parameter, {}).get("topic", [parameter]))
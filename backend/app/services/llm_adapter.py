@@ -12,14 +12,28 @@ To swap LLM provider:
 """
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import json
 from ..models import Language
 from ..config import settings
+from .http_client import http_get, http_post, async_http_post, async_http_stream
+from .rate_limiter import get_rate_limiter, estimate_request_tokens, limited_http_post, async_limited_http_post
+from .key_pool import KeyPool, configured_keys, get_key_pool, is_quota_error
+from .helper_cache import FallbackText
+from .circuit_breaker import breaker_for_url, get_breaker
 
 
 class LLMAdapter(ABC):
     """Abstract base class for LLM adapters."""
     
+    # Provider name (part of the helper cache key) and model in use
+    provider_name: str = "unknown"
+    model_name: str = ""
+    
+    # Estimated tokens of retrieved context to send in helper prompts
+    context_token_budget: int = 900
+    
     @abstractmethod
     def generate_helper(
         self,
@@ -42,6 +56,41 @@ class LLMAdapter(ABC):
         """
         pass
     
+    async def generate_helper_async(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """
+        Async variant of generate_helper() for the wizard's event loop.
+        
+        Default runs the blocking call in a worker thread; adapters with an
+        HTTP API override it to await the request instead.
+        """
+        return await asyncio.to_thread(
+            self.generate_helper, parameter, language, user_message, retrieved_chunks
+        )
+    
+    async def stream_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> AsyncIterator[str]:
+        """
+        Stream the helper explanation as text pieces arrive (for SSE).
+        
+        Yields the fallback text instead if the provider fails before the
+        first piece, and an empty FallbackText marker if the stream breaks
+        after it (so the partial text is not cached). Default yields the
+        full completion as one piece;
+        adapters with a streaming API override it.
+        """
+        yield await self.generate_helper_async(parameter, language, user_message, retrieved_chunks)
+    
     async def generate_async(self, prompt: str, temperature: float = 0.3) -> str:
         """
         Generate text asynchronously (for report generation).
@@ -54,7 +103,7 @@ class LLMAdapter(ABC):
             Generated text
         """
         # Default implementation - subclasses should override for true async
-        return self.generate_sync(prompt, temperature)
+        return await asyncio.to_thread(self.generate_sync, prompt, temperature)
     
     def generate_sync(self, prompt: str, temperature: float = 0.3) -> str:
         """
@@ -78,6 +127,8 @@ class OllamaLLMAdapter(LLMAdapter):
     Much better for Hindi/English and fully offline.
     """
     
+    provider_name = "ollama"
+    
     def __init__(self, model_name: str = "mistral", base_url: str = "http://localhost:11434"):
         """
         Initialize Ollama adapter.
@@ -88,11 +139,11 @@ class OllamaLLMAdapter(LLMAdapter):
         """
         self.model_name = model_name
         self.base_url = base_url
+        self.context_token_budget = settings.helper_context_tokens_ollama
         
         # Test connection
         try:
-            import requests
-            response = requests.get(f"{base_url}/api/tags", timeout=2)
+            response = http_get(f"{base_url}/api/tags", timeout=2)
             if response.status_code == 200:
                 models = response.json().get('models', [])
                 model_names = [m['name'] for m in models]
@@ -116,8 +167,71 @@ class OllamaLLMAdapter(LLMAdapter):
         retrieved_chunks: List[str],
     ) -> str:
         """Generate helper explanation using Ollama."""
-        import requests
-        
+        url, request = self._helper_request(parameter, language, user_message, retrieved_chunks)
+        try:
+            response = http_post(url, **request)
+            return self._parse_helper_response(response, parameter, language)
+        except Exception as e:
+            print(f"✗ Ollama error: {e}")
+            return self._fallback_response(parameter, language)
+    
+    async def generate_helper_async(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """Generate helper explanation using Ollama (awaits the request)."""
+        url, request = self._helper_request(parameter, language, user_message, retrieved_chunks)
+        try:
+            response = await async_http_post(url, **request)
+            return self._parse_helper_response(response, parameter, language)
+        except Exception as e:
+            print(f"✗ Ollama error: {e}")
+            return self._fallback_response(parameter, language)
+    
+    async def stream_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> AsyncIterator[str]:
+        """Stream helper explanation from Ollama (NDJSON chunks)."""
+        url, request = self._helper_request(parameter, language, user_message, retrieved_chunks)
+        request["json"]["stream"] = True
+        streamed = False
+        try:
+            async with async_http_stream(url, **request) as response:
+                if response.status_code != 200:
+                    print(f"✗ Ollama API error: {response.status_code}")
+                    yield self._fallback_response(parameter, language)
+                    return
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    piece = json.loads(line)
+                    if piece.get("response"):
+                        streamed = True
+                        yield piece["response"]
+                    if piece.get("done"):
+                        break
+        except Exception as e:
+            print(f"✗ Ollama error: {e}")
+            if not streamed:
+                yield self._fallback_response(parameter, language)
+            else:
+                yield FallbackText("")  # Interrupted: the partial text must not be cached
+    
+    def _helper_request(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> Tuple[str, Dict[str, Any]]:
+        """URL and request arguments of the helper call."""
         # Build context from retrieved chunks
         context = "\n\n".join(retrieved_chunks[:3])  # Use top 3 chunks
         
@@ -180,43 +294,37 @@ To test {param_display}, follow ALL these steps:
 
 Step 1:"""
         
-        # Call Ollama API
-        try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model_name,
-                    "prompt": full_prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.4,  # Slightly higher for more helpful responses
-                        "num_predict": 400,  # Allow more detailed steps (increased)
-                        "top_p": 0.9,
-                        "top_k": 40,
-                        "repeat_penalty": 1.1,
-                        "stop": ["Let me know", "let me know", "मुझे बताएं", "अगर आप", "if you'd like"],  # Stop at asking for more
-                    }
-                },
-                timeout=20
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get('response', '').strip()
-            else:
-                print(f"✗ Ollama API error: {response.status_code}")
-                return self._fallback_response(parameter, language)
-        
-        except Exception as e:
-            print(f"✗ Ollama error: {e}")
-            return self._fallback_response(parameter, language)
+        return f"{self.base_url}/api/generate", {
+            "json": {
+                "model": self.model_name,
+                "prompt": full_prompt,
+                "stream": False,
+                "options": {
+                    "temperature": 0.4,  # Slightly higher for more helpful responses
+                    "num_predict": 400,  # Allow more detailed steps (increased)
+                    "top_p": 0.9,
+                    "top_k": 40,
+                    "repeat_penalty": 1.1,
+                    "stop": ["Let me know", "let me know", "मुझे बताएं", "अगर आप", "if you'd like"],  # Stop at asking for more
+                }
+            },
+            "timeout": 20,
+        }
+    
+    def _parse_helper_response(self, response: Any, parameter: str, language: Language) -> str:
+        """Helper text from an Ollama response (requests or httpx)."""
+        if response.status_code == 200:
+            result = response.json()
+            return result.get('response', '').strip()
+        print(f"✗ Ollama API error: {response.status_code}")
+        return self._fallback_response(parameter, language)
     
     def _fallback_response(self, parameter: str, language: Language) -> str:
         """Fallback response if Ollama fails."""
         if language == "hi":
-            return f"किसान भाई, {parameter} की जांच के लिए कृपया विकल्पों में से चुनें या फिर से प्रयास करें।"
+            return FallbackText(f"किसान भाई, {parameter} की जांच के लिए कृपया विकल्पों में से चुनें या फिर से प्रयास करें।")
         else:
-            return f"Please select from the options or try again to test {parameter}."
+            return FallbackText(f"Please select from the options or try again to test {parameter}.")
 
 
 class GeminiLLMAdapter(LLMAdapter):
@@ -229,23 +337,35 @@ class GeminiLLMAdapter(LLMAdapter):
     Supports both old (google-generativeai) and new (google-genai) packages.
     """
     
-    def __init__(self, api_key: str, model_name: str = "gemini-2.5-flash"):
+    provider_name = "gemini"
+    
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "gemini-2.5-flash",
+        key_pool: Optional[KeyPool] = None,
+    ):
         """
         Initialize Gemini adapter.
         
         Args:
             api_key: Gemini API key
             model_name: Model to use (e.g., "gemini-2.5-flash", "gemini-2.5-pro", "gemini-3-pro-preview")
+            key_pool: Keys to spread calls across (default: just `api_key`; new API only)
         """
         self.api_key = api_key
+        self.key_pool = key_pool or KeyPool(self.provider_name, [api_key])
+        self._clients: Dict[str, Any] = {}
+        self.breaker = get_breaker(self.provider_name, "generate_content")
         self.model_name = model_name
         self.use_new_api = False
+        self.context_token_budget = settings.helper_context_tokens_gemini
         
         try:
             # Try new API first (google-genai package)
             try:
                 from google import genai
-                self.client = genai.Client(api_key=api_key)
+                self.client = self._client(api_key)
                 self.use_new_api = True
                 print(f"✓ Initialized Gemini adapter (new API) with model: {model_name}")
             except ImportError:
@@ -254,6 +374,8 @@ class GeminiLLMAdapter(LLMAdapter):
                 genai.configure(api_key=api_key)
                 self.model = genai.GenerativeModel(model_name)
                 self.use_new_api = False
+                # The legacy package has one global key: no pooling
+                self.key_pool = KeyPool(self.provider_name, [api_key])
                 print(f"✓ Initialized Gemini adapter (legacy API) with model: {model_name}")
         except Exception as e:
             print(f"✗ Error initializing Gemini: {e}")
@@ -267,6 +389,107 @@ class GeminiLLMAdapter(LLMAdapter):
         retrieved_chunks: List[str],
     ) -> str:
         """Generate helper explanation using Gemini API."""
+        full_prompt = self._build_helper_prompt(parameter, language, user_message, retrieved_chunks)
+        
+        with self.key_pool.lease() as lease:
+            try:
+                if self.use_new_api:
+                    # Use new google-genai API
+                    contents, config = self._new_api_request(full_prompt)
+                    with self.breaker.guard():
+                        response = self._client(lease.key).models.generate_content(
+                            model=self.model_name,
+                            contents=contents,
+                            config=config,
+                        )
+                    # Handle response - new API returns different structure
+                    # Try to get text directly first
+                    try:
+                        if hasattr(response, 'text'):
+                            text = response.text
+                            if text:
+                                return text.strip()
+                    except Exception as e:
+                        print(f"DEBUG: Could not get text directly: {e}")
+                    
+                    # Try to extract from candidates
+                    if hasattr(response, 'candidates') and response.candidates:
+                        for candidate in response.candidates:
+                            if hasattr(candidate, 'content') and candidate.content:
+                                content = candidate.content
+                                if hasattr(content, 'parts') and content.parts:
+                                    parts_text = []
+                                    for part in content.parts:
+                                        if hasattr(part, 'text') and part.text:
+                                            parts_text.append(str(part.text))
+                                    if parts_text:
+                                        return ' '.join(parts_text).strip()
+                    
+                    # If we can't extract text, raise an error to trigger fallback
+                    raise ValueError(f"Could not extract text from response")
+                else:
+                    # Use legacy google-generativeai API
+                    with self.breaker.guard():
+                        response = self.model.generate_content(full_prompt)
+                    return response.text.strip()
+            except Exception as e:
+                lease.fail(e)
+                return self._error_response(e, parameter, language)
+    
+    async def stream_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> AsyncIterator[str]:
+        """Stream helper explanation from Gemini (async streaming API)."""
+        full_prompt = self._build_helper_prompt(parameter, language, user_message, retrieved_chunks)
+        streamed = False
+        with self.key_pool.lease() as lease:
+            try:
+                with self.breaker.guard():
+                    if self.use_new_api:
+                        contents, config = self._new_api_request(full_prompt)
+                        stream = await self._client(lease.key).aio.models.generate_content_stream(
+                            model=self.model_name,
+                            contents=contents,
+                            config=config,
+                        )
+                    else:
+                        stream = await self.model.generate_content_async(full_prompt, stream=True)
+                    
+                    # Iterated inside the guard so mid-stream errors count against Gemini
+                    async for chunk in stream:
+                        text = self._chunk_text(chunk)
+                        if text:
+                            streamed = True
+                            yield text
+            except Exception as e:
+                lease.fail(e)
+                if streamed:
+                    print(f"✗ Gemini stream interrupted: {e}")
+                    yield FallbackText("")  # The partial text must not be cached
+                else:
+                    yield self._error_response(e, parameter, language)
+    
+    def _client(self, api_key: str) -> Any:
+        """google-genai client for a key (one per key, reused)."""
+        client = self._clients.get(api_key)
+        if client is None:
+            from google import genai
+            client = genai.Client(api_key=api_key)
+            self._clients[api_key] = client
+        return client
+    
+    def _build_helper_prompt(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """Full helper prompt (system rules + context + question)."""
         # Build context from retrieved chunks
         context = "\n\n".join(retrieved_chunks)
         
@@ -316,73 +539,50 @@ Context from knowledge base:
 
 {user_prompt}"""
         
+        return full_prompt
+    
+    def _new_api_request(self, full_prompt: str) -> Tuple[Any, Any]:
+        """Contents and generation config for the google-genai API."""
+        from google.genai import types
+        
+        contents = [
+            types.Content(
+                role="user",
+                parts=[types.Part.from_text(text=full_prompt)],
+            )
+        ]
+        
+        config = types.GenerateContentConfig(
+            temperature=0.5,  # Lower for more consistent steps
+            max_output_tokens=1500,  # More tokens for detailed steps
+        )
+        return contents, config
+    
+    @staticmethod
+    def _chunk_text(chunk: Any) -> str:
+        """Text of one streamed chunk ('' for chunks without text parts)."""
         try:
-            if self.use_new_api:
-                # Use new google-genai API
-                from google.genai import types
-                
-                contents = [
-                    types.Content(
-                        role="user",
-                        parts=[types.Part.from_text(text=full_prompt)],
-                    )
-                ]
-                
-                config = types.GenerateContentConfig(
-                    temperature=0.5,  # Lower for more consistent steps
-                    max_output_tokens=1500,  # More tokens for detailed steps
-                )
-                
-                response = self.client.models.generate_content(
-                    model=self.model_name,
-                    contents=contents,
-                    config=config,
-                )
-                # Handle response - new API returns different structure
-                # Try to get text directly first
-                try:
-                    if hasattr(response, 'text'):
-                        text = response.text
-                        if text:
-                            return text.strip()
-                except Exception as e:
-                    print(f"DEBUG: Could not get text directly: {e}")
-                
-                # Try to extract from candidates
-                if hasattr(response, 'candidates') and response.candidates:
-                    for candidate in response.candidates:
-                        if hasattr(candidate, 'content') and candidate.content:
-                            content = candidate.content
-                            if hasattr(content, 'parts') and content.parts:
-                                parts_text = []
-                                for part in content.parts:
-                                    if hasattr(part, 'text') and part.text:
-                                        parts_text.append(str(part.text))
-                                if parts_text:
-                                    return ' '.join(parts_text).strip()
-                
-                # If we can't extract text, raise an error to trigger fallback
-                raise ValueError(f"Could not extract text from response")
-            else:
-                # Use legacy google-generativeai API
-                response = self.model.generate_content(full_prompt)
-                return response.text.strip()
-        except Exception as e:
-            error_msg = str(e)
-            print(f"✗ Error calling Gemini API: {error_msg}")
-            
-            # Check for quota/rate limit errors
-            if "429" in error_msg or "quota" in error_msg.lower():
-                if language == "hi":
-                    return f"किसान भाई, API की सीमा पूरी हो गई है। कृपया कुछ देर बाद पुनः प्रयास करें।"
-                else:
-                    return f"API quota exceeded. Please try again later."
-            
-            # Fallback message
+            return chunk.text or ""
+        except Exception:
+            return ""
+    
+    def _error_response(self, error: Exception, parameter: str, language: Language) -> str:
+        """Fallback text for a failed Gemini call."""
+        error_msg = str(error)
+        print(f"✗ Error calling Gemini API: {error_msg}")
+        
+        # Check for quota/rate limit errors
+        if "429" in error_msg or "quota" in error_msg.lower():
             if language == "hi":
-                return f"माफ करें, {parameter} के बारे में जानकारी प्राप्त करने में समस्या हुई। कृपया पुनः प्रयास करें।"
+                return FallbackText(f"किसान भाई, API की सीमा पूरी हो गई है। कृपया कुछ देर बाद पुनः प्रयास करें।")
             else:
-                return f"Sorry, there was an issue getting information about {parameter}. Please try again."
+                return FallbackText(f"API quota exceeded. Please try again later.")
+        
+        # Fallback message
+        if language == "hi":
+            return FallbackText(f"माफ करें, {parameter} के बारे में जानकारी प्राप्त करने में समस्या हुई। कृपया पुनः प्रयास करें।")
+        else:
+            return FallbackText(f"Sorry, there was an issue getting information about {parameter}. Please try again.")
 
 
 class GroqLLMAdapter(LLMAdapter):
@@ -393,17 +593,29 @@ class GroqLLMAdapter(LLMAdapter):
     Much faster than local models and suitable for production deployment.
     """
     
-    def __init__(self, api_key: str, model_name: str = "llama-3.3-70b-versatile"):
+    provider_name = "groq"
+    
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "llama-3.3-70b-versatile",
+        base_url: str = "https://api.groq.com/openai/v1/chat/completions",
+        key_pool: Optional[KeyPool] = None,
+    ):
         """
         Initialize Groq adapter.
         
         Args:
             api_key: Groq API key
             model_name: Model to use (llama-3.3-70b-versatile, mixtral-8x7b-32768, etc.)
+            base_url: Chat completions URL (any OpenAI-compatible server)
+            key_pool: Keys to spread calls across (default: just `api_key`)
         """
         self.api_key = api_key
+        self.key_pool = key_pool or KeyPool(self.provider_name, [api_key])
         self.model_name = model_name
-        self.base_url = "https://api.groq.com/openai/v1/chat/completions"
+        self.base_url = base_url
+        self.context_token_budget = settings.helper_context_tokens_groq
         print(f"✓ Initialized Groq LLM adapter with model: {model_name}")
     
     def generate_helper(
@@ -414,8 +626,105 @@ class GroqLLMAdapter(LLMAdapter):
         retrieved_chunks: List[str],
     ) -> str:
         """Generate helper explanation using Groq API."""
-        import requests
+        def call(api_key: str, max_retries: Optional[int]) -> Any:
+            url, request = self._helper_request(parameter, language, user_message, retrieved_chunks, api_key)
+            return limited_http_post(url, api_key, max_retries=max_retries, **request)
+        
+        try:
+            response = self.key_pool.call(call)
+            return self._parse_helper_response(response, parameter, language)
+        except Exception as e:
+            print(f"✗ Groq error: {e}")
+            return self._fallback_response(parameter, language)
+    
+    async def generate_helper_async(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """Generate helper explanation using Groq API (awaits the request)."""
+        async def call(api_key: str, max_retries: Optional[int]) -> Any:
+            url, request = self._helper_request(parameter, language, user_message, retrieved_chunks, api_key)
+            return await async_limited_http_post(url, api_key, max_retries=max_retries, **request)
         
+        try:
+            response = await self.key_pool.call_async(call)
+            return self._parse_helper_response(response, parameter, language)
+        except Exception as e:
+            print(f"✗ Groq error: {e}")
+            return self._fallback_response(parameter, language)
+    
+    async def stream_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> AsyncIterator[str]:
+        """
+        Stream helper explanation from Groq (OpenAI-style SSE deltas).
+        
+        A 429 before the first piece moves the call to another healthy
+        pooled key (the limited key cools down).
+        """
+        attempts = len(self.key_pool)
+        for attempt in range(attempts):
+            with self.key_pool.lease() as lease:
+                rotate = attempt < attempts - 1 and self.key_pool.can_rotate(lease)
+                url, request = self._helper_request(parameter, language, user_message, retrieved_chunks, lease.key)
+                request["json"]["stream"] = True
+                streamed = False
+                try:
+                    breaker_for_url(url).reject_if_open()  # Before queueing on the limiter
+                    limiter = get_rate_limiter().for_key(lease.key) if settings.rate_limit_enabled else None
+                    if limiter is not None:
+                        await limiter.acquire(estimate_request_tokens(request["json"]))
+                    async with async_http_stream(url, **request) as response:
+                        if limiter is not None:
+                            limiter.observe(response)
+                        lease.observe(response)
+                        if response.status_code == 429 and rotate:
+                            print(f"⏳ Groq key rate limited, rotating to another key")
+                            continue
+                        if response.status_code != 200:
+                            print(f"✗ Groq API error: {response.status_code}")
+                            yield self._fallback_response(parameter, language)
+                            return
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[len("data:"):].strip()
+                            if data == "[DONE]":
+                                break
+                            choices = json.loads(data).get("choices") or [{}]
+                            text = choices[0].get("delta", {}).get("content")
+                            if text:
+                                streamed = True
+                                yield text
+                    return
+                except Exception as e:
+                    lease.fail(e)
+                    if rotate and not streamed and is_quota_error(e):
+                        print(f"⏳ Groq key rate limited, rotating to another key")
+                        continue
+                    print(f"✗ Groq error: {e}")
+                    if not streamed:
+                        yield self._fallback_response(parameter, language)
+                    else:
+                        yield FallbackText("")  # Interrupted: the partial text must not be cached
+                    return
+    
+    def _helper_request(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+        api_key: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """URL and request arguments of the helper call (authorized with `api_key`)."""
         # Build context from retrieved chunks
         context = "\n\n".join(retrieved_chunks[:5])  # Use top 5 chunks
         
@@ -485,64 +794,47 @@ Provide clear, actionable steps. Do NOT add information not in the context.
 
 To test {parameter}:"""
         
-        try:
-            response = requests.post(
-                self.base_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model_name,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    "temperature": 0.5,
-                    "max_tokens": 1500,
-                    "top_p": 0.9,
-                },
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result["choices"][0]["message"]["content"].strip()
-            else:
-                print(f"✗ Groq API error: {response.status_code} - {response.text}")
-                return self._fallback_response(parameter, language)
-        
-        except Exception as e:
-            print(f"✗ Groq error: {e}")
-            return self._fallback_response(parameter, language)
+        return self.base_url, {
+            "headers": {
+                "Authorization": f"Bearer {api_key or self.api_key}",
+                "Content-Type": "application/json"
+            },
+            "json": {
+                "model": self.model_name,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                "temperature": 0.5,
+                "max_tokens": 1500,
+                "top_p": 0.9,
+            },
+            "timeout": 30,
+        }
+    
+    def _parse_helper_response(self, response: Any, parameter: str, language: Language) -> str:
+        """Helper text from a Groq response (requests or httpx)."""
+        if response.status_code == 200:
+            result = response.json()
+            return result["choices"][0]["message"]["content"].strip()
+        print(f"✗ Groq API error: {response.status_code} - {response.text}")
+        return self._fallback_response(parameter, language)
     
     def _fallback_response(self, parameter: str, language: Language) -> str:
         """Fallback response if Groq fails."""
         if language == "hi":
-            return f"किसान भाई, {parameter} की जांच के लिए कृपया विकल्पों में से चुनें या फिर से प्रयास करें।"
+            return FallbackText(f"किसान भाई, {parameter} की जांच के लिए कृपया विकल्पों में से चुनें या फिर से प्रयास करें।")
         else:
-            return f"Please select from the options or try again to test {parameter}."
+            return FallbackText(f"Please select from the options or try again to test {parameter}.")
     
     def generate_sync(self, prompt: str, temperature: float = 0.3) -> str:
         """Generate text synchronously using Groq API."""
-        import requests
-        
         try:
-            response = requests.post(
-                self.base_url,
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": self.model_name,
-                    "messages": [
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": temperature,
-                    "max_tokens": 2000,
-                },
-                timeout=60
+            response = self.key_pool.call(
+                lambda api_key, max_retries: limited_http_post(
+                    self.base_url, api_key, max_retries=max_retries,
+                    **self._generate_request(prompt, temperature, api_key),
+                )
             )
             
             if response.status_code == 200:
@@ -557,70 +849,121 @@ To test {parameter}:"""
     
     async def generate_async(self, prompt: str, temperature: float = 0.3) -> str:
         """Generate text asynchronously using Groq API."""
-        import httpx
-        
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.base_url,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": self.model_name,
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": temperature,
-                        "max_tokens": 2000,
-                    }
+            response = await self.key_pool.call_async(
+                lambda api_key, max_retries: async_limited_http_post(
+                    self.base_url, api_key, max_retries=max_retries,
+                    **self._generate_request(prompt, temperature, api_key),
                 )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return result["choices"][0]["message"]["content"].strip()
-                else:
-                    raise Exception(f"Groq API error: {response.status_code}")
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                return result["choices"][0]["message"]["content"].strip()
+            else:
+                raise Exception(f"Groq API error: {response.status_code}")
         
         except Exception as e:
             print(f"✗ Groq async generation error: {e}")
             raise
+    
+    def _generate_request(self, prompt: str, temperature: float, api_key: str) -> Dict[str, Any]:
+        """Request arguments of a free-form generation call."""
+        return {
+            "headers": {
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            "json": {
+                "model": self.model_name,
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": temperature,
+                "max_tokens": 2000,
+            },
+            "timeout": 60.0,
+        }
 
 
 def create_llm_adapter() -> LLMAdapter:
     """
     Factory function to create appropriate LLM adapter based on config.
     
+    With `llm_hedge_providers` set, the `llm_provider` adapter is wrapped
+    together with those secondaries in a MultiProviderLLMAdapter
+    (hedged requests + latency-based failover, see llm_router.py).
+    With `llm_coalescing_enabled`, identical concurrent calls share one
+    upstream request (CoalescingLLMAdapter, see single_flight.py).
+    
     Returns:
         LLMAdapter instance (Groq, Gemini, Ollama, or Local)
     """
-    if settings.llm_provider == "groq":
+    adapter = _create_routed_adapter()
+    if settings.llm_coalescing_enabled:
+        from .single_flight import CoalescingLLMAdapter
+        return CoalescingLLMAdapter(adapter)
+    return adapter
+
+
+def _create_routed_adapter() -> LLMAdapter:
+    """The `llm_provider` adapter, or a MultiProviderLLMAdapter with hedge providers."""
+    primary = create_provider_adapter(settings.llm_provider)
+    secondary_names = [
+        name.strip() for name in settings.llm_hedge_providers.split(",")
+        if name.strip() and name.strip() != settings.llm_provider
+    ]
+    if not secondary_names:
+        return primary
+    
+    adapters = [primary]
+    for name in secondary_names:
+        try:
+            adapters.append(create_provider_adapter(name))
+        except Exception as e:
+            print(f"⚠️  Skipping hedge provider '{name}': {e}")
+    if len(adapters) == 1:
+        return primary
+    
+    from .llm_router import MultiProviderLLMAdapter
+    return MultiProviderLLMAdapter(adapters)
+
+
+def create_provider_adapter(provider: str) -> LLMAdapter:
+    """
+    Create the adapter of a single provider from config.
+    
+    Args:
+        provider: "groq", "ollama", "gemini" (or "local")
+    """
+    if provider == "groq":
         # Use Groq (fast cloud LLM)
         if not settings.groq_llm_api_key:
             raise ValueError("GROQ_LLM_API_KEY not set in environment")
         return GroqLLMAdapter(
             api_key=settings.groq_llm_api_key,
-            model_name=settings.groq_llm_model
+            model_name=settings.groq_llm_model,
+            key_pool=get_key_pool("groq"),
         )
     
-    elif settings.llm_provider == "ollama":
+    elif provider == "ollama":
         # Use Ollama (local LLM)
         model_name = getattr(settings, 'ollama_model_name', 'mistral')
         return OllamaLLMAdapter(model_name=model_name)
     
-    elif settings.llm_provider == "gemini":
-        if not settings.gemini_api_key:
+    elif provider == "gemini":
+        gemini_keys = configured_keys("gemini")
+        if not gemini_keys:
             raise ValueError("GEMINI_API_KEY not set in environment")
         return GeminiLLMAdapter(
-            api_key=settings.gemini_api_key,
-            model_name=settings.gemini_model_name
+            api_key=gemini_keys[0],
+            model_name=settings.gemini_model_name,
+            key_pool=get_key_pool("gemini"),
         )
     
-    elif settings.llm_provider == "local":
+    elif provider == "local":
         # Future: llama.cpp or other local implementations
         raise NotImplementedError("Local LLM adapter not yet implemented. Use 'ollama' instead.")
     
     else:
-        raise ValueError(f"Unknown LLM provider: {settings.llm_provider}")
-
+        raise ValueError(f"Unknown LLM provider: {provider}")
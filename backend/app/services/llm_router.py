@@ -0,0 +1,352 @@
+"""
+Multi-provider LLM adapter: hedged requests and latency-based failover.
+
+Wraps the single-provider adapters (Groq, Gemini, Ollama) behind the
+LLMAdapter interface. For every helper call:
+- The primary provider is called first
+- If it has not answered after its adaptive hedge delay (a percentile of
+  its recent latencies), the next provider is called as well
+- If a provider fails (fallback text / error), the next one is called at once
+- The first good answer wins; the other in-flight request is cancelled
+
+Providers keep the configured order unless the primary's recent average
+latency is `llm_failover_ratio` times worse than the best provider's; then
+the fastest healthy provider is tried first until the samples age out.
+
+Enable with `llm_hedge_providers` in config.py (e.g. LLM_PROVIDER=groq,
+LLM_HEDGE_PROVIDERS=gemini,ollama). fake_providers.py serves
+Ollama/Groq-compatible endpoints with configurable latency and failures
+for exercising this locally (see benchmark_hedging.py).
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from ..models import Language
+from ..config import settings
+from .llm_adapter import LLMAdapter
+from .helper_cache import FallbackText
+
+
+# Latency samples kept per provider and call kind
+LATENCY_WINDOW = 100
+# Samples needed before the percentile replaces the initial hedge delay
+MIN_SAMPLES = 10
+# Weight of the newest sample in the moving average used for ordering
+EWMA_ALPHA = 0.2
+
+
+class ProviderLatency:
+    """Recent latencies of one provider for one kind of call."""
+
+    def __init__(self):
+        self.samples: deque = deque(maxlen=LATENCY_WINDOW)
+        self.ewma: Optional[float] = None
+        self.last_at = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, success: bool = True) -> None:
+        """Add a sample; failures only move the average (by a penalty latency)."""
+        with self._lock:
+            if success:
+                self.samples.append(seconds)
+            self.ewma = seconds if self.ewma is None else EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * self.ewma
+            self.last_at = time.monotonic()
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-th percentile of successful latencies (None if too few samples)."""
+        with self._lock:
+            if len(self.samples) < MIN_SAMPLES:
+                return None
+            return float(np.percentile(np.fromiter(self.samples, dtype=float), q))
+
+    def recent_ewma(self, window_seconds: float) -> Optional[float]:
+        """Moving average latency, or None if the last sample is older than the window."""
+        if self.ewma is None or time.monotonic() - self.last_at > window_seconds:
+            return None
+        return self.ewma
+
+
+class MultiProviderLLMAdapter(LLMAdapter):
+    """Hedges and fails over helper calls across several provider adapters."""
+
+    provider_name = "multi"
+
+    def __init__(self, adapters: List[LLMAdapter]):
+        """
+        Initialize router.
+
+        Args:
+            adapters: Provider adapters in order of preference (primary first)
+        """
+        if not adapters:
+            raise ValueError("MultiProviderLLMAdapter needs at least one adapter")
+        self.adapters = adapters
+        self.model_name = "+".join(f"{adapter.provider_name}:{adapter.model_name}" for adapter in adapters)
+        # Chunks are packed before the provider is known, so fit the smallest budget
+        self.context_token_budget = min(adapter.context_token_budget for adapter in adapters)
+        self._latency: Dict[Tuple[int, str], ProviderLatency] = {}
+        self.counters: Dict[str, Any] = {
+            "calls": 0,
+            "hedged": 0,
+            "failovers": 0,
+            "secondary_wins": 0,
+            "wins": {},
+        }
+        names = ", ".join(adapter.provider_name for adapter in adapters)
+        print(f"✓ Initialized multi-provider LLM adapter ({names})")
+
+    # ---- Ordering and hedge delays -------------------------------------------
+
+    def _stats(self, adapter: LLMAdapter, kind: str) -> ProviderLatency:
+        key = (id(adapter), kind)
+        stats = self._latency.get(key)
+        if stats is None:
+            stats = self._latency.setdefault(key, ProviderLatency())
+        return stats
+
+    def ordered(self, kind: str = "complete") -> List[LLMAdapter]:
+        """Adapters in the order they are tried (primary first)."""
+        window = settings.llm_failover_window_seconds
+        averages = {id(adapter): self._stats(adapter, kind).recent_ewma(window) for adapter in self.adapters}
+        measured = [average for average in averages.values() if average is not None]
+        if not measured:
+            return list(self.adapters)
+
+        best = min(measured)
+        primary = self.adapters[0]
+        for adapter in self.adapters:
+            average = averages[id(adapter)]
+            if average is None or average <= settings.llm_failover_ratio * best:
+                primary = adapter
+                break
+        return [primary] + [adapter for adapter in self.adapters if adapter is not primary]
+
+    def hedge_delay(self, adapter: LLMAdapter, kind: str = "complete") -> float:
+        """Seconds to wait for `adapter` before also asking the next provider."""
+        delay = self._stats(adapter, kind).percentile(settings.llm_hedge_percentile)
+        if delay is None:
+            delay = settings.llm_hedge_initial_delay_seconds
+        return min(max(delay, settings.llm_hedge_min_delay_seconds), settings.llm_hedge_max_delay_seconds)
+
+    # ---- Racing ---------------------------------------------------------------
+
+    async def _race(
+        self,
+        kind: str,
+        call: Callable[[LLMAdapter], Awaitable[Any]],
+        is_good: Callable[[Any], bool],
+        discard: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ) -> Any:
+        """
+        Run `call` on the primary, hedging/failing over to the next adapters.
+
+        Returns the first result accepted by `is_good`, else the last result
+        (raises the last error if every adapter raised). Results that are not
+        returned are passed to `discard`.
+        """
+        order = self.ordered(kind)
+        self.counters["calls"] += 1
+        pending: Dict[asyncio.Future, Tuple[LLMAdapter, float]] = {}
+        next_index = 0
+        last_result: Any = None
+        last_error: Optional[BaseException] = None
+        penalty = 2 * settings.llm_hedge_max_delay_seconds
+
+        def launch() -> None:
+            nonlocal next_index
+            adapter = order[next_index]
+            next_index += 1
+            pending[asyncio.ensure_future(call(adapter))] = (adapter, time.monotonic())
+
+        async def drop(result: Any) -> None:
+            if discard is not None and result is not None:
+                await discard(result)
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if len(pending) == 1 and next_index < len(order):
+                    adapter, started = next(iter(pending.values()))
+                    timeout = max(0.0, self.hedge_delay(adapter, kind) - (time.monotonic() - started))
+
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Slower than usual for this provider: ask the next one too
+                    self.counters["hedged"] += 1
+                    launch()
+                    continue
+
+                winner = None
+                for task in done:
+                    adapter, started = pending.pop(task)
+                    elapsed = time.monotonic() - started
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        print(f"✗ {adapter.provider_name} call failed: {e}")
+                        self._stats(adapter, kind).record(penalty, success=False)
+                        last_error = e
+                        continue
+
+                    if winner is None and is_good(result):
+                        self._stats(adapter, kind).record(elapsed)
+                        winner = (adapter, result)
+                        continue
+
+                    if not is_good(result):
+                        self._stats(adapter, kind).record(penalty, success=False)
+                    await drop(last_result)
+                    last_result = result
+
+                if winner is not None:
+                    # Cancelled calls were at least this slow: let that count for ordering
+                    now = time.monotonic()
+                    for other, started in pending.values():
+                        self._stats(other, kind).record(now - started, success=False)
+                    adapter, result = winner
+                    wins = self.counters["wins"]
+                    wins[adapter.provider_name] = wins.get(adapter.provider_name, 0) + 1
+                    if adapter is not order[0]:
+                        self.counters["secondary_wins"] += 1
+                    await drop(last_result)
+                    return result
+
+                if not pending and next_index < len(order):
+                    # Every running call failed: fail over immediately
+                    self.counters["failovers"] += 1
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if last_result is None and last_error is not None:
+            raise last_error
+        return last_result
+
+    # ---- LLMAdapter interface ---------------------------------------------------
+
+    def generate_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """Sequential failover (no hedging) for synchronous callers."""
+        result = None
+        for adapter in self.ordered("complete"):
+            start = time.monotonic()
+            result = adapter.generate_helper(parameter, language, user_message, retrieved_chunks)
+            if _is_good_text(result):
+                self._stats(adapter, "complete").record(time.monotonic() - start)
+                return result
+            self._stats(adapter, "complete").record(2 * settings.llm_hedge_max_delay_seconds, success=False)
+        return result
+
+    async def generate_helper_async(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        """Hedged helper call; the first good completion wins."""
+        try:
+            return await self._race(
+                "complete",
+                lambda adapter: adapter.generate_helper_async(parameter, language, user_message, retrieved_chunks),
+                _is_good_text,
+            )
+        except Exception as e:
+            print(f"✗ All LLM providers failed: {e}")
+            return _fallback_response(parameter, language)
+
+    async def stream_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> AsyncIterator[str]:
+        """Hedged on time to first piece; the winning stream is then relayed."""
+        async def first_piece(adapter: LLMAdapter) -> Tuple[AsyncIterator[str], str]:
+            stream = adapter.stream_helper(parameter, language, user_message, retrieved_chunks)
+            try:
+                return stream, await stream.__anext__()
+            except BaseException:
+                await stream.aclose()
+                raise
+
+        async def close(result: Tuple[AsyncIterator[str], str]) -> None:
+            await result[0].aclose()
+
+        try:
+            stream, piece = await self._race(
+                "first_token",
+                first_piece,
+                lambda result: _is_good_text(result[1]),
+                discard=close,
+            )
+        except Exception as e:
+            print(f"✗ All LLM providers failed: {e}")
+            yield _fallback_response(parameter, language)
+            return
+
+        try:
+            yield piece
+            async for piece in stream:
+                yield piece
+        finally:
+            await stream.aclose()
+
+    async def generate_async(self, prompt: str, temperature: float = 0.3) -> str:
+        """First adapter (in preference order) that supports free-form generation."""
+        for adapter in self.adapters:
+            try:
+                return await adapter.generate_async(prompt, temperature)
+            except NotImplementedError:
+                continue
+        raise NotImplementedError("No wrapped adapter implements generate_async")
+
+    def generate_sync(self, prompt: str, temperature: float = 0.3) -> str:
+        """First adapter (in preference order) that supports free-form generation."""
+        for adapter in self.adapters:
+            try:
+                return adapter.generate_sync(prompt, temperature)
+            except NotImplementedError:
+                continue
+        raise NotImplementedError("No wrapped adapter implements generate_sync")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hedge/failover counters and per-provider latency state."""
+        providers = {}
+        for adapter in self.adapters:
+            complete = self._stats(adapter, "complete")
+            p50 = complete.percentile(50)
+            providers[adapter.provider_name] = {
+                "model": adapter.model_name,
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "avg_ms": round(complete.ewma * 1000, 1) if complete.ewma is not None else None,
+                "hedge_delay_ms": round(self.hedge_delay(adapter) * 1000, 1),
+            }
+        return {
+            **self.counters,
+            "order": [adapter.provider_name for adapter in self.ordered()],
+            "providers": providers,
+        }
+
+
+def _is_good_text(text: Any) -> bool:
+    return bool(text) and not isinstance(text, FallbackText)
+
+
+def _fallback_response(parameter: str, language: Language) -> str:
+    """Fallback text when every provider failed."""
+    if language == "hi":
+        return FallbackText(f"किसान भाई, {parameter} की जांच के लिए कृपया विकल्पों में से चुनें या फिर से प्रयास करें।")
+    return FallbackText(f"Please select from the options or try again to test {parameter}.")
@@ -0,0 +1,270 @@
+"""
+Registry of optional in-process models (lazy, background, memory-budgeted).
+
+Heavy models such as the SentenceTransformer behind the enhanced
+validators used to load on the first request that needed them: a
+multi-second stall for that farmer, or an out-of-memory kill on a 512 MB
+instance. Models are now registered with a loader and an estimated size
+and loaded on a background thread, either right after startup
+(`model_preload`) or on first use. Until a model is ready, callers get
+None from `get()` and use their lexical fallback; nothing ever waits.
+
+Memory budget (`model_memory_budget_mb`, process RSS, 0 = unlimited):
+- before loading: skipped if current RSS + the model's size would exceed it
+- after loading: the model's measured RSS growth replaces the estimate;
+  if RSS is over budget, least recently used models are unloaded until
+  the expected RSS fits
+- skipped / unloaded models are retried on later use once they fit
+
+States: registered → loading → ready, or skipped / failed / unloaded.
+`model_registry_stats()` is shown under `models` in /health.
+
+To modify:
+- Budget / preloading: Update `model_memory_budget_mb`, `model_preload` in config.py
+- Add a model: `get_model_registry().register(name, load, size_mb, unload)`
+"""
+
+import gc
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from ..config import settings
+
+
+REGISTERED = "registered"
+LOADING = "loading"
+READY = "ready"
+SKIPPED = "skipped"
+FAILED = "failed"
+UNLOADED = "unloaded"
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB (None if it cannot be read)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # Peak, not current: conservative
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except Exception:
+        return None
+
+
+class _ModelEntry:
+    """One registered model and its load state."""
+
+    def __init__(self, name: str, load: Callable[[], Any], size_mb: float, unload: Optional[Callable[[Any], None]]):
+        self.name = name
+        self.load = load
+        self.unload = unload
+        self.size_mb = size_mb  # Estimate until measured by a load
+        self.state = REGISTERED
+        self.model: Any = None
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.last_used = 0.0
+        self.thread: Optional[threading.Thread] = None
+        self.ready_event = threading.Event()
+
+
+class ModelRegistry:
+    """Loads registered models off the request path within a memory budget."""
+
+    def __init__(self, budget_mb: Optional[float] = None):
+        """
+        Initialize registry.
+
+        Args:
+            budget_mb: Process RSS ceiling in MB (defaults to settings, 0 = unlimited)
+        """
+        self.budget_mb = settings.model_memory_budget_mb if budget_mb is None else budget_mb
+        self._entries: Dict[str, _ModelEntry] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        load: Callable[[], Any],
+        size_mb: float,
+        unload: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        """
+        Register a model (no-op if the name is taken).
+
+        Args:
+            name: Registry key (shown in /health)
+            load: Blocking loader, runs on a background thread
+            size_mb: Estimated RSS growth of loading it
+            unload: Optional hook called with the model before it is dropped
+        """
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _ModelEntry(name, load, size_mb, unload)
+
+    def get(self, name: str) -> Optional[Any]:
+        """
+        The model if it is ready, else None (never blocks).
+
+        A model that is not loaded yet starts loading in the background,
+        so the caller falls back now and gets the model on a later call.
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            return None
+        if entry.state == READY:
+            entry.last_used = time.monotonic()
+            return entry.model
+        if entry.state in (REGISTERED, SKIPPED, UNLOADED):
+            self.load_in_background(name)
+        return None
+
+    def is_ready(self, name: str) -> bool:
+        entry = self._entries.get(name)
+        return entry is not None and entry.state == READY
+
+    def wait_ready(self, name: str, timeout: Optional[float] = None) -> bool:
+        """Block until a load attempt of `name` finishes (scripts / warm-up only)."""
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+        if entry.state in (REGISTERED, UNLOADED):
+            self.load_in_background(name)
+        entry.ready_event.wait(timeout)
+        return entry.state == READY
+
+    def preload(self) -> None:
+        """Start background loads of every registered model (after startup)."""
+        for name in list(self._entries):
+            self.load_in_background(name)
+
+    def load_in_background(self, name: str) -> bool:
+        """
+        Start loading `name` on a daemon thread if it fits the budget.
+
+        Returns:
+            True if a load is running (started now or before)
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.state == READY:
+                return False
+            if entry.state == LOADING:
+                return True
+            if entry.state == FAILED:
+                return False
+            if not self._fits(entry.size_mb):
+                if entry.state != SKIPPED:
+                    print(f"⚠️  Not loading model '{name}': ~{entry.size_mb:.0f} MB would exceed the {self.budget_mb:.0f} MB budget")
+                entry.state = SKIPPED
+                entry.ready_event.set()
+                return False
+            entry.state = LOADING
+            entry.ready_event.clear()
+            entry.thread = threading.Thread(target=self._load, args=(entry,), name=f"model-load-{name}", daemon=True)
+            entry.thread.start()
+            return True
+
+    def unload(self, name: str) -> None:
+        """Drop a ready model (state becomes unloaded; a later get() reloads it if it fits)."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.state != READY:
+                return
+            model, entry.model = entry.model, None
+            entry.state = UNLOADED
+        if entry.unload is not None:
+            try:
+                entry.unload(model)
+            except Exception as e:
+                print(f"⚠️  Unload hook of model '{name}' failed: {e}")
+        del model
+        gc.collect()
+        print(f"⏳ Unloaded model '{name}'")
+
+    def _fits(self, size_mb: float) -> bool:
+        if not self.budget_mb:
+            return True
+        rss = current_rss_mb()
+        return rss is None or rss + size_mb <= self.budget_mb
+
+    def _load(self, entry: _ModelEntry) -> None:
+        print(f"⏳ Loading model '{entry.name}' in the background...")
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        try:
+            model = entry.load()
+        except Exception as e:
+            entry.state = FAILED
+            entry.error = str(e)
+            entry.ready_event.set()
+            print(f"⚠️  Could not load model '{entry.name}': {e}")
+            return
+
+        entry.load_seconds = round(time.perf_counter() - start, 2)
+        rss_after = current_rss_mb()
+        if rss_before is not None and rss_after is not None and rss_after > rss_before:
+            entry.size_mb = round(rss_after - rss_before, 1)
+        entry.model = model
+        entry.last_used = time.monotonic()
+        entry.state = READY
+        entry.ready_event.set()
+        print(f"✓ Model '{entry.name}' ready ({entry.load_seconds}s, ~{entry.size_mb:.0f} MB)")
+        self._enforce_budget()
+
+    def _enforce_budget(self) -> None:
+        """Unload least recently used models until the expected RSS fits the budget."""
+        if not self.budget_mb:
+            return
+        rss = current_rss_mb()
+        if rss is None or rss <= self.budget_mb:
+            return
+        ready: List[_ModelEntry] = sorted(
+            (entry for entry in self._entries.values() if entry.state == READY),
+            key=lambda entry: entry.last_used,
+        )
+        print(f"⚠️  RSS {rss:.0f} MB is over the {self.budget_mb:.0f} MB model budget")
+        for entry in ready:
+            if rss <= self.budget_mb:
+                break
+            self.unload(entry.name)
+            rss -= entry.size_mb  # Freed pages are not always returned to the OS right away
+
+    def stats(self) -> Dict[str, Any]:
+        rss = current_rss_mb()
+        return {
+            "rss_mb": round(rss, 1) if rss is not None else None,
+            "budget_mb": self.budget_mb or None,
+            "models": {
+                name: {
+                    "state": entry.state,
+                    "size_mb": entry.size_mb,
+                    "load_seconds": entry.load_seconds,
+                    "error": entry.error,
+                }
+                for name, entry in self._entries.items()
+            },
+        }
+
+
+# Global registry instance
+_model_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get or create global model registry."""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry()
+    return _model_registry
+
+
+def model_registry_stats() -> Dict[str, Any]:
+    """Registry state for /health."""
+    return get_model_registry().stats()
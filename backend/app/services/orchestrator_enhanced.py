@@ -6,9 +6,17 @@ Adds:
 - Confidence fusion (ASR + Validator + LLM)
 - Audit logging
 - TTS response generation
+
+The turn is implemented as a coroutine (`handle_user_message_enhanced_async`)
+so STT, intent, extraction, helper LLM and TTS calls are awaited instead of
+blocking the server's event loop; `handle_user_message_enhanced` runs it
+to completion for synchronous callers (scripts). With `on_helper_text`,
+helper text is streamed piece by piece (SSE endpoint) before the turn ends.
 """
 
-from typing import Tuple, Optional, Dict, Any
+import asyncio
+import time
+from typing import Awaitable, Callable, Tuple, Optional, Dict, Any
 from ..models import (
     SessionState,
     NextMessageResponse,
@@ -24,13 +32,16 @@ from .orchestrator import (
     get_question_for_parameter,
 )
 from .validators_enhanced import ENHANCED_VALIDATORS
+from . import lexicon
 from .orchestrator import validate_name
 from .rag_engine import RAGEngine
+from .context_packer import estimate_tokens
 from .llm_adapter import LLMAdapter
 from .stt_service import STTService, ASRResult
 from .tts_service import TTSService
 from .answer_extractor import get_answer_extractor
-from .intent_classifier import get_intent_classifier
+from .intent_classifier import TurnAnalysis, get_intent_classifier
+from .helper_cache import FallbackText, get_helper_cache
 from ..config import settings
 
 
@@ -71,6 +82,33 @@ def handle_user_message_enhanced(
     llm: LLMAdapter,
     stt_service: Optional[STTService] = None,
     tts_service: Optional[TTSService] = None,
+) -> Tuple[NextMessageResponse, Dict[str, Any]]:
+    """
+    Synchronous wrapper around handle_user_message_enhanced_async().
+    
+    Must not be called from a running event loop (API routes await the
+    async variant directly).
+    """
+    return asyncio.run(handle_user_message_enhanced_async(
+        session=session,
+        user_message=user_message,
+        audio_bytes=audio_bytes,
+        rag_engine=rag_engine,
+        llm=llm,
+        stt_service=stt_service,
+        tts_service=tts_service,
+    ))
+
+
+async def handle_user_message_enhanced_async(
+    session: SessionState,
+    user_message: Optional[str],
+    audio_bytes: Optional[bytes],
+    rag_engine: RAGEngine,
+    llm: LLMAdapter,
+    stt_service: Optional[STTService] = None,
+    tts_service: Optional[TTSService] = None,
+    on_helper_text: Optional[Callable[[str], Awaitable[None]]] = None,
 ) -> Tuple[NextMessageResponse, Dict[str, Any]]:
     """
     Enhanced orchestration with audio support and confidence scoring.
@@ -83,6 +121,8 @@ def handle_user_message_enhanced(
         llm: LLM adapter for helper mode
         stt_service: STT service for audio transcription
         tts_service: TTS service for audio responses
+        on_helper_text: If set, helper text is streamed and each piece is
+            passed to this callback as it arrives
         
     Returns:
         Tuple of (NextMessageResponse, audit_dict)
@@ -104,7 +144,7 @@ def handle_user_message_enhanced(
     asr_result: Optional[ASRResult] = None
     if audio_bytes and stt_service:
         try:
-            asr_result = stt_service.transcribe(audio_bytes, language)
+            asr_result = await stt_service.transcribe_async(audio_bytes, language)
             audit["asr_conf"] = asr_result.asr_confidence
             audit["asr_text"] = asr_result.text
             
@@ -117,15 +157,18 @@ def handle_user_message_enhanced(
     
     # If still no message, return error
     if not user_message or not user_message.strip():
-        return _create_error_response(
+        return await _create_error_response(
             session,
             "No input provided",
             language,
             tts_service
         ), audit
     
+    audit["user_message"] = user_message  # Training data for train_intent_model.py
+    
     # Step 2: Use LLM to intelligently classify user intent
     # Skip intent classification for simple parameters that don't need help
+    joint: Optional[TurnAnalysis] = None
     SIMPLE_PARAMETERS = ["name", "location", "fertilizer_used"]
     
     if current_param in SIMPLE_PARAMETERS:
@@ -141,10 +184,19 @@ def handle_user_message_enhanced(
             intent_confidence = 0.95
         
         print(f"✓ Intent (simple param): {intent} (confidence: {intent_confidence:.2f})")
+    elif settings.llm_joint_turn_analysis:
+        # One LLM call classifies the intent and extracts the answer
+        classifier = get_intent_classifier()
+        joint = await classifier.analyze_turn_async(
+            user_message, current_param, language, lexicon.canonical_values(current_param)
+        )
+        intent, intent_confidence = joint.intent, joint.intent_confidence
+        audit["joint_analysis"] = True
+        print(f"✓ Joint analysis: {intent} (confidence: {intent_confidence:.2f}), value: {joint.value}")
     else:
         # For complex parameters, use LLM classification
         classifier = get_intent_classifier()
-        intent, intent_confidence = classifier.classify_intent(user_message, current_param, language)
+        intent, intent_confidence = await classifier.classify_intent_async(user_message, current_param, language)
         print(f"✓ Intent classification: {intent} (confidence: {intent_confidence:.2f})")
     
     audit["intent"] = intent
@@ -166,16 +218,31 @@ def handle_user_message_enhanced(
         # Jump directly to Step 4 (RAG helper mode)
         validation_result = ValidationResult(value=None, is_confident=False)
     else:
-        # Try LLM-based answer extraction
-        extractor = get_answer_extractor()
-        expected_values = _get_expected_values(current_param)
+        if joint is not None:
+            # Answer already extracted by the joint call
+            extracted_value, extraction_conf = joint.value, joint.value_confidence
+        else:
+            # Try LLM-based answer extraction
+            extractor = get_answer_extractor()
+            expected_values = lexicon.canonical_values(current_param)
+            
+            extracted_value, extraction_conf = await extractor.extract_answer_async(
+                user_message, current_param, language, expected_values
+            )
         
-        extracted_value, extraction_conf = extractor.extract_answer(
-            user_message, current_param, language, expected_values
-        )
+        cross_checked = None
+        if joint is not None and extracted_value and extraction_conf >= 0.80:
+            cross_checked = _cross_check_extraction(
+                extracted_value, extraction_conf, current_param, user_message, language
+            )
         
+        if cross_checked is not None:
+            validation_result, audit["validator_conf"] = cross_checked
+            audit["llm_extraction"] = extracted_value
+            print(f"✓ LLM extracted: '{extracted_value}' (conf: {extraction_conf:.2f}), "
+                  f"cross-checked: '{validation_result.value}' (confident: {validation_result.is_confident})")
         # If LLM extracted an answer, use it
-        if extracted_value and extraction_conf >= 0.80:
+        elif extracted_value and extraction_conf >= 0.80:
             print(f"✓ LLM extracted: '{extracted_value}' (conf: {extraction_conf:.2f})")
             validation_result = ValidationResult(value=extracted_value, is_confident=True)
             audit["validator_conf"] = extraction_conf
@@ -203,7 +270,7 @@ def handle_user_message_enhanced(
         # High confidence from validator - auto-fill immediately
         audit["combined_conf"] = audit["validator_conf"]
         audit["llm_conf"] = 0.0  # Skipped LLM
-        return _auto_fill_and_advance(
+        return await _auto_fill_and_advance(
             session,
             current_param,
             validation_result,
@@ -223,7 +290,7 @@ def handle_user_message_enhanced(
     if validation_result.value and prelim_conf >= 0.60:
         audit["combined_conf"] = prelim_conf
         audit["llm_conf"] = 0.0  # Skipped LLM
-        return _auto_fill_and_advance(
+        return await _auto_fill_and_advance(
             session,
             current_param,
             validation_result,
@@ -241,19 +308,59 @@ def handle_user_message_enhanced(
     query = _build_rag_query(current_param, user_message, language)
     
     if rag_engine.is_ready():
-        chunks = rag_engine.retrieve(query, current_param, language, k=10)  # Get more chunks for better context
+        # Pack the best chunks into the provider's context budget (bounded prompt size)
+        packed = rag_engine.retrieve_packed_ids(
+            query,
+            current_param,
+            language,
+            token_budget=llm.context_token_budget,
+            max_chunks=settings.helper_context_max_chunks,
+            candidates=settings.helper_context_candidates,
+        )
+        chunk_ids = [chunk_id for chunk_id, _ in packed]
+        chunks = [text for _, text in packed]
         audit["retrieved_chunks"] = chunks[:2]  # Store first 2 for audit (shorter)
-        print(f"✓ Retrieved {len(chunks)} chunks for {current_param}")
+        audit["context_tokens"] = sum(estimate_tokens(chunk) for chunk in chunks)
+        print(f"✓ Packed {len(chunks)} chunks (~{audit['context_tokens']} tokens) for {current_param}")
     else:
-        chunks = []
+        chunk_ids, chunks = [], []
     
-    # Call helper LLM with more chunks for better context
-    helper_text = llm.generate_helper(
-        parameter=current_param,
-        language=language,
-        user_message=user_message,
-        retrieved_chunks=chunks[:5] if chunks else [],  # Use top 5 chunks
-    )
+    # Identical helper requests (same chunks, same index build) are served from cache
+    helper_cache = get_helper_cache() if settings.helper_cache_enabled else None
+    cache_key = None
+    helper_text = None
+    if helper_cache is not None:
+        cache_key = helper_cache.make_key(
+            llm.provider_name,
+            llm.model_name,
+            current_param,
+            language,
+            user_message,
+            chunk_ids,
+            rag_engine.fingerprint or rag_engine.version,
+        )
+        helper_text = await helper_cache.get_async(cache_key)
+        audit["helper_cache"] = "hit" if helper_text is not None else "miss"
+    
+    if helper_text is not None:
+        print(f"✓ Helper response served from cache for {current_param}")
+        if on_helper_text is not None:
+            await on_helper_text(helper_text)
+    elif on_helper_text is None:
+        # Call helper LLM with the packed context
+        helper_text = await llm.generate_helper_async(
+            parameter=current_param,
+            language=language,
+            user_message=user_message,
+            retrieved_chunks=chunks,
+        )
+    else:
+        helper_text = await _stream_helper_text(
+            llm, current_param, language, user_message, chunks, on_helper_text, audit
+        )
+    
+    if helper_cache is not None and audit["helper_cache"] == "miss":
+        await helper_cache.set_async(cache_key, helper_text)
     
     # For now, assume LLM confidence based on response length and content
     audit["llm_conf"] = _estimate_llm_confidence(helper_text, chunks)
@@ -274,7 +381,7 @@ def handle_user_message_enhanced(
     audio_url = ""
     if tts_service and helper_text:
         try:
-            audio_path = tts_service.synthesize(helper_text, language)
+            audio_path = await tts_service.synthesize_async(helper_text, language)
             audio_url = tts_service.get_audio_url(audio_path, base_url=settings.api_base_url)
         except Exception as e:
             print(f"✗ TTS error: {e}")
@@ -293,7 +400,33 @@ def handle_user_message_enhanced(
     ), audit
 
 
-def _auto_fill_and_advance(
+async def _stream_helper_text(
+    llm: LLMAdapter,
+    parameter: str,
+    language: Language,
+    user_message: str,
+    chunks: list,
+    on_helper_text: Callable[[str], Awaitable[None]],
+    audit: Dict[str, Any],
+) -> str:
+    """Forward streamed helper pieces to the callback; returns the full text."""
+    start = time.perf_counter()
+    pieces = []
+    async for piece in llm.stream_helper(parameter, language, user_message, chunks):
+        if not pieces:
+            audit["helper_first_token_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        pieces.append(piece)
+        if piece:
+            await on_helper_text(piece)
+    
+    text = "".join(pieces).strip()
+    # Keep the fallback marker (fallback text or an interrupted stream) so the text is not cached
+    if any(isinstance(piece, FallbackText) for piece in pieces):
+        return FallbackText(text)
+    return text
+
+
+async def _auto_fill_and_advance(
     session: SessionState,
     current_param: str,
     validation: ValidationResult,
@@ -324,7 +457,7 @@ def _auto_fill_and_advance(
         if tts_service:
             print(f"🔊 Generating TTS for {next_param}: '{next_question[:50]}...'")
             try:
-                audio_path = tts_service.synthesize(next_question, language)
+                audio_path = await tts_service.synthesize_async(next_question, language)
                 audio_url = tts_service.get_audio_url(audio_path, base_url=settings.api_base_url)
                 print(f"✓ TTS generated: {audio_url}")
             except Exception as e:
@@ -422,19 +555,33 @@ def _build_rag_query(parameter: str, user_message: str, language: Language) -> s
     return f"{base_query} {user_message}"
 
 
-def _get_expected_values(parameter: str) -> list[str]:
-    """Get list of expected values for a parameter."""
-    expected_values_map = {
-        "color": ["black", "red", "brown", "yellow", "grey"],
-        "moisture": ["dry", "wet", "moist", "very_dry"],
-        "smell": ["sweet", "earthy", "sour", "rotten", "no_smell"],
-        "ph": ["acidic", "neutral", "alkaline", "very_acidic", "very_alkaline"],
-        "soil_type": ["clay", "sandy", "loamy", "silt"],
-        "earthworms": ["yes", "no", "many", "few"],
-        "location": [],  # Free text
-        "fertilizer_used": [],  # Free text or yes/no
-    }
-    return expected_values_map.get(parameter, [])
+def _cross_check_extraction(
+    value: str,
+    confidence: float,
+    parameter: str,
+    user_message: str,
+    language: Language,
+) -> Optional[Tuple[ValidationResult, float]]:
+    """
+    Cross-check a joint-mode extraction against the parameter's validator.
+    
+    Returns:
+        (validation_result, validator_conf), or None without a validator
+        - Validator agrees: the validator's result (keeps e.g. ph_value), conf >= 0.95
+        - Validator found nothing: the LLM value as is
+        - Validator found a different value: not confident (helper mode asks again)
+    """
+    validator_func = ENHANCED_VALIDATORS.get(parameter)
+    if not validator_func:
+        return None
+    
+    checked: ValidationResult = validator_func(user_message, language)
+    if not checked.value:
+        return ValidationResult(value=value, is_confident=True), confidence
+    if checked.value == value:
+        return checked, max(confidence, 0.95)
+    print(f"⚠️  LLM value '{value}' disagrees with validator value '{checked.value}'")
+    return ValidationResult(value=value, is_confident=False), 0.40
 
 
 def _estimate_llm_confidence(helper_text: str, chunks: list) -> float:
@@ -484,7 +631,7 @@ def _handle_unknown_parameter(
         )
 
 
-def _create_error_response(
+async def _create_error_response(
     session: SessionState,
     error_msg: str,
     language: Language,
@@ -499,7 +646,7 @@ def _create_error_response(
     audio_url = ""
     if tts_service:
         try:
-            audio_path = tts_service.synthesize(helper_text, language)
+            audio_path = await tts_service.synthesize_async(helper_text, language)
             audio_url = tts_service.get_audio_url(audio_path, base_url=settings.api_base_url)
         except:
             pass
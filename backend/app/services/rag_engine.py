@@ -6,20 +6,69 @@ Loads FAISS index and metadata, retrieves relevant chunks based on:
 - Language preference
 - User query
 
+Chunks are ranked with BM25 (see bm25.py) plus parameter, section-type
+and language boosts.
+
 To modify:
 - Change embedding model: Update `embedding_model_name` in config.py
 - Change retrieval strategy: Modify `retrieve()` method
+- Tune BM25: Update `bm25_k1` / `bm25_b` in config.py
+- Size the retrieval cache: Update `rag_cache_size` / `rag_cache_ttl_seconds` in config.py
+- Hot reload a rebuilt index: See rag_index_manager.py
+- Parameter keywords (PARAM_BOOST): Update `topic` in lexicon.py VOCABULARY
 - Add new parameters: Ensure knowledge base chunks have correct metadata
 """
 
+import hashlib
 import os
-import pickle
-import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 import faiss
 from ..config import settings
 from ..models import Language
+from . import lexicon
+from .bm25 import BM25Index, BM25_FILENAME, tokenize
+from .ttl_cache import LRUTTLCache
+from .context_packer import pack_chunk_positions
+from .kb_metadata import ChunkMetadata, FLAG_HOW_TO, FLAG_VALID, load_chunk_metadata
+
+
+# Score boosts added on top of BM25
+PARAM_BOOST = 10.0
+HOW_TO_BOOST = 5.0
+LANGUAGE_BOOST = 3.0
+
+# Files whose size/mtime identify one build of the index
+INDEX_FILES = [
+    "kb_index.faiss",
+    os.path.join("kb_meta", "labels.json"),
+    os.path.join("kb_meta", "text.bin"),
+    "kb_index_meta.pkl",
+    BM25_FILENAME,
+    "kb_build_manifest.json",
+]
+
+
+def default_embeddings_dir() -> str:
+    """Embeddings directory from settings, resolved relative to backend/."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    return os.path.join(backend_dir, settings.embeddings_dir)
+
+
+def index_fingerprint(embeddings_dir: str) -> str:
+    """
+    Cheap fingerprint of the index files on disk (sizes + mtimes).
+    
+    Changes whenever preprocessing rewrites any artifact, without reading them.
+    """
+    parts = []
+    for name in INDEX_FILES:
+        try:
+            stat = os.stat(os.path.join(embeddings_dir, name))
+            parts.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{name}:-")
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:12]
 
 
 class RAGEngine:
@@ -27,39 +76,128 @@ class RAGEngine:
     RAG engine for retrieving relevant knowledge base chunks.
     
     Uses FAISS for fast similarity search and filters by parameter + language.
-    OPTIMIZED: No embedding model loaded at runtime (uses keyword matching instead)
+    OPTIMIZED: No embedding model loaded at runtime (uses BM25 keyword ranking)
     """
     
-    def __init__(self):
-        """Initialize RAG engine by loading index only (no embedding model)."""
+    def __init__(
+        self,
+        embeddings_dir: Optional[str] = None,
+        version: str = "initial",
+    ):
+        """
+        Initialize RAG engine by loading index only (no embedding model).
+        
+        Args:
+            embeddings_dir: Index directory (defaults to settings.embeddings_dir)
+            version: Label of this index build (set by RAGIndexManager on reload)
+        """
+        self.embeddings_dir = embeddings_dir or default_embeddings_dir()
+        self.version = version
+        self.fingerprint: Optional[str] = None
         self.index: Optional[faiss.Index] = None
-        self.metadata: Dict[str, Dict[str, Any]] = {}
+        self.metadata: Optional[ChunkMetadata] = None
+        
+        # Keyword ranking state (built once in _load_index), one row per chunk
+        self.bm25: Optional[BM25Index] = None
+        self._language_ids: np.ndarray = np.array([], dtype=np.int8)
+        self._valid: np.ndarray = np.array([], dtype=bool)
+        self._how_to: np.ndarray = np.array([], dtype=bool)
+        self._param_masks: Dict[str, np.ndarray] = {}
+        self._boosts: Dict[Tuple[str, str], np.ndarray] = {}
+        
+        # Retrieval results keyed on (normalized query, parameter, language, k)
+        self._cache = LRUTTLCache(
+            maxsize=settings.rag_cache_size,
+            ttl_seconds=settings.rag_cache_ttl_seconds,
+        )
+        
         self._load_index()
     
     def _load_index(self) -> None:
-        """Load FAISS index and metadata from disk."""
-        # Resolve paths relative to backend/ directory
-        backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-        embeddings_dir = os.path.join(backend_dir, settings.embeddings_dir)
+        """Load FAISS index and metadata (memory-mapped kb_meta/, or legacy pickle) from disk."""
+        # Cached results belong to the previous index
+        self._cache.clear()
+        
+        embeddings_dir = self.embeddings_dir
+        self.fingerprint = index_fingerprint(embeddings_dir)
         
         index_path = os.path.join(embeddings_dir, "kb_index.faiss")
-        meta_path = os.path.join(embeddings_dir, "kb_index_meta.pkl")
+        bm25_path = os.path.join(embeddings_dir, BM25_FILENAME)
         
-        if not os.path.exists(index_path) or not os.path.exists(meta_path):
+        if not os.path.exists(index_path):
             print(f"⚠ Index files not found at {embeddings_dir}")
             print("  Run preprocessing script first to build index.")
             return
         
         try:
+            metadata = load_chunk_metadata(embeddings_dir)
+            if metadata is None:
+                print(f"⚠ Index metadata not found at {embeddings_dir}")
+                print("  Run preprocessing script first to build index.")
+                return
             self.index = faiss.read_index(index_path)
-            with open(meta_path, "rb") as f:
-                self.metadata = pickle.load(f)
+            self.metadata = metadata
+            self._build_keyword_index(bm25_path)
             print(f"✓ Loaded FAISS index with {self.index.ntotal} chunks")
         except Exception as e:
             print(f"✗ Error loading index: {e}")
             # Don't raise - allow app to start without RAG (helper mode won't work)
             self.index = None
-            self.metadata = {}
+            self.metadata = None
+            self.bm25 = None
+    
+    def _build_keyword_index(self, bm25_path: str) -> None:
+        """
+        Prepare per-chunk arrays used by retrieve().
+        
+        Rows follow metadata order, which matches FAISS ids and the rows
+        of the BM25 term matrix.
+        """
+        metadata = self.metadata
+        self._language_ids = np.asarray(metadata.columns["language"])
+        flags = np.asarray(metadata.flags)
+        self._valid = (flags & FLAG_VALID) > 0
+        self._how_to = (flags & FLAG_HOW_TO) > 0
+        self._param_masks = {}
+        self._boosts = {}
+        
+        if os.path.exists(bm25_path):
+            bm25 = BM25Index.load(bm25_path, k1=settings.bm25_k1, b=settings.bm25_b)
+            if bm25.n_docs == len(metadata):
+                self.bm25 = bm25
+                return
+            print(f"⚠ {BM25_FILENAME} does not match metadata ({bm25.n_docs} vs {len(metadata)} chunks), rebuilding in memory")
+        
+        self.bm25 = BM25Index.from_texts(metadata.texts(), k1=settings.bm25_k1, b=settings.bm25_b)
+    
+    def _param_mask(self, parameter: str) -> np.ndarray:
+        """Boolean mask of chunks matching a parameter's keywords (cached)."""
+        mask = self._param_masks.get(parameter)
+        if mask is None:
+            mask = np.zeros(len(self.metadata), dtype=bool)
+            for row in range(len(self.metadata)):
+                # Parameter label and chunk head scanned together in one pass
+                text = self.metadata.value("parameter", row) + "\n" + self.metadata.head(row)
+                mask[row] = lexicon.mentions_topic(parameter, text)
+            self._param_masks[parameter] = mask
+        return mask
+    
+    def _same_language(self, language: Language) -> np.ndarray:
+        """Boolean mask of chunks written in `language`."""
+        return self._language_ids == self.metadata.label_id("language", language)
+    
+    def _boost_vector(self, parameter: str, language: Language) -> np.ndarray:
+        """Parameter + section-type + language boosts per chunk (cached)."""
+        key = (parameter, language)
+        boosts = self._boosts.get(key)
+        if boosts is None:
+            boosts = (
+                PARAM_BOOST * self._param_mask(parameter)
+                + HOW_TO_BOOST * self._how_to
+                + LANGUAGE_BOOST * self._same_language(language)
+            ).astype(np.float32)
+            self._boosts[key] = boosts
+        return boosts
     
     def retrieve(
         self,
@@ -71,7 +209,7 @@ class RAGEngine:
         """
         Retrieve top-k relevant chunks for a query.
         
-        OPTIMIZED: Uses keyword matching instead of embeddings to save memory.
+        OPTIMIZED: Uses BM25 keyword ranking instead of embeddings to save memory.
         
         Args:
             query: User's question or context
@@ -82,80 +220,131 @@ class RAGEngine:
         Returns:
             List of text chunks (strings) most relevant to query
         """
-        if self.index is None:
+        return [self.metadata.text(row) for row in self.retrieve_ids(query, parameter, language, k)]
+    
+    def retrieve_ids(
+        self,
+        query: str,
+        parameter: str,
+        language: Language,
+        k: int = 4
+    ) -> List[int]:
+        """
+        Retrieve row ids (== FAISS ids) of the top-k chunks for a query.
+        
+        Same ranking as retrieve(); used directly by benchmark_retrieval.py.
+        """
+        if self.index is None or self.bm25 is None:
             return []
         
+        # Repeated help requests skip scoring entirely
+        cache_key = (" ".join(tokenize(query)), parameter, language, k)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
         # Use keyword-based retrieval instead of embeddings
         # This saves 90MB+ of RAM by not loading sentence-transformers
-        
-        # Score all chunks based on keyword matching
-        scored_chunks = []
-        
-        for chunk_id, chunk_meta in self.metadata.items():
-            
-            # Get chunk info
-            chunk_param = chunk_meta.get("parameter", "").lower()
-            chunk_lang = chunk_meta.get("language", "en")
-            chunk_text = chunk_meta.get("text", "")
-            chunk_type = chunk_meta.get("section_type", "")
-            
-            if not chunk_text or len(chunk_text) < 20:
-                continue
-            
-            # Calculate relevance score based on keyword matching
-            score = 0.0
-            
-            # Boost for parameter match (fuzzy)
-            param_keywords = {
-                "color": ["color", "रंग", "colour"],
-                "moisture": ["moisture", "नमी", "wet", "dry", "गीली", "सूखी"],
-                "smell": ["smell", "गंध", "odor", "scent"],
-                "ph": ["ph", "acid", "alkaline", "अम्ल", "क्षार"],
-                "soil_type": ["soil type", "मिट्टी", "clay", "sandy", "loamy", "चिकनी", "रेतीली"],
-                "earthworms": ["earthworm", "केंचुए", "worm"],
-                "location": ["location", "स्थान", "place"],
-                "fertilizer_used": ["fertilizer", "खाद", "manure"],
-            }
-            
-            keywords = param_keywords.get(parameter, [parameter])
-            if any(kw in chunk_param or kw in chunk_text.lower()[:200] for kw in keywords):
-                score += 10.0  # Strong boost for parameter match
-            
-            # Boost for query keywords in text
-            query_words = query.lower().split()
-            for word in query_words:
-                if len(word) > 3 and word in chunk_text.lower():
-                    score += 2.0
-            
-            # Boost for "how to test" sections
-            if chunk_type == "how_to_test" or "कैसे जांचें" in chunk_text or "how to" in chunk_text.lower():
-                score += 5.0
-            
-            # Boost for matching language
-            if chunk_lang == language:
-                score += 3.0
-            
-            # Penalize JSON/code chunks
-            if chunk_text.strip().startswith("{") or "```json" in chunk_text:
-                score = 0.0
-            
-            if score > 0:
-                scored_chunks.append((score, chunk_text, chunk_lang))
-        
-        # Sort by score and return top k
-        scored_chunks.sort(key=lambda x: x[0], reverse=True)
+        scores = self.bm25.score(query) + self._boost_vector(parameter, language)
+        scores[~self._valid] = 0.0
         
         # Prefer same language but include others if needed
-        same_lang_chunks = [text for score, text, lang in scored_chunks if lang == language]
-        other_lang_chunks = [text for score, text, lang in scored_chunks if lang != language]
-        
-        result = same_lang_chunks[:k]
+        same_lang = self._same_language(language)
+        result = self._top_rows(scores, np.flatnonzero(same_lang & (scores > 0)), k)
         if len(result) < k:
-            result.extend(other_lang_chunks[:k - len(result)])
+            other_rows = np.flatnonzero(~same_lang & (scores > 0))
+            result.extend(self._top_rows(scores, other_rows, k - len(result)))
         
-        return result[:k]
+        rows = result[:k]
+        self._cache.set(cache_key, tuple(rows))
+        return rows
+    
+    def retrieve_packed(
+        self,
+        query: str,
+        parameter: str,
+        language: Language,
+        token_budget: int,
+        max_chunks: int = 5,
+        candidates: int = 10,
+    ) -> List[str]:
+        """
+        Retrieve chunks packed into a prompt token budget.
+        
+        Fetches `candidates` chunks, drops near-duplicates (how_to_test vs
+        how_to_test_step) and keeps the best-scored ones that fit the budget.
+        
+        Args:
+            query: User's question or context
+            parameter: Current parameter being asked about
+            language: Language preference ("hi" or "en")
+            token_budget: Estimated tokens allowed for all chunks together
+            max_chunks: Maximum number of chunks returned
+            candidates: Number of chunks retrieved before packing
+            
+        Returns:
+            List of text chunks in score order
+        """
+        packed = self.retrieve_packed_ids(query, parameter, language, token_budget, max_chunks, candidates)
+        return [text for _, text in packed]
+    
+    def retrieve_packed_ids(
+        self,
+        query: str,
+        parameter: str,
+        language: Language,
+        token_budget: int,
+        max_chunks: int = 5,
+        candidates: int = 10,
+    ) -> List[Tuple[int, str]]:
+        """Same as retrieve_packed(), as (chunk row id, text) pairs."""
+        rows = self.retrieve_ids(query, parameter, language, k=max(candidates, max_chunks))
+        chunks = [self.metadata.text(row) for row in rows]
+        packed = pack_chunk_positions(chunks, token_budget=token_budget, max_chunks=max_chunks)
+        return [(rows[position], text) for position, text in packed]
+    
+    def _top_rows(self, scores: np.ndarray, rows: np.ndarray, k: int) -> List[int]:
+        """Return up to k rows ordered by score (ties keep knowledge base order)."""
+        if k <= 0 or len(rows) == 0:
+            return []
+        if len(rows) > k:
+            rows = rows[np.argpartition(-scores[rows], k - 1)[:k]]
+        order = np.lexsort((rows, -scores[rows]))
+        return rows[order].tolist()
+    
+    def reload(self) -> None:
+        """Reload index and metadata from disk (drops cached results)."""
+        self._load_index()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Retrieval cache hit/miss counters."""
+        return self._cache.stats()
     
     def is_ready(self) -> bool:
         """Check if RAG engine is ready (index loaded)."""
         return self.index is not None
-
+    
+    def validate(self) -> Optional[str]:
+        """
+        Sanity-check a freshly loaded index before it serves traffic.
+        
+        Returns:
+            None if valid, otherwise a description of the problem
+        """
+        if not self.is_ready():
+            return "index failed to load"
+        if self.index.ntotal == 0:
+            return "index is empty"
+        if len(self.metadata) != self.index.ntotal:
+            return f"metadata has {len(self.metadata)} chunks but FAISS index has {self.index.ntotal}"
+        if self.bm25 is None or self.bm25.n_docs != self.index.ntotal:
+            return "BM25 matrix does not match the FAISS index"
+        if index_fingerprint(self.embeddings_dir) != self.fingerprint:
+            return "index files changed while loading"
+        
+        for parameter in ("color", "ph"):
+            if not self.retrieve(f"how to test {parameter}", parameter, "en", k=1):
+                return f"smoke query for '{parameter}' returned no chunks"
+        # Smoke queries should not linger in the cache
+        self._cache.clear()
+        return None
@@ -0,0 +1,208 @@
+"""
+Zero-downtime hot reload of the RAG index.
+
+RAGIndexManager owns the RAGEngine served by `sessions.get_rag_engine_dep`.
+A reload loads the rebuilt index into a *new* RAGEngine in a worker thread,
+validates it and then swaps it in under a lock, so:
+- Requests already running keep the engine (version) they leased
+- New requests get the new version as soon as it is swapped in
+- The old version is released once its last lease ends
+
+Reloads are triggered by the admin endpoint (routes/admin.py) or by the
+file-watch loop started from main.py when `rag_watch_index` is enabled.
+
+To modify:
+- Change validation: Update `RAGEngine.validate()`
+- Change watch interval: Set `rag_watch_interval_seconds` in config.py
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+from .rag_engine import RAGEngine, default_embeddings_dir, index_fingerprint
+
+
+class RAGIndexManager:
+    """Holds the current RAGEngine and swaps in reloaded versions atomically."""
+
+    def __init__(
+        self,
+        engine_factory: Callable[..., RAGEngine] = RAGEngine,
+        embeddings_dir: Optional[str] = None,
+    ):
+        """
+        Initialize manager (call `load()` to load the first version).
+
+        Args:
+            engine_factory: Builds an engine; called with embeddings_dir and version
+            embeddings_dir: Index directory (defaults to settings.embeddings_dir)
+        """
+        self.engine_factory = engine_factory
+        self.embeddings_dir = embeddings_dir or default_embeddings_dir()
+        self._engine: Optional[RAGEngine] = None
+        self._generation = 0
+
+        # Active leases per version; retired versions stay listed until drained
+        self._leases: Dict[str, int] = {}
+        self._retired: Dict[str, RAGEngine] = {}
+        self._lock = threading.Lock()
+        # Only one reload builds an engine at a time
+        self._reload_lock = threading.Lock()
+
+        self.last_reload: Dict[str, Any] = {}
+        # Fingerprint of the last build that failed validation (not retried until it changes)
+        self._rejected_fingerprint: Optional[str] = None
+
+    @property
+    def engine(self) -> Optional[RAGEngine]:
+        """Currently served engine (None before the first successful load)."""
+        return self._engine
+
+    def load(self) -> RAGEngine:
+        """Load the first version (startup). Serves it even if validation fails."""
+        with self._reload_lock:
+            engine = self._build()
+            with self._lock:
+                self._engine = engine
+            return engine
+
+    def _build(self) -> RAGEngine:
+        self._generation += 1
+        return self.engine_factory(
+            embeddings_dir=self.embeddings_dir,
+            version=f"v{self._generation}",
+        )
+
+    def needs_reload(self) -> bool:
+        """True if the index files on disk differ from the served version."""
+        current = self._engine
+        fingerprint = index_fingerprint(self.embeddings_dir)
+        if fingerprint == self._rejected_fingerprint:
+            return False
+        return current is None or fingerprint != current.fingerprint
+
+    def reload(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Load, validate and swap in the index currently on disk (blocking).
+
+        Args:
+            force: Reload even if the index files look unchanged
+
+        Returns:
+            Result dict with status "swapped", "unchanged", "busy" or "failed"
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            return {"status": "busy", "version": self.version}
+
+        try:
+            previous = self._engine
+            if not force and not self.needs_reload():
+                return {"status": "unchanged", "version": self.version}
+
+            start = time.perf_counter()
+            candidate = self._build()
+            error = candidate.validate()
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+
+            if error:
+                self._rejected_fingerprint = candidate.fingerprint
+                print(f"⚠ RAG index {candidate.version} rejected: {error}")
+                result = {
+                    "status": "failed",
+                    "version": self.version,
+                    "rejected_version": candidate.version,
+                    "error": error,
+                    "load_ms": elapsed_ms,
+                }
+            else:
+                with self._lock:
+                    self._engine = candidate
+                    if previous is not None:
+                        if self._leases.get(previous.version, 0) > 0:
+                            self._retired[previous.version] = previous
+                        else:
+                            self._leases.pop(previous.version, None)
+                print(f"✓ RAG index swapped: {previous.version if previous else None} → {candidate.version} "
+                      f"({candidate.index.ntotal} chunks, loaded in {elapsed_ms}ms)")
+                result = {
+                    "status": "swapped",
+                    "version": candidate.version,
+                    "previous_version": previous.version if previous else None,
+                    "chunks": candidate.index.ntotal,
+                    "load_ms": elapsed_ms,
+                }
+
+            self.last_reload = {**result, "at": time.time()}
+            return result
+        finally:
+            self._reload_lock.release()
+
+    @contextmanager
+    def lease(self) -> Iterator[Optional[RAGEngine]]:
+        """
+        Pin the current engine for the duration of one request.
+
+        A swap during the request does not affect it; a retired engine is
+        dropped (and its memory freed) when its last lease ends.
+        """
+        with self._lock:
+            engine = self._engine
+            if engine is not None:
+                self._leases[engine.version] = self._leases.get(engine.version, 0) + 1
+        try:
+            yield engine
+        finally:
+            if engine is not None:
+                with self._lock:
+                    remaining = self._leases.get(engine.version, 1) - 1
+                    if remaining > 0:
+                        self._leases[engine.version] = remaining
+                    else:
+                        self._leases.pop(engine.version, None)
+                        if self._retired.pop(engine.version, None) is not None:
+                            print(f"✓ Released RAG index {engine.version}")
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._engine.version if self._engine else None
+
+    def status(self) -> Dict[str, Any]:
+        """Served version, active leases and versions still draining."""
+        with self._lock:
+            return {
+                "version": self.version,
+                "fingerprint": self._engine.fingerprint if self._engine else None,
+                "active_requests": dict(self._leases),
+                "draining_versions": sorted(self._retired),
+                "last_reload": self.last_reload or None,
+            }
+
+    async def watch(self, interval_seconds: float) -> None:
+        """
+        Poll the index files and reload when a rebuild has finished.
+
+        A change is only acted on once the fingerprint is stable across two
+        polls, so a reload does not start while preprocessing is still writing.
+        """
+        print(f"👀 Watching RAG index for changes every {interval_seconds}s")
+        seen: Optional[str] = None
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                fingerprint = await asyncio.to_thread(index_fingerprint, self.embeddings_dir)
+                current = self._engine
+                if fingerprint in (current.fingerprint if current else None, self._rejected_fingerprint):
+                    seen = None
+                    continue
+                if fingerprint != seen:
+                    seen = fingerprint
+                    continue
+                if await asyncio.to_thread(self.needs_reload):
+                    await asyncio.to_thread(self.reload)
+                seen = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠ RAG index watch error: {e}")
@@ -0,0 +1,549 @@
+"""
+Per-API-key rate limiter and request scheduler for Groq.
+
+The Groq keys (`groq_llm_api_key`, `groq_report_api_key`, `groq_api_key`)
+are shared between interactive wizard turns and background report
+generation. Instead of firing requests and turning 429s into fallback
+text, every call first takes a slot from its key's limiter:
+- Two token buckets per key: requests/minute and tokens/minute
+  (prompt estimate + max_tokens, corrected with the reported usage)
+- A priority queue per key: interactive calls (intent, extraction,
+  helper, STT) are granted before ReportOrchestrator/translator calls
+- 429 responses block the key for `Retry-After` (or Groq's
+  x-ratelimit-reset-* headers) and the request is queued again
+  (backpressure) instead of failing; calls on a pooled key with other
+  healthy keys pass `max_retries=0` and rotate instead (key_pool.py)
+- Waits are bounded per priority; `RateLimitTimeout` goes to the
+  caller's normal error/fallback path
+
+`get_rate_limiter().stats()` reports queue depth, wait times, 429s and
+budget per key (shown under `rate_limits` in /health). Keys are labelled
+by their settings name, never by value.
+
+To modify:
+- Limits / waits / retries: Update `groq_*_limit` and `rate_limit_*` settings in config.py
+"""
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import re
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple, TypeVar
+import numpy as np
+from ..config import settings
+from .context_packer import estimate_tokens
+from .http_client import http_post, async_http_post
+from .circuit_breaker import breaker_for_url
+
+
+PRIORITY_INTERACTIVE = 0  # Wizard turns: intent, extraction, helper, STT
+PRIORITY_BACKGROUND = 10  # Report generation and translation
+
+# Settings fields holding API keys (used to label metrics, never the key itself)
+KEY_SETTINGS = (
+    "groq_llm_api_key", "groq_report_api_key", "groq_api_key",
+    "gemini_api_key", "gemini_api_key_1", "gemini_api_key_2",
+)
+
+# Wait-time samples kept per key and priority
+WAIT_WINDOW = 500
+
+T = TypeVar("T")
+
+
+class RateLimitTimeout(Exception):
+    """No slot became available within the caller's maximum wait."""
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """
+    Seconds to wait from a 429 response's headers.
+
+    Understands `Retry-After` (seconds or HTTP date) and Groq's
+    `x-ratelimit-reset-requests` / `x-ratelimit-reset-tokens` ("2m59.56s", "7.66s", "120ms").
+    """
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    if value:
+        value = value.strip()
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    waits = [
+        _parse_duration(headers.get(name))
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+    ]
+    waits = [wait for wait in waits if wait is not None]
+    return max(waits) if waits else None
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    """'1h2m3.5s' / '7.66s' / '120ms' → seconds."""
+    if not value:
+        return None
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value.strip())
+    if not parts:
+        return None
+    scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def estimate_request_tokens(payload: Optional[Dict[str, Any]]) -> int:
+    """Token cost of an OpenAI-style chat request: prompt estimate + max_tokens."""
+    if not payload:
+        return 0
+    prompt = sum(estimate_tokens(str(message.get("content", ""))) for message in payload.get("messages", []))
+    return prompt + int(payload.get("max_tokens") or 0)
+
+
+def _used_tokens(result: Any) -> Optional[int]:
+    """Total tokens reported by a response (httpx/requests JSON or a LangChain message)."""
+    metadata = getattr(result, "response_metadata", None)
+    if isinstance(metadata, dict):
+        usage = metadata.get("token_usage") or {}
+        return usage.get("total_tokens")
+    if getattr(result, "status_code", None) == 200:
+        try:
+            usage = result.json().get("usage") or {}
+        except Exception:
+            return None
+        return usage.get("total_tokens")
+    return None
+
+
+def _rate_limited(error_or_response: Any) -> Tuple[bool, Optional[Mapping[str, str]]]:
+    """(is a 429?, its headers) for a response or an SDK exception."""
+    if getattr(error_or_response, "status_code", None) != 429:
+        return False, None
+    headers = getattr(error_or_response, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(error_or_response, "response", None), "headers", None)
+    return True, headers
+
+
+class _Waiter:
+    """A queued request: ordered by (priority, arrival)."""
+
+    __slots__ = ("priority", "seq", "tokens", "wake")
+
+    def __init__(self, priority: int, seq: int, tokens: int, wake: Callable[[], None]):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.wake = wake
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class KeyRateLimiter:
+    """Token buckets (requests/min, tokens/min) and a priority queue for one API key."""
+
+    def __init__(self, label: str, rpm: int, tpm: int):
+        """
+        Initialize limiter with full buckets.
+
+        Args:
+            label: Metrics name of the key (settings field name)
+            rpm: Requests per minute (0 = unlimited)
+            tpm: Tokens per minute (0 = unlimited)
+        """
+        self.label = label
+        self.rpm = rpm
+        self.tpm = tpm
+        self.available_requests = float(rpm)
+        self.available_tokens = float(tpm)
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+        self.granted: Dict[int, int] = {}
+        self.timeouts = 0
+        self.throttled = 0  # 429 responses seen
+        self.retries = 0
+        self.max_queue_depth = 0
+        self._waits: Dict[int, deque] = {}
+
+    # ---- Buckets ----------------------------------------------------------------
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self.available_requests = min(float(self.rpm), self.available_requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self.available_tokens = min(float(self.tpm), self.available_tokens + elapsed * self.tpm / 60)
+
+    def _time_until(self, tokens: int, now: float) -> float:
+        """Seconds until a request costing `tokens` fits (0 = now)."""
+        wait = max(0.0, self.blocked_until - now)
+        if self.rpm and self.available_requests < 1:
+            wait = max(wait, (1 - self.available_requests) * 60 / self.rpm)
+        if self.tpm:
+            needed = min(tokens, self.tpm)  # Oversized requests go through on a full bucket
+            if self.available_tokens < needed:
+                wait = max(wait, (needed - self.available_tokens) * 60 / self.tpm)
+        return wait
+
+    def _poll(self, waiter: _Waiter) -> Tuple[bool, Optional[float]]:
+        """
+        Grant `waiter` if it is first in line and the buckets allow it.
+
+        Returns (granted, seconds to sleep; None = until woken by the queue).
+        """
+        with self._lock:
+            if not self._queue or self._queue[0] is not waiter:
+                return False, None
+            now = time.monotonic()
+            self._refill(now)
+            wait = self._time_until(waiter.tokens, now)
+            if wait > 0:
+                return False, wait
+            heapq.heappop(self._queue)
+            if self.rpm:
+                self.available_requests -= 1
+            if self.tpm:
+                self.available_tokens -= min(waiter.tokens, self.tpm)
+            head = self._queue[0] if self._queue else None
+        if head is not None:
+            head.wake()
+        return True, None
+
+    def _enqueue(self, tokens: int, priority: int, wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(priority, next(self._seq), tokens, wake)
+        with self._lock:
+            heapq.heappush(self._queue, waiter)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+            head = self._queue[0]
+        if head is not waiter:
+            head.wake()  # A new higher-priority head re-evaluates; others keep sleeping
+        return waiter
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        """Remove a waiter that gave up (timeout / cancellation)."""
+        with self._lock:
+            if waiter not in self._queue:
+                return
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+            head = self._queue[0] if self._queue else None
+        if head is not None:
+            head.wake()
+
+    def _record_wait(self, priority: int, started: float) -> float:
+        waited = time.monotonic() - started
+        self.granted[priority] = self.granted.get(priority, 0) + 1
+        self._waits.setdefault(priority, deque(maxlen=WAIT_WINDOW)).append(waited)
+        return waited
+
+    def _max_wait(self, priority: int, max_wait: Optional[float]) -> float:
+        if max_wait is not None:
+            return max_wait
+        if priority <= PRIORITY_INTERACTIVE:
+            return settings.rate_limit_interactive_max_wait_seconds
+        return settings.rate_limit_background_max_wait_seconds
+
+    # ---- Acquire ----------------------------------------------------------------
+
+    async def acquire(
+        self,
+        tokens: int = 0,
+        priority: int = PRIORITY_INTERACTIVE,
+        max_wait: Optional[float] = None,
+    ) -> float:
+        """
+        Wait (without blocking the event loop) for a slot.
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            RateLimitTimeout: No slot within `max_wait` (default per priority)
+        """
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        started = time.monotonic()
+        deadline = started + self._max_wait(priority, max_wait)
+        waiter = self._enqueue(tokens, priority, lambda: loop.call_soon_threadsafe(event.set))
+        try:
+            while True:
+                event.clear()
+                granted, sleep = self._poll(waiter)
+                if granted:
+                    return self._record_wait(priority, started)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise RateLimitTimeout(f"{self.label}: no rate limit slot within {deadline - started:.1f}s")
+                try:
+                    await asyncio.wait_for(event.wait(), min(sleep, remaining) if sleep is not None else remaining)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._dequeue(waiter)
+
+    def acquire_sync(
+        self,
+        tokens: int = 0,
+        priority: int = PRIORITY_INTERACTIVE,
+        max_wait: Optional[float] = None,
+    ) -> float:
+        """Blocking variant of acquire() for threads / sync callers."""
+        event = threading.Event()
+        started = time.monotonic()
+        deadline = started + self._max_wait(priority, max_wait)
+        waiter = self._enqueue(tokens, priority, event.set)
+        try:
+            while True:
+                event.clear()
+                granted, sleep = self._poll(waiter)
+                if granted:
+                    return self._record_wait(priority, started)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise RateLimitTimeout(f"{self.label}: no rate limit slot within {deadline - started:.1f}s")
+                event.wait(min(sleep, remaining) if sleep is not None else remaining)
+        finally:
+            self._dequeue(waiter)
+
+    # ---- Feedback from responses ------------------------------------------------
+
+    def block_for(self, seconds: float) -> None:
+        """Hold every request on this key for `seconds` (429 / Retry-After)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            # The provider says the window is spent: don't burst right after the block
+            self.available_requests = min(self.available_requests, 0.0)
+
+    def observe(self, result: Any, estimated_tokens: int = 0) -> bool:
+        """
+        Update the buckets from a response / LangChain message / SDK error.
+
+        Returns:
+            True if it was a 429 (the key is now blocked)
+        """
+        limited, headers = _rate_limited(result)
+        if limited:
+            self.throttled += 1
+            retry_after = parse_retry_after(headers)
+            self.block_for(retry_after if retry_after is not None else settings.rate_limit_default_retry_seconds)
+            return True
+
+        used = _used_tokens(result)
+        headers = getattr(result, "headers", None)
+        with self._lock:
+            if self.tpm and used is not None:
+                self.available_tokens -= used - min(estimated_tokens, self.tpm)
+            # Never believe we have more budget than the provider reports
+            if headers is not None:
+                remaining_requests = headers.get("x-ratelimit-remaining-requests")
+                remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+                if self.rpm and remaining_requests and remaining_requests.isdigit():
+                    self.available_requests = min(self.available_requests, float(remaining_requests))
+                if self.tpm and remaining_tokens and remaining_tokens.isdigit():
+                    self.available_tokens = min(self.available_tokens, float(remaining_tokens))
+        return False
+
+    # ---- Scheduled calls --------------------------------------------------------
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        tokens: int = 0,
+        priority: int = PRIORITY_INTERACTIVE,
+        max_retries: Optional[int] = None,
+    ) -> T:
+        """
+        Await `call()` inside a slot; 429s (returned or raised) are queued again.
+
+        After `max_retries` (default `rate_limit_max_retries`; pooled callers
+        pass 0 to rotate to another key instead) the last 429 response is
+        returned / error raised, so callers keep their usual error handling.
+        """
+        max_retries = settings.rate_limit_max_retries if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            await self.acquire(tokens, priority)
+            try:
+                result = await call()
+            except Exception as e:
+                if not self.observe(e) or attempt >= max_retries:
+                    raise
+            else:
+                if not self.observe(result, tokens) or attempt >= max_retries:
+                    return result
+            attempt += 1
+            self.retries += 1
+            print(f"⏳ {self.label} rate limited (429), retrying after backoff ({attempt}/{max_retries})")
+
+    def run_sync(
+        self,
+        call: Callable[[], T],
+        tokens: int = 0,
+        priority: int = PRIORITY_INTERACTIVE,
+        max_retries: Optional[int] = None,
+    ) -> T:
+        """Blocking variant of run()."""
+        max_retries = settings.rate_limit_max_retries if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            self.acquire_sync(tokens, priority)
+            try:
+                result = call()
+            except Exception as e:
+                if not self.observe(e) or attempt >= max_retries:
+                    raise
+            else:
+                if not self.observe(result, tokens) or attempt >= max_retries:
+                    return result
+            attempt += 1
+            self.retries += 1
+            print(f"⏳ {self.label} rate limited (429), retrying after backoff ({attempt}/{max_retries})")
+
+    # ---- Metrics ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, wait times per priority, 429s and remaining budget."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            depth = len(self._queue)
+            waiting = {}
+            for waiter in self._queue:
+                waiting[waiter.priority] = waiting.get(waiter.priority, 0) + 1
+            available_requests = self.available_requests
+            available_tokens = self.available_tokens
+            blocked = max(0.0, self.blocked_until - now)
+
+        waits = {}
+        for priority, samples in list(self._waits.items()):
+            values = np.fromiter(samples, dtype=float) * 1000
+            waits[_priority_name(priority)] = {
+                "granted": self.granted.get(priority, 0),
+                "queued_now": waiting.get(priority, 0),
+                "wait_p50_ms": round(float(np.percentile(values, 50)), 1),
+                "wait_p95_ms": round(float(np.percentile(values, 95)), 1),
+                "wait_max_ms": round(float(values.max()), 1),
+            }
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "available_requests": round(available_requests, 2) if self.rpm else None,
+            "available_tokens": round(available_tokens, 1) if self.tpm else None,
+            "queue_depth": depth,
+            "max_queue_depth": self.max_queue_depth,
+            "blocked_for_s": round(blocked, 2),
+            "throttled_429": self.throttled,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "by_priority": waits,
+        }
+
+
+def _priority_name(priority: int) -> str:
+    if priority == PRIORITY_INTERACTIVE:
+        return "interactive"
+    if priority == PRIORITY_BACKGROUND:
+        return "background"
+    return str(priority)
+
+
+def key_label(api_key: str) -> str:
+    """Settings name of an API key (first match), else a short hash."""
+    for name in KEY_SETTINGS:
+        if getattr(settings, name, None) == api_key:
+            return name
+    return "key-" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8]
+
+
+class RateLimiterRegistry:
+    """One KeyRateLimiter per API key value (keys reused across settings share it)."""
+
+    def __init__(self):
+        self._limiters: Dict[str, KeyRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def for_key(self, api_key: str) -> KeyRateLimiter:
+        limiter = self._limiters.get(api_key)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(api_key)
+                if limiter is None:
+                    limiter = KeyRateLimiter(key_label(api_key), settings.groq_rpm_limit, settings.groq_tpm_limit)
+                    self._limiters[api_key] = limiter
+        return limiter
+
+    def stats(self) -> Dict[str, Any]:
+        return {limiter.label: limiter.stats() for limiter in list(self._limiters.values())}
+
+
+# Global instance
+_registry: Optional[RateLimiterRegistry] = None
+
+
+def get_rate_limiter() -> RateLimiterRegistry:
+    """Get or create the global rate limiter registry."""
+    global _registry
+    if _registry is None:
+        _registry = RateLimiterRegistry()
+    return _registry
+
+
+def limited_http_post(
+    url: str,
+    api_key: Optional[str],
+    priority: int = PRIORITY_INTERACTIVE,
+    max_retries: Optional[int] = None,
+    **kwargs: Any,
+):
+    """
+    http_post() through the key's limiter (plain http_post without a key or when disabled).
+
+    The token cost is estimated from the OpenAI-style `json` payload. An open
+    circuit breaker fails the call before it waits for the limiter.
+    """
+    breaker_for_url(url).reject_if_open()
+    if not api_key or not settings.rate_limit_enabled:
+        return http_post(url, **kwargs)
+    tokens = estimate_request_tokens(kwargs.get("json"))
+    return get_rate_limiter().for_key(api_key).run_sync(lambda: http_post(url, **kwargs), tokens, priority, max_retries)
+
+
+async def async_limited_http_post(
+    url: str,
+    api_key: Optional[str],
+    priority: int = PRIORITY_INTERACTIVE,
+    max_retries: Optional[int] = None,
+    **kwargs: Any,
+):
+    """async_http_post() through the key's limiter (see limited_http_post)."""
+    breaker_for_url(url).reject_if_open()
+    tokens = estimate_request_tokens(kwargs.get("json"))
+    return await run_limited(api_key, lambda: async_http_post(url, **kwargs), tokens, priority, max_retries)
+
+
+async def run_limited(
+    api_key: Optional[str],
+    call: Callable[[], Awaitable[T]],
+    tokens: int = 0,
+    priority: int = PRIORITY_INTERACTIVE,
+    max_retries: Optional[int] = None,
+) -> T:
+    """Await `call()` through the key's limiter (directly without a key or when disabled)."""
+    if not api_key or not settings.rate_limit_enabled:
+        return await call()
+    return await get_rate_limiter().for_key(api_key).run(call, tokens, priority, max_retries)
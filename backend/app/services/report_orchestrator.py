@@ -6,14 +6,25 @@ import asyncio
 import json
 import logging
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 from ..config import settings
+from .context_packer import estimate_tokens
+from .rate_limiter import PRIORITY_BACKGROUND, run_limited
+from .key_pool import get_key_pool
+from .circuit_breaker import get_breaker
 
 logger = logging.getLogger(__name__)
 
+# Agent settings: name -> (temperature, max_tokens)
+AGENTS = {
+    "soil_analysis": (0.3, 2000),  # Agent 1: Soil Analysis
+    "crop": (0.4, 2000),  # Agent 2: Crop Recommendations
+    "fertilizer": (0.4, 2000),  # Agent 3: Fertilizer Recommendations
+}
+
 
 class ReportOrchestrator:
     """
@@ -26,32 +37,44 @@ class ReportOrchestrator:
     def __init__(self):
         """Initialize the three specialized agents - all using Groq for speed and reliability"""
         
-        # All agents use Groq for fast, reliable generation
-        # Agent 1: Soil Analysis
-        self.soil_analysis_agent = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            groq_api_key=settings.groq_llm_api_key,  # Use existing Groq key
-            temperature=0.3,
-            max_tokens=2000
-        )
+        # All agents use Groq for fast, reliable generation. Each call draws a key
+        # from the shared Groq key pool (groq_llm_api_key, groq_report_api_key);
+        # the key's rate limiter queues report calls behind wizard turns.
+        self.key_pool = get_key_pool("groq")
+        self._agents: Dict[Tuple[str, str], ChatGroq] = {}
         
-        # Agent 2: Crop Recommendations
-        self.crop_agent = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            groq_api_key=settings.groq_llm_api_key,
-            temperature=0.4,
-            max_tokens=2000
-        )
+        logger.info(f"✓ Initialized Report Orchestrator with 3 Groq agents over {len(self.key_pool)} key(s)")
+    
+    def _agent(self, name: str, api_key: str) -> ChatGroq:
+        """Chat model of an agent for one key (created once per key)."""
+        agent = self._agents.get((name, api_key))
+        if agent is None:
+            temperature, max_tokens = AGENTS[name]
+            agent = ChatGroq(
+                model="llama-3.3-70b-versatile",
+                groq_api_key=api_key,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            self._agents[(name, api_key)] = agent
+        return agent
+    
+    async def _invoke(self, name: str, messages: List[Any]) -> Any:
+        """Run an agent on a pooled key (rotating on 429s), scheduled as background work on its rate limiter."""
+        breaker = get_breaker("groq", "chat/completions")
+        breaker.reject_if_open()  # Groq is down: fail now instead of queueing
         
-        # Agent 3: Fertilizer Recommendations
-        self.fertilizer_agent = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            groq_api_key=settings.groq_report_api_key if settings.groq_report_api_key else settings.groq_llm_api_key,
-            temperature=0.4,
-            max_tokens=2000
-        )
+        async def invoke(api_key: str, max_retries: Optional[int]) -> Any:
+            agent = self._agent(name, api_key)
+            tokens = sum(estimate_tokens(str(message.content)) for message in messages) + (agent.max_tokens or 0)
+            
+            async def call() -> Any:
+                with breaker.guard():
+                    return await agent.ainvoke(messages)
+            
+            return await run_limited(api_key, call, tokens, PRIORITY_BACKGROUND, max_retries)
         
-        logger.info("✓ Initialized Report Orchestrator with 3 Groq agents (fast & reliable)")
+        return await self.key_pool.call_async(invoke)
     
     def _clean_json_response(self, text: str) -> str:
         """Clean LLM response to extract valid JSON"""
@@ -144,7 +167,7 @@ Provide comprehensive soil analysis in JSON format."""
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.soil_analysis_agent.ainvoke(messages)
+            response = await self._invoke("soil_analysis", messages)
             cleaned = self._clean_json_response(response.content)
             result = json.loads(cleaned)
             
@@ -240,7 +263,7 @@ Return JSON array with 6 crop recommendations."""
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.crop_agent.ainvoke(messages)
+            response = await self._invoke("crop", messages)
             cleaned = self._clean_json_response(response.content)
             result = json.loads(cleaned)
             
@@ -349,7 +372,7 @@ Return JSON array with 6 fertilizer recommendations."""
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.fertilizer_agent.ainvoke(messages)
+            response = await self._invoke("fertilizer", messages)
             cleaned = self._clean_json_response(response.content)
             result = json.loads(cleaned)
             
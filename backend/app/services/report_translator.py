@@ -3,10 +3,14 @@ Report Translation Service
 Translates English reports to Hindi using LLM
 """
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
 from ..config import settings
+from .context_packer import estimate_tokens
+from .rate_limiter import PRIORITY_BACKGROUND, run_limited
+from .key_pool import get_key_pool
+from .circuit_breaker import get_breaker
 
 logger = logging.getLogger(__name__)
 
@@ -16,14 +20,41 @@ class ReportTranslator:
     
     def __init__(self):
         """Initialize translation agent"""
-        self.translator = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            groq_api_key=settings.groq_llm_api_key,
-            temperature=0.2,  # Low temperature for consistent translation
-            max_tokens=3000
-        )
+        # Each call draws a key from the shared Groq key pool
+        self.key_pool = get_key_pool("groq")
+        self._translators: Dict[str, ChatGroq] = {}
         logger.info("✓ Initialized Report Translator")
     
+    def _translator(self, api_key: str) -> ChatGroq:
+        """Translation model for one key (created once per key)."""
+        translator = self._translators.get(api_key)
+        if translator is None:
+            translator = ChatGroq(
+                model="llama-3.3-70b-versatile",
+                groq_api_key=api_key,
+                temperature=0.2,  # Low temperature for consistent translation
+                max_tokens=3000
+            )
+            self._translators[api_key] = translator
+        return translator
+    
+    async def _invoke(self, messages: List[Any]) -> Any:
+        """Translate on a pooled key (rotating on 429s), scheduled as background work on its rate limiter."""
+        breaker = get_breaker("groq", "chat/completions")
+        breaker.reject_if_open()  # Groq is down: fail now instead of queueing
+        
+        async def invoke(api_key: str, max_retries: Optional[int]) -> Any:
+            translator = self._translator(api_key)
+            tokens = sum(estimate_tokens(str(message.content)) for message in messages) + (translator.max_tokens or 0)
+            
+            async def call() -> Any:
+                with breaker.guard():
+                    return await translator.ainvoke(messages)
+            
+            return await run_limited(api_key, call, tokens, PRIORITY_BACKGROUND, max_retries)
+        
+        return await self.key_pool.call_async(invoke)
+    
     async def translate_soil_analysis(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Translate soil analysis section to Hindi"""
         
@@ -49,7 +80,7 @@ Return the translated JSON with same structure."""
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.translator.ainvoke(messages)
+            response = await self._invoke(messages)
             
             # Parse response - try to extract JSON
             import json
@@ -100,7 +131,7 @@ Return the translated JSON array with same structure."""
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.translator.ainvoke(messages)
+            response = await self._invoke(messages)
             
             import json
             import re
@@ -147,7 +178,7 @@ Return the translated JSON array with same structure."""
                 HumanMessage(content=user_prompt)
             ]
             
-            response = await self.translator.ainvoke(messages)
+            response = await self._invoke(messages)
             
             import json
             import re
@@ -0,0 +1,304 @@
+"""
+Single-flight coalescing of identical in-flight LLM requests.
+
+When many phones send the same help question at once (a field demo),
+each would trigger an identical provider call. Concurrent calls with the
+same key (normalized prompt + parameters) now share one upstream request:
+the first caller starts it, later callers wait for the same result.
+Nothing is cached after the request finishes (see helper_cache.py for that).
+
+Covered:
+- LLM adapter calls via CoalescingLLMAdapter (generate_helper, its async and
+  streaming variants, generate_async / generate_sync). Streams are fanned
+  out: late joiners replay the pieces received so far, then follow live
+- Intent classification and answer extraction (IntentClassifier /
+  AnswerExtractor use `get_single_flight(...)` directly)
+
+`single_flight_stats()` reports calls, upstream requests and saved
+(coalesced) calls per group under `coalescing` in /health.
+
+To modify:
+- Disable: Set `llm_coalescing_enabled` to False in config.py
+"""
+
+import asyncio
+import hashlib
+import threading
+import unicodedata
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from ..models import Language
+from ..config import settings
+from .llm_adapter import LLMAdapter
+from .helper_cache import normalize_message
+
+
+T = TypeVar("T")
+
+
+def make_key(*parts: Any) -> str:
+    """Stable key (sha256) of a call's normalized prompt and parameters."""
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """NFC + collapsed whitespace (prompts differing only in spacing coalesce)."""
+    return " ".join(unicodedata.normalize("NFC", prompt).split())
+
+
+class _SyncCall:
+    """An in-flight call shared between threads."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers share it."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.upstream = 0
+        self._tasks: Dict[Tuple[str, int], asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self._sync_calls: Dict[str, _SyncCall] = {}
+        self._lock = threading.Lock()
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Await `call()`, or the identical call already in flight on this loop."""
+        if not settings.llm_coalescing_enabled:
+            return await call()
+        self.calls += 1
+        loop_key = (key, id(asyncio.get_running_loop()))
+        task = self._tasks.get(loop_key)
+        if task is None or task.done():
+            self.upstream += 1
+            task = asyncio.ensure_future(call())
+            self._tasks[loop_key] = task
+            task.add_done_callback(lambda done, loop_key=loop_key: self._forget(loop_key, done))
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # Shielded: one caller going away must not cancel the others' request
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters.get(task) == 1 and not task.done():
+                task.cancel()  # Nobody is left waiting for it
+            raise
+        finally:
+            remaining = self._waiters.get(task, 1) - 1
+            if remaining:
+                self._waiters[task] = remaining
+            else:
+                self._waiters.pop(task, None)
+
+    def _forget(self, loop_key: Tuple[str, int], task: asyncio.Task) -> None:
+        if self._tasks.get(loop_key) is task:
+            del self._tasks[loop_key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here so an unawaited failure is not logged
+
+    def do_sync(self, key: str, call: Callable[[], T]) -> T:
+        """Blocking variant of do() for threads."""
+        if not settings.llm_coalescing_enabled:
+            return call()
+        with self._lock:
+            self.calls += 1
+            shared = self._sync_calls.get(key)
+            leader = shared is None
+            if leader:
+                self.upstream += 1
+                shared = _SyncCall()
+                self._sync_calls[key] = shared
+
+        if leader:
+            try:
+                shared.result = call()
+            except BaseException as e:
+                shared.error = e
+            finally:
+                with self._lock:
+                    del self._sync_calls[key]
+                shared.done.set()
+        else:
+            shared.done.wait()
+
+        if shared.error is not None:
+            raise shared.error
+        return shared.result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "upstream": self.upstream,
+            "saved": self.calls - self.upstream,
+            "in_flight": len(self._tasks) + len(self._sync_calls),
+        }
+
+
+class _StreamFanout:
+    """One upstream stream replayed to every subscriber (late joiners catch up)."""
+
+    def __init__(self, source: AsyncIterator[str]):
+        self.pieces: List[str] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+        self._task = asyncio.ensure_future(self._pump(source))
+
+    async def _pump(self, source: AsyncIterator[str]) -> None:
+        try:
+            async for piece in source:
+                self.pieces.append(piece)
+                self._notify()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = True
+            self._notify()
+            await source.aclose()
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        self.subscribers += 1
+        position = 0
+        try:
+            while True:
+                while position < len(self.pieces):
+                    yield self.pieces[position]
+                    position += 1
+                if self.finished:
+                    if self.error is not None and position == 0:
+                        raise self.error
+                    return
+                await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and not self.finished:
+                self._task.cancel()  # Every client went away
+
+
+class CoalescingLLMAdapter(LLMAdapter):
+    """Wraps an adapter so identical concurrent calls share one upstream request."""
+
+    def __init__(self, inner: LLMAdapter):
+        """
+        Initialize wrapper.
+
+        Args:
+            inner: Adapter doing the actual provider calls
+        """
+        self.inner = inner
+        self.provider_name = inner.provider_name
+        self.model_name = inner.model_name
+        self.context_token_budget = inner.context_token_budget
+        self._helper = get_single_flight("helper")
+        self._generate = get_single_flight("generate")
+        self._streams: Dict[Tuple[str, int], _StreamFanout] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything else (stats(), base_url, ...) comes from the wrapped adapter
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def _helper_key(self, parameter: str, language: Language, user_message: str, retrieved_chunks: List[str]) -> str:
+        return make_key(
+            self.provider_name,
+            self.model_name,
+            parameter,
+            language,
+            normalize_message(user_message),
+            make_key(*retrieved_chunks),
+        )
+
+    def generate_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        return self._helper.do_sync(
+            self._helper_key(parameter, language, user_message, retrieved_chunks),
+            lambda: self.inner.generate_helper(parameter, language, user_message, retrieved_chunks),
+        )
+
+    async def generate_helper_async(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> str:
+        return await self._helper.do(
+            self._helper_key(parameter, language, user_message, retrieved_chunks),
+            lambda: self.inner.generate_helper_async(parameter, language, user_message, retrieved_chunks),
+        )
+
+    async def stream_helper(
+        self,
+        parameter: str,
+        language: Language,
+        user_message: str,
+        retrieved_chunks: List[str],
+    ) -> AsyncIterator[str]:
+        key = (
+            self._helper_key(parameter, language, user_message, retrieved_chunks),
+            id(asyncio.get_running_loop()),
+        )
+        self._helper.calls += 1
+        fanout = self._streams.get(key)
+        if fanout is None or fanout.finished:
+            self._helper.upstream += 1
+            fanout = _StreamFanout(self.inner.stream_helper(parameter, language, user_message, retrieved_chunks))
+            self._streams[key] = fanout
+        try:
+            async for piece in fanout.subscribe():
+                yield piece
+        finally:
+            if fanout.finished and self._streams.get(key) is fanout:
+                del self._streams[key]
+
+    async def generate_async(self, prompt: str, temperature: float = 0.3) -> str:
+        return await self._generate.do(
+            make_key(self.provider_name, self.model_name, normalize_prompt(prompt), temperature),
+            lambda: self.inner.generate_async(prompt, temperature),
+        )
+
+    def generate_sync(self, prompt: str, temperature: float = 0.3) -> str:
+        return self._generate.do_sync(
+            make_key(self.provider_name, self.model_name, normalize_prompt(prompt), temperature),
+            lambda: self.inner.generate_sync(prompt, temperature),
+        )
+
+
+# Global groups
+_groups: Dict[str, SingleFlight] = {}
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Get or create the coalescing group `name` ("helper", "intent", ...)."""
+    group = _groups.get(name)
+    if group is None:
+        group = _groups.setdefault(name, SingleFlight(name))
+    return group
+
+
+def single_flight_stats() -> Dict[str, Any]:
+    """Calls, upstream requests and saved calls per group."""
+    groups = {name: group.stats() for name, group in list(_groups.items())}
+    calls = sum(group["calls"] for group in groups.values())
+    saved = sum(group["saved"] for group in groups.values())
+    return {
+        "enabled": settings.llm_coalescing_enabled,
+        "upstream_calls_saved": saved,
+        "saved_rate": round(saved / calls, 4) if calls else 0.0,
+        "groups": groups,
+    }
@@ -9,11 +9,19 @@ Provides ASR (Automatic Speech Recognition) with multiple provider support:
 Returns ASRResult with text, confidence, and detected language.
 """
 
+import asyncio
 import os
 import tempfile
+from types import SimpleNamespace
 from typing import Optional, Literal
 from pydantic import BaseModel
 from ..config import settings
+from .rate_limiter import get_rate_limiter, async_limited_http_post
+from .circuit_breaker import get_breaker
+
+
+# Groq's OpenAI-compatible transcription endpoint (used by the async path)
+GROQ_TRANSCRIPTIONS_URL = "https://api.groq.com/openai/v1/audio/transcriptions"
 
 
 class ASRResult(BaseModel):
@@ -49,6 +57,7 @@ class STTService:
                     self._init_provider()
                     return
                 self.client = Groq(api_key=api_key)
+                self.api_key = api_key
                 print(f"✓ Initialized Groq STT")
             except Exception as e:
                 print(f"⚠️  Groq initialization failed: {e}, falling back to local Whisper")
@@ -101,6 +110,64 @@ class STTService:
         else:
             raise ValueError(f"Unknown ASR provider: {self.provider}")
     
+    async def transcribe_async(
+        self,
+        audio_bytes: bytes,
+        language: Optional[Literal["hi", "en"]] = None
+    ) -> ASRResult:
+        """
+        Async variant of transcribe().
+        
+        Groq is called over the pooled async HTTP client; local/OpenAI
+        Whisper run in a worker thread so the event loop stays free.
+        """
+        if self.provider == "groq":
+            return await self._transcribe_groq_async(audio_bytes, language)
+        return await asyncio.to_thread(self.transcribe, audio_bytes, language)
+    
+    async def _transcribe_groq_async(
+        self,
+        audio_bytes: bytes,
+        language: Optional[str] = None
+    ) -> ASRResult:
+        """Transcribe using Groq Whisper API (multipart upload, no temp file)."""
+        try:
+            data = {"model": "whisper-large-v3", "response_format": "verbose_json"}
+            if language:
+                data["language"] = self._map_language(language)
+            
+            response = await async_limited_http_post(
+                GROQ_TRANSCRIPTIONS_URL,
+                self.api_key,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                data=data,
+                files={"file": ("audio.wav", audio_bytes, "audio/wav")},
+                timeout=60.0,
+            )
+            if response.status_code != 200:
+                raise Exception(f"Groq API error: {response.status_code}")
+            
+            result = response.json()
+            transcription = SimpleNamespace(
+                text=result.get("text", ""),
+                segments=result.get("segments"),
+            )
+            return ASRResult(
+                text=transcription.text.strip(),
+                asr_confidence=self._estimate_confidence_groq(transcription),
+                detected_language=language or result.get("language"),
+                provider="groq"
+            )
+        
+        except Exception as e:
+            print(f"✗ Groq transcription error: {e}")
+            return ASRResult(
+                text="",
+                asr_confidence=0.0,
+                detected_language=language,
+                provider="groq_error"
+            )
+    
     def _transcribe_groq(
         self,
         audio_bytes: bytes,
@@ -114,14 +181,24 @@ class STTService:
                 temp_path = temp_audio.name
             
             try:
-                # Call Groq Whisper
-                with open(temp_path, "rb") as audio_file:
-                    transcription = self.client.audio.transcriptions.create(
-                        file=audio_file,
-                        model="whisper-large-v3",
-                        language=self._map_language(language) if language else None,
-                        response_format="verbose_json"
-                    )
+                # Call Groq Whisper (scheduled by the key's rate limiter,
+                # failed fast while the endpoint's circuit breaker is open)
+                breaker = get_breaker("groq", "audio/transcriptions")
+                breaker.reject_if_open()
+                
+                def call_whisper():
+                    with breaker.guard(), open(temp_path, "rb") as audio_file:
+                        return self.client.audio.transcriptions.create(
+                            file=audio_file,
+                            model="whisper-large-v3",
+                            language=self._map_language(language) if language else None,
+                            response_format="verbose_json"
+                        )
+                
+                if settings.rate_limit_enabled:
+                    transcription = get_rate_limiter().for_key(self.api_key).run_sync(call_whisper)
+                else:
+                    transcription = call_whisper()
                 
                 # Extract confidence from segments if available
                 confidence = self._estimate_confidence_groq(transcription)
@@ -9,12 +9,14 @@ Provides TTS with multiple provider support:
 Returns audio file path for playback.
 """
 
+import asyncio
 import os
 import hashlib
 from pathlib import Path
 from typing import Literal, Optional
 from gtts import gTTS
 from ..config import settings
+from .circuit_breaker import get_breaker
 
 
 class TTSService:
@@ -95,6 +97,20 @@ class TTSService:
         else:
             raise ValueError(f"Unknown TTS provider: {self.provider}")
     
+    async def synthesize_async(
+        self,
+        text: str,
+        language: Literal["hi", "en"] = "en",
+        slow: bool = False
+    ) -> str:
+        """
+        Async variant of synthesize().
+        
+        gTTS/Coqui/OpenAI calls are blocking, so synthesis runs in a worker
+        thread; the event loop keeps serving other sessions meanwhile.
+        """
+        return await asyncio.to_thread(self.synthesize, text, language, slow)
+    
     def _synthesize_gtts(
         self,
         text: str,
@@ -118,7 +134,8 @@ class TTSService:
             
             # Generate speech
             tts = gTTS(text=text, lang=gtts_lang, slow=slow)
-            tts.save(str(filepath))
+            with get_breaker("gtts", "translate_tts").guard():
+                tts.save(str(filepath))
             
             return f"audio/{filename}"
         
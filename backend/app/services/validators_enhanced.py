@@ -3,50 +3,183 @@ Enhanced Parameter Validation with Semantic Matching
 
 Adds confidence scoring and semantic similarity matching to validators.
 Uses sentence embeddings to match user input to canonical labels.
+
+Answers naming a lexicon term (lexicon.py) are accepted in one scan,
+misspelled / transliterated terms by a typo-tolerant lookup (fuzzy_index.py);
+semantic matching only runs for the rest. Synonym embeddings are
+precomputed once per mapping (and cached on disk at
+`validator_embedding_cache_path`), so semantic matching is one encode of
+the user text plus one matrix product. `validate_batch()` validates many
+utterances with a single encode call.
+
+The sentence encoder is never loaded on a request: model_registry.py loads
+it in the background within `model_memory_budget_mb`, and validation uses
+the lexicon + fuzzy matching until it is ready (or when it does not fit).
+
+To modify:
+- Add synonyms: Update VOCABULARY in lexicon.py (matrices rebuild automatically)
+- Acceptance threshold: Update `_validate_choice_enhanced()`
 """
 
 from typing import Dict, List, Tuple, Optional
 from ..models import ValidationResult, Language
+from ..config import settings
+from . import fuzzy_index, lexicon
+from .model_registry import get_model_registry
+import hashlib
+import os
 import re
+import threading
+import numpy as np
 
 
-# Import the original mappings
-from .validators import (
-    COLOR_MAPPINGS,
-    MOISTURE_MAPPINGS,
-    SMELL_MAPPINGS,
-    SOIL_TYPE_MAPPINGS,
-    EARTHWORMS_MAPPINGS,
-    HELP_INDICATORS,
-)
+def load_sentence_encoder():
+    """Load the SentenceTransformer used for semantic matching (blocking, ~90 MB+)."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(settings.embedding_model_name)
+
+
+class SynonymMatrix:
+    """L2-normalized embeddings of every synonym of one mapping, grouped by label."""
+    
+    def __init__(self, labels: List[str], embeddings: np.ndarray, counts: List[int]):
+        """
+        Initialize matrix.
+        
+        Args:
+            labels: Canonical labels in mapping order
+            embeddings: (synonyms x dim) float32, rows grouped by label, unit length
+            counts: Synonyms per label (same order as labels)
+        """
+        self.labels = labels
+        self.embeddings = embeddings
+        self.starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+    
+    def best(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Best label per query.
+        
+        Args:
+            queries: (n x dim) unit-length query embeddings
+            
+        Returns:
+            (label index per query, cosine similarity per query)
+        """
+        similarities = queries @ self.embeddings.T  # (n x synonyms)
+        per_label = np.maximum.reduceat(similarities, self.starts, axis=1)  # Best synonym of each label
+        best = per_label.argmax(axis=1)
+        return best, per_label[np.arange(len(best)), best]
 
 
 class SemanticValidator:
     """
     Enhanced validator with semantic matching using embeddings.
     
-    Falls back to exact/fuzzy matching if embeddings not available.
+    Synonym embeddings are computed once per mapping (SynonymMatrix, also
+    kept in an on-disk cache), so matching is one encode of the user text
+    and one matrix-vector product.
+    
+    Falls back to edit-distance matching (fuzzy_index.py) if embeddings
+    are not available.
     """
     
-    def __init__(self, use_embeddings: bool = True):
+    def __init__(self, use_embeddings: bool = True, cache_path: Optional[str] = None):
         """
         Initialize semantic validator.
         
         Args:
             use_embeddings: Whether to use sentence embeddings for matching
+            cache_path: .npz file of synonym embeddings (None = memory only)
         """
-        self.use_embeddings = use_embeddings
+        self.use_embeddings = False
         self.model = None
+        self.cache_path = cache_path
+        self._matrices: Dict[Tuple, SynonymMatrix] = {}
+        self._vectors: Dict[str, np.ndarray] = {}  # Disk cache: key → synonym embeddings
+        self._fuzzy_indexes: Dict[Tuple, fuzzy_index.FuzzyIndex] = {}
+        self._lock = threading.Lock()
         
         if use_embeddings:
             try:
-                from sentence_transformers import SentenceTransformer
-                from ..config import settings
-                self.model = SentenceTransformer(settings.embedding_model_name)
+                self.attach_model(load_sentence_encoder())
                 print("✓ Semantic validator initialized with embeddings")
             except Exception as e:
                 print(f"⚠️  Could not load embeddings for validator: {e}")
-                self.use_embeddings = False
+    
+    def attach_model(self, model) -> None:
+        """Switch to embedding matching (synonym matrices are built before the switch)."""
+        self.model = model
+        self._load_cache()
+        self.precompute()
+        self.use_embeddings = True
+    
+    def detach_model(self) -> None:
+        """Drop the model and its matrices; matching falls back to fuzzy."""
+        self.use_embeddings = False
+        self.model = None
+        self._matrices = {}
+        self._vectors = {}
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Unit-length embeddings (float32, one row per text)."""
+        embeddings = self.model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
+    
+    def _cache_key(self, synonyms: List[str]) -> str:
+        digest = hashlib.sha256("\x1f".join([settings.embedding_model_name] + synonyms).encode("utf-8"))
+        return digest.hexdigest()[:32]
+    
+    def _load_cache(self) -> None:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as data:
+                self._vectors = {key: data[key] for key in data.files}
+            print(f"✓ Loaded {len(self._vectors)} cached synonym matrices")
+        except Exception as e:
+            print(f"⚠️  Could not read synonym embedding cache: {e}")
+    
+    def _save_cache(self) -> None:
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp.npz"
+            np.savez(tmp_path, **self._vectors)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"⚠️  Could not write synonym embedding cache: {e}")
+    
+    def synonym_matrix(self, canonical_labels: Dict[str, List[str]]) -> SynonymMatrix:
+        """Embedding matrix of a mapping (built once, then served from memory / disk)."""
+        key = tuple((label, tuple(synonyms)) for label, synonyms in canonical_labels.items())
+        matrix = self._matrices.get(key)
+        if matrix is not None:
+            return matrix
+        
+        with self._lock:
+            matrix = self._matrices.get(key)
+            if matrix is None:
+                labels = [label for label, synonyms in canonical_labels.items() if synonyms]
+                synonyms = [synonym.lower().strip() for label in labels for synonym in canonical_labels[label]]
+                cache_key = self._cache_key(synonyms)
+                embeddings = self._vectors.get(cache_key)
+                if embeddings is None or len(embeddings) != len(synonyms):
+                    embeddings = self._encode(synonyms)
+                    self._vectors[cache_key] = embeddings
+                    self._save_cache()
+                matrix = SynonymMatrix(labels, embeddings, [len(canonical_labels[label]) for label in labels])
+                self._matrices[key] = matrix
+        return matrix
+    
+    def precompute(self, parameters: Optional[List[str]] = None) -> None:
+        """Build the synonym matrices of the lexicon's parameters up front."""
+        if self.model is None:
+            return
+        for parameter in parameters or list(lexicon.VOCABULARY):
+            canonical_labels = lexicon.synonyms(parameter, related=True)
+            if canonical_labels:
+                self.synonym_matrix(canonical_labels)
     
     def compute_similarity(self, text1: str, text2: str) -> float:
         """
@@ -60,39 +193,25 @@ class SemanticValidator:
             return self._fuzzy_match(text1, text2)
         
         try:
-            # Compute embeddings
-            emb1 = self.model.encode([text1], convert_to_numpy=True)[0]
-            emb2 = self.model.encode([text2], convert_to_numpy=True)[0]
-            
-            # Cosine similarity
-            import numpy as np
-            similarity = np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2))
-            
-            return float(max(0.0, min(1.0, similarity)))
+            emb1, emb2 = self._encode([text1, text2])
+            return float(max(0.0, min(1.0, float(emb1 @ emb2))))
         except Exception as e:
             print(f"⚠️  Similarity computation error: {e}")
             return self._fuzzy_match(text1, text2)
     
     def _fuzzy_match(self, text1: str, text2: str) -> float:
-        """Simple fuzzy string matching fallback."""
-        text1 = text1.lower().strip()
-        text2 = text2.lower().strip()
-        
-        # Exact match
-        if text1 == text2:
-            return 1.0
-        
-        # Substring match
-        if text1 in text2 or text2 in text1:
-            return 0.85
-        
-        # Levenshtein-like simple check
-        common_chars = set(text1) & set(text2)
-        if len(common_chars) > 0:
-            ratio = len(common_chars) / max(len(set(text1)), len(set(text2)))
-            return ratio * 0.7
-        
-        return 0.0
+        """Edit-distance similarity fallback (typos, transliteration variants)."""
+        return fuzzy_index.similarity(text1, text2)
+    
+    def _fuzzy_best(self, user_text: str, canonical_labels: Dict[str, List[str]]) -> Tuple[Optional[str], float]:
+        key = tuple((label, tuple(synonyms)) for label, synonyms in canonical_labels.items())
+        index = self._fuzzy_indexes.get(key)
+        if index is None:
+            index = self._fuzzy_indexes[key] = fuzzy_index.FuzzyIndex.from_mapping(canonical_labels)
+        match = index.best(user_text)
+        if match is None:
+            return None, 0.0
+        return match.value, match.score
     
     def match_to_canonical(
         self,
@@ -111,30 +230,79 @@ class SemanticValidator:
         Returns:
             Tuple of (best_label, confidence_score)
         """
-        user_text = user_text.lower().strip()
-        
-        best_label = None
-        best_score = 0.0
-        
-        for canonical, synonyms in canonical_labels.items():
-            for synonym in synonyms:
-                score = self.compute_similarity(user_text, synonym)
-                if score > best_score:
-                    best_score = score
-                    best_label = canonical
+        return self.match_many([user_text], canonical_labels, language)[0]
+    
+    def match_many(
+        self,
+        user_texts: List[str],
+        canonical_labels: Dict[str, List[str]],
+        language: Language
+    ) -> List[Tuple[Optional[str], float]]:
+        """
+        Batch variant of match_to_canonical() (one encode call for all texts).
         
-        return best_label, best_score
+        Returns:
+            (best_label, confidence_score) per text, in input order
+        """
+        texts = [text.lower().strip() for text in user_texts]
+        if not texts:
+            return []
+        if not any(canonical_labels.values()):
+            return [(None, 0.0)] * len(texts)
+        if self.use_embeddings and self.model:
+            try:
+                matrix = self.synonym_matrix(canonical_labels)
+                best, scores = matrix.best(self._encode(texts))
+                return [
+                    (matrix.labels[index], float(max(0.0, min(1.0, score))))
+                    for index, score in zip(best, scores)
+                ]
+            except Exception as e:
+                print(f"⚠️  Similarity computation error: {e}")
+        return [self._fuzzy_best(text, canonical_labels) for text in texts]
+
 
+def default_embedding_cache_path() -> Optional[str]:
+    """Synonym embedding cache path from settings, resolved relative to backend/ (None = memory only)."""
+    if not settings.validator_embedding_cache_path:
+        return None
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    return os.path.join(backend_dir, settings.validator_embedding_cache_path)
+
+
+# Model registry key of the sentence encoder
+SEMANTIC_MODEL = "semantic_validator"
 
 # Global semantic validator instance
 _semantic_validator = None
+_semantic_validator_lock = threading.Lock()
 
 
 def get_semantic_validator() -> SemanticValidator:
-    """Get or create global semantic validator instance."""
+    """
+    Get or create global semantic validator instance.
+    
+    The validator starts on fuzzy matching; its sentence encoder is loaded
+    by the model registry in the background (after startup or on first
+    use, within the memory budget) and attached once ready.
+    """
     global _semantic_validator
     if _semantic_validator is None:
-        _semantic_validator = SemanticValidator(use_embeddings=True)
+        with _semantic_validator_lock:
+            if _semantic_validator is None:
+                validator = SemanticValidator(use_embeddings=False, cache_path=default_embedding_cache_path())
+                if settings.validator_embeddings_enabled:
+                    def load():
+                        model = load_sentence_encoder()
+                        validator.attach_model(model)
+                        return model
+                    get_model_registry().register(
+                        SEMANTIC_MODEL, load, settings.validator_model_size_mb,
+                        unload=lambda model: validator.detach_model(),
+                    )
+                _semantic_validator = validator
+    if settings.validator_embeddings_enabled:
+        get_model_registry().get(SEMANTIC_MODEL)  # Starts the background load if needed
     return _semantic_validator
 
 
@@ -142,81 +310,17 @@ def get_semantic_validator() -> SemanticValidator:
 
 def validate_color_enhanced(text: str, language: Language) -> ValidationResult:
     """Enhanced color validation with semantic matching."""
-    validator = get_semantic_validator()
-    
-    # Check for help request
-    if _check_help_request(text, language):
-        return ValidationResult(value=None, is_confident=False)
-    
-    # Build canonical labels with all synonyms
-    canonical_labels = {
-        "black": ["black", "kali", "काली", "काला", "dark", "गहरा", "kala"],
-        "red": ["red", "lal", "लाल", "reddish", "laal"],
-        "brown": ["brown", "bhura", "भूरा", "भूरी", "bhoora"],
-        "yellow": ["yellow", "peela", "पीला", "पीली", "peeli"],
-        "grey": ["grey", "gray", "surahi", "सुराही", "ग्रे", "gray"],
-    }
-    
-    # Semantic matching
-    best_label, confidence = validator.match_to_canonical(text, canonical_labels, language)
-    
-    # Be more lenient - accept lower confidence for colors
-    if best_label and confidence >= 0.60:
-        return ValidationResult(value=best_label, is_confident=True)
-    elif best_label and confidence >= 0.40:
-        # Medium confidence - still accept it
-        return ValidationResult(value=best_label, is_confident=True)
-    else:
-        return ValidationResult(value=None, is_confident=False)
+    return _validate_choice_enhanced("color", text, language)
 
 
 def validate_moisture_enhanced(text: str, language: Language) -> ValidationResult:
     """Enhanced moisture validation."""
-    validator = get_semantic_validator()
-    
-    if _check_help_request(text, language):
-        return ValidationResult(value=None, is_confident=False)
-    
-    canonical_labels = {
-        "dry": ["dry", "sukhi", "सूखी", "सूखा", "arid"],
-        "wet": ["wet", "geeli", "गीली", "गीला", "moist", "damp"],
-        "moist": ["moist", "nam", "नम", "humid"],
-        "very_dry": ["very dry", "bahut sukhi", "बहुत सूखी"],
-    }
-    
-    best_label, confidence = validator.match_to_canonical(text, canonical_labels, language)
-    
-    if best_label and confidence >= 0.60:
-        return ValidationResult(value=best_label, is_confident=True)
-    elif best_label and confidence >= 0.40:
-        return ValidationResult(value=best_label, is_confident=True)
-    else:
-        return ValidationResult(value=None, is_confident=False)
+    return _validate_choice_enhanced("moisture", text, language)
 
 
 def validate_smell_enhanced(text: str, language: Language) -> ValidationResult:
     """Enhanced smell validation."""
-    validator = get_semantic_validator()
-    
-    if _check_help_request(text, language):
-        return ValidationResult(value=None, is_confident=False)
-    
-    canonical_labels = {
-        "sweet": ["sweet", "meethi", "मीठी", "मीठा", "good"],
-        "earthy": ["earthy", "mitti", "मिट्टी", "soil-like"],
-        "sour": ["sour", "khatti", "खट्टी", "खट्टा", "acidic"],
-        "rotten": ["rotten", "sadhi", "सड़ी", "bad", "foul"],
-        "no_smell": ["no smell", "koi gandh nahi", "कोई गंध नहीं", "odorless"],
-    }
-    
-    best_label, confidence = validator.match_to_canonical(text, canonical_labels, language)
-    
-    if best_label and confidence >= 0.60:
-        return ValidationResult(value=best_label, is_confident=True)
-    elif best_label and confidence >= 0.40:
-        return ValidationResult(value=best_label, is_confident=True)
-    else:
-        return ValidationResult(value=None, is_confident=False)
+    return _validate_choice_enhanced("smell", text, language)
 
 
 def validate_ph_enhanced(text: str, language: Language) -> ValidationResult:
@@ -253,70 +357,18 @@ def validate_ph_enhanced(text: str, language: Language) -> ValidationResult:
         except ValueError:
             pass
     
-    # Semantic matching for categories
-    validator = get_semantic_validator()
-    canonical_labels = {
-        "acidic": ["acidic", "acid", "अम्लीय", "khatta"],
-        "neutral": ["neutral", "तटस्थ", "balanced"],
-        "alkaline": ["alkaline", "basic", "क्षारीय"],
-    }
-    
-    best_label, confidence = validator.match_to_canonical(text, canonical_labels, language)
-    
-    if best_label and confidence >= 0.60:
-        return ValidationResult(value=best_label, is_confident=True)
-    elif best_label and confidence >= 0.40:
-        return ValidationResult(value=best_label, is_confident=True)
-    else:
-        return ValidationResult(value=None, is_confident=False)
+    # Category words: lexicon first, then semantic matching
+    return _validate_choice_enhanced("ph", text, language)
 
 
 def validate_soil_type_enhanced(text: str, language: Language) -> ValidationResult:
     """Enhanced soil type validation."""
-    validator = get_semantic_validator()
-    
-    if _check_help_request(text, language):
-        return ValidationResult(value=None, is_confident=False)
-    
-    canonical_labels = {
-        "clay": ["clay", "chikni", "चिकनी", "sticky"],
-        "sandy": ["sandy", "retili", "रेतिली", "sand"],
-        "loamy": ["loamy", "dumat", "दोमट", "मिट्टी", "balanced"],
-        "silt": ["silt", "silty"],
-    }
-    
-    best_label, confidence = validator.match_to_canonical(text, canonical_labels, language)
-    
-    if best_label and confidence >= 0.60:
-        return ValidationResult(value=best_label, is_confident=True)
-    elif best_label and confidence >= 0.40:
-        return ValidationResult(value=best_label, is_confident=True)
-    else:
-        return ValidationResult(value=None, is_confident=False)
+    return _validate_choice_enhanced("soil_type", text, language)
 
 
 def validate_earthworms_enhanced(text: str, language: Language) -> ValidationResult:
     """Enhanced earthworms validation."""
-    validator = get_semantic_validator()
-    
-    if _check_help_request(text, language):
-        return ValidationResult(value=None, is_confident=False)
-    
-    canonical_labels = {
-        "yes": ["yes", "haan", "हाँ", "हैं", "present"],
-        "no": ["no", "nahi", "नहीं", "absent"],
-        "many": ["many", "bahut", "बहुत", "lots"],
-        "few": ["few", "kam", "कम", "some"],
-    }
-    
-    best_label, confidence = validator.match_to_canonical(text, canonical_labels, language)
-    
-    if best_label and confidence >= 0.60:
-        return ValidationResult(value=best_label, is_confident=True)
-    elif best_label and confidence >= 0.40:
-        return ValidationResult(value=best_label, is_confident=True)
-    else:
-        return ValidationResult(value=None, is_confident=False)
+    return _validate_choice_enhanced("earthworms", text, language)
 
 
 def validate_location_enhanced(text: str, language: Language) -> ValidationResult:
@@ -340,13 +392,17 @@ def validate_fertilizer_used_enhanced(text: str, language: Language) -> Validati
     
     normalized = text.lower().strip()
     
-    # Check for yes/no first
-    yes_no_labels = {
-        "yes": ["yes", "haan", "हाँ", "used"],
-        "no": ["no", "nahi", "नहीं", "none"],
-    }
+    # Check for yes/no first (exact, then misspelled: "nahin", "yess")
+    yes_no = lexicon.match_value("fertilizer_used", text, language)
+    if not yes_no:
+        fuzzy = fuzzy_index.match("fertilizer_used", text, language)
+        yes_no = fuzzy.value if fuzzy is not None else None
+    if yes_no:
+        return ValidationResult(value=yes_no, is_confident=True)
     
-    best_label, confidence = validator.match_to_canonical(text, yes_no_labels, language)
+    best_label, confidence = validator.match_to_canonical(
+        text, lexicon.synonyms("fertilizer_used", related=True), language
+    )
     
     if best_label and confidence >= 0.60:
         return ValidationResult(value=best_label, is_confident=True)
@@ -362,9 +418,89 @@ def validate_fertilizer_used_enhanced(text: str, language: Language) -> Validati
 
 def _check_help_request(text: str, language: Language) -> bool:
     """Check if user is asking for help."""
-    normalized = text.lower().strip()
-    indicators = HELP_INDICATORS.get(language, [])
-    return any(indicator in normalized for indicator in indicators)
+    return lexicon.is_help_request(text, language)
+
+
+def _lexical_choice(parameter: str, text: str, language: Language) -> Optional[ValidationResult]:
+    """
+    Value terms (exact, then typo-tolerant) before fallback terms; None if
+    semantic matching is needed.
+    
+    Session-language values are tried first, then values of every script
+    ("चिकनी मिट्टी" in an English session is clay), so a fallback or
+    related term ("मिट्टी") never beats a real value term.
+    """
+    match = lexicon.scan(parameter, text, language)
+    if match.is_help:
+        return ValidationResult(value=None, is_confident=False)
+    if match.value and "value" in match.groups:
+        return ValidationResult(value=match.value, is_confident=True)
+    fuzzy = fuzzy_index.match(parameter, text, language)
+    if fuzzy is not None and fuzzy.value:
+        return ValidationResult(value=fuzzy.value, is_confident=True)
+    # Values of every script (the intent matcher holds no fallback terms)
+    any_script = lexicon.scan(parameter, text)
+    if any_script.value:
+        return ValidationResult(value=any_script.value, is_confident=True)
+    fuzzy = fuzzy_index.match(parameter, text)
+    if fuzzy is not None and fuzzy.value:
+        return ValidationResult(value=fuzzy.value, is_confident=True)
+    if match.value:  # Only a fallback term ("मिट्टी") matched
+        return ValidationResult(value=match.value, is_confident=True)
+    return None
+
+
+def _validate_choice_enhanced(parameter: str, text: str, language: Language) -> ValidationResult:
+    """Lexicon match (exact, then fuzzy); semantic matching against the synonyms otherwise."""
+    result = _lexical_choice(parameter, text, language)
+    if result is not None:
+        return result
+    
+    validator = get_semantic_validator()
+    best_label, confidence = validator.match_to_canonical(
+        text, lexicon.synonyms(parameter, related=True), language
+    )
+    
+    # Lenient: medium confidence (>= 0.40) is still accepted
+    if best_label and confidence >= 0.40:
+        return ValidationResult(value=best_label, is_confident=True)
+    return ValidationResult(value=None, is_confident=False)
+
+
+# Parameters validated by _validate_choice_enhanced() alone (batchable)
+_CHOICE_PARAMETERS = ("color", "moisture", "smell", "soil_type", "earthworms")
+
+
+def validate_batch(parameter: str, texts: List[str], language: Language) -> List[ValidationResult]:
+    """
+    Validate many answers to one choice parameter (e.g. replayed transcripts).
+    
+    Same results as calling the parameter's validator per text, but all
+    texts without an exact or fuzzy lexicon match share a single semantic
+    encode call.
+    Other parameters (numeric pH, free text) use their validator per text.
+    """
+    if parameter not in _CHOICE_PARAMETERS:
+        validate = ENHANCED_VALIDATORS.get(parameter, validate_name_enhanced)
+        return [validate(text, language) for text in texts]
+    
+    results: List[Optional[ValidationResult]] = [None] * len(texts)
+    pending: List[int] = []
+    for i, text in enumerate(texts):
+        results[i] = _lexical_choice(parameter, text, language)
+        if results[i] is None:
+            pending.append(i)
+    
+    if pending:
+        matches = get_semantic_validator().match_many(
+            [texts[i] for i in pending], lexicon.synonyms(parameter, related=True), language
+        )
+        for i, (best_label, confidence) in zip(pending, matches):
+            if best_label and confidence >= 0.40:
+                results[i] = ValidationResult(value=best_label, is_confident=True)
+            else:
+                results[i] = ValidationResult(value=None, is_confident=False)
+    return results
 
 
 # Simple name validator
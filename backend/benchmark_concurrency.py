@@ -0,0 +1,170 @@
+"""
+Concurrency benchmark for the async wizard turn pipeline.
+
+Runs N simultaneous wizard sessions through
+handle_user_message_enhanced_async (the /api/v1/session/next path) against
+a local fake Ollama-compatible provider with a fixed response latency, and
+reports turns/second and per-turn latency for each concurrency level.
+
+Every timed turn takes the full I/O path of a helper turn:
+LLM intent classification → LLM answer extraction → validator → RAG → LLM helper.
+
+The "sequential" row processes the same turns one at a time, which is what
+the old blocking /next handler did on a single uvicorn worker; with the
+async pipeline throughput should grow with concurrency until the HTTP
+pool (`--pool-size`) or the provider is saturated. Runs fully offline.
+
+Usage:
+    python benchmark_concurrency.py
+    python benchmark_concurrency.py --levels 1 8 32 --latency-ms 300 --turns 3
+    python benchmark_concurrency.py --output results.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+import numpy as np
+from app.config import settings
+from app.services.session_manager import session_manager
+from app.services.rag_engine import RAGEngine
+from app.services.llm_adapter import OllamaLLMAdapter
+from app.services.intent_classifier import get_intent_classifier
+from app.services.answer_extractor import get_answer_extractor
+from app.services.orchestrator_enhanced import handle_user_message_enhanced_async
+from fake_providers import FAKE_MODEL, FakeProviderConfig, start_fake_provider
+
+
+# Long enough for the LLM intent path, no keyword matches for "color"
+DEFAULT_MESSAGE = "what should I look at to decide this one for my field"
+
+
+async def run_level(
+    concurrency: int,
+    turns: int,
+    sequential: bool,
+    rag_engine: RAGEngine,
+    llm: OllamaLLMAdapter,
+    message: str,
+    language: str,
+) -> Dict[str, Any]:
+    """Run `concurrency` sessions × `turns` helper turns and time them."""
+    sessions = []
+    for _ in range(concurrency):
+        session = session_manager.create_session(language)
+        session.current_parameter = "color"
+        sessions.append(session)
+
+    latencies: List[float] = []
+
+    async def play(session) -> None:
+        for _ in range(turns):
+            start = time.perf_counter()
+            response, _ = await handle_user_message_enhanced_async(
+                session=session,
+                user_message=message,
+                audio_bytes=None,
+                rag_engine=rag_engine,
+                llm=llm,
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.helper_mode, "benchmark turn did not reach helper mode"
+
+    start = time.perf_counter()
+    if sequential:
+        for session in sessions:
+            await play(session)
+    else:
+        await asyncio.gather(*(play(session) for session in sessions))
+    elapsed = time.perf_counter() - start
+
+    for session in sessions:
+        session_manager.delete_session(session.session_id)
+
+    values = np.array(latencies)
+    return {
+        "sessions": concurrency,
+        "mode": "sequential" if sequential else "async",
+        "turns": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "turns_per_s": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "p50": round(float(np.percentile(values, 50)), 1),
+            "p95": round(float(np.percentile(values, 95)), 1),
+            "max": round(float(values.max()), 1),
+        },
+    }
+
+
+async def benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    server = start_fake_provider(FakeProviderConfig(latency_ms=args.latency_ms))
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    # Route every LLM caller of the turn to the fake provider
+    settings.llm_provider = "ollama"
+    settings.http_pool_maxsize = args.pool_size
+    settings.helper_cache_enabled = False  # Every turn must reach the provider
+    llm = OllamaLLMAdapter(model_name=FAKE_MODEL, base_url=base_url)
+    get_intent_classifier().base_url = base_url
+    extractor = get_answer_extractor()
+    extractor.base_url = base_url
+
+    rag_engine = RAGEngine()
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+
+    results = []
+    try:
+        with quiet:
+            # Warm-up (pool connections, RAG cache, imports)
+            await run_level(2, 1, False, rag_engine, llm, args.message, args.language)
+            results.append(await run_level(
+                max(args.levels), args.turns, True, rag_engine, llm, args.message, args.language
+            ))
+            for level in args.levels:
+                results.append(await run_level(
+                    level, args.turns, False, rag_engine, llm, args.message, args.language
+                ))
+    finally:
+        server.shutdown()
+
+    return {
+        "provider_latency_ms": args.latency_ms,
+        "llm_calls_per_turn": 3,
+        "pool_size": args.pool_size,
+        "rag_ready": rag_engine.is_ready(),
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark concurrent wizard turns (async pipeline)")
+    parser.add_argument("--levels", nargs="+", type=int, default=[1, 4, 16, 64], help="Simultaneous sessions")
+    parser.add_argument("--turns", type=int, default=2, help="Helper turns per session")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Fake provider latency per LLM call")
+    parser.add_argument("--pool-size", type=int, default=settings.http_pool_maxsize, help="Pooled connections per provider")
+    parser.add_argument("--message", default=DEFAULT_MESSAGE, help="User message sent every turn")
+    parser.add_argument("--language", choices=["en", "hi"], default="en")
+    parser.add_argument("--verbose", action="store_true", help="Show orchestrator logs")
+    parser.add_argument("--output", type=Path, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(benchmark(args))
+
+    print(f"\n{'mode':<12}{'sessions':>9}{'turns':>7}{'turns/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    for row in report["results"]:
+        latency = row["latency_ms"]
+        print(f"{row['mode']:<12}{row['sessions']:>9}{row['turns']:>7}{row['turns_per_s']:>10.2f}"
+              f"{latency['p50']:>9.1f}{latency['p95']:>9.1f}{latency['max']:>9.1f}")
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+        print(f"\n✓ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
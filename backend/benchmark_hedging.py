@@ -0,0 +1,147 @@
+"""
+Hedging / failover drill for MultiProviderLLMAdapter against fake providers.
+
+Starts two local fake providers (fake_providers.py): an Ollama-compatible
+primary and an OpenAI/Groq-compatible secondary, then runs helper calls
+through each scenario with and without the router:
+
+- steady:    primary fast, secondary slower → (almost) no hedges
+- tail:      primary has a slow tail (some requests take seconds) → hedges cut p99
+- down:      primary answers 503 → immediate failover to the secondary
+- degraded:  primary becomes much slower than the secondary → order flips
+
+Usage:
+    python benchmark_hedging.py
+    python benchmark_hedging.py --calls 200 --concurrency 8 --output hedging.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+import numpy as np
+from app.config import settings
+from app.services.helper_cache import FallbackText
+from app.services.llm_adapter import GroqLLMAdapter, LLMAdapter, OllamaLLMAdapter
+from app.services.llm_router import MultiProviderLLMAdapter
+from fake_providers import FAKE_MODEL, FakeProviderConfig, start_fake_provider
+
+
+SCENARIOS = {
+    # name: (primary config, secondary config)
+    "steady": (dict(latency_ms=100), dict(latency_ms=250)),
+    "tail": (dict(latency_ms=100, tail_ratio=0.1, tail_latency_ms=3000), dict(latency_ms=250)),
+    "down": (dict(latency_ms=50, fail_status=503), dict(latency_ms=250)),
+    "degraded": (dict(latency_ms=1500), dict(latency_ms=250)),
+}
+CHUNKS = ["Soil color: dark brown or black soil usually has more organic matter."]
+
+
+async def run_calls(llm: LLMAdapter, calls: int, concurrency: int) -> Dict[str, Any]:
+    """`calls` helper calls, `concurrency` at a time; latency percentiles and failures."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one() -> None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            text = await llm.generate_helper_async("color", "en", "how do I check color?", CHUNKS)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if isinstance(text, FallbackText) or not text:
+                failures += 1
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    values = np.array(latencies)
+    return {
+        "calls": calls,
+        "failures": failures,
+        "p50_ms": round(float(np.percentile(values, 50)), 1),
+        "p99_ms": round(float(np.percentile(values, 99)), 1),
+        "max_ms": round(float(values.max()), 1),
+    }
+
+
+async def run_scenario(name: str, calls: int, concurrency: int) -> Dict[str, Any]:
+    primary_config, secondary_config = SCENARIOS[name]
+    primary_server = start_fake_provider(FakeProviderConfig(**primary_config))
+    secondary_server = start_fake_provider(FakeProviderConfig(**secondary_config))
+    try:
+        primary = OllamaLLMAdapter(model_name=FAKE_MODEL, base_url=f"http://127.0.0.1:{primary_server.server_port}")
+        secondary = GroqLLMAdapter(
+            api_key="fake",
+            model_name=FAKE_MODEL,
+            base_url=f"http://127.0.0.1:{secondary_server.server_port}/openai/v1/chat/completions",
+        )
+        router = MultiProviderLLMAdapter([primary, secondary])
+
+        single = await run_calls(primary, calls, concurrency)
+        primary_server.config.requests = secondary_server.config.requests = 0
+        hedged = await run_calls(router, calls, concurrency)
+        stats = router.stats()
+        return {
+            "scenario": name,
+            "primary_only": single,
+            "hedged": hedged,
+            "upstream_requests": {
+                "primary": primary_server.config.requests,
+                "secondary": secondary_server.config.requests,
+            },
+            "router": {key: stats[key] for key in ("hedged", "failovers", "secondary_wins", "wins", "order")},
+        }
+    finally:
+        primary_server.shutdown()
+        secondary_server.shutdown()
+
+
+async def benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    settings.llm_hedge_initial_delay_seconds = args.initial_delay
+    # The fake secondary's key would otherwise be held to Groq's real RPM limit
+    settings.rate_limit_enabled = False
+    results = []
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        for name in args.scenarios:
+            results.append(await run_scenario(name, args.calls, args.concurrency))
+    return {
+        "hedge_percentile": settings.llm_hedge_percentile,
+        "failover_ratio": settings.llm_failover_ratio,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hedged request / failover drill with fake providers")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--calls", type=int, default=100, help="Helper calls per run")
+    parser.add_argument("--concurrency", type=int, default=4, help="Calls in flight")
+    parser.add_argument("--initial-delay", type=float, default=0.5, help="Hedge delay before latencies are known")
+    parser.add_argument("--verbose", action="store_true", help="Show adapter logs")
+    parser.add_argument("--output", type=Path, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(benchmark(args))
+
+    print(f"\n{'scenario':<10}{'run':<14}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'failed':>8}"
+          f"{'hedged':>8}{'failover':>10}  wins")
+    for row in report["results"]:
+        for run in ("primary_only", "hedged"):
+            result = row[run]
+            router = row["router"] if run == "hedged" else {}
+            print(f"{row['scenario']:<10}{run:<14}{result['p50_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+                  f"{result['max_ms']:>9.1f}{result['failures']:>8}"
+                  f"{router.get('hedged', ''):>8}{router.get('failovers', ''):>10}  {router.get('wins', '')}")
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+        print(f"\n✓ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
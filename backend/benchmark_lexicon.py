@@ -0,0 +1,228 @@
+"""
+Per-turn answer matching cost: linear keyword scans vs the compiled lexicon.
+
+Every wizard turn matches the farmer's message several times: the intent
+fast path, the help check and the enhanced validator. The legacy path
+rebuilt its term lists per call, ran one `in` check per term and scored
+every synonym with the semantic matcher; the lexicon (app/services/lexicon.py)
+does one regex pass per matcher over tries compiled at import and only
+falls back to semantic matching when no term matched.
+
+Replays English, Hindi and transliterated utterances for every parameter
+through both paths and reports mean / p99 microseconds per turn, the
+speedup and how often both paths pick the same value, then the accuracy
+of both paths on misspelled answers (the new path adds the fuzzy index,
+fuzzy_index.py). Runs fully offline.
+
+Usage:
+    python benchmark_lexicon.py
+    python benchmark_lexicon.py --repeat 2000 --output lexicon.json
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.services import fuzzy_index, lexicon
+from app.services.validators_enhanced import SemanticValidator
+
+
+UTTERANCES: List[Tuple[str, str, str]] = [
+    ("color", "black", "en"),
+    ("color", "meri mitti kali hai", "hi"),
+    ("color", "मेरी मिट्टी काली है", "hi"),
+    ("color", "it is reddish brown", "en"),
+    ("color", "I don't know how to check the color", "en"),
+    ("color", "peeli", "hi"),
+    ("moisture", "very dry", "en"),
+    ("moisture", "बहुत सूखी है", "hi"),
+    ("moisture", "geeli hai", "hi"),
+    ("moisture", "it's damp after the rain", "en"),
+    ("smell", "sweet", "en"),
+    ("smell", "मिट्टी जैसी गंध", "hi"),
+    ("smell", "कोई गंध नहीं", "hi"),
+    ("smell", "smells a bit sour", "en"),
+    ("ph", "acidic", "en"),
+    ("ph", "क्षारीय", "hi"),
+    ("ph", "not sure what ph means", "en"),
+    ("soil_type", "मेरी मिट्टी चिकनी है", "hi"),
+    ("soil_type", "sandy loam", "en"),
+    ("soil_type", "dumat", "hi"),
+    ("earthworms", "yes there are many", "en"),
+    ("earthworms", "नहीं हैं", "hi"),
+    ("earthworms", "bahut kam", "hi"),
+    ("earthworms", "मुझे नहीं पता", "hi"),
+    ("fertilizer_used", "urea and some gobar", "en"),
+    ("fertilizer_used", "नहीं", "hi"),
+]
+
+# Misspelled / loosely transliterated answers with the value they mean
+MISSPELLED: List[Tuple[str, str, str, Optional[str]]] = [
+    ("color", "blak", "en", "black"),
+    ("color", "balck soil", "en", "black"),
+    ("color", "bhuraa", "hi", "brown"),
+    ("color", "yelow", "en", "yellow"),
+    ("moisture", "sukhee", "hi", "dry"),
+    ("moisture", "wett", "en", "wet"),
+    ("moisture", "gilla hai", "hi", "wet"),
+    ("smell", "rotton", "en", "rotten"),
+    ("smell", "khati", "hi", "sour"),
+    ("smell", "koi gand nai", "hi", "no_smell"),
+    ("ph", "alkalin", "en", "alkaline"),
+    ("ph", "acedic", "en", "acidic"),
+    ("soil_type", "chiknee", "hi", "clay"),
+    ("soil_type", "sandi", "en", "sandy"),
+    ("soil_type", "domatt", "hi", "loamy"),
+    ("earthworms", "nahin", "hi", "no"),
+    ("earthworms", "bahot", "hi", "many"),
+    ("earthworms", "presnt", "en", "yes"),
+    # Not an answer: nothing should be picked
+    ("color", "I will check tomorrow", "en", None),
+    ("moisture", "abhi khet mein hoon", "hi", None),
+    ("smell", "wait a minute", "en", None),
+]
+
+
+# Embedding-free matching on both paths, so results are deterministic offline
+_SEMANTIC = SemanticValidator(use_embeddings=False)
+_UNSURE = [term for terms in lexicon.PHRASES["unsure"].values() for term in terms]
+_FOLLOW_UP = [term for terms in lexicon.PHRASES["follow_up"].values() for term in terms]
+
+
+def _legacy_quick_terms(parameter: str) -> List[str]:
+    # Rebuilt per call like the old `valid_answers` literal
+    hints = lexicon.VOCABULARY[parameter].get("hints", {})
+    return [term for terms in lexicon.synonyms(parameter).values() for term in terms] + [
+        term for language in lexicon.LANGUAGES for term in hints.get(language, [])
+    ]
+
+
+def _legacy_similarity(text1: str, text2: str) -> float:
+    # The old character-set overlap fallback of SemanticValidator
+    text1, text2 = text1.lower().strip(), text2.lower().strip()
+    if text1 == text2:
+        return 1.0
+    if text1 in text2 or text2 in text1:
+        return 0.85
+    common_chars = set(text1) & set(text2)
+    if common_chars:
+        return len(common_chars) / max(len(set(text1)), len(set(text2))) * 0.7
+    return 0.0
+
+
+def _legacy_match(text: str, canonical_labels: Dict[str, List[str]]) -> Tuple[Optional[str], float]:
+    best_label, best_score = None, 0.0
+    for canonical, synonyms in canonical_labels.items():
+        for synonym in synonyms:
+            score = _legacy_similarity(text, synonym)
+            if score > best_score:
+                best_label, best_score = canonical, score
+    return best_label, best_score
+
+
+def legacy_turn(parameter: str, text: str, language: str) -> Optional[str]:
+    """Old path: intent fast path, help check, enhanced validator (all linear scans)."""
+    normalized = text.lower().strip()
+
+    # Intent fast path: answer terms, then "don't know", then follow-up phrases
+    if not any(term in normalized for term in _legacy_quick_terms(parameter)):
+        if not any(phrase in normalized for phrase in _UNSURE):
+            any(phrase in normalized for phrase in _FOLLOW_UP)
+
+    # Help check
+    if any(indicator in normalized for indicator in lexicon.PHRASES["help"].get(language, [])):
+        return None
+
+    # Enhanced validator: canonical labels rebuilt per call, every synonym scored
+    canonical_labels = lexicon.synonyms(parameter, related=True)
+    label, confidence = _legacy_match(text, canonical_labels)
+    return label if label and confidence >= 0.40 else None
+
+
+def lexicon_turn(parameter: str, text: str, language: str) -> Optional[str]:
+    """New path: one scan per matcher, then the fuzzy index; semantic matching only without a hit."""
+    if not lexicon.scan(parameter, text).groups:  # Intent fast path
+        fuzzy_index.match(parameter, text)
+    match = lexicon.scan(parameter, text, language)
+    if match.is_help:
+        return None
+    if match.value:
+        return match.value
+    fuzzy = fuzzy_index.match(parameter, text, language)
+    if fuzzy is not None and fuzzy.value:
+        return fuzzy.value
+    label, confidence = _SEMANTIC.match_to_canonical(text, lexicon.synonyms(parameter, related=True), language)
+    return label if label and confidence >= 0.40 else None
+
+
+def _time(turn, repeat: int, utterances=UTTERANCES) -> Tuple[np.ndarray, List[Optional[str]]]:
+    samples = []
+    values = []
+    for _ in range(repeat):
+        for parameter, text, language, *_ in utterances:
+            start = time.perf_counter_ns()
+            value = turn(parameter, text, language)
+            samples.append(time.perf_counter_ns() - start)
+            if len(values) < len(utterances):
+                values.append(value)
+    return np.array(samples, dtype=np.float64) / 1000.0, values
+
+
+def run(repeat: int) -> Dict[str, Any]:
+    _time(legacy_turn, 10)  # Warm up
+    _time(lexicon_turn, 10)
+    legacy_us, legacy_values = _time(legacy_turn, repeat)
+    lexicon_us, lexicon_values = _time(lexicon_turn, repeat)
+
+    misspelled = {}
+    for name, turn in (("legacy", legacy_turn), ("lexicon", lexicon_turn)):
+        misspelled_us, values = _time(turn, max(1, repeat // 5), MISSPELLED)
+        misspelled[name] = {
+            "mean_us": round(float(misspelled_us.mean()), 2),
+            "accuracy": round(sum(value == expected for value, (*_, expected) in zip(values, MISSPELLED)) / len(MISSPELLED), 4),
+        }
+
+    differences = [
+        {"parameter": parameter, "text": text, "legacy": old, "lexicon": new}
+        for (parameter, text, _), old, new in zip(UTTERANCES, legacy_values, lexicon_values)
+        if old != new
+    ]
+    return {
+        "utterances": len(UTTERANCES),
+        "repeat": repeat,
+        "legacy_us": {"mean": round(float(legacy_us.mean()), 2), "p99": round(float(np.percentile(legacy_us, 99)), 2)},
+        "lexicon_us": {"mean": round(float(lexicon_us.mean()), 2), "p99": round(float(np.percentile(lexicon_us, 99)), 2)},
+        "speedup": round(float(legacy_us.mean() / lexicon_us.mean()), 2),
+        "agreement": round(1 - len(differences) / len(UTTERANCES), 4),
+        "differences": differences,
+        "misspelled": misspelled,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=500, help="Passes over the utterance set")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print(f"Per-turn matching cost ({results['utterances']} utterances x {results['repeat']})")
+    print(f"  legacy scans:  mean {results['legacy_us']['mean']:8.2f} µs   p99 {results['legacy_us']['p99']:8.2f} µs")
+    print(f"  lexicon:       mean {results['lexicon_us']['mean']:8.2f} µs   p99 {results['lexicon_us']['p99']:8.2f} µs")
+    print(f"  speedup:       {results['speedup']:.2f}x")
+    print(f"  agreement:     {results['agreement']:.0%}")
+    for difference in results["differences"]:
+        print(f"    {difference['parameter']:<16} {difference['text']!r}: {difference['legacy']} → {difference['lexicon']}")
+    print(f"Misspelled answers and non-answers ({len(MISSPELLED)})")
+    for name, stats in results["misspelled"].items():
+        print(f"  {name + ':':<14} mean {stats['mean_us']:8.2f} µs   accuracy {stats['accuracy']:.0%}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✓ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Retrieval benchmark and quality harness for RAGEngine.
+
+Replays the labeled farmer help queries in
+app/data/benchmarks/retrieval_queries.json (English, Hindi and
+transliterated Hindi) against RAGEngine.retrieve_ids and reports:
+- p50 / p95 / p99 latency (ms) and queries per second
+- recall@k and MRR against the labeled relevant chunks, overall and per script
+
+Relevant chunks are labeled by module_name + a text substring and resolved
+to chunk ids against the loaded index, so labels survive KB rebuilds.
+
+A synthetic scaler multiplies kb_chunks.jsonl to a target size (e.g. 10k
+or 100k chunks) with chunks sampled from same-language vocabulary; synthetic chunks
+are distractors only and never count as relevant. Runs fully offline.
+
+Usage:
+    python benchmark_retrieval.py
+    python benchmark_retrieval.py --sizes base 10000 100000
+    python benchmark_retrieval.py --output results.json   # diff between commits
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import numpy as np
+import faiss
+from app.config import settings
+from app.services.bm25 import build_term_matrix, save_term_matrix, BM25_FILENAME
+from app.services.kb_metadata import ChunkMetadataWriter, FLAG_VALID, COLUMNAR_META_DIRNAME
+from app.services.rag_engine import RAGEngine, default_embeddings_dir
+
+
+BACKEND_DIR = Path(__file__).parent
+DEFAULT_QUERIES = BACKEND_DIR / "app" / "data" / "benchmarks" / "retrieval_queries.json"
+SYNTHETIC_MODULE_PREFIX = "synthetic-"
+
+
+def load_query_set(path: Path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _read_chunks(jsonl_path: Path) -> List[Dict[str, Any]]:
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def scale_knowledge_base(
+    target_size: int,
+    out_dir: Path,
+    source_dir: Optional[Path] = None,
+    seed: int = 13,
+) -> Path:
+    """
+    Write a synthetic index of `target_size` chunks to `out_dir`.
+
+    The original chunks are kept as rows 0..n-1; the rest are synthetic
+    chunks with the metadata and length of a random chunk and tokens drawn
+    from three random chunks of the same language. Vectors are the mean of
+    those chunks' vectors plus noise, so both BM25 and FAISS see plausible
+    distractors rather than copies of the labeled chunks.
+
+    Returns:
+        out_dir (reused as-is if it already holds the same scaled index)
+    """
+    source_dir = source_dir or Path(default_embeddings_dir())
+    jsonl_path = BACKEND_DIR / settings.kb_processed_dir / "kb_chunks.jsonl"
+    stamp = {"target_size": target_size, "seed": seed, "source_size": os.path.getsize(jsonl_path), "generator": 2}
+
+    stamp_path = out_dir / "scale.json"
+    if stamp_path.exists():
+        with open(stamp_path, "r", encoding="utf-8") as f:
+            if json.load(f) == stamp:
+                return out_dir
+    shutil.rmtree(out_dir, ignore_errors=True)
+    out_dir.mkdir(parents=True)
+
+    chunks = _read_chunks(jsonl_path)
+    index = faiss.read_index(str(source_dir / "kb_index.faiss"))
+    rng = np.random.default_rng(seed)
+    if index.ntotal == len(chunks):
+        vectors = index.reconstruct_n(0, index.ntotal)
+    else:
+        print(f"⚠ kb_index.faiss has {index.ntotal} vectors for {len(chunks)} chunks, using random vectors")
+        vectors = rng.standard_normal((len(chunks), index.d)).astype("float32")
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    by_language: Dict[str, List[int]] = {}
+    for i, chunk in enumerate(chunks):
+        by_language.setdefault(chunk.get("language") or "en", []).append(i)
+
+    print(f"🔄 Scaling {len(chunks)} chunks to {target_size}...")
+    start = time.perf_counter()
+    out_index = faiss.IndexFlatL2(index.d)
+    out_index.add(vectors)
+    writer = ChunkMetadataWriter(out_dir / COLUMNAR_META_DIRNAME)
+    texts: List[str] = []
+    for chunk in chunks:
+        writer.add(chunk)
+        texts.append(chunk["text"])
+
+    n_synthetic = max(0, target_size - len(chunks))
+    batch: List[np.ndarray] = []
+    for n in range(n_synthetic):
+        source = int(rng.integers(len(chunks)))
+        donor_pool = by_language[chunks[source].get("language") or "en"]
+        donors = [donor_pool[int(i)] for i in rng.integers(len(donor_pool), size=3)]
+
+        # Same length and language as the source, vocabulary drawn from random chunks
+        donor_tokens = [token for d in donors for token in chunks[d]["text"].split()]
+        n_tokens = len(chunks[source]["text"].split())
+        if donor_tokens and n_tokens:
+            text = " ".join(donor_tokens[int(i)] for i in rng.integers(len(donor_tokens), size=n_tokens))
+        else:
+            text = chunks[source]["text"]
+
+        synthetic = {**chunks[source], "text": text, "module_name": f"{SYNTHETIC_MODULE_PREFIX}{n:06d}"}
+        writer.add(synthetic)
+        texts.append(text)
+
+        vector = vectors[donors].mean(axis=0) + rng.normal(0.0, 0.05, index.d).astype("float32")
+        batch.append(vector / np.linalg.norm(vector))
+        if len(batch) >= 4096:
+            out_index.add(np.stack(batch))
+            batch = []
+    if batch:
+        out_index.add(np.stack(batch))
+
+    writer.close()
+    faiss.write_index(out_index, str(out_dir / "kb_index.faiss"))
+    save_term_matrix(out_dir / BM25_FILENAME, build_term_matrix(texts))
+
+    with open(stamp_path, "w", encoding="utf-8") as f:
+        json.dump(stamp, f)
+    print(f"✓ Scaled index written to {out_dir} in {time.perf_counter() - start:.1f}s")
+    return out_dir
+
+
+def resolve_relevant(engine: RAGEngine, query_set: Dict[str, Any]) -> Dict[str, List[int]]:
+    """Resolve each relevance group (module_name + text substring) to chunk ids."""
+    metadata = engine.metadata
+    module_ids = np.asarray(metadata.columns["module_name"])
+    valid = (np.asarray(metadata.flags) & FLAG_VALID) > 0
+
+    resolved: Dict[str, List[int]] = {}
+    for group, matchers in query_set["relevant"].items():
+        rows = set()
+        for matcher in matchers:
+            label = metadata.label_id("module_name", matcher["module_name"])
+            if label < 0:
+                continue
+            for row in np.flatnonzero((module_ids == label) & valid):
+                if matcher["contains"] in metadata.text(int(row)):
+                    rows.add(int(row))
+        resolved[group] = sorted(rows)
+    return resolved
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return float(np.percentile(np.asarray(sorted_values), q))
+
+
+def _quality(ranked: List[int], relevant: List[int]) -> Dict[str, float]:
+    relevant_set = set(relevant)
+    hits = [i for i, row in enumerate(ranked) if row in relevant_set]
+    return {
+        "recall": len(hits) / len(relevant_set) if relevant_set else 0.0,
+        "rr": 1.0 / (hits[0] + 1) if hits else 0.0,
+        "first_hit_rank": hits[0] + 1 if hits else None,
+    }
+
+
+def benchmark(
+    engine: RAGEngine,
+    query_set: Dict[str, Any],
+    k: int,
+    repeat: int,
+    raw_queries: bool,
+    details: bool,
+) -> Dict[str, Any]:
+    """Measure latency and quality of one engine over the query set."""
+    if raw_queries:
+        build_query = lambda parameter, message, language: message
+    else:
+        from app.services.orchestrator_enhanced import _build_rag_query as build_query
+
+    relevant = resolve_relevant(engine, query_set)
+    queries = [
+        (q, build_query(q["parameter"], q["message"], q["language"]))
+        for q in query_set["queries"]
+    ]
+
+    # Quality (deterministic, one pass) + warm-up
+    per_query = []
+    by_script: Dict[str, List[Dict[str, float]]] = {}
+    for q, text in queries:
+        ranked = engine.retrieve_ids(text, q["parameter"], q["language"], k=k)
+        quality = _quality(ranked, relevant.get(q["relevant"], []))
+        by_script.setdefault(q["script"], []).append(quality)
+        per_query.append({"id": q["id"], "ranked": ranked, **quality})
+
+    latencies: List[float] = []
+    wall_start = time.perf_counter()
+    for _ in range(repeat):
+        for q, text in queries:
+            start = time.perf_counter()
+            engine.retrieve_ids(text, q["parameter"], q["language"], k=k)
+            latencies.append((time.perf_counter() - start) * 1000)
+    wall = time.perf_counter() - wall_start
+    latencies.sort()
+
+    def summarize(items: List[Dict[str, float]]) -> Dict[str, float]:
+        return {
+            "queries": len(items),
+            "recall_at_k": round(float(np.mean([i["recall"] for i in items])), 4) if items else 0.0,
+            "mrr": round(float(np.mean([i["rr"] for i in items])), 4) if items else 0.0,
+        }
+
+    result = {
+        "chunks": len(engine.metadata),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 4),
+            "p95": round(_percentile(latencies, 95), 4),
+            "p99": round(_percentile(latencies, 99), 4),
+            "mean": round(float(np.mean(latencies)), 4) if latencies else 0.0,
+        },
+        "qps": round(len(latencies) / wall, 1) if wall > 0 else 0.0,
+        **summarize(per_query),
+        "by_script": {script: summarize(items) for script, items in sorted(by_script.items())},
+        "unresolved_groups": sorted(group for group, rows in relevant.items() if not rows),
+    }
+    if details:
+        result["per_query"] = per_query
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark RAGEngine retrieval latency and quality")
+    parser.add_argument("--queries", type=Path, default=DEFAULT_QUERIES, help="Labeled query set (JSON)")
+    parser.add_argument("--sizes", nargs="+", default=["base"], help="KB sizes: 'base' and/or chunk counts, e.g. 10000 100000")
+    parser.add_argument("--k", type=int, default=5, help="Chunks retrieved per query (recall@k / MRR cutoff)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed passes over the query set")
+    parser.add_argument("--cache", action="store_true", help="Keep the retrieval cache enabled (off by default)")
+    parser.add_argument("--raw-queries", action="store_true", help="Retrieve with the message only, not the orchestrator's query template")
+    parser.add_argument("--work-dir", type=Path, default=Path(tempfile.gettempdir()) / "kb_benchmark", help="Where scaled indexes are built (reused across runs)")
+    parser.add_argument("--details", action="store_true", help="Include per-query rankings in the JSON")
+    parser.add_argument("--output", type=Path, help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    if not args.cache:
+        settings.rag_cache_size = 0
+
+    query_set = load_query_set(args.queries)
+    report: Dict[str, Any] = {
+        "git_commit": _git_commit(),
+        "query_set": str(args.queries.name),
+        "k": args.k,
+        "repeat": args.repeat,
+        "cache": args.cache,
+        "results": [],
+    }
+
+    for size in args.sizes:
+        if size == "base":
+            embeddings_dir = default_embeddings_dir()
+        else:
+            embeddings_dir = str(scale_knowledge_base(int(size), args.work_dir / f"kb_{int(size)}"))
+
+        start = time.perf_counter()
+        engine = RAGEngine(embeddings_dir=embeddings_dir)
+        load_ms = round((time.perf_counter() - start) * 1000, 1)
+        entry: Dict[str, Any] = {"size": size, "load_ms": load_ms}
+        if not engine.is_ready():
+            entry["error"] = "index not available"
+        else:
+            entry.update(benchmark(engine, query_set, args.k, args.repeat, args.raw_queries, args.details))
+        report["results"].append(entry)
+
+    print(f"\n{'size':<8}{'chunks':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'QPS':>10}{'R@k':>7}{'MRR':>7}")
+    for row in report["results"]:
+        if "error" in row:
+            print(f"{row['size']:<8}  {row['error']}")
+            continue
+        latency = row["latency_ms"]
+        print(f"{row['size']:<8}{row['chunks']:>8}{latency['p50']:>9.3f}{latency['p95']:>9.3f}"
+              f"{latency['p99']:>9.3f}{row['qps']:>10.1f}{row['recall_at_k']:>7.3f}{row['mrr']:>7.3f}")
+        for script, quality in row["by_script"].items():
+            print(f"{'':<9}{script:>8}{'':>36}{quality['recall_at_k']:>7.3f}{quality['mrr']:>7.3f}")
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+        print(f"\n✓ Results written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Local fake LLM providers for benchmarks and failover drills.
+
+Serves the two HTTP APIs the adapters speak, fully offline:
+- Ollama: GET /api/tags, POST /api/generate (JSON or NDJSON stream)
+- OpenAI-compatible (Groq): POST /openai/v1/chat/completions (JSON or SSE stream)
+
+Replies depend on the prompt type (intent classification → "ANSWER",
+answer extraction → "NONE", anything else → helper steps), after a
+configurable latency. Latency, jitter and failures (e.g. 429 with
+Retry-After) can be changed while the server runs (`server.config`), so a
+provider can be slowed down or taken down mid-benchmark.
+
+Usage:
+    python fake_providers.py --port 11434 --latency-ms 300
+    python fake_providers.py --port 8081 --latency-ms 800 --fail-status 503
+    python fake_providers.py --port 8082 --fail-status 429 --retry-after 2
+
+Point the app at it with e.g. OLLAMA base URL http://127.0.0.1:11434, or
+GroqLLMAdapter(api_key="fake", base_url="http://127.0.0.1:8081/openai/v1/chat/completions").
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+FAKE_MODEL = "fake-bench"
+HELPER_TEXT = "Step 1: Take a handful of soil. Step 2: Look at it in daylight. Step 3: Compare the color."
+
+
+class FakeProviderConfig:
+    """Runtime behaviour of a fake provider (mutable while serving)."""
+
+    def __init__(
+        self,
+        latency_ms: float = 200.0,
+        jitter_ms: float = 0.0,
+        fail_status: Optional[int] = None,
+        stream_pieces: int = 4,
+        tail_ratio: float = 0.0,
+        tail_latency_ms: float = 0.0,
+        retry_after: Optional[float] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tail_ratio = tail_ratio  # Share of requests answered after tail_latency_ms instead
+        self.tail_latency_ms = tail_latency_ms
+        self.fail_status = fail_status
+        self.retry_after = retry_after  # Retry-After header (seconds) sent with failures
+        self.stream_pieces = stream_pieces
+        self.requests = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        if self.tail_ratio and random.random() < self.tail_ratio:
+            return self.tail_latency_ms / 1000
+        return max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+    def count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+
+def reply_text(prompt: str) -> str:
+    """Canned reply by prompt type."""
+    if '"intent"' in prompt:
+        return '{"intent": "answer", "value": null, "confidence": 0.9}'  # Joint intent + extraction
+    if '"ANSWER"' in prompt and '"HELP"' in prompt and "NONE" not in prompt:
+        return "ANSWER"  # Intent classification
+    if '"NONE"' in prompt:
+        return "NONE"  # Answer extraction: nothing found
+    return HELPER_TEXT
+
+
+def split_pieces(text: str, pieces: int) -> list:
+    words = text.split(" ")
+    size = max(1, -(-len(words) // max(1, pieces)))
+    return [" ".join(words[i:i + size]) + (" " if i + size < len(words) else "") for i in range(0, len(words), size)]
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    """Ollama and OpenAI-compatible endpoints driven by `server.config`."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Headers and body are separate writes
+
+    @property
+    def config(self) -> FakeProviderConfig:
+        return self.server.config
+
+    def do_GET(self):
+        self._reply({"models": [{"name": FAKE_MODEL}]})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        config = self.config
+        config.count("requests")
+        time.sleep(config.delay())
+
+        if config.fail_status:
+            headers = {"Retry-After": str(config.retry_after)} if config.retry_after is not None else {}
+            self._reply({"error": "fake provider failure"}, status=config.fail_status, headers=headers)
+            return
+
+        if self.path.startswith("/api/generate"):
+            text = reply_text(body.get("prompt", ""))
+            if body.get("stream"):
+                self._stream([json.dumps({"response": piece, "done": False}) + "\n"
+                              for piece in split_pieces(text, config.stream_pieces)]
+                             + [json.dumps({"response": "", "done": True}) + "\n"], "application/x-ndjson")
+            else:
+                self._reply({"response": text})
+        elif self.path.endswith("/chat/completions"):
+            prompt = "\n".join(message.get("content", "") for message in body.get("messages", []))
+            text = reply_text(prompt)
+            if body.get("stream"):
+                events = [
+                    "data: " + json.dumps({"choices": [{"delta": {"content": piece}}]}) + "\n\n"
+                    for piece in split_pieces(text, config.stream_pieces)
+                ]
+                self._stream(events + ["data: [DONE]\n\n"], "text/event-stream")
+            else:
+                self._reply({"choices": [{"message": {"content": text}}]})
+        else:
+            self._reply({"error": "not found"}, status=404)
+            return
+        config.count("completed")
+
+    def _reply(self, payload: Dict[str, Any], status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, parts: list, content_type: str) -> None:
+        """Chunked response, one part per chunk, spread over the latency again."""
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        gap = self.config.latency_ms / 1000 / max(1, len(parts))
+        for part in parts:
+            data = part.encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+            time.sleep(gap)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    """Threaded server that ignores clients hanging up (cancelled hedges)."""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_fake_provider(
+    config: Optional[FakeProviderConfig] = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> FakeProviderServer:
+    """Start a fake provider in a daemon thread; `server.config` controls it."""
+    server = FakeProviderServer((host, port), FakeProviderHandler)
+    server.config = config or FakeProviderConfig()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a fake Ollama / OpenAI-compatible LLM provider")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Delay before each reply")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on the delay")
+    parser.add_argument("--fail-status", type=int, help="Answer every request with this HTTP status")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with failures (e.g. 429)")
+    parser.add_argument("--tail-ratio", type=float, default=0.0, help="Share of slow (tail) requests")
+    parser.add_argument("--tail-latency-ms", type=float, default=0.0, help="Delay of tail requests")
+    args = parser.parse_args()
+
+    config = FakeProviderConfig(
+        args.latency_ms, args.jitter_ms, args.fail_status,
+        tail_ratio=args.tail_ratio, tail_latency_ms=args.tail_latency_ms, retry_after=args.retry_after,
+    )
+    server = start_fake_provider(config, args.host, args.port)
+    print(f"✓ Fake provider on http://{args.host}:{server.server_port} "
+          f"(Ollama /api/generate, OpenAI /openai/v1/chat/completions)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
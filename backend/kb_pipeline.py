@@ -0,0 +1,447 @@
+"""
+Parallel Knowledge Base Preprocessing Pipeline
+
+One pipeline behind preprocess_kb.py and preprocess_kb_improved.py,
+selectable by chunking strategy:
+- basic:    preprocess_kb.chunk_markdown (headings/paragraphs)
+- improved: preprocess_kb_improved.chunk_markdown_improved (keeps steps together)
+
+Stages:
+1. Read, hash and chunk markdown files across a ProcessPoolExecutor
+2. Embed chunks in batches of --batch-size
+3. Stream each embedded batch to kb_chunks.jsonl, kb_meta/ and the FAISS
+   index, so chunk texts for the whole corpus are never held in memory
+
+Rebuilds are incremental: kb_build_manifest.json (next to kb_index.faiss)
+records a content hash plus the chunk/embedding range of every source
+file. Unchanged files are copied from the previous build instead of being
+re-chunked and re-embedded.
+
+Usage:
+    python kb_pipeline.py --strategy improved --workers 8 --batch-size 128
+    python kb_pipeline.py --full    # ignore the manifest, rebuild everything
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import faiss
+from app.config import settings
+from app.services.bm25 import build_term_matrix, save_term_matrix, BM25_FILENAME
+from app.services.kb_metadata import ChunkMetadataWriter, COLUMNAR_META_DIRNAME
+from preprocess_kb import chunk_markdown
+from preprocess_kb_improved import chunk_markdown_improved
+
+
+MANIFEST_FILENAME = "kb_build_manifest.json"
+
+# strategy -> (chunk function, version). Bump the version when a chunker
+# changes so chunks from older builds are not reused.
+CHUNKING_STRATEGIES: Dict[str, Tuple[Callable[[str, str], List[Dict[str, Any]]], int]] = {
+    "basic": (chunk_markdown, 1),
+    "improved": (chunk_markdown_improved, 1),
+}
+
+DEFAULT_BATCH_SIZE = 64
+
+
+def file_content_hash(content: str) -> str:
+    """SHA-256 of a markdown file's content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def load_embedding_model():
+    """Load the SentenceTransformer used for chunk embeddings."""
+    from sentence_transformers import SentenceTransformer
+
+    print("🔄 Loading embedding model...")
+    model_kwargs = {}
+    if settings.hf_token:
+        model_kwargs["token"] = settings.hf_token
+
+    embedding_model = SentenceTransformer(
+        settings.embedding_model_name,
+        **model_kwargs
+    )
+    print(f"✓ Loaded: {settings.embedding_model_name}")
+    return embedding_model
+
+
+def _read_and_chunk(task: Tuple[str, Optional[str], str]) -> Dict[str, Any]:
+    """
+    Stage 1 worker: read, hash and (if changed) chunk one markdown file.
+
+    Args:
+        task: (path, previous content hash or None, strategy name)
+
+    Returns:
+        Dict with name, sha256, chunks (None if unchanged) and seconds spent
+    """
+    path, previous_hash, strategy = task
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    content_hash = file_content_hash(content)
+
+    chunks = None
+    if content_hash != previous_hash:
+        chunk_fn, _ = CHUNKING_STRATEGIES[strategy]
+        chunks = chunk_fn(content, os.path.basename(path))
+
+    return {
+        "name": os.path.basename(path),
+        "sha256": content_hash,
+        "chunks": chunks,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+class StageStats:
+    """Item counts and time spent per pipeline stage."""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+
+    def add(self, stage: str, items: int, seconds: float) -> None:
+        entry = self.stages.setdefault(stage, {"items": 0, "seconds": 0.0})
+        entry["items"] += items
+        entry["seconds"] += seconds
+
+    def report(self) -> None:
+        print("\n⏱ Stage throughput:")
+        for stage, entry in self.stages.items():
+            rate = entry["items"] / entry["seconds"] if entry["seconds"] > 0 else float("inf")
+            print(f"  - {stage:<10} {int(entry['items']):>8} items  {entry['seconds']:>8.2f}s  {rate:>10.1f}/s")
+
+
+class PreviousBuild:
+    """Random access to the chunks and vectors of the previous build."""
+
+    def __init__(self, manifest: Dict[str, Any], jsonl_path: Path, index):
+        self.manifest = manifest
+        self.files: Dict[str, Dict[str, Any]] = manifest["files"]
+        self.index = index
+        self._jsonl = open(jsonl_path, "rb")
+
+        # Byte offset of every JSONL line, so reused ranges can be read without loading the file
+        offsets = [0]
+        for line in self._jsonl:
+            offsets.append(offsets[-1] + len(line))
+        self._offsets = np.array(offsets, dtype=np.int64)
+
+    @classmethod
+    def load(cls, embeddings_dir: Path, kb_processed_dir: Path, strategy: str) -> Optional["PreviousBuild"]:
+        """
+        Open the previous build for splicing.
+
+        Returns None if there is no usable previous build, e.g. the manifest is
+        missing, the embedding model or chunker changed, or artifacts disagree.
+        """
+        manifest_path = embeddings_dir / MANIFEST_FILENAME
+        index_path = embeddings_dir / "kb_index.faiss"
+        jsonl_path = kb_processed_dir / "kb_chunks.jsonl"
+
+        if not (manifest_path.exists() and index_path.exists() and jsonl_path.exists()):
+            return None
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if (
+            manifest.get("embedding_model") != settings.embedding_model_name
+            or manifest.get("chunker") != strategy
+            or manifest.get("chunker_version") != CHUNKING_STRATEGIES[strategy][1]
+        ):
+            print("ℹ Embedding model or chunker changed since last build - full rebuild")
+            return None
+
+        index = faiss.read_index(str(index_path))
+        build = cls(manifest, jsonl_path, index)
+        if index.ntotal != build.n_chunks or manifest.get("total_chunks") != build.n_chunks:
+            print("ℹ Previous artifacts are inconsistent - full rebuild")
+            build.close()
+            return None
+        return build
+
+    @property
+    def n_chunks(self) -> int:
+        return len(self._offsets) - 1
+
+    def chunks(self, start: int, count: int) -> List[Dict[str, Any]]:
+        self._jsonl.seek(int(self._offsets[start]))
+        return [json.loads(self._jsonl.readline()) for _ in range(count)]
+
+    def embeddings(self, start: int, count: int) -> np.ndarray:
+        return self.index.reconstruct_n(start, count)
+
+    def close(self) -> None:
+        self._jsonl.close()
+
+
+def _iter_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _iter_results(
+    tasks: List[Tuple[str, Optional[str], str]],
+    workers: int,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Run stage 1 over all files, yielding results in file order.
+
+    At most `workers * 4` files are in flight, so chunk lists cannot pile
+    up in memory while embedding is the bottleneck.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield _read_and_chunk(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        task_iter = iter(tasks)
+        for task in task_iter:
+            pending.append(executor.submit(_read_and_chunk, task))
+            if len(pending) >= workers * 4:
+                break
+        while pending:
+            yield pending.popleft().result()
+            next_task = next(task_iter, None)
+            if next_task is not None:
+                pending.append(executor.submit(_read_and_chunk, next_task))
+
+
+def run_pipeline(
+    strategy: str = "improved",
+    workers: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    full_rebuild: bool = False,
+    write_pickle: bool = True,
+) -> None:
+    """
+    Build (or incrementally update) the knowledge base artifacts.
+
+    Args:
+        strategy: Chunking strategy (key of CHUNKING_STRATEGIES)
+        workers: Chunking processes (default: CPU count; 1 = in-process)
+        batch_size: Chunks per embedding batch / streamed write
+        full_rebuild: Ignore the build manifest and re-embed every file
+        write_pickle: Also write the legacy kb_index_meta.pkl (re-reads the
+            JSONL into memory once at the end)
+    """
+    if strategy not in CHUNKING_STRATEGIES:
+        raise ValueError(f"Unknown chunking strategy: {strategy}")
+    workers = workers or os.cpu_count() or 1
+    batch_size = max(1, batch_size)
+
+    backend_dir = Path(__file__).parent
+    kb_raw_dir = backend_dir / settings.kb_raw_dir
+    kb_processed_dir = backend_dir / settings.kb_processed_dir
+    embeddings_dir = backend_dir / settings.embeddings_dir
+
+    kb_processed_dir.mkdir(parents=True, exist_ok=True)
+    embeddings_dir.mkdir(parents=True, exist_ok=True)
+
+    if not kb_raw_dir.exists():
+        print(f"⚠ Warning: Knowledge base directory not found: {kb_raw_dir}")
+        print("  Please copy your .md files to this directory first.")
+        return
+
+    md_files = sorted(kb_raw_dir.glob("*.md"))
+    if not md_files:
+        print(f"⚠ Warning: No .md files found in {kb_raw_dir}")
+        return
+
+    print(f"📚 Found {len(md_files)} markdown files (strategy: {strategy}, workers: {workers}, batch size: {batch_size})")
+
+    previous = None if full_rebuild else PreviousBuild.load(embeddings_dir, kb_processed_dir, strategy)
+    previous_files = previous.files if previous else {}
+
+    jsonl_path = kb_processed_dir / "kb_chunks.jsonl"
+    jsonl_tmp = kb_processed_dir / "kb_chunks.jsonl.tmp"
+    columnar_dir = embeddings_dir / COLUMNAR_META_DIRNAME
+    columnar_tmp = embeddings_dir / (COLUMNAR_META_DIRNAME + ".tmp")
+    shutil.rmtree(columnar_tmp, ignore_errors=True)
+
+    stats = StageStats()
+    embedding_model = None
+    index = None
+    by_type: Dict[str, int] = {}
+    manifest_files: Dict[str, Dict[str, Any]] = {}
+    changed_files: List[str] = []
+
+    # Chunks waiting for their batch to be embedded; vector is None until then
+    pending: List[Tuple[Dict[str, Any], Optional[np.ndarray]]] = []
+    total_chunks = 0
+
+    jsonl_out = open(jsonl_tmp, "w", encoding="utf-8")
+    meta_writer = ChunkMetadataWriter(columnar_tmp)
+
+    def flush() -> None:
+        """Stages 2 + 3: embed the pending batch and stream it to disk."""
+        nonlocal embedding_model, index
+        if not pending:
+            return
+
+        texts = [chunk["text"] for chunk, vector in pending if vector is None]
+        new_vectors = iter(())
+        if texts:
+            if embedding_model is None:
+                embedding_model = load_embedding_model()
+            start = time.perf_counter()
+            encoded = embedding_model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+            stats.add("embed", len(texts), time.perf_counter() - start)
+            new_vectors = iter(np.asarray(encoded, dtype="float32"))
+
+        start = time.perf_counter()
+        vectors = np.stack([
+            vector if vector is not None else next(new_vectors) for _, vector in pending
+        ]).astype("float32")
+        if index is None:
+            index = faiss.IndexFlatL2(vectors.shape[1])
+        index.add(vectors)
+        for chunk, _ in pending:
+            jsonl_out.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+            meta_writer.add(chunk)
+            section_type = chunk.get("section_type", "unknown")
+            by_type[section_type] = by_type.get(section_type, 0) + 1
+        stats.add("write", len(pending), time.perf_counter() - start)
+        pending.clear()
+
+    tasks = [
+        (str(md_file), previous_files.get(md_file.name, {}).get("sha256"), strategy)
+        for md_file in md_files
+    ]
+
+    wall_start = time.perf_counter()
+    for result in _iter_results(tasks, workers):
+        name = result["name"]
+        if result["chunks"] is None:
+            entry = previous_files[name]
+            start, count = entry["chunk_start"], entry["chunk_count"]
+            reuse_start = time.perf_counter()
+            chunks = previous.chunks(start, count)
+            vectors = previous.embeddings(start, count) if count else []
+            stats.add("reuse", count, time.perf_counter() - reuse_start)
+            pending.extend(zip(chunks, vectors))
+            print(f"  Unchanged: {name} ({count} chunks reused)")
+        else:
+            chunks = result["chunks"]
+            changed_files.append(name)
+            stats.add("chunk", 1, result["seconds"])
+            pending.extend((chunk, None) for chunk in chunks)
+            print(f"  Processing: {name} → {len(chunks)} chunks")
+
+        manifest_files[name] = {
+            "sha256": result["sha256"],
+            "chunk_start": total_chunks,
+            "chunk_count": len(chunks),
+        }
+        total_chunks += len(chunks)
+
+        while len(pending) >= batch_size:
+            overflow = pending[batch_size:]
+            del pending[batch_size:]
+            flush()
+            pending.extend(overflow)
+    flush()
+
+    jsonl_out.close()
+    meta_writer.close()
+    if previous:
+        previous.close()
+    stats.add("pipeline", len(md_files), time.perf_counter() - wall_start)
+
+    removed_files = sorted(set(previous_files) - set(manifest_files))
+    if (previous and not changed_files and not removed_files) or index is None:
+        os.remove(jsonl_tmp)
+        shutil.rmtree(columnar_tmp, ignore_errors=True)
+        if index is None:
+            print("⚠ Warning: No chunks produced - keeping previous artifacts")
+        else:
+            print("\n✅ Knowledge base is up to date - nothing to rebuild")
+        return
+
+    print(f"\n📦 Total chunks: {total_chunks} ({len(changed_files)} files re-embedded, {len(removed_files)} removed)")
+    print("Chunk breakdown:")
+    for chunk_type, count in sorted(by_type.items()):
+        print(f"  - {chunk_type}: {count}")
+
+    # Swap in streamed outputs
+    os.replace(jsonl_tmp, jsonl_path)
+    print(f"✓ Saved chunks to {jsonl_path}")
+    shutil.rmtree(columnar_dir, ignore_errors=True)
+    os.replace(columnar_tmp, columnar_dir)
+    print(f"✓ Saved columnar metadata to {columnar_dir}")
+
+    index_path = embeddings_dir / "kb_index.faiss"
+    faiss.write_index(index, str(index_path))
+    print(f"✓ Saved FAISS index to {index_path}")
+
+    if write_pickle:
+        metadata_dict = {str(i): chunk for i, chunk in enumerate(_iter_jsonl(jsonl_path))}
+        meta_path = embeddings_dir / "kb_index_meta.pkl"
+        with open(meta_path, "wb") as f:
+            pickle.dump(metadata_dict, f)
+        del metadata_dict
+        print(f"✓ Saved metadata to {meta_path}")
+
+    # Save BM25 term-frequency matrix + IDF (rows follow FAISS ids)
+    start = time.perf_counter()
+    bm25_matrix = build_term_matrix(chunk["text"] for chunk in _iter_jsonl(jsonl_path))
+    bm25_path = embeddings_dir / BM25_FILENAME
+    save_term_matrix(bm25_path, bm25_matrix)
+    stats.add("bm25", total_chunks, time.perf_counter() - start)
+    print(f"✓ Saved BM25 matrix to {bm25_path} ({len(bm25_matrix['vocab'])} terms)")
+
+    # Save build manifest last, so an interrupted build is redone next time
+    manifest = {
+        "embedding_model": settings.embedding_model_name,
+        "chunker": strategy,
+        "chunker_version": CHUNKING_STRATEGIES[strategy][1],
+        "total_chunks": total_chunks,
+        "files": manifest_files,
+    }
+    manifest_path = embeddings_dir / MANIFEST_FILENAME
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(f"✓ Saved build manifest to {manifest_path}")
+
+    stats.report()
+    print("\n✅ Knowledge base preprocessing complete!")
+    print(f"   Index size: {index.ntotal} vectors")
+    print(f"   Embedding dimension: {index.d}")
+
+
+def add_pipeline_arguments(parser: argparse.ArgumentParser) -> None:
+    """Flags shared by kb_pipeline.py and the preprocess_kb*.py entry points."""
+    parser.add_argument("--workers", type=int, default=None, help="Chunking processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Chunks per embedding batch")
+    parser.add_argument("--full", action="store_true", help="Ignore the build manifest and rebuild everything")
+    parser.add_argument("--no-pickle", action="store_true", help="Skip the legacy kb_index_meta.pkl")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the knowledge base index")
+    parser.add_argument("--strategy", choices=sorted(CHUNKING_STRATEGIES), default="improved", help="Chunking strategy")
+    add_pipeline_arguments(parser)
+    args = parser.parse_args()
+    run_pipeline(
+        strategy=args.strategy,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        full_rebuild=args.full,
+        write_pickle=not args.no_pickle,
+    )
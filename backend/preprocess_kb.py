@@ -4,26 +4,24 @@ Knowledge Base Preprocessing Script
 Converts markdown knowledge base files into:
 1. Chunked JSONL file (kb_chunks.jsonl)
 2. FAISS index (kb_index.faiss)
-3. Metadata pickle (kb_index_meta.pkl)
+3. Metadata pickle (kb_index_meta.pkl) + columnar copy (kb_meta/)
+
+Chunking lives here; reading, embedding and writing are done by the shared
+parallel pipeline in kb_pipeline.py.
 
 Usage:
     python preprocess_kb.py
+    python preprocess_kb.py --workers 8 --batch-size 128
 
 To modify chunking strategy:
     - Edit _chunk_markdown() function
     - Adjust metadata extraction logic
 """
 
-import os
-import json
-import pickle
+import argparse
 import re
 from pathlib import Path
-from typing import List, Dict, Any
-import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
-from app.config import settings
+from typing import List, Dict, Any, Optional
 
 
 def detect_language(text: str) -> str:
@@ -183,99 +181,31 @@ def _create_chunk(
     return chunk_meta
 
 
-def process_knowledge_base() -> None:
+def process_knowledge_base(
+    workers: Optional[int] = None,
+    batch_size: int = 64,
+) -> None:
     """
     Main preprocessing function.
     
     Reads all .md files from kb_raw/, chunks them, creates embeddings,
-    and saves to FAISS index.
+    and saves to FAISS index (via the shared pipeline in kb_pipeline.py).
     """
-    # Resolve paths relative to backend/ directory
-    backend_dir = Path(__file__).parent
-    kb_raw_dir = backend_dir / settings.kb_raw_dir
-    kb_processed_dir = backend_dir / settings.kb_processed_dir
-    embeddings_dir = backend_dir / settings.embeddings_dir
-    
-    # Create output directories
-    kb_processed_dir.mkdir(parents=True, exist_ok=True)
-    embeddings_dir.mkdir(parents=True, exist_ok=True)
-    
-    if not kb_raw_dir.exists():
-        print(f"⚠ Warning: Knowledge base directory not found: {kb_raw_dir}")
-        print("  Please copy your .md files to this directory first.")
-        return
-    
-    # Find all markdown files
-    md_files = list(kb_raw_dir.glob("*.md"))
-    if not md_files:
-        print(f"⚠ Warning: No .md files found in {kb_raw_dir}")
-        return
-    
-    print(f"📚 Found {len(md_files)} markdown files")
-    
-    # Load embedding model
-    print("🔄 Loading embedding model...")
-    model_kwargs = {}
-    if settings.hf_token:
-        model_kwargs["token"] = settings.hf_token
-    
-    embedding_model = SentenceTransformer(
-        settings.embedding_model_name,
-        **model_kwargs
-    )
-    print(f"✓ Loaded: {settings.embedding_model_name}")
-    
-    # Process all files and create chunks
-    all_chunks = []
-    for md_file in md_files:
-        print(f"  Processing: {md_file.name}")
-        with open(md_file, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        chunks = chunk_markdown(content, md_file.name)
-        all_chunks.extend(chunks)
-        print(f"    → Created {len(chunks)} chunks")
+    from kb_pipeline import run_pipeline
     
-    print(f"\n📦 Total chunks: {len(all_chunks)}")
-    
-    # Save chunks to JSONL
-    jsonl_path = kb_processed_dir / "kb_chunks.jsonl"
-    with open(jsonl_path, "w", encoding="utf-8") as f:
-        for chunk in all_chunks:
-            f.write(json.dumps(chunk, ensure_ascii=False) + "\n")
-    print(f"✓ Saved chunks to {jsonl_path}")
-    
-    # Create embeddings
-    print("🔄 Creating embeddings...")
-    texts = [chunk["text"] for chunk in all_chunks]
-    embeddings = embedding_model.encode(texts, show_progress_bar=True)
-    embeddings = embeddings.astype('float32')
-    
-    print(f"✓ Created {len(embeddings)} embeddings (dim: {embeddings.shape[1]})")
-    
-    # Create FAISS index
-    print("🔄 Building FAISS index...")
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dimension)  # L2 distance
-    index.add(embeddings)
-    
-    # Save index
-    index_path = embeddings_dir / "kb_index.faiss"
-    faiss.write_index(index, str(index_path))
-    print(f"✓ Saved FAISS index to {index_path}")
-    
-    # Save metadata (chunk_id -> metadata mapping)
-    metadata_dict = {str(i): chunk for i, chunk in enumerate(all_chunks)}
-    meta_path = embeddings_dir / "kb_index_meta.pkl"
-    with open(meta_path, "wb") as f:
-        pickle.dump(metadata_dict, f)
-    print(f"✓ Saved metadata to {meta_path}")
-    
-    print("\n✅ Knowledge base preprocessing complete!")
-    print(f"   Index size: {index.ntotal} vectors")
-    print(f"   Embedding dimension: {dimension}")
+    run_pipeline(strategy="basic", workers=workers, batch_size=batch_size)
 
 
 if __name__ == "__main__":
-    process_knowledge_base()
-
+    from kb_pipeline import add_pipeline_arguments, run_pipeline
+    
+    parser = argparse.ArgumentParser(description="Build the knowledge base index (basic chunking)")
+    add_pipeline_arguments(parser)
+    args = parser.parse_args()
+    run_pipeline(
+        strategy="basic",
+        workers=args.workers,
+        batch_size=args.batch_size,
+        full_rebuild=args.full,
+        write_pickle=not args.no_pickle,
+    )
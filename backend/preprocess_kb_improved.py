@@ -2,18 +2,20 @@
 IMPROVED Knowledge Base Preprocessing Script
 
 Better chunking strategy that preserves step-by-step instructions.
+
+Chunking lives here; reading, embedding and writing are done by the shared
+parallel pipeline in kb_pipeline.py (incremental, manifest-based rebuilds).
+
+Usage:
+    python preprocess_kb_improved.py                          # incremental rebuild
+    python preprocess_kb_improved.py --workers 8 --batch-size 128
+    python preprocess_kb_improved.py --full                   # re-chunk and re-embed everything
 """
 
-import os
-import json
-import pickle
+import argparse
 import re
 from pathlib import Path
-from typing import List, Dict, Any
-import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
-from app.config import settings
+from typing import List, Dict, Any, Optional
 
 
 def detect_language(text: str) -> str:
@@ -142,103 +144,36 @@ def chunk_markdown_improved(content: str, filename: str) -> List[Dict[str, Any]]
     return chunks
 
 
-def process_knowledge_base_improved() -> None:
-    """Main preprocessing with improved chunking."""
-    backend_dir = Path(__file__).parent
-    kb_raw_dir = backend_dir / settings.kb_raw_dir
-    kb_processed_dir = backend_dir / settings.kb_processed_dir
-    embeddings_dir = backend_dir / settings.embeddings_dir
-    
-    kb_processed_dir.mkdir(parents=True, exist_ok=True)
-    embeddings_dir.mkdir(parents=True, exist_ok=True)
-    
-    if not kb_raw_dir.exists():
-        print(f"⚠ Warning: Knowledge base directory not found: {kb_raw_dir}")
-        return
-    
-    md_files = list(kb_raw_dir.glob("*.md"))
-    if not md_files:
-        print(f"⚠ Warning: No .md files found in {kb_raw_dir}")
-        return
-    
-    print(f"📚 Found {len(md_files)} markdown files")
+def process_knowledge_base_improved(
+    full_rebuild: bool = False,
+    workers: Optional[int] = None,
+    batch_size: int = 64,
+) -> None:
+    """
+    Main preprocessing with improved chunking.
     
-    # Load embedding model
-    print("🔄 Loading embedding model...")
-    model_kwargs = {}
-    if settings.hf_token:
-        model_kwargs["token"] = settings.hf_token
+    Runs the shared parallel pipeline (kb_pipeline.py) with this chunker.
+    """
+    from kb_pipeline import run_pipeline
     
-    embedding_model = SentenceTransformer(
-        settings.embedding_model_name,
-        **model_kwargs
+    run_pipeline(
+        strategy="improved",
+        workers=workers,
+        batch_size=batch_size,
+        full_rebuild=full_rebuild,
     )
-    print(f"✓ Loaded: {settings.embedding_model_name}")
-    
-    # Process all files with improved chunking
-    all_chunks = []
-    for md_file in md_files:
-        print(f"  Processing: {md_file.name}")
-        with open(md_file, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        chunks = chunk_markdown_improved(content, md_file.name)
-        all_chunks.extend(chunks)
-        
-        # Count by type
-        how_to_count = sum(1 for c in chunks if c["section_type"] == "how_to_test")
-        step_count = sum(1 for c in chunks if c["section_type"] == "how_to_test_step")
-        print(f"    → {len(chunks)} chunks ({how_to_count} how-to, {step_count} steps)")
-    
-    print(f"\n📦 Total chunks: {len(all_chunks)}")
-    
-    # Show breakdown
-    by_type = {}
-    for chunk in all_chunks:
-        section_type = chunk.get("section_type", "unknown")
-        by_type[section_type] = by_type.get(section_type, 0) + 1
-    
-    print("Chunk breakdown:")
-    for chunk_type, count in sorted(by_type.items()):
-        print(f"  - {chunk_type}: {count}")
-    
-    # Save chunks to JSONL
-    jsonl_path = kb_processed_dir / "kb_chunks.jsonl"
-    with open(jsonl_path, "w", encoding="utf-8") as f:
-        for chunk in all_chunks:
-            f.write(json.dumps(chunk, ensure_ascii=False) + "\n")
-    print(f"✓ Saved chunks to {jsonl_path}")
-    
-    # Create embeddings
-    print("🔄 Creating embeddings...")
-    texts = [chunk["text"] for chunk in all_chunks]
-    embeddings = embedding_model.encode(texts, show_progress_bar=True)
-    embeddings = embeddings.astype('float32')
-    
-    print(f"✓ Created {len(embeddings)} embeddings (dim: {embeddings.shape[1]})")
-    
-    # Create FAISS index
-    print("🔄 Building FAISS index...")
-    dimension = embeddings.shape[1]
-    index = faiss.IndexFlatL2(dimension)
-    index.add(embeddings)
-    
-    # Save index
-    index_path = embeddings_dir / "kb_index.faiss"
-    faiss.write_index(index, str(index_path))
-    print(f"✓ Saved FAISS index to {index_path}")
-    
-    # Save metadata
-    metadata_dict = {str(i): chunk for i, chunk in enumerate(all_chunks)}
-    meta_path = embeddings_dir / "kb_index_meta.pkl"
-    with open(meta_path, "wb") as f:
-        pickle.dump(metadata_dict, f)
-    print(f"✓ Saved metadata to {meta_path}")
-    
-    print("\n✅ Improved knowledge base preprocessing complete!")
-    print(f"   Index size: {index.ntotal} vectors")
-    print(f"   Embedding dimension: {dimension}")
 
 
 if __name__ == "__main__":
-    process_knowledge_base_improved()
+    from kb_pipeline import add_pipeline_arguments, run_pipeline
+    
+    parser = argparse.ArgumentParser(description="Build the knowledge base index (improved chunking)")
+    add_pipeline_arguments(parser)
+    args = parser.parse_args()
+    run_pipeline(
+        strategy="improved",
+        workers=args.workers,
+        batch_size=args.batch_size,
+        full_rebuild=args.full,
+        write_pickle=not args.no_pickle,
+    )
@@ -0,0 +1,14 @@
+"""
+Shared pytest setup.
+
+Tests run from backend/ (`pytest`) without API keys: LLM_PROVIDER is forced
+to ollama so importing app.config never needs a Gemini/Groq key. Tests that
+change settings use `monkeypatch.setattr(settings, name, value)` so the
+global settings object is restored afterwards.
+"""
+
+import os
+import sys
+
+os.environ.setdefault("LLM_PROVIDER", "ollama")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
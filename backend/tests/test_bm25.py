@@ -0,0 +1,68 @@
+"""Tests for bm25.py: tokenization, the term-major matrix and BM25 scoring."""
+
+import math
+
+import numpy as np
+import pytest
+
+from app.services.bm25 import BM25Index, build_term_matrix, save_term_matrix, tokenize
+
+
+DOCS = [
+    "Soil pH test: mix soil with vinegar.",
+    "Earthworms show healthy soil.",
+    "Check soil moisture by squeezing soil in your hand.",
+]
+
+
+def reference_bm25(docs, query, k1=1.5, b=0.75):
+    """Textbook Okapi BM25, one document at a time."""
+    tokenized = [tokenize(doc) for doc in docs]
+    avg_len = sum(len(tokens) for tokens in tokenized) / len(tokenized)
+    scores = []
+    for tokens in tokenized:
+        score = 0.0
+        for term in set(tokenize(query)):
+            df = sum(1 for other in tokenized if term in other)
+            if not df:
+                continue
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            tf = tokens.count(term)
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / avg_len))
+        scores.append(score)
+    return scores
+
+
+def test_tokenize_strips_punctuation():
+    assert tokenize("Soil pH: (6.5)!  मिट्टी। --") == ["soil", "ph", "6.5", "मिट्टी"]
+
+
+def test_term_matrix_is_term_major():
+    matrix = build_term_matrix(DOCS)
+    vocab = list(matrix["vocab"])
+    assert vocab == sorted(vocab)
+    soil = vocab.index("soil")
+    start, end = matrix["indptr"][soil], matrix["indptr"][soil + 1]
+    assert list(matrix["doc_ids"][start:end]) == [0, 1, 2]
+    assert list(matrix["tf"][start:end]) == [2, 1, 2]
+    assert list(matrix["doc_len"]) == [len(tokenize(doc)) for doc in DOCS]
+
+
+@pytest.mark.parametrize("query", ["soil moisture", "earthworms", "vinegar soil ph", "Soil, soil!"])
+def test_scores_match_reference_bm25(query):
+    scores = BM25Index.from_texts(DOCS).score(query)
+    assert scores.dtype == np.float32
+    np.testing.assert_allclose(scores, reference_bm25(DOCS, query), rtol=1e-5)
+
+
+def test_unknown_query_scores_zero():
+    scores = BM25Index.from_texts(DOCS).score("fertilizer")
+    assert scores.shape == (len(DOCS),)
+    assert not scores.any()
+
+
+def test_saved_matrix_loads_back(tmp_path):
+    path = tmp_path / "kb_bm25.npz"
+    save_term_matrix(path, build_term_matrix(DOCS))
+    loaded = BM25Index.load(path)
+    np.testing.assert_array_equal(loaded.score("soil moisture"), BM25Index.from_texts(DOCS).score("soil moisture"))
@@ -0,0 +1,240 @@
+"""Tests for circuit_breaker.py: state transitions, neutral outcomes and the Gemini stream guard."""
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    breaker_for_url,
+)
+from app.services.key_pool import KeyPool
+from app.services.llm_adapter import FallbackText, GeminiLLMAdapter
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+@pytest.fixture(autouse=True)
+def breaker_settings(monkeypatch):
+    monkeypatch.setattr(settings, "circuit_breaker_enabled", True)
+    monkeypatch.setattr(settings, "circuit_minimum_calls", 4)
+    monkeypatch.setattr(settings, "circuit_failure_rate_threshold", 0.5)
+    monkeypatch.setattr(settings, "circuit_slow_call_seconds", 8.0)
+    monkeypatch.setattr(settings, "circuit_slow_call_rate_threshold", 0.8)
+    monkeypatch.setattr(settings, "circuit_open_seconds", 30.0)
+    monkeypatch.setattr(settings, "circuit_half_open_max_calls", 1)
+
+
+def fail(breaker, times=1):
+    for _ in range(times):
+        with pytest.raises(RuntimeError):
+            with breaker.guard():
+                raise RuntimeError("provider down")
+
+
+def succeed(breaker, times=1):
+    for _ in range(times):
+        with breaker.guard():
+            pass
+
+
+def open_breaker():
+    breaker = CircuitBreaker("test")
+    fail(breaker, settings.circuit_minimum_calls)
+    assert breaker.state == OPEN
+    return breaker
+
+
+# ---- Closed -> open -----------------------------------------------------------------
+
+def test_stays_closed_below_minimum_calls():
+    breaker = CircuitBreaker("test")
+    fail(breaker, settings.circuit_minimum_calls - 1)
+    assert breaker.state == CLOSED
+
+
+def test_opens_at_failure_rate():
+    breaker = CircuitBreaker("test")
+    succeed(breaker, 2)
+    fail(breaker, 2)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 1
+
+
+def test_stays_closed_below_failure_rate():
+    breaker = CircuitBreaker("test")
+    succeed(breaker, 3)
+    fail(breaker, 1)
+    assert breaker.state == CLOSED
+
+
+def test_5xx_response_counts_as_failure():
+    breaker = CircuitBreaker("test")
+    for _ in range(settings.circuit_minimum_calls):
+        with breaker.guard() as attempt:
+            attempt.observe(FakeResponse(503))
+    assert breaker.state == OPEN
+
+
+def test_slow_calls_open_the_breaker():
+    breaker = CircuitBreaker("test")
+    for _ in range(settings.circuit_minimum_calls):
+        breaker.check()
+        breaker.record(settings.circuit_slow_call_seconds + 1, True)
+    assert breaker.state == OPEN
+    assert breaker.failures == 0
+
+
+# ---- Neutral outcomes ---------------------------------------------------------------
+
+def test_429_response_is_neutral():
+    breaker = CircuitBreaker("test")
+    for _ in range(10):
+        with breaker.guard() as attempt:
+            attempt.observe(FakeResponse(429))
+    assert breaker.state == CLOSED
+    assert breaker.calls == 0
+
+
+def test_raised_429_is_neutral():
+    breaker = CircuitBreaker("test")
+    for _ in range(10):
+        with pytest.raises(RateLimited):
+            with breaker.guard():
+                raise RateLimited()
+    assert breaker.state == CLOSED
+    assert breaker.calls == 0
+
+
+def test_cancellation_is_neutral():
+    breaker = CircuitBreaker("test")
+
+    async def guarded():
+        with breaker.guard():
+            await asyncio.sleep(10)
+
+    async def main():
+        for _ in range(10):
+            task = asyncio.ensure_future(guarded())
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(main())
+    assert breaker.state == CLOSED
+    assert breaker.calls == 0
+
+
+# ---- Open -> half-open -> closed / open ---------------------------------------------
+
+def test_open_breaker_fails_fast():
+    breaker = open_breaker()
+    with pytest.raises(CircuitOpenError) as raised:
+        with breaker.guard():
+            pytest.fail("the call must not be made")
+    assert raised.value.retry_in > 0
+    assert breaker.rejected == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.reject_if_open()
+
+
+def test_half_open_probe_success_closes(monkeypatch):
+    breaker = open_breaker()
+    monkeypatch.setattr(settings, "circuit_open_seconds", 0.0)
+    with breaker.guard():
+        assert breaker.state == HALF_OPEN
+        # Only one probe at a time
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_failure_rate"] == 0.0
+
+
+def test_half_open_probe_failure_reopens(monkeypatch):
+    breaker = open_breaker()
+    monkeypatch.setattr(settings, "circuit_open_seconds", 0.0)
+    fail(breaker)
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+
+def test_neutral_probe_frees_its_slot(monkeypatch):
+    breaker = open_breaker()
+    monkeypatch.setattr(settings, "circuit_open_seconds", 0.0)
+    with pytest.raises(RateLimited):
+        with breaker.guard():
+            raise RateLimited()
+    assert breaker.state == HALF_OPEN
+    succeed(breaker)
+    assert breaker.state == CLOSED
+
+
+def test_disabled_breaker_never_opens(monkeypatch):
+    monkeypatch.setattr(settings, "circuit_breaker_enabled", False)
+    breaker = CircuitBreaker("test")
+    fail(breaker, 10)
+    assert breaker.state == CLOSED
+
+
+def test_breaker_for_url_names_provider_and_endpoint():
+    assert breaker_for_url("https://api.groq.com/openai/v1/chat/completions").name == "groq:chat/completions"
+    assert breaker_for_url("http://localhost:11434/api/generate").name == "ollama:api/generate"
+
+
+# ---- Gemini stream guard ------------------------------------------------------------
+
+class BrokenStream:
+    """Legacy Gemini stream that yields one chunk, then fails."""
+
+    def __init__(self):
+        self.sent = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.sent:
+            raise RuntimeError("connection reset")
+        self.sent = True
+        return type("Chunk", (), {"text": "Step 1: "})()
+
+
+class BrokenStreamModel:
+    async def generate_content_async(self, prompt, stream=False):
+        return BrokenStream()
+
+
+def test_mid_stream_gemini_failures_count_against_its_breaker():
+    adapter = GeminiLLMAdapter.__new__(GeminiLLMAdapter)
+    adapter.use_new_api = False
+    adapter.model = BrokenStreamModel()
+    adapter.model_name = "gemini-test"
+    adapter.context_token_budget = settings.helper_context_tokens_gemini
+    adapter.breaker = CircuitBreaker("gemini:test")
+    adapter.key_pool = KeyPool("gemini-test", ["k"])
+
+    async def stream():
+        return [piece async for piece in adapter.stream_helper("ph", "en", "how?", ["chunk"])]
+
+    pieces = asyncio.run(stream())
+    assert pieces[0] == "Step 1: "
+    # The partial answer is marked so it is not cached
+    assert isinstance(pieces[-1], FallbackText) and pieces[-1] == ""
+    assert adapter.breaker.failures == 1
+
+    for _ in range(settings.circuit_minimum_calls - 1):
+        asyncio.run(stream())
+    assert adapter.breaker.state == OPEN
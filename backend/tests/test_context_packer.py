@@ -0,0 +1,48 @@
+"""Tests for context_packer.py: token estimates, budget packing and near-duplicate removal."""
+
+from app.services.context_packer import estimate_tokens, pack_chunk_positions, pack_chunks
+
+
+STEP_1 = "Step 1: Take a handful of soil from 15 cm deep."
+STEP_2 = "Step 2: Add water and squeeze it into a ball."
+PARENT = "How to test soil type at home.\n" + STEP_1 + "\n" + STEP_2
+
+
+def test_estimate_tokens_counts_devanagari_heavier():
+    assert estimate_tokens("a" * 40) == 11
+    assert estimate_tokens("मिट्टी" * 4) > estimate_tokens("mitti" * 4)
+
+
+def test_chunks_beyond_the_budget_are_skipped():
+    chunks = ["short chunk one", "x " * 400, "short chunk two"]
+    assert pack_chunks(chunks, token_budget=50) == ["short chunk one", "short chunk two"]
+
+
+def test_top_chunk_is_truncated_to_the_budget():
+    top = "\n".join(f"Line {i}: mix the soil sample with clean water." for i in range(40))
+    packed = pack_chunks([top, "next chunk"], token_budget=60)
+    assert packed[0].startswith("Line 0:")
+    assert estimate_tokens(packed[0]) <= 60
+    # Cut at a line break
+    assert packed[0].endswith("water.")
+
+
+def test_max_chunks():
+    chunks = [f"distinct chunk number {word}" for word in ("one", "two", "three", "four")]
+    assert len(pack_chunks(chunks, token_budget=1000, max_chunks=2)) == 2
+
+
+def test_exact_and_near_duplicates_are_dropped():
+    chunks = [STEP_1, STEP_1.upper(), STEP_1 + "!", STEP_2]
+    assert pack_chunks(chunks, token_budget=1000) == [STEP_1, STEP_2]
+
+
+def test_parent_replaces_its_steps_and_takes_their_rank():
+    chunks = [STEP_1, "Unrelated chunk about earthworms.", STEP_2, PARENT]
+    positions = pack_chunk_positions(chunks, token_budget=1000)
+    # The parent covers both steps and is ranked where the first step was
+    assert positions == [(3, PARENT), (1, "Unrelated chunk about earthworms.")]
+
+
+def test_step_after_its_parent_is_dropped():
+    assert pack_chunks([PARENT, STEP_2], token_budget=1000) == [PARENT]
@@ -0,0 +1,89 @@
+"""Tests for fuzzy_index.py and the lexical matching order of validators_enhanced.py."""
+
+import pytest
+
+from app.config import settings
+from app.services import fuzzy_index
+from app.services.fuzzy_index import FuzzyIndex, bounded_distance, fold, max_edits
+from app.services.validators_enhanced import validate_moisture_enhanced, validate_soil_type_enhanced
+
+
+@pytest.fixture(autouse=True)
+def no_sentence_encoder(monkeypatch):
+    # Lexical matching only: no background model load
+    monkeypatch.setattr(settings, "validator_embeddings_enabled", False)
+
+
+@pytest.mark.parametrize("a, b, bound, expected", [
+    ("black", "black", 1, 0),
+    ("blak", "black", 1, 1),
+    ("form", "from", 1, 1),  # Transposition
+    ("sandy", "soggy", 1, 2),  # Beyond the bound
+    ("abc", "abcdef", 1, 2),
+])
+def test_bounded_distance(a, b, bound, expected):
+    assert bounded_distance(a, b, bound) == expected
+
+
+def test_edit_budget_grows_with_length():
+    assert [max_edits(length) for length in (2, 3, 4, 7, 8)] == [0, 0, 1, 1, 2]
+
+
+def test_fold_merges_transliteration_variants():
+    assert fold("Chhikni") == fold("chikni")
+    assert fold("bhoora") == fold("bura")
+    assert fold("sukhee") == fold("suki")
+
+
+@pytest.mark.parametrize("parameter, text, language, expected", [
+    ("color", "blak", "en", "black"),
+    ("soil_type", "chiknee", "en", "clay"),
+    ("soil_type", "santy", "en", "sandy"),
+    ("moisture", "sukhee", "en", "dry"),
+    ("earthworms", "nahin", "hi", "no"),
+    ("moisture", "very drry", "en", "very_dry"),
+])
+def test_match_tolerates_misspellings(parameter, text, language, expected):
+    assert fuzzy_index.match(parameter, text, language).value == expected
+
+
+def test_short_words_match_exactly_only():
+    # "na" must not become "no"
+    assert fuzzy_index.match("earthworms", "na", "en") is None
+    assert fuzzy_index.match("earthworms", "no", "en").distance == 0
+
+
+def test_session_language_limits_values():
+    assert fuzzy_index.match("soil_type", "चिकनि", "en") is None
+    assert fuzzy_index.match("soil_type", "चिकनि", "hi").value == "clay"
+    # Without a language every script is searched (intent fast path)
+    assert fuzzy_index.match("soil_type", "चिकनि").value == "clay"
+
+
+def test_from_mapping_keeps_first_label():
+    index = FuzzyIndex.from_mapping({"moist": ["damp"], "wet": ["damp", "soaked"]})
+    assert index.best("dammp").value == "moist"
+    assert index.best("soakd").value == "wet"
+    assert index.best("xyz") is None
+
+
+# ---- validators_enhanced lexical order ----------------------------------------------
+
+@pytest.mark.parametrize("text, language, expected", [
+    # Value terms of any script beat the "मिट्टी" fallback, whatever the session language
+    ("चिकनी मिट्टी", "en", "clay"),
+    ("चिकनी मिट्टी", "hi", "clay"),
+    ("रेटीली मिट्टी", "hi", "sandy"),
+    ("मिट्टी", "hi", "loamy"),
+    ("chiknee", "en", "clay"),
+])
+def test_soil_type_enhanced(text, language, expected):
+    result = validate_soil_type_enhanced(text, language)
+    assert result.value == expected
+    assert result.is_confident
+
+
+def test_help_request_is_not_an_answer():
+    result = validate_moisture_enhanced("I don't know", "en")
+    assert result.value is None
+    assert not result.is_confident
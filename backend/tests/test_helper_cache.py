@@ -0,0 +1,92 @@
+"""Tests for helper_cache.py: memory and SQLite tiers, fallback skipping and the async variants."""
+
+import asyncio
+import threading
+
+from app.services.helper_cache import FallbackText, HelperResponseCache, normalize_message
+
+
+class ThreadRecordingCache(HelperResponseCache):
+    """Records the thread every blocking get()/set() runs on."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, response):
+        self.threads.append(threading.get_ident())
+        super().set(key, response)
+
+
+def test_key_ignores_case_punctuation_and_spacing():
+    assert normalize_message("How do I  test pH?") == normalize_message("how do i test ph")
+    key = HelperResponseCache.make_key("groq", "m", "ph", "en", "How do I test pH?", [3, 1], "v1")
+    assert key == HelperResponseCache.make_key("groq", "m", "ph", "en", "how do i test ph", [3, 1], "v1")
+    assert key != HelperResponseCache.make_key("groq", "m", "ph", "en", "how do i test ph", [3, 1], "v2")
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "helper_cache.sqlite")
+    HelperResponseCache(path).set("k", "Step 1: ...")
+    reopened = HelperResponseCache(path)
+    assert reopened.get("k") == "Step 1: ..."
+    assert reopened.disk_hits == 1
+    # Promoted to memory
+    assert reopened.get("k") == "Step 1: ..."
+    assert reopened.disk_hits == 1
+
+
+def test_fallback_and_empty_texts_are_not_cached(tmp_path):
+    cache = HelperResponseCache(str(tmp_path / "helper_cache.sqlite"))
+    cache.set("fallback", FallbackText("Please try again later."))
+    cache.set("empty", "")
+    assert cache.get("fallback") is None
+    assert cache.get("empty") is None
+    assert cache.stats()["disk_entries"] == 0
+
+
+def test_expired_disk_entries_are_misses(tmp_path):
+    cache = HelperResponseCache(str(tmp_path / "helper_cache.sqlite"), ttl_seconds=-1)
+    cache.set("k", "Step 1: ...")
+    cache.memory.clear()
+    assert cache.get("k") is None
+    assert cache.misses == 1
+
+
+def test_async_variants_keep_sqlite_off_the_event_loop(tmp_path):
+    cache = ThreadRecordingCache(str(tmp_path / "helper_cache.sqlite"))
+
+    async def main():
+        loop_thread = threading.get_ident()
+        await cache.set_async("k", "Step 1: ...")
+        cache.memory.clear()  # Force the disk read
+        value = await cache.get_async("k")
+        return loop_thread, value
+
+    loop_thread, value = asyncio.run(main())
+    assert value == "Step 1: ..."
+    assert len(cache.threads) == 2
+    assert loop_thread not in cache.threads
+
+
+def test_async_memory_hit_needs_no_worker_thread(tmp_path):
+    cache = ThreadRecordingCache(str(tmp_path / "helper_cache.sqlite"))
+    cache.memory.set("k", "Step 1: ...")
+    assert asyncio.run(cache.get_async("k")) == "Step 1: ..."
+    assert cache.threads == []
+
+
+def test_async_variants_without_disk_tier():
+    cache = HelperResponseCache(None)
+
+    async def main():
+        await cache.set_async("k", "Step 1: ...")
+        await cache.set_async("fallback", FallbackText("sorry"))
+        return await cache.get_async("k"), await cache.get_async("fallback")
+
+    assert asyncio.run(main()) == ("Step 1: ...", None)
+    assert cache.misses == 1
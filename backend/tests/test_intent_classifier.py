@@ -0,0 +1,30 @@
+"""Tests for the rule-based fast path of intent_classifier.py."""
+
+import pytest
+
+from app.services.intent_classifier import IntentClassifier
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return IntentClassifier(provider="ollama", model_name="test")
+
+
+@pytest.mark.parametrize("parameter, message, expected", [
+    # Answers
+    ("color", "black", ("answer", 0.95)),
+    ("moisture", "मिट्टी गीली है", ("answer", 0.95)),
+    ("color", "blak", ("answer", 0.9)),
+    ("name", "Ramesh", ("answer", 0.99)),
+    # "How do I test it?" names the parameter's values but is a help request
+    ("moisture", "how do I know if it is wet or dry", ("help_request", 0.95)),
+    ("color", "kaise pata kare ki kali hai", ("help_request", 0.95)),
+    ("soil_type", "चिकनी मिट्टी कैसे पहचानें", ("help_request", 0.95)),
+    # Unsure and follow-up questions
+    ("color", "don't know", ("help_request", 0.95)),
+    ("earthworms", "नहीं पता", ("help_request", 0.95)),
+    ("ph", "how to do step 2", ("help_request", 0.75)),
+    ("color", "I have a problem with this step", ("help_request", 0.75)),
+])
+def test_classify_quick(classifier, parameter, message, expected):
+    assert classifier._classify_quick(message, parameter) == expected
@@ -0,0 +1,189 @@
+"""Tests for key_pool.py: key selection, cooldowns and 429 rotation in call()/call_async()."""
+
+import asyncio
+
+import pytest
+
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.key_pool import KeyPool, is_quota_error, status_of
+from app.services.rate_limiter import key_label
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class QuotaError(Exception):
+    status_code = 429
+
+
+def healthy(pool, key):
+    return pool.stats()["keys"][key_label(key)]["healthy"]
+
+
+# ---- Helpers ------------------------------------------------------------------------
+
+@pytest.mark.parametrize("result, expected", [
+    (FakeResponse(429), 429),
+    (QuotaError(), 429),
+    (type("GenaiError", (Exception,), {"code": 503})(), 503),
+    (object(), None),
+])
+def test_status_of(result, expected):
+    assert status_of(result) == expected
+
+
+@pytest.mark.parametrize("result, expected", [
+    (FakeResponse(429), True),
+    (FakeResponse(200), False),
+    (FakeResponse(500), False),
+    (Exception("429 RESOURCE_EXHAUSTED"), True),
+    (Exception("You exceeded your current quota"), True),
+    (Exception("connection reset"), False),
+])
+def test_is_quota_error(result, expected):
+    assert is_quota_error(result) is expected
+
+
+# ---- Selection ----------------------------------------------------------------------
+
+def test_empty_and_duplicate_keys_are_dropped():
+    pool = KeyPool("test", ["a", "", "a", "b"])
+    assert pool.keys == ["a", "b"]
+    with pytest.raises(ValueError):
+        KeyPool("test", ["", ""])
+
+
+def test_least_loaded_spreads_concurrent_leases():
+    pool = KeyPool("test", ["a", "b"], strategy="least_loaded")
+    with pool.lease() as first, pool.lease() as second:
+        assert {first.key, second.key} == {"a", "b"}
+
+
+def test_round_robin_rotates():
+    pool = KeyPool("test", ["a", "b", "c"], strategy="round_robin")
+    used = []
+    for _ in range(6):
+        with pool.lease() as lease:
+            used.append(lease.key)
+    assert used == ["a", "b", "c", "a", "b", "c"]
+
+
+def test_quota_error_cools_key_down_for_retry_after():
+    pool = KeyPool("test", ["a", "b"])
+    with pool.lease() as lease:
+        lease.observe(FakeResponse(429, {"retry-after": "30"}))
+    assert not healthy(pool, lease.key)
+    assert pool.stats()["keys"][key_label(lease.key)]["cooldown_remaining_s"] > 25
+    # The other key is picked while the first one cools down
+    for _ in range(3):
+        with pool.lease() as other:
+            assert other.key != lease.key
+
+
+def test_auth_error_cools_key_down():
+    pool = KeyPool("test", ["a", "b"])
+    with pool.lease() as lease:
+        lease.observe(FakeResponse(401))
+    assert not healthy(pool, lease.key)
+
+
+def test_open_circuit_does_not_count_against_the_key():
+    pool = KeyPool("test", ["a"])
+    with pytest.raises(CircuitOpenError):
+        with pool.lease():
+            raise CircuitOpenError("test", 5)
+    assert pool.stats()["keys"][key_label("a")]["failures"] == 0
+
+
+def test_every_key_cooling_down_still_leases_one():
+    pool = KeyPool("test", ["a", "b"])
+    for _ in range(2):
+        with pool.lease() as lease:
+            lease.fail(QuotaError())
+    assert pool.stats()["healthy_keys"] == 0
+    with pool.lease() as lease:
+        assert lease.key in ("a", "b")
+
+
+# ---- call / call_async --------------------------------------------------------------
+
+def test_call_rotates_to_the_next_key_on_429():
+    pool = KeyPool("test", ["a", "b"])
+    calls = []
+
+    def call(key, max_retries):
+        calls.append((key, max_retries))
+        return FakeResponse(429 if len(calls) == 1 else 200)
+
+    result = pool.call(call)
+    assert result.status_code == 200
+    first, second = calls
+    # No same-key retries while another key is healthy; the default on the last key
+    assert first[1] == 0 and second[1] is None
+    assert first[0] != second[0]
+    assert not healthy(pool, first[0])
+
+
+def test_call_rotates_on_raised_429():
+    pool = KeyPool("test", ["a", "b"])
+    keys = []
+
+    def call(key, max_retries):
+        keys.append(key)
+        if len(keys) == 1:
+            raise QuotaError("429")
+        return "ok"
+
+    assert pool.call(call) == "ok"
+    assert len(set(keys)) == 2
+
+
+def test_call_on_a_single_key_pool_keeps_default_retries():
+    pool = KeyPool("test", ["a"])
+    seen = []
+    pool.call(lambda key, max_retries: seen.append(max_retries) or FakeResponse(200))
+    assert seen == [None]
+
+
+def test_call_returns_last_429_when_every_key_is_limited():
+    pool = KeyPool("test", ["a", "b", "c"])
+    calls = []
+
+    def call(key, max_retries):
+        calls.append(key)
+        return FakeResponse(429)
+
+    assert pool.call(call).status_code == 429
+    # Each key is tried once
+    assert sorted(calls) == ["a", "b", "c"]
+
+
+def test_call_does_not_rotate_other_errors():
+    pool = KeyPool("test", ["a", "b"])
+    calls = []
+
+    def call(key, max_retries):
+        calls.append(key)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        pool.call(call)
+    assert len(calls) == 1
+
+
+def test_call_async_rotates_to_the_next_key_on_429():
+    pool = KeyPool("test", ["a", "b"])
+    calls = []
+
+    async def call(key, max_retries):
+        calls.append((key, max_retries))
+        await asyncio.sleep(0)
+        return FakeResponse(429 if len(calls) == 1 else 200)
+
+    result = asyncio.run(pool.call_async(call))
+    assert result.status_code == 200
+    assert [retries for _, retries in calls] == [0, None]
+    assert calls[0][0] != calls[1][0]
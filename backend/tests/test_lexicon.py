@@ -0,0 +1,116 @@
+"""Tests for lexicon.py: normalization, longest-term matching, fallback terms and phrase groups."""
+
+import pytest
+
+from app.services import lexicon, validators
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("  Geeli   Mitti ", "gili mitti"),
+    ("BHOORA", "bhura"),
+    ("laal", "lal"),
+    ("don't_know", "dont know"),
+    ("रेतीली", "रेतिलि"),
+    ("हाँ", "हां"),
+    ("सड़ी।", "सडि"),
+])
+def test_normalize(text, expected):
+    assert lexicon.normalize(text) == expected
+
+
+# ---- Values (validators) ------------------------------------------------------------
+
+@pytest.mark.parametrize("parameter, text, language, expected", [
+    ("color", "it is kala", "en", "black"),
+    ("color", "मिट्टी भूरी है", "hi", "brown"),
+    ("moisture", "geeli hai", "en", "wet"),
+    ("moisture", "gili hai", "en", "wet"),
+    ("soil_type", "रेतीली", "hi", "sandy"),
+    # Transliterations are accepted in Hindi sessions too
+    ("soil_type", "chikni", "hi", "clay"),
+    # Whole utterance is the start of a term
+    ("color", "bhu", "en", "brown"),
+])
+def test_scan_finds_value(parameter, text, language, expected):
+    assert lexicon.scan(parameter, text, language).value == expected
+
+
+@pytest.mark.parametrize("parameter, text, language, expected", [
+    ("moisture", "very dry", "en", "very_dry"),
+    ("moisture", "it is very wet", "en", "wet"),
+    ("ph", "very acidic soil", "en", "very_acidic"),
+    ("moisture", "बहुत सूखी", "hi", "very_dry"),
+])
+def test_longest_term_wins(parameter, text, language, expected):
+    assert lexicon.scan(parameter, text, language).value == expected
+
+
+def test_terms_match_at_word_start_only():
+    # "no" must not match inside "know", nor "hain" inside "chain"
+    assert lexicon.scan("earthworms", "I know", "en").value is None
+    assert lexicon.scan("earthworms", "chain", "en").value is None
+    assert lexicon.scan("earthworms", "no worms", "en").value == "no"
+
+
+def test_help_phrase_beats_value_word():
+    # "नहीं पता" (don't know) contains "नहीं" (no)
+    match = lexicon.scan("earthworms", "नहीं पता", "hi")
+    assert match.is_help
+    assert lexicon.match_value("earthworms", "नहीं पता", "hi") is None
+    assert lexicon.is_help_request("I don't know", "en")
+
+
+def test_related_terms_are_not_values():
+    assert lexicon.scan("moisture", "damp", "en").value is None
+    assert "damp" in lexicon.synonyms("moisture", related=True)["moist"]
+    assert "damp" not in lexicon.synonyms("moisture")["moist"]
+
+
+# ---- Fallback terms -----------------------------------------------------------------
+
+@pytest.mark.parametrize("text, expected", [
+    ("मिट्टी", "loamy"),
+    ("चिकनी मिट्टी", "clay"),
+    ("मिट्टी चिकनी है", "clay"),
+    ("रेतीली मिट्टी", "sandy"),
+])
+def test_fallback_term_only_when_no_value_term(text, expected):
+    assert lexicon.scan("soil_type", text, "hi").value == expected
+
+
+def test_mappings_list_fallback_terms_last():
+    hindi = validators.SOIL_TYPE_MAPPINGS["hi"]
+    assert list(hindi)[-1] == "मिट्टी"
+    assert hindi["चिकनी"] == "clay"
+    assert validators.validate_soil_type("चिकनी मिट्टी", "hi").value == "clay"
+
+
+# ---- Intent fast path ---------------------------------------------------------------
+
+def test_intent_scan_sees_every_language_and_phrase_groups():
+    match = lexicon.scan("color", "kaise pata kare ki lal hai")
+    assert match.value == "red"
+    assert {"value", "how_to"} <= match.groups
+
+    assert "unsure" in lexicon.scan("color", "don't know").groups
+    assert "hint" in lexicon.scan("color", "light").groups
+    assert "follow_up" in lexicon.scan("ph", "problem after step 2").groups
+    assert "how_to" in lexicon.scan("soil_type", "मिट्टी कैसे जांचें").groups
+
+
+def test_intent_scan_has_no_fallback_terms():
+    # "मिट्टी" is only a hint for the intent classifier, not an answer
+    match = lexicon.scan("soil_type", "मिट्टी")
+    assert match.value is None
+    assert "hint" in match.groups
+
+
+def test_unknown_parameter_still_sees_phrases():
+    assert "how_to" in lexicon.scan("name", "how do I write it").groups
+
+
+def test_topic_and_values():
+    assert lexicon.mentions_topic("ph", "What is the pH of soil?")
+    assert not lexicon.mentions_topic("ph", "earthworms")
+    assert lexicon.canonical_values("location") == []
+    assert "clay" in lexicon.canonical_values("soil_type")
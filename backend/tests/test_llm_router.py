@@ -0,0 +1,149 @@
+"""Tests for llm_router.py: hedged requests, failover and latency-based ordering."""
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.helper_cache import FallbackText
+from app.services.llm_adapter import LLMAdapter
+from app.services.llm_router import MultiProviderLLMAdapter
+
+
+class FakeAdapter(LLMAdapter):
+    """Answers `text` after `delay` seconds (raises `error` if set)."""
+
+    def __init__(self, name, delay=0.0, text=None, error=None):
+        self.provider_name = name
+        self.model_name = name
+        self.delay = delay
+        self.text = f"answer from {name}" if text is None else text
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    def generate_helper(self, parameter, language, user_message, retrieved_chunks):
+        return self.text
+
+    async def generate_helper_async(self, parameter, language, user_message, retrieved_chunks):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.text
+
+
+@pytest.fixture(autouse=True)
+def hedge_settings(monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedge_initial_delay_seconds", 0.05)
+    monkeypatch.setattr(settings, "llm_hedge_min_delay_seconds", 0.01)
+    monkeypatch.setattr(settings, "llm_hedge_max_delay_seconds", 1.0)
+    monkeypatch.setattr(settings, "llm_failover_ratio", 2.0)
+    monkeypatch.setattr(settings, "llm_failover_window_seconds", 60.0)
+
+
+def helper(router):
+    return asyncio.run(router.generate_helper_async("ph", "en", "how?", ["chunk"]))
+
+
+def test_fast_primary_is_not_hedged():
+    primary, secondary = FakeAdapter("primary"), FakeAdapter("secondary")
+    router = MultiProviderLLMAdapter([primary, secondary])
+    assert helper(router) == "answer from primary"
+    assert secondary.calls == 0
+    assert router.counters["hedged"] == 0
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    primary, secondary = FakeAdapter("primary", delay=1.0), FakeAdapter("secondary")
+    router = MultiProviderLLMAdapter([primary, secondary])
+    assert helper(router) == "answer from secondary"
+    assert router.counters["hedged"] == 1
+    assert router.counters["secondary_wins"] == 1
+    assert primary.cancelled
+
+
+def test_failed_primary_fails_over_at_once():
+    primary = FakeAdapter("primary", error=RuntimeError("down"))
+    secondary = FakeAdapter("secondary")
+    router = MultiProviderLLMAdapter([primary, secondary])
+    assert helper(router) == "answer from secondary"
+    assert router.counters["failovers"] == 1
+    assert router.counters["hedged"] == 0
+
+
+def test_fallback_text_counts_as_failure():
+    primary = FakeAdapter("primary", text=FallbackText("sorry"))
+    secondary = FakeAdapter("secondary")
+    router = MultiProviderLLMAdapter([primary, secondary])
+    assert helper(router) == "answer from secondary"
+
+
+def test_last_fallback_is_returned_when_every_provider_fails():
+    router = MultiProviderLLMAdapter([
+        FakeAdapter("primary", error=RuntimeError("down")),
+        FakeAdapter("secondary", text=FallbackText("sorry")),
+    ])
+    assert helper(router) == "sorry"
+
+
+def test_race_raises_when_every_provider_raised():
+    router = MultiProviderLLMAdapter([
+        FakeAdapter("primary", error=RuntimeError("first")),
+        FakeAdapter("secondary", error=RuntimeError("second")),
+    ])
+
+    async def race():
+        return await router._race(
+            "complete", lambda adapter: adapter.generate_helper_async("ph", "en", "", []), bool,
+        )
+
+    with pytest.raises(RuntimeError, match="second"):
+        asyncio.run(race())
+
+
+def test_losing_results_are_discarded():
+    primary = FakeAdapter("primary", text=FallbackText("sorry"))
+    secondary = FakeAdapter("secondary")
+    router = MultiProviderLLMAdapter([primary, secondary])
+    discarded = []
+
+    async def discard(result):
+        discarded.append(result)
+
+    async def race():
+        return await router._race(
+            "complete",
+            lambda adapter: adapter.generate_helper_async("ph", "en", "", []),
+            lambda text: not isinstance(text, FallbackText),
+            discard=discard,
+        )
+
+    assert asyncio.run(race()) == "answer from secondary"
+    assert discarded == ["sorry"]
+
+
+def test_slow_primary_is_demoted():
+    primary, secondary = FakeAdapter("primary"), FakeAdapter("secondary")
+    router = MultiProviderLLMAdapter([primary, secondary])
+    assert router.ordered() == [primary, secondary]
+    router._stats(primary, "complete").record(3.0)
+    router._stats(secondary, "complete").record(1.0)
+    assert router.ordered() == [secondary, primary]
+    # Within the failover ratio the configured order is kept
+    router._stats(primary, "complete").ewma = 1.5
+    assert router.ordered() == [primary, secondary]
+
+
+def test_hedge_delay_follows_latency_percentile(monkeypatch):
+    monkeypatch.setattr(settings, "llm_hedge_percentile", 90.0)
+    adapter = FakeAdapter("primary")
+    router = MultiProviderLLMAdapter([adapter])
+    assert router.hedge_delay(adapter) == pytest.approx(0.05)
+    for latency in [0.1] * 9 + [0.5]:
+        router._stats(adapter, "complete").record(latency)
+    assert router.hedge_delay(adapter) == pytest.approx(0.14)
@@ -0,0 +1,250 @@
+"""Tests for rate_limiter.py: Retry-After parsing, token buckets, priorities and 429 retries."""
+
+import asyncio
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+from app.config import settings
+from app.services.rate_limiter import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    KeyRateLimiter,
+    RateLimitTimeout,
+    parse_retry_after,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, usage=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._usage = usage
+
+    def json(self):
+        return {"usage": {"total_tokens": self._usage}} if self._usage is not None else {}
+
+
+# ---- parse_retry_after --------------------------------------------------------------
+
+@pytest.mark.parametrize("headers, expected", [
+    (None, None),
+    ({}, None),
+    ({"retry-after": "7"}, 7.0),
+    ({"retry-after": " 1.5 "}, 1.5),
+    ({"retry-after": "-3"}, 0.0),
+    ({"x-ratelimit-reset-requests": "2m59.56s"}, 179.56),
+    ({"x-ratelimit-reset-tokens": "120ms"}, 0.12),
+    ({"x-ratelimit-reset-requests": "1h2m3s"}, 3723.0),
+    # The later of the two Groq resets wins
+    ({"x-ratelimit-reset-requests": "7.66s", "x-ratelimit-reset-tokens": "30s"}, 30.0),
+    ({"x-ratelimit-reset-requests": "soon"}, None),
+])
+def test_parse_retry_after(headers, expected):
+    result = parse_retry_after(headers)
+    if expected is None:
+        assert result is None
+    else:
+        assert result == pytest.approx(expected)
+
+
+def test_parse_retry_after_http_date():
+    wait = parse_retry_after({"retry-after": formatdate(time.time() + 60, usegmt=True)})
+    assert 55 <= wait <= 61
+
+
+def test_retry_after_header_wins_over_groq_resets():
+    assert parse_retry_after({"retry-after": "2", "x-ratelimit-reset-requests": "1m"}) == 2.0
+
+
+# ---- Buckets ------------------------------------------------------------------------
+
+def test_requests_bucket_runs_out():
+    limiter = KeyRateLimiter("test", rpm=2, tpm=0)
+    limiter.acquire_sync(max_wait=0.1)
+    limiter.acquire_sync(max_wait=0.1)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire_sync(max_wait=0.05)
+    assert limiter.timeouts == 1
+
+
+def test_unlimited_key_never_waits():
+    limiter = KeyRateLimiter("test", rpm=0, tpm=0)
+    for _ in range(100):
+        assert limiter.acquire_sync(tokens=10_000, max_wait=0) < 0.05
+
+
+def test_tokens_bucket_counts_request_size():
+    limiter = KeyRateLimiter("test", rpm=0, tpm=1000)
+    limiter.acquire_sync(tokens=800, max_wait=0.1)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire_sync(tokens=800, max_wait=0.05)
+    # A small request still fits in what is left
+    limiter.acquire_sync(tokens=100, max_wait=0.1)
+
+
+def test_oversized_request_goes_through_on_a_full_bucket():
+    limiter = KeyRateLimiter("test", rpm=0, tpm=1000)
+    limiter.acquire_sync(tokens=5000, max_wait=0.1)
+    assert limiter.available_tokens == pytest.approx(0.0, abs=1.0)
+
+
+def test_block_for_holds_every_request():
+    limiter = KeyRateLimiter("test", rpm=100, tpm=0)
+    limiter.block_for(5)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire_sync(max_wait=0.05)
+    assert limiter.stats()["blocked_for_s"] > 4
+
+
+def test_observe_429_blocks_key_for_retry_after():
+    limiter = KeyRateLimiter("test", rpm=100, tpm=0)
+    assert limiter.observe(FakeResponse(429, {"retry-after": "3"})) is True
+    assert limiter.throttled == 1
+    assert 2 < limiter.blocked_until - time.monotonic() <= 3
+
+
+def test_observe_trusts_provider_remaining_budget():
+    limiter = KeyRateLimiter("test", rpm=100, tpm=10_000)
+    headers = {"x-ratelimit-remaining-requests": "3", "x-ratelimit-remaining-tokens": "500"}
+    assert limiter.observe(FakeResponse(200, headers)) is False
+    assert limiter.available_requests <= 3
+    assert limiter.available_tokens <= 500
+
+
+def test_observe_charges_actual_token_usage():
+    limiter = KeyRateLimiter("test", rpm=0, tpm=10_000)
+    limiter.acquire_sync(tokens=100, max_wait=0)
+    limiter.observe(FakeResponse(200, usage=600), estimated_tokens=100)
+    # 100 reserved up front + 500 more actually used
+    assert limiter.available_tokens == pytest.approx(9400, abs=5)
+
+
+# ---- Priorities ---------------------------------------------------------------------
+
+def test_interactive_waiter_is_served_before_background():
+    limiter = KeyRateLimiter("test", rpm=600, tpm=0)  # One request per 0.1s
+    limiter.available_requests = 0.0  # Drained
+
+    order = []
+
+    async def waiter(name, priority, delay):
+        await asyncio.sleep(delay)
+        await limiter.acquire(priority=priority, max_wait=5)
+        order.append(name)
+
+    async def main():
+        # Background queues first, interactive arrives later but is served first
+        await asyncio.gather(
+            waiter("background", PRIORITY_BACKGROUND, 0.0),
+            waiter("interactive", PRIORITY_INTERACTIVE, 0.05),
+        )
+
+    asyncio.run(main())
+    assert order == ["interactive", "background"]
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    limiter = KeyRateLimiter("test", rpm=60, tpm=0)
+    limiter.available_requests = 0.0
+
+    async def main():
+        task = asyncio.ensure_future(limiter.acquire(max_wait=5))
+        await asyncio.sleep(0.05)
+        assert limiter.stats()["queue_depth"] == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert limiter.stats()["queue_depth"] == 0
+
+    asyncio.run(main())
+
+
+def test_sync_and_async_waiters_share_one_queue():
+    limiter = KeyRateLimiter("test", rpm=600, tpm=0)  # One request per 0.1s
+    limiter.available_requests = 0.0
+    done = []
+
+    def sync_caller():
+        limiter.acquire_sync(max_wait=5)
+        done.append("sync")
+
+    async def main():
+        thread = threading.Thread(target=sync_caller)
+        thread.start()
+        await limiter.acquire(max_wait=5)
+        done.append("async")
+        await asyncio.to_thread(thread.join)
+
+    asyncio.run(main())
+    assert sorted(done) == ["async", "sync"]
+    assert sum(limiter.granted.values()) == 2
+
+
+# ---- run / run_sync -----------------------------------------------------------------
+
+def test_run_sync_retries_429_then_returns(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_max_retries", 3)
+    limiter = KeyRateLimiter("test", rpm=0, tpm=0)
+    responses = iter([FakeResponse(429, {"retry-after": "0"}), FakeResponse(200)])
+    result = limiter.run_sync(lambda: next(responses))
+    assert result.status_code == 200
+    assert limiter.retries == 1
+    assert limiter.throttled == 1
+
+
+def test_run_sync_returns_last_429_after_max_retries():
+    limiter = KeyRateLimiter("test", rpm=0, tpm=0)
+    calls = []
+
+    def call():
+        calls.append(1)
+        return FakeResponse(429, {"retry-after": "0"})
+
+    result = limiter.run_sync(call, max_retries=2)
+    assert result.status_code == 429
+    assert len(calls) == 3
+
+
+def test_run_with_no_retries_hands_429_back_at_once():
+    limiter = KeyRateLimiter("test", rpm=0, tpm=0)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return FakeResponse(429, {"retry-after": "0"})
+
+    result = asyncio.run(limiter.run(call, max_retries=0))
+    assert result.status_code == 429
+    assert len(calls) == 1
+    assert limiter.retries == 0
+
+
+def test_run_reraises_raised_429_after_retries():
+    limiter = KeyRateLimiter("test", rpm=0, tpm=0)
+
+    class RateLimited(Exception):
+        status_code = 429
+        headers = {"retry-after": "0"}
+
+    async def call():
+        raise RateLimited()
+
+    with pytest.raises(RateLimited):
+        asyncio.run(limiter.run(call, max_retries=1))
+    assert limiter.retries == 1
+
+
+def test_run_does_not_retry_other_errors():
+    limiter = KeyRateLimiter("test", rpm=0, tpm=0)
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        limiter.run_sync(call, max_retries=3)
+    assert len(calls) == 1
@@ -0,0 +1,246 @@
+"""Tests for single_flight.py: coalescing, cancellation and stream fan-out."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.config import settings
+from app.services.llm_adapter import LLMAdapter
+from app.services.single_flight import CoalescingLLMAdapter, SingleFlight, make_key, normalize_prompt
+
+
+class Upstream:
+    """Counts calls; every call waits on `release` before returning."""
+
+    def __init__(self, result="answer"):
+        self.calls = 0
+        self.result = result
+        self.release = None
+        self.cancelled = False
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def test_make_key_and_normalize_prompt():
+    assert normalize_prompt("  what   is\n pH ") == "what is pH"
+    assert make_key("a", 1) == make_key("a", 1)
+    assert make_key("a", 1) != make_key("a", 2)
+
+
+def test_concurrent_calls_share_one_upstream_request():
+    group = SingleFlight("test")
+    upstream = Upstream()
+
+    async def main():
+        upstream.release = asyncio.Event()
+        waiters = [asyncio.ensure_future(group.do("k", upstream)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        upstream.release.set()
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(main()) == ["answer"] * 5
+    assert upstream.calls == 1
+    assert group.stats() == {"calls": 5, "upstream": 1, "saved": 4, "in_flight": 0}
+
+
+def test_different_keys_are_not_coalesced():
+    group = SingleFlight("test")
+    upstream = Upstream()
+
+    async def main():
+        upstream.release = asyncio.Event()
+        upstream.release.set()
+        await asyncio.gather(group.do("a", upstream), group.do("b", upstream))
+
+    asyncio.run(main())
+    assert upstream.calls == 2
+
+
+def test_finished_call_is_not_reused():
+    group = SingleFlight("test")
+    upstream = Upstream()
+
+    async def main():
+        upstream.release = asyncio.Event()
+        upstream.release.set()
+        await group.do("k", upstream)
+        await group.do("k", upstream)
+
+    asyncio.run(main())
+    assert upstream.calls == 2
+
+
+def test_one_cancelled_waiter_does_not_cancel_the_others():
+    group = SingleFlight("test")
+    upstream = Upstream()
+
+    async def main():
+        upstream.release = asyncio.Event()
+        first = asyncio.ensure_future(group.do("k", upstream))
+        second = asyncio.ensure_future(group.do("k", upstream))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        upstream.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "answer"
+    assert not upstream.cancelled
+
+
+def test_last_waiter_going_away_cancels_the_request():
+    group = SingleFlight("test")
+    upstream = Upstream()
+
+    async def main():
+        upstream.release = asyncio.Event()
+        waiter = asyncio.ensure_future(group.do("k", upstream))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert upstream.cancelled
+    assert group.stats()["in_flight"] == 0
+
+
+def test_errors_reach_every_waiter():
+    group = SingleFlight("test")
+    upstream = Upstream(result=RuntimeError("provider down"))
+
+    async def main():
+        upstream.release = asyncio.Event()
+        waiters = [asyncio.ensure_future(group.do("k", upstream)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        upstream.release.set()
+        return await asyncio.gather(*waiters, return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert upstream.calls == 1
+
+
+def test_do_sync_coalesces_threads():
+    group = SingleFlight("test")
+    calls = []
+    started = threading.Event()
+    results = []
+
+    def call():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "answer"
+
+    def worker():
+        results.append(group.do_sync("k", call))
+
+    leader = threading.Thread(target=worker)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert results == ["answer"] * 4
+    assert len(calls) == 1
+    assert group.stats()["saved"] == 3
+
+
+def test_do_sync_raises_the_leaders_error_to_followers():
+    group = SingleFlight("test")
+    started = threading.Event()
+    errors = []
+
+    def call():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("provider down")
+
+    def worker():
+        try:
+            group.do_sync("k", call)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=worker)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=worker)
+    follower.start()
+    leader.join()
+    follower.join()
+    assert len(errors) == 2
+
+
+def test_disabled_coalescing_calls_upstream_every_time(monkeypatch):
+    monkeypatch.setattr(settings, "llm_coalescing_enabled", False)
+    group = SingleFlight("test")
+    upstream = Upstream()
+
+    async def main():
+        upstream.release = asyncio.Event()
+        upstream.release.set()
+        await asyncio.gather(*(group.do("k", upstream) for _ in range(3)))
+
+    asyncio.run(main())
+    assert upstream.calls == 3
+    assert group.stats()["calls"] == 0
+
+
+# ---- Streams ------------------------------------------------------------------------
+
+class StreamingAdapter(LLMAdapter):
+    provider_name = "fake"
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.streams = 0
+        self.release = None
+
+    def generate_helper(self, parameter, language, user_message, retrieved_chunks):
+        return "helper"
+
+    async def stream_helper(self, parameter, language, user_message, retrieved_chunks):
+        self.streams += 1
+        yield "first "
+        await self.release.wait()
+        yield "second"
+
+
+def test_concurrent_streams_share_one_upstream_stream():
+    inner = StreamingAdapter()
+    adapter = CoalescingLLMAdapter(inner)
+
+    async def collect():
+        return "".join([piece async for piece in adapter.stream_helper("ph", "en", "how?", ["chunk"])])
+
+    async def main():
+        inner.release = asyncio.Event()
+        early = asyncio.ensure_future(collect())
+        await asyncio.sleep(0.01)
+        # A late joiner replays "first " before following the live stream
+        late = asyncio.ensure_future(collect())
+        await asyncio.sleep(0.01)
+        inner.release.set()
+        return await asyncio.gather(early, late)
+
+    assert asyncio.run(main()) == ["first second", "first second"]
+    assert inner.streams == 1
@@ -0,0 +1,60 @@
+"""Tests for ttl_cache.py: LRU eviction, expiry and counters."""
+
+import time
+
+from app.services.ttl_cache import LRUTTLCache
+
+
+def test_get_returns_stored_value():
+    cache = LRUTTLCache(maxsize=2)
+    cache.set("a", [1, 2])
+    assert cache.get("a") == [1, 2]
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUTTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl():
+    cache = LRUTTLCache(maxsize=2, ttl_seconds=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_non_positive_ttl_never_expires():
+    cache = LRUTTLCache(maxsize=2, ttl_seconds=0)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    assert cache.get("a") == 1
+
+
+def test_zero_maxsize_disables_cache():
+    cache = LRUTTLCache(maxsize=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_clear_keeps_counters():
+    cache = LRUTTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
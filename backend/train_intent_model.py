@@ -0,0 +1,288 @@
+"""
+Train the local answer / help-request model (app/services/intent_model.py).
+
+Training data, all offline:
+- Answers: every lexicon value and hint (app/services/lexicon.py) in
+  English, Hindi and transliterated answer templates, plus descriptive
+  answers that name no lexicon term ("looks like charcoal")
+- Help requests: the lexicon's help / unsure / follow-up phrases and
+  question templates about each parameter, plus the farmer help queries
+  in app/data/benchmarks/retrieval_queries.json
+- Audit logs (optional, --audit-log): server logs with "📊 Audit: {...}"
+  lines or JSONL with {"user_message", "intent"[, "intent_confidence"]};
+  turns below --min-confidence are skipped
+
+The report replays the hand-labeled turns in
+app/data/benchmarks/intent_turns.json (never trained on) through the
+rule-based fast path, then the model, and prints the LLM call rate with
+and without the model, the accuracy of local decisions and the µs per
+model decision, for a few thresholds.
+
+Usage:
+    python train_intent_model.py
+    python train_intent_model.py --audit-log server.log --audit-log reviewed.jsonl
+    python train_intent_model.py --report-only --output report.json
+"""
+
+import argparse
+import ast
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.config import settings
+from app.services import lexicon
+from app.services.intent_classifier import IntentClassifier
+from app.services.intent_model import IntentModel, default_model_path, train_intent_model, DEFAULT_DIM
+
+
+BACKEND_DIR = Path(__file__).parent
+HELP_QUERIES = BACKEND_DIR / "app" / "data" / "benchmarks" / "retrieval_queries.json"
+EVAL_TURNS = BACKEND_DIR / "app" / "data" / "benchmarks" / "intent_turns.json"
+AUDIT_MARKER = "📊 Audit: "
+REPORT_THRESHOLDS = (0.8, 0.9, 0.95)
+
+HELP, ANSWER = 1, 0
+
+# Templates: "{t}" = lexicon term or description
+ANSWER_TEMPLATES = {
+    "en": ["{t}", "it is {t}", "its {t}", "mostly {t}", "{t} i think", "looks {t} to me", "my soil is {t}", "a bit {t}"],
+    "hi": ["{t}", "{t} है", "मिट्टी {t} है", "मेरी मिट्टी {t} है", "थोड़ी {t} है", "{t} लग रही है"],
+    "translit": ["{t} hai", "mitti {t} hai", "meri mitti {t} hai", "thodi {t} hai", "{t} lag rahi hai"],
+}
+DESCRIPTIONS = {
+    "en": [
+        "looks like charcoal", "like wet ash", "like old bricks", "the colour of rust", "like cocoa powder",
+        "sticks to my hands", "feels rough and sandy", "falls apart easily", "makes a ball that stays",
+        "hard like a stone", "soft and crumbly", "smells like manure", "like rotten eggs", "smells of petrol",
+        "nothing special", "the strip went red", "the paper turned blue", "foam came up", "no bubbles at all",
+        "found five of them", "only one or two", "lots near the surface", "not even one", "about 6",
+        "around 7 maybe", "it is 5.5", "the reading says 8",
+    ],
+    "hi": [
+        "कोयले जैसी", "राख जैसी", "ईंट जैसा रंग", "जंग जैसा रंग", "हाथ में चिपकती है", "खुरदरी और रेतीली",
+        "आसानी से बिखर जाती है", "गोला बन जाता है", "पत्थर जैसी सख्त", "मुलायम और भुरभुरी", "गोबर जैसी गंध",
+        "सड़े अंडे जैसी", "कुछ खास नहीं", "पट्टी लाल हो गई", "कागज नीला हो गया", "झाग आया", "कोई बुलबुले नहीं",
+        "पांच मिले", "सिर्फ एक दो", "ऊपर ही बहुत सारे", "लगभग 6",
+    ],
+    "translit": [
+        "koyle jaisi", "raakh jaisi", "eent jaisa rang", "haath mein chipakti hai", "khurdari aur retili",
+        "aasani se bikhar jati hai", "gola ban jata hai", "patthar jaisi sakht", "mulayam aur bhurbhuri",
+        "gobar jaisi gandh", "kuch khas nahi", "patti lal ho gayi", "jhaag aaya", "paanch mile", "sirf ek do",
+    ],
+}
+HELP_TEMPLATES = {
+    "en": [
+        "how do i check {topic}", "how to measure {topic}", "what is {topic}", "why does {topic} matter",
+        "where do i check {topic}", "can you help me with {topic}", "i dont understand the {topic} step",
+        "explain {topic} please", "what should i do for {topic}", "which tool do i need for {topic}",
+    ],
+    "hi": [
+        "{topic} कैसे पता करें", "{topic} क्या होता है", "{topic} क्यों जरूरी है", "{topic} कहाँ देखें",
+        "{topic} के लिए क्या करूं", "मुझे {topic} समझ नहीं आया", "{topic} कैसे जांचें",
+    ],
+    "translit": [
+        "{topic} kaise pata kare", "{topic} kya hota hai", "{topic} kyon zaruri hai", "{topic} kahan dekhe",
+        "{topic} ke liye kya karu", "{topic} kaise check kare",
+    ],
+}
+HELP_SENTENCES = {
+    "en": [
+        "how", "why", "what", "what do i do next", "i am confused", "tell me again", "repeat the steps",
+        "i did that, what now", "how much soil do i need", "what does that mean", "which one should i pick",
+        "i cannot do this", "can you show me", "is there an easier way", "what if i get it wrong",
+    ],
+    "hi": [
+        "अब क्या करना है", "फिर से बताइए", "कैसे करूं", "क्या करना है", "समझाइए", "कितनी मिट्टी लेनी है",
+        "इसका मतलब क्या है", "मुझसे नहीं हो रहा", "कोई आसान तरीका है क्या", "गलत हो गया तो",
+    ],
+    "translit": [
+        "ab kya karna hai", "phir se batao", "kaise karu", "samajh nahi aaya", "madad karo", "kitni mitti leni hai",
+        "iska matlab kya hai", "mujhse nahi ho raha", "koi aasan tarika hai kya",
+    ],
+}
+TOPICS = {
+    "color": {"en": ["color", "colour", "soil color"], "hi": ["रंग", "मिट्टी का रंग"], "translit": ["rang", "mitti ka rang"]},
+    "moisture": {"en": ["moisture", "wetness"], "hi": ["नमी"], "translit": ["nami", "namee"]},
+    "smell": {"en": ["smell", "odor"], "hi": ["गंध", "खुशबू"], "translit": ["gandh", "khushbu"]},
+    "ph": {"en": ["ph", "acidity", "the ph strip"], "hi": ["पीएच", "अम्लता"], "translit": ["ph", "ph patti"]},
+    "soil_type": {"en": ["soil type", "texture"], "hi": ["मिट्टी का प्रकार", "बनावट"], "translit": ["mitti ka prakar"]},
+    "earthworms": {"en": ["earthworms", "worms"], "hi": ["केंचुए"], "translit": ["kenchue"]},
+}
+
+
+def _script(term: str) -> str:
+    return "hi" if any("ऀ" <= char <= "ॿ" for char in term) else "en"
+
+
+def lexicon_examples() -> List[Tuple[str, int]]:
+    """Templated answers from the lexicon and templated help requests."""
+    examples: List[Tuple[str, int]] = []
+    for parameter, entry in lexicon.VOCABULARY.items():
+        terms = [term for values in lexicon.synonyms(parameter).values() for term in values]
+        if parameter not in ("location", "fertilizer_used"):  # Their hints are prepositions / free text
+            terms += [term for language in lexicon.LANGUAGES for term in entry.get("hints", {}).get(language, [])]
+        for term in dict.fromkeys(term.replace("_", " ") for term in terms):
+            script = _script(term)
+            templates = ANSWER_TEMPLATES["hi"] if script == "hi" else ANSWER_TEMPLATES["en"] + ANSWER_TEMPLATES["translit"]
+            examples += [(template.format(t=term), ANSWER) for template in templates]
+
+    suffixes = {"en": "i think", "hi": "है", "translit": "hai"}
+    for script, descriptions in DESCRIPTIONS.items():
+        examples += [(description, ANSWER) for description in descriptions]
+        examples += [(f"{description} {suffixes[script]}", ANSWER) for description in descriptions]
+
+    for topics in TOPICS.values():
+        for script, names in topics.items():
+            examples += [(template.format(topic=name), HELP) for name in names for template in HELP_TEMPLATES[script]]
+    for script, sentences in HELP_SENTENCES.items():
+        examples += [(sentence, HELP) for sentence in sentences]
+    for group in ("help", "unsure", "follow_up"):
+        for phrases in lexicon.PHRASES[group].values():
+            examples += [(phrase, HELP) for phrase in phrases if phrase != "?"]
+    return examples
+
+
+def help_query_examples(path: Path = HELP_QUERIES) -> List[Tuple[str, int]]:
+    """Farmer help queries of the retrieval benchmark."""
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [(query["message"], HELP) for query in json.load(f)["queries"]]
+
+
+def _audit_record(line: str) -> Optional[Dict[str, Any]]:
+    line = line.strip()
+    if AUDIT_MARKER in line:
+        try:
+            return ast.literal_eval(line.split(AUDIT_MARKER, 1)[1])
+        except (ValueError, SyntaxError):
+            return None
+    if line.startswith("{"):
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            return None
+    return None
+
+
+def audit_examples(paths: Iterable[str], min_confidence: float) -> List[Tuple[str, int]]:
+    """Labeled turns from server logs ("📊 Audit:" lines) or JSONL files."""
+    examples = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                record = _audit_record(line)
+                if not isinstance(record, dict):
+                    continue
+                message = record.get("user_message") or record.get("message")
+                intent = record.get("intent")
+                if not message or intent not in ("answer", "help_request"):
+                    continue
+                if float(record.get("intent_confidence", 1.0)) < min_confidence:
+                    continue
+                examples.append((message, HELP if intent == "help_request" else ANSWER))
+    return examples
+
+
+def load_eval_turns(path: Path = EVAL_TURNS) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["turns"]
+
+
+def report(model: Optional[IntentModel], turns: List[Dict[str, Any]], thresholds=REPORT_THRESHOLDS) -> Dict[str, Any]:
+    """LLM call rate and local accuracy on labeled turns, without and with the model."""
+    rules = IntentClassifier(provider="ollama", model_name="report")
+    quick = [rules._classify_quick(turn["message"], turn["parameter"]) for turn in turns]
+    rule_decided = [(turn, decision) for turn, decision in zip(turns, quick) if decision]
+    undecided = [turn for turn, decision in zip(turns, quick) if not decision]
+    results: Dict[str, Any] = {
+        "turns": len(turns),
+        "without_model": {
+            "llm_call_rate": round(len(undecided) / len(turns), 4),
+            "rule_accuracy": round(
+                sum(decision[0] == turn["intent"] for turn, decision in rule_decided) / len(rule_decided), 4
+            ) if rule_decided else None,
+        },
+        "with_model": [],
+    }
+    if model is None:
+        return results
+
+    model.predict_proba("warm up")
+    start = time.perf_counter_ns()
+    probabilities = [model.predict_proba(turn["message"]) for turn in undecided]
+    micros = (time.perf_counter_ns() - start) / 1000 / max(1, len(undecided))
+    results["model_us_per_decision"] = round(micros, 2)
+    for threshold in thresholds:
+        decided = correct = 0
+        for turn, probability in zip(undecided, probabilities):
+            confidence = max(probability, 1 - probability)
+            if confidence >= threshold:
+                decided += 1
+                correct += ("help_request" if probability >= 0.5 else "answer") == turn["intent"]
+        results["with_model"].append({
+            "threshold": threshold,
+            "llm_call_rate": round((len(undecided) - decided) / len(turns), 4),
+            "model_decided": decided,
+            "model_accuracy": round(correct / decided, 4) if decided else None,
+        })
+    return results
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    without = results["without_model"]
+    print(f"Labeled turns: {results['turns']}")
+    print(f"  rules only:  LLM call rate {without['llm_call_rate']:.0%}  (rule accuracy {without['rule_accuracy']:.0%})")
+    for row in results["with_model"]:
+        accuracy = f"{row['model_accuracy']:.0%}" if row["model_accuracy"] is not None else "n/a"
+        print(
+            f"  + model @ {row['threshold']:.2f}: LLM call rate {row['llm_call_rate']:.0%}  "
+            f"({row['model_decided']} decided locally, accuracy {accuracy})"
+        )
+    if "model_us_per_decision" in results:
+        print(f"  model: {results['model_us_per_decision']:.1f} µs per decision")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audit-log", action="append", default=[], help="Server log or JSONL with labeled turns (repeatable)")
+    parser.add_argument("--min-confidence", type=float, default=0.85, help="Skip audit turns classified below this confidence")
+    parser.add_argument("--model", default=default_model_path(), help="Artifact path")
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM, help="Hash buckets (power of two)")
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    parser.add_argument("--report-only", action="store_true", help="Evaluate the existing artifact without training")
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    if args.report_only:
+        model = IntentModel.load(args.model)
+    else:
+        examples = lexicon_examples() + help_query_examples() + audit_examples(args.audit_log, args.min_confidence)
+        examples = list(dict.fromkeys((lexicon.normalize(text), label) for text, label in examples if text.strip()))
+        helps = sum(label for _, label in examples)
+        print(f"⏳ Training on {len(examples)} examples ({helps} help, {len(examples) - helps} answer)")
+        start = time.perf_counter()
+        model = train_intent_model(
+            [text for text, _ in examples], [label for _, label in examples],
+            dim=args.dim, epochs=args.epochs, l2=args.l2,
+        )
+        train_accuracy = sum(
+            (model.predict_proba(text) >= 0.5) == bool(label) for text, label in examples
+        ) / len(examples)
+        print(f"✓ Trained in {time.perf_counter() - start:.1f}s (training accuracy {train_accuracy:.1%})")
+        model.save(args.model)
+        print(f"✓ Model written to {args.model}")
+
+    results = report(model, load_eval_turns())
+    results["threshold_in_use"] = settings.intent_model_threshold
+    print_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✓ Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()